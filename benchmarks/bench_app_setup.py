@@ -0,0 +1,87 @@
+"""Benchmark the time to start an application with a number of EPR sockets.
+
+An application is started over a `UnixSocketConnection` to a controller without
+quantum backend (running in a separate process), either registering the application
+and opening its EPR sockets with a single `SetupAppMessage` (batched), or with a
+message per step, each waiting for its reply (unbatched).
+
+Usage::
+
+    python benchmarks/bench_app_setup.py [--num NUM]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from netqasm.backend.executor import Executor
+from netqasm.backend.qnodeos import QNodeController
+from netqasm.backend.unix_socket import QNodeControllerServer
+from netqasm.sdk.connection import DebugConnection
+from netqasm.sdk.epr_socket import EPRSocket
+from netqasm.sdk.unix_connection import UnixSocketConnection
+
+NUM_EPR_SOCKETS = [1, 2, 4, 8, 16, 32]
+
+
+class BenchController(QNodeController):
+    @classmethod
+    def _get_executor_class(cls, flavour=None):
+        return Executor
+
+    def stop(self):
+        pass
+
+    def _mark_message_finished(self, msg_id, msg):
+        pass
+
+
+class UnbatchedConnection(UnixSocketConnection):
+    _supports_setup_app_message = False
+
+
+def _serve(path: str) -> None:
+    QNodeControllerServer(BenchController("alice"), path=path).serve_forever()
+
+
+def bench_setup(path: str, num_epr_sockets: int, batched: bool, num: int) -> float:
+    connection_class = UnixSocketConnection if batched else UnbatchedConnection
+    total = 0.0
+    for _ in range(num):
+        epr_sockets = [
+            EPRSocket("bob", epr_socket_id=i) for i in range(num_epr_sockets)
+        ]
+        start = time.perf_counter()
+        conn = connection_class("alice", path=path, timeout=10, epr_sockets=epr_sockets)
+        total += time.perf_counter() - start
+        conn.close()
+    return total / num
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=100)
+    args = parser.parse_args()
+
+    DebugConnection.node_ids = {"alice": 0, "bob": 1}
+    path = os.path.join(tempfile.mkdtemp(), "alice.sock")
+    server = multiprocessing.Process(target=_serve, args=(path,))
+    server.start()
+    try:
+        print(f"{'EPR sockets':>12}{'unbatched':>16}{'batched':>16}")
+        for num_epr_sockets in NUM_EPR_SOCKETS:
+            unbatched = bench_setup(path, num_epr_sockets, False, args.num)
+            batched = bench_setup(path, num_epr_sockets, True, args.num)
+            print(
+                f"{num_epr_sockets:>12}{unbatched * 1e6:13.1f} us"
+                f"{batched * 1e6:13.1f} us"
+            )
+    finally:
+        UnixSocketConnection("alice", path=path, timeout=10).close(stop_backend=True)
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
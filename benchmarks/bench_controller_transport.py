@@ -0,0 +1,119 @@
+"""Benchmark the overhead of the Unix-domain-socket transport to a quantum node
+controller.
+
+A subroutine that allocates, measures and returns a qubit is executed repeatedly by a
+controller without quantum backend: directly in the same process, over a
+`UnixSocketConnection` waiting for each subroutine to finish, and over a
+`UnixSocketConnection` with all subroutines in flight at the same time (pipelined).
+The server runs in a separate process.
+
+Usage::
+
+    python benchmarks/bench_controller_transport.py [--num NUM]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Callable
+
+from netqasm.backend.executor import Executor
+from netqasm.backend.messages import (
+    InitNewAppMessage,
+    SubroutineMessage,
+    deserialize_host_msg,
+)
+from netqasm.backend.qnodeos import QNodeController
+from netqasm.backend.unix_socket import QNodeControllerServer
+from netqasm.lang.subroutine import Subroutine
+from netqasm.sdk.connection import DebugConnection
+from netqasm.sdk.qubit import Qubit
+from netqasm.sdk.unix_connection import UnixSocketConnection
+
+
+class BenchController(QNodeController):
+    @classmethod
+    def _get_executor_class(cls, flavour=None):
+        return Executor
+
+    def stop(self):
+        pass
+
+    def _mark_message_finished(self, msg_id, msg):
+        pass
+
+
+def _get_subroutine() -> Subroutine:
+    conn = DebugConnection("alice")
+    Qubit(conn).measure()
+    subroutine = conn.compile()
+    assert subroutine is not None
+    # Release the app ID, such that the benchmarked connections use the same one
+    conn.clear()
+    subroutine.instantiate(0)
+    return subroutine
+
+
+def _serve(path: str) -> None:
+    QNodeControllerServer(BenchController("alice"), path=path).serve_forever()
+
+
+def _timeit(func: Callable[[], None], num: int) -> float:
+    start = time.perf_counter()
+    for _ in range(num):
+        func()
+    return (time.perf_counter() - start) / num
+
+
+def bench_direct(subroutine: Subroutine, num: int) -> float:
+    controller = BenchController("direct")
+    raw_msg = bytes(SubroutineMessage(subroutine))
+    controller._handle_init_new_app(InitNewAppMessage(app_id=0, max_qubits=1))
+
+    def execute():
+        msg = deserialize_host_msg(raw_msg)
+        for _ in controller.handle_netqasm_message(0, msg):
+            pass
+
+    return _timeit(execute, num)
+
+
+def bench_unix_socket(subroutine: Subroutine, num: int, pipelined: bool) -> float:
+    path = os.path.join(tempfile.mkdtemp(), "alice.sock")
+    server = multiprocessing.Process(target=_serve, args=(path,))
+    server.start()
+    conn = UnixSocketConnection("alice", path=path, timeout=10)
+    try:
+        if pipelined:
+            start = time.perf_counter()
+            for _ in range(num):
+                conn.commit_subroutine(subroutine, block=False)
+            conn.block()
+            result = (time.perf_counter() - start) / num
+        else:
+            result = _timeit(lambda: conn.commit_subroutine(subroutine), num)
+    finally:
+        conn.close(stop_backend=True)
+        server.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=1000)
+    args = parser.parse_args()
+
+    subroutine = _get_subroutine()
+    results = {
+        "direct": bench_direct(subroutine, args.num),
+        "unix socket (blocking)": bench_unix_socket(subroutine, args.num, False),
+        "unix socket (pipelined)": bench_unix_socket(subroutine, args.num, True),
+    }
+    for name, result in results.items():
+        print(f"{name:>24}: {result * 1e6:9.1f} us per subroutine")
+
+
+if __name__ == "__main__":
+    main()
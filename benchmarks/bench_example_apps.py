@@ -0,0 +1,210 @@
+"""End-to-end benchmark of the example applications.
+
+Every app in `netqasm/examples/apps` and `netqasm/examples/qne_apps` is simulated for
+a number of rounds, each app in a fresh worker process of a pool. Per app, the wall
+time, the CPU time and the peak memory usage (RSS) of its worker are recorded, as well
+as the number of NetQASM instructions executed by the nodes (using the profiles of
+:mod:`netqasm.backend.profiling`).
+
+Apps are skipped if the simulator (backend) is not installed, or if they are known not
+to work with the simulator (see `netqasm/examples/run_examples.py`). The reason is
+included in the report.
+
+The report is printed as a table and can be written to a JSON file. The script exits
+with status 1 if any app failed.
+
+Usage::
+
+    python benchmarks/bench_example_apps.py [--rounds ROUNDS] [--workers WORKERS]
+        [--simulator SIMULATOR] [--filter FILTER] [--seed SEED] [--output FILE]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import traceback
+from typing import Any, Dict, List, Tuple
+
+import netqasm.examples
+from netqasm.runtime.settings import Simulator
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(netqasm.examples.__file__))
+APP_COLLECTIONS = ["apps", "qne_apps"]
+
+
+def find_apps(name_filter: str = "") -> List[Tuple[str, str]]:
+    """Get the (name, path) of all example apps whose name contains `name_filter`."""
+    apps = []
+    for collection in APP_COLLECTIONS:
+        collection_dir = os.path.join(EXAMPLES_DIR, collection)
+        for app in sorted(os.listdir(collection_dir)):
+            app_dir = os.path.join(collection_dir, app)
+            name = f"{collection}/{app}"
+            if os.path.isdir(app_dir) and app != "__pycache__" and name_filter in name:
+                apps.append((name, app_dir))
+    return apps
+
+
+def run_app(
+    name: str, app_dir: str, simulator: str, num_rounds: int, seed: int
+) -> Dict[str, Any]:
+    """Simulate an app and measure its resource usage.
+
+    Should be run in a fresh process, since apps of different directories may have
+    modules with the same names, and to measure the peak memory usage of the app
+    only.
+    """
+    # Imported here, such that the simulator is set before `netqasm.sdk.external`
+    # is imported
+    from netqasm.backend.profiling import get_profiles
+    from netqasm.runtime.parallel import SimulationSettings, simulate_rounds
+    from netqasm.runtime.settings import set_profiling, set_simulator
+
+    report: Dict[str, Any] = {"app": name, "app_dir": app_dir, "rounds": num_rounds}
+
+    set_simulator(simulator)
+    from netqasm.examples.run_examples import skip_ifs
+
+    skip_if = skip_ifs.get(os.path.basename(app_dir))
+    if skip_if is not None and skip_if.skip:
+        return {**report, "status": "skipped", "reason": skip_if.reason}
+    try:
+        import netqasm.sdk.external  # noqa: F401
+    except ModuleNotFoundError as exc:
+        return {**report, "status": "skipped", "reason": f"backend missing: {exc}"}
+
+    set_profiling(True)
+    with tempfile.TemporaryDirectory() as log_dir:
+        settings = SimulationSettings(
+            app_dir=app_dir,
+            log_dir=log_dir,
+            simulator=Simulator(simulator),
+            enable_logging=False,
+        )
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            simulate_rounds(settings, num_rounds=num_rounds, seed=seed)
+        except Exception:
+            return {**report, "status": "failed", "reason": traceback.format_exc()}
+        wall_time = time.perf_counter() - start_wall
+        cpu_time = time.process_time() - start_cpu
+
+    instructions: Dict[str, int] = {}
+    for profile in get_profiles():
+        for app_instructions in profile.instructions.values():
+            for instr_name, stats in app_instructions.items():
+                instructions[instr_name] = instructions.get(instr_name, 0) + stats.count
+
+    return {
+        **report,
+        "status": "ok",
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "peak_rss_kb": _get_peak_rss_kb(),
+        "num_instructions": sum(instructions.values()),
+        "instructions": instructions,
+    }
+
+
+def _get_peak_rss_kb() -> int:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # In bytes on macOS and kilobytes on Linux
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def _run_app_task(args: Tuple[str, str, str, int, int]) -> Dict[str, Any]:
+    return run_app(*args)
+
+
+def run_apps(
+    apps: List[Tuple[str, str]],
+    simulator: str,
+    num_rounds: int,
+    workers: int,
+    seed: int,
+) -> List[Dict[str, Any]]:
+    """Run apps in a pool of processes, using a new process for each app."""
+    tasks = [(name, app_dir, simulator, num_rounds, seed) for name, app_dir in apps]
+    context = multiprocessing.get_context("spawn")
+    reports = []
+    with context.Pool(processes=workers, maxtasksperchild=1) as pool:
+        for report in pool.imap_unordered(_run_app_task, tasks):
+            print(_format_report(report), flush=True)
+            reports.append(report)
+    return sorted(reports, key=lambda report: report["app"])
+
+
+def _format_report(report: Dict[str, Any]) -> str:
+    line = f"{report['app']:<36}{report['status']:>8}"
+    if report["status"] == "ok":
+        line += (
+            f"{report['wall_time']:>10.2f} s{report['cpu_time']:>10.2f} s"
+            f"{report['peak_rss_kb'] / 1024:>10.1f} MB{report['num_instructions']:>14}"
+        )
+    else:
+        line += f"  {report['reason'].strip().splitlines()[-1]}"
+    return line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--simulator",
+        choices=[Simulator.NETSQUID.value, Simulator.SIMULAQRON.value],
+        default=Simulator.NETSQUID.value,
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run apps whose name contains this"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    apps = find_apps(args.filter)
+    print(
+        f"{'app':<36}{'status':>8}{'wall':>12}{'cpu':>12}{'peak RSS':>13}"
+        f"{'instructions':>14}"
+    )
+    start = time.perf_counter()
+    reports = run_apps(apps, args.simulator, args.rounds, args.workers, args.seed)
+    total_time = time.perf_counter() - start
+
+    counts: Dict[str, int] = {}
+    for report in reports:
+        counts[report["status"]] = counts.get(report["status"], 0) + 1
+    print(
+        f"\n{len(reports)} apps in {total_time:.2f} s: "
+        + ", ".join(f"{num} {status}" for status, num in sorted(counts.items()))
+    )
+
+    if args.output is not None:
+        output: Dict[str, Any] = {
+            "simulator": args.simulator,
+            "rounds": args.rounds,
+            "seed": args.seed,
+            "workers": args.workers,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "total_time": total_time,
+            "apps": reports,
+        }
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if counts.get("failed", 0) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark the time and memory needed to create many measurement Futures.
+
+Creates one Future for each entry of an array, once by constructing a new `Future`
+per entry (the baseline) and once through the per-index cache of `Array`.
+
+Usage::
+
+    python benchmarks/bench_futures.py [--num NUM]
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List
+
+from netqasm.sdk.futures import Array, Future
+from netqasm.sdk.shared_memory import SharedMemory
+
+
+class _BenchConnection:
+    def __init__(self, num: int):
+        self.shared_memory = SharedMemory()
+        self.shared_memory.init_new_array(address=0, length=num)
+
+
+def _create_new_futures(conn: _BenchConnection, num: int) -> List[Future]:
+    return [
+        Future(connection=conn, address=0, index=i) for i in range(num)  # type: ignore
+    ]
+
+
+def _create_array_futures(conn: _BenchConnection, num: int) -> List[Future]:
+    array = Array(conn, length=num, address=0)  # type: ignore
+    return [array.get_future_index(i) for i in range(num)]
+
+
+def _measure(create: Callable[[_BenchConnection, int], List[Future]], num: int) -> None:
+    conn = _BenchConnection(num)
+    start = time.perf_counter()
+    futures = create(conn, num)
+    duration = time.perf_counter() - start
+    del futures
+
+    # Memory is measured in a separate pass, since tracing slows down allocations
+    tracemalloc.start()
+    futures = create(conn, num)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del futures
+
+    print(f"  time: {duration:.3f} s ({duration / num * 1e9:.0f} ns per future)")
+    print(f"  peak memory: {peak / 2**20:.1f} MiB ({peak / num:.0f} B per future)")
+
+
+def bench_futures(num: int) -> None:
+    print(f"new Future per entry ({num} futures):")
+    _measure(_create_new_futures, num)
+    print(f"Array.get_future_index ({num} futures):")
+    _measure(_create_array_futures, num)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=10**6)
+    args = parser.parse_args()
+    bench_futures(args.num)
+
+
+if __name__ == "__main__":
+    main()
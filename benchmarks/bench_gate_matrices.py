@@ -0,0 +1,59 @@
+"""Benchmark getting the matrices of gate instructions, like a simulator does.
+
+Usage::
+
+    python benchmarks/bench_gate_matrices.py [--num NUM]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from netqasm.lang.encoding import RegisterName
+from netqasm.lang.instr import NetQASMInstruction, nv, vanilla
+from netqasm.lang.operand import Immediate, Register
+
+
+def _create_instructions(num: int) -> List[NetQASMInstruction]:
+    q0 = Register(RegisterName.Q, 0)
+    q1 = Register(RegisterName.Q, 1)
+    rng = random.Random(0)
+    instructions: List[NetQASMInstruction] = []
+    for _ in range(num):
+        kind = rng.randrange(4)
+        # Angles of rotations are always of the form n * pi / 2^d
+        n, d = Immediate(rng.randrange(1, 8)), Immediate(rng.randrange(4))
+        if kind == 0:
+            instructions.append(vanilla.GateHInstruction(reg=q0))
+        elif kind == 1:
+            instructions.append(vanilla.CnotInstruction(reg0=q0, reg1=q1))
+        elif kind == 2:
+            instructions.append(vanilla.RotXInstruction(reg=q0, imm0=n, imm1=d))
+        else:
+            instructions.append(
+                nv.ControlledRotYInstruction(reg0=q0, reg1=q1, imm0=n, imm1=d)
+            )
+    return instructions
+
+
+def bench_gate_matrices(num: int) -> None:
+    instructions = _create_instructions(num)
+
+    start = time.perf_counter()
+    for instr in instructions:
+        instr.to_matrix()  # type: ignore
+    duration = time.perf_counter() - start
+
+    print(f"time: {duration:.3f} s ({duration / num * 1e9:.0f} ns per to_matrix)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=10**6)
+    args = parser.parse_args()
+    bench_gate_matrices(args.num)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark the overhead of profiling an executor.
+
+A classical loop subroutine is executed by an `Executor` with profiling disabled and
+enabled.
+
+Usage::
+
+    python benchmarks/bench_profiling.py [--num NUM]
+"""
+
+import argparse
+import timeit
+
+from netqasm.backend.executor import Executor
+from netqasm.lang.parsing import parse_text_subroutine
+from netqasm.runtime.settings import set_profiling
+from netqasm.sdk.shared_memory import SharedMemoryManager
+
+SUBROUTINE = """
+# NETQASM 0.0
+# APPID 0
+array 10 @0
+set R0 0
+LOOP:
+beq R0 100 EXIT
+store R0 @0[1]
+add R0 R0 1
+jmp LOOP
+EXIT:
+ret_arr @0
+"""
+
+
+def bench(profiling: bool, num: int) -> float:
+    SharedMemoryManager.reset_memories()
+    set_profiling(profiling)
+    executor = Executor()
+    executor.init_new_application(app_id=0, max_qubits=1)
+    subroutine = parse_text_subroutine(SUBROUTINE)
+
+    def execute():
+        for _ in executor.execute_subroutine(subroutine=subroutine):
+            pass
+
+    result = timeit.timeit(execute, number=num) / num
+    set_profiling(False)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=200)
+    args = parser.parse_args()
+
+    disabled = bench(False, args.num)
+    enabled = bench(True, args.num)
+    print(f"profiling disabled: {disabled * 1e6:9.1f} us per subroutine")
+    print(f" profiling enabled: {enabled * 1e6:9.1f} us per subroutine")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Benchmark the number of values that are returned to the Host per flush.
+
+Two applications are built using a `DebugConnection` and their subroutines are executed
+by an `Executor` without quantum backend:
+
+* "carried array": measurement outcomes are stored in a large array while subroutines
+  are cut automatically, such that the array is returned by every subroutine.
+* "epr": EPR pairs are created, which uses arrays that are only read by the quantum
+  node controller (qubit IDs and request arguments).
+
+Before: every returned array is written to the shared memory as a whole, and all
+arrays are returned. After: only entries that changed since the last return are
+written, and arrays that are only read by the quantum node controller are not
+returned.
+
+Usage::
+
+    python benchmarks/bench_return_traffic.py [--length LENGTH]
+"""
+
+import argparse
+import contextlib
+from typing import Callable, List, Tuple
+from unittest import mock
+
+from netqasm.backend.executor import Executor
+from netqasm.backend.messages import SubroutineMessage, deserialize_host_msg
+from netqasm.lang.instr.core import ArrayInstruction, RetArrInstruction, SetInstruction
+from netqasm.lang.parsing import deserialize
+from netqasm.lang.subroutine import Subroutine
+from netqasm.sdk.connection import DebugConnection
+from netqasm.sdk.epr_socket import EPRSocket
+from netqasm.sdk.memmgr import MemoryManager
+from netqasm.sdk.qubit import Qubit
+
+
+class FullReturnExecutor(Executor):
+    """Executor that writes returned arrays to the shared memory as a whole."""
+
+    def _instr_ret_arr(self, subroutine_id, instr):
+        app_id = self._get_app_id(subroutine_id=subroutine_id)
+        self._dirty_array_ranges[app_id].pop(instr.address.address, None)
+        return super()._instr_ret_arr(subroutine_id, instr)
+
+
+def build_carried_array(conn: DebugConnection, length: int) -> None:
+    outcomes = conn.new_array(length)
+    for i in range(length):
+        Qubit(conn).measure(future=outcomes.get_future_index(i))
+
+
+def build_epr(conn: DebugConnection, length: int) -> None:
+    epr_socket = EPRSocket("bob")
+    epr_socket.conn = conn
+    for _ in range(length // 10):
+        epr_socket.create_keep(10)
+        conn.flush()
+
+
+def get_subroutines(
+    build: Callable[[DebugConnection, int], None], length: int, return_inputs: bool
+) -> List[Subroutine]:
+    DebugConnection.node_ids = {"alice": 0, "bob": 1}
+    patch_input_arrays = (
+        mock.patch.object(MemoryManager, "is_input_array", lambda self, array: False)
+        if return_inputs
+        else contextlib.nullcontext()
+    )
+    with patch_input_arrays:
+        conn = DebugConnection(
+            "alice", max_qubits=20, auto_flush=True, max_instructions=100
+        )
+        build(conn, length)
+        conn.flush()
+        conn.clear()
+    subroutines = []
+    for raw_msg in conn.storage:
+        msg = deserialize_host_msg(raw_msg)
+        if isinstance(msg, SubroutineMessage):
+            subroutines.append(deserialize(msg.subroutine))
+    return subroutines
+
+
+def count_returned_values(
+    executor: Executor, subroutines: List[Subroutine]
+) -> Tuple[int, int]:
+    """Execute subroutines and count the number of array values that are written to
+    the shared memory."""
+    executor.init_new_application(app_id=0, max_qubits=20)
+    memory = executor._shared_memories[0]
+    num_values = 0
+    init_new_array = memory.init_new_array
+    set_array_part = memory.set_array_part
+
+    def count_init_new_array(address, length=1, new_array=None):
+        nonlocal num_values
+        num_values += length if new_array is None else len(new_array)
+        init_new_array(address, length=length, new_array=new_array)
+
+    def count_set_array_part(address, index, value):
+        nonlocal num_values
+        num_values += len(value) if isinstance(value, list) else 1
+        set_array_part(address, index, value)
+
+    memory.init_new_array = count_init_new_array  # type: ignore
+    memory.set_array_part = count_set_array_part  # type: ignore
+    for subroutine in subroutines:
+        for _ in executor.execute_subroutine(subroutine):
+            pass
+    return num_values, len(subroutines)
+
+
+def count_ret_arr_values(subroutines: List[Subroutine]) -> Tuple[int, int]:
+    """Count the number of array values that are returned by subroutines, assuming
+    that all of them are written to the shared memory."""
+    num_values = 0
+    for subroutine in subroutines:
+        registers = {}
+        lengths = {}
+        for instr in subroutine.instructions:
+            if isinstance(instr, SetInstruction):
+                registers[instr.reg] = instr.imm.value
+            elif isinstance(instr, ArrayInstruction):
+                lengths[instr.address.address] = registers[instr.size]
+            elif isinstance(instr, RetArrInstruction):
+                num_values += lengths[instr.address.address]
+    return num_values, len(subroutines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--length", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'':>16}{'flushes':>10}{'before':>16}{'after':>16}  (values per flush)")
+    for name, build, executes in [
+        ("carried array", build_carried_array, True),
+        ("epr", build_epr, False),
+    ]:
+        before_subroutines = get_subroutines(build, args.length, return_inputs=True)
+        after_subroutines = get_subroutines(build, args.length, return_inputs=False)
+        if executes:
+            before, num = count_returned_values(
+                FullReturnExecutor(), before_subroutines
+            )
+            after, _ = count_returned_values(Executor(), after_subroutines)
+        else:
+            # EPR pairs can not be created without a network stack, so only count
+            # the values of the arrays that are returned
+            before, num = count_ret_arr_values(before_subroutines)
+            after, _ = count_ret_arr_values(after_subroutines)
+        print(f"{name:>16}{num:>10}{before / num:>16.1f}{after / num:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
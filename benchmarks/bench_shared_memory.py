@@ -0,0 +1,58 @@
+"""Benchmark reads and writes of in-process and cross-process shared memories.
+
+Usage::
+
+    python benchmarks/bench_shared_memory.py [--num NUM] [--length LENGTH]
+"""
+
+import argparse
+import timeit
+import uuid
+from typing import Dict
+
+from netqasm.sdk.process_shared_memory import ProcessSharedMemory
+from netqasm.sdk.shared_memory import SharedMemory
+
+
+def bench(memory: SharedMemory, num: int, length: int) -> Dict[str, float]:
+    memory.set_register("M0", 1)
+    memory.init_new_array(0, new_array=list(range(length)))
+    operations = {
+        "set_register": lambda: memory.set_register("M0", 1),
+        "get_register": lambda: memory.get_register("M0"),
+        "get_array_part": lambda: memory.get_array_part(0, 0),
+        "init_new_array": lambda: memory.init_new_array(0, length=length),
+        "get_array": lambda: memory[0],
+        "get_array_view": lambda: memory.get_array_view(0),
+    }
+    return {
+        name: timeit.timeit(operation, number=num) / num
+        for name, operation in operations.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=10000)
+    parser.add_argument("--length", type=int, default=1000)
+    args = parser.parse_args()
+
+    process_memory = ProcessSharedMemory.create(f"netqasm_bench_{uuid.uuid4().hex[:8]}")
+    results = {
+        "SharedMemory": bench(SharedMemory(), args.num, args.length),
+        "ProcessSharedMemory": bench(process_memory, args.num, args.length),
+    }
+    process_memory.close()
+
+    print(f"{'':>16}" + "".join(f"{name:>22}" for name in results))
+    for operation in results["SharedMemory"]:
+        print(
+            f"{operation:>16}"
+            + "".join(
+                f"{result[operation] * 1e6:19.2f} us" for result in results.values()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
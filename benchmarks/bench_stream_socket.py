@@ -0,0 +1,97 @@
+"""Benchmark the latency and throughput of StreamSockets against ThreadSockets.
+
+The remote Host echoes messages back, and runs in a thread for ThreadSockets and in a
+separate process for StreamSockets.
+
+Usage::
+
+    python benchmarks/bench_stream_socket.py [--num NUM] [--size SIZE]
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import threading
+import time
+from typing import Callable, Dict
+
+from netqasm.sdk.classical_communication import (
+    StreamSocket,
+    ThreadSocket,
+    reset_connection_pool,
+    reset_socket_hub,
+)
+from netqasm.sdk.classical_communication.socket import Socket
+
+
+def _echo(create_socket: Callable[..., Socket], num: int, **kwargs) -> None:
+    socket = create_socket("bob", "alice", **kwargs)
+    # Latency: echo every message
+    for _ in range(num):
+        socket.send(socket.recv())
+    # Throughput: acknowledge after receiving all messages
+    received = 0
+    while received < num:
+        received += len(socket.recv_many())
+    socket.send("done")
+
+
+def _run(create_socket: Callable[..., Socket], num: int, size: int, **kwargs) -> Dict:
+    socket = create_socket("alice", "bob", **kwargs)
+    msg = "x" * size
+
+    start = time.perf_counter()
+    for _ in range(num):
+        socket.send(msg)
+        socket.recv()
+    latency = (time.perf_counter() - start) / num
+
+    start = time.perf_counter()
+    for _ in range(num):
+        socket.send(msg)
+    socket.recv()
+    throughput = num / (time.perf_counter() - start)
+    return {"latency": latency, "throughput": throughput}
+
+
+def bench_thread_socket(num: int, size: int) -> Dict:
+    reset_socket_hub()
+    echo = threading.Thread(target=_echo, args=(ThreadSocket, num))
+    echo.start()
+    result = _run(ThreadSocket, num, size)
+    echo.join()
+    return result
+
+
+def bench_stream_socket(num: int, size: int, family: str) -> Dict:
+    reset_connection_pool()
+    kwargs = {"family": family, "registry_dir": tempfile.mkdtemp()}
+    echo = multiprocessing.Process(
+        target=_echo, args=(StreamSocket, num), kwargs=kwargs
+    )
+    echo.start()
+    result = _run(StreamSocket, num, size, **kwargs)
+    echo.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=100)
+    parser.add_argument("--size", type=int, default=100)
+    args = parser.parse_args()
+
+    results = {
+        "ThreadSocket": bench_thread_socket(args.num, args.size),
+        "StreamSocket (unix)": bench_stream_socket(args.num, args.size, "unix"),
+        "StreamSocket (tcp)": bench_stream_socket(args.num, args.size, "tcp"),
+    }
+    for name, result in results.items():
+        print(
+            f"{name:>20}: latency {result['latency'] * 1e6:9.1f} us, "
+            f"throughput {result['throughput']:10.0f} msgs/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
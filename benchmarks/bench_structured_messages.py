@@ -0,0 +1,76 @@
+"""Benchmark sending structured messages with large payloads between ThreadSockets.
+
+Usage::
+
+    python benchmarks/bench_structured_messages.py [--size SIZE] [--num NUM]
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from netqasm.sdk.classical_communication import (
+    BinaryCodec,
+    Codec,
+    JsonCodec,
+    PassthroughCodec,
+    ThreadSocket,
+    reset_socket_hub,
+)
+from netqasm.sdk.classical_communication.message import StructuredMessage
+
+
+def _create_sockets(codec: Optional[Codec]) -> Tuple[ThreadSocket, ThreadSocket]:
+    # Sockets wait for their remote to connect, so create them in separate threads
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        alice = executor.submit(ThreadSocket, "alice", "bob", codec=codec)
+        bob = executor.submit(ThreadSocket, "bob", "alice", codec=codec)
+        return alice.result(), bob.result()
+
+
+def _time_messages(codec: Codec, payload: Any, num: int) -> float:
+    reset_socket_hub()
+    alice, bob = _create_sockets(codec)
+    msg = StructuredMessage(header="Outcomes", payload=payload)
+    start = time.perf_counter()
+    for _ in range(num):
+        alice.send_structured(msg)
+        bob.recv_structured()
+    return (time.perf_counter() - start) / num
+
+
+def bench_structured_messages(size: int, num: int) -> None:
+    outcomes = [random.randint(0, 1) for _ in range(size)]
+    payloads = {
+        "list": outcomes,
+        "numpy": np.array(outcomes, dtype=np.uint8),
+    }
+    codecs = {
+        "json": JsonCodec(),
+        "binary": BinaryCodec(),
+        "passthrough": PassthroughCodec(),
+        "passthrough (copy)": PassthroughCodec(copy=True),
+    }
+    for payload_name, payload in payloads.items():
+        for codec_name, codec in codecs.items():
+            duration = _time_messages(codec, payload, num)
+            print(
+                f"{payload_name:>5} payload, {codec_name:>18} codec: "
+                f"{duration * 1e3:8.3f} ms per message"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10**5)
+    parser.add_argument("--num", type=int, default=20)
+    args = parser.parse_args()
+    bench_structured_messages(args.size, args.num)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the overhead of writing a trace of an executor.
+
+A subroutine with a classical loop and a wait instruction is executed by an
+`Executor` with tracing disabled and enabled. The size of the trace shows how much is
+written per subroutine, since events are streamed to the file instead of being kept
+in memory.
+
+Usage::
+
+    python benchmarks/bench_trace.py [--num NUM]
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+from typing import Optional
+
+from netqasm.backend.executor import Executor
+from netqasm.lang.parsing import parse_text_subroutine
+from netqasm.logging.trace import start_tracing, stop_tracing
+from netqasm.sdk.shared_memory import SharedMemoryManager
+
+SUBROUTINE = """
+# NETQASM 0.0
+# APPID 0
+array 10 @0
+set R0 0
+LOOP:
+beq R0 100 EXIT
+store R0 @0[1]
+add R0 R0 1
+jmp LOOP
+EXIT:
+wait_single @0[1]
+ret_arr @0
+"""
+
+
+def bench(trace_file: Optional[str], num: int) -> float:
+    SharedMemoryManager.reset_memories()
+    if trace_file is not None:
+        start_tracing(trace_file)
+    executor = Executor(name="alice")
+    executor.init_new_application(app_id=0, max_qubits=1)
+    subroutine = parse_text_subroutine(SUBROUTINE)
+
+    def execute():
+        for _ in executor.execute_subroutine(subroutine=subroutine):
+            pass
+
+    result = timeit.timeit(execute, number=num) / num
+    stop_tracing()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num", type=int, default=200)
+    args = parser.parse_args()
+
+    trace_file = os.path.join(tempfile.mkdtemp(), "trace.json")
+    disabled = bench(None, args.num)
+    enabled = bench(trace_file, args.num)
+    size = os.path.getsize(trace_file)
+    print(f"tracing disabled: {disabled * 1e6:9.1f} us per subroutine")
+    print(f" tracing enabled: {enabled * 1e6:9.1f} us per subroutine")
+    print(f"      trace size: {size / args.num:9.1f} bytes per subroutine")
+
+
+if __name__ == "__main__":
+    main()
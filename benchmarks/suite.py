@@ -0,0 +1,332 @@
+"""Benchmark suite for the language toolchain, the executor and the SDK.
+
+Every benchmark is run for each of its parameters (typically the size of its input).
+The reported time is the fastest of a number of repeats, per call.
+
+Results can be saved to a JSON file and compared with the results saved earlier, e.g.
+on the main branch::
+
+    python benchmarks/suite.py --save baseline.json
+    # ... make changes ...
+    python benchmarks/suite.py --compare baseline.json
+
+When comparing, benchmarks that are slower than the baseline by more than a fraction
+`--threshold` are flagged, and the script exits with status 1.
+
+Usage::
+
+    python benchmarks/suite.py [--filter FILTER] [--repeat REPEAT]
+        [--save FILE] [--compare FILE] [--threshold THRESHOLD]
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import platform
+import sys
+import threading
+import timeit
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Callable, Dict, List, Sequence
+
+from netqasm.backend.executor import Executor
+from netqasm.lang.parsing import deserialize, parse_text_subroutine
+from netqasm.lang.parsing.text import assemble_subroutine, parse_text_protosubroutine
+from netqasm.lang.verifier import verify_subroutine
+from netqasm.runtime.settings import set_trusted_execution
+from netqasm.sdk import ThreadSocket
+from netqasm.sdk.classical_communication.thread_socket.socket_hub import _SocketHub
+from netqasm.sdk.shared_memory import SharedMemoryManager
+from netqasm.sdk.transpile import NVSubroutineTranspiler
+
+SIZES = [10, 100, 1000]
+
+SDK_EXAMPLES = [
+    "example_bb84",
+    "example_enumerate",
+    "example_loop",
+    "example_post_epr",
+    "example_rsp",
+    "example_simple_loop",
+]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    params: Sequence[Any]
+    # Returns the function to time, given a parameter
+    setup: Callable[[Any], Callable[[], Any]]
+
+
+def classical_subroutine(size: int) -> str:
+    """Subroutine with `size` straight-line classical instructions."""
+    lines = ["# NETQASM 0.0", "# APPID 0", "array 10 @0", "set R0 0"]
+    for i in range(size):
+        lines.append(f"add R0 R0 {i % 7}" if i % 2 == 0 else f"store R0 @0[{i % 10}]")
+    lines.append("ret_arr @0")
+    return "\n".join(lines)
+
+
+def loop_subroutine(size: int) -> str:
+    """Subroutine with a classical loop of `size` iterations."""
+    return f"""
+# NETQASM 0.0
+# APPID 0
+array 10 @0
+set R0 0
+LOOP:
+beq R0 {size} EXIT
+store R0 @0[1]
+add R0 R0 1
+jmp LOOP
+EXIT:
+ret_arr @0
+"""
+
+
+def qubit_subroutine(size: int) -> str:
+    """Subroutine with `size` gates on two qubits."""
+    lines = [
+        "# NETQASM 0.0",
+        "# APPID 0",
+        "set Q0 0",
+        "set Q1 1",
+        "qalloc Q0",
+        "qalloc Q1",
+        "init Q0",
+        "init Q1",
+    ]
+    gates = ["h Q0", "cnot Q0 Q1", "x Q1", "rot_z Q0 1 2", "cphase Q1 Q0"]
+    for i in range(size):
+        lines.append(gates[i % len(gates)])
+    lines += ["meas Q0 M0", "meas Q1 M1", "qfree Q0", "qfree Q1"]
+    return "\n".join(lines)
+
+
+def setup_parse(size: int) -> Callable[[], Any]:
+    text = classical_subroutine(size)
+    return lambda: parse_text_subroutine(text)
+
+
+def setup_assemble(size: int) -> Callable[[], Any]:
+    text = classical_subroutine(size)
+    # Assembling modifies the protosubroutine, so it is parsed for every call
+    return lambda: assemble_subroutine(parse_text_protosubroutine(text))
+
+
+def setup_transpile(size: int) -> Callable[[], Any]:
+    subroutine = parse_text_subroutine(qubit_subroutine(size))
+    instructions = subroutine.instructions
+
+    def transpile():
+        # Transpiling replaces the instructions of the subroutine
+        subroutine.instructions = instructions
+        NVSubroutineTranspiler(subroutine).transpile()
+
+    return transpile
+
+
+def setup_serialize(size: int) -> Callable[[], Any]:
+    subroutine = parse_text_subroutine(classical_subroutine(size))
+    return lambda: bytes(subroutine)
+
+
+def setup_deserialize(size: int) -> Callable[[], Any]:
+    data = bytes(parse_text_subroutine(classical_subroutine(size)))
+    return lambda: deserialize(data)
+
+
+def setup_verify(size: int) -> Callable[[], Any]:
+    subroutine = parse_text_subroutine(classical_subroutine(size))
+    return lambda: verify_subroutine(subroutine)
+
+
+def _setup_execute(text: str) -> Callable[[], Any]:
+    SharedMemoryManager.reset_memories()
+    executor = Executor(name="alice")
+    executor.init_new_application(app_id=0, max_qubits=2)
+    subroutine = parse_text_subroutine(text)
+
+    def execute():
+        for _ in executor.execute_subroutine(subroutine=subroutine):
+            pass
+
+    return execute
+
+
+def setup_execute_loop(size: int) -> Callable[[], Any]:
+    return _setup_execute(loop_subroutine(size))
+
+
+def setup_execute_loop_trusted(size: int) -> Callable[[], Any]:
+    # The subroutine is only verified for the first call
+    set_trusted_execution(True)
+    try:
+        return _setup_execute(loop_subroutine(size))
+    finally:
+        set_trusted_execution(False)
+
+
+def setup_execute_qubits(size: int) -> Callable[[], Any]:
+    return _setup_execute(qubit_subroutine(size))
+
+
+def setup_sdk_example(name: str) -> Callable[[], Any]:
+    module = importlib.import_module(f"netqasm.examples.sdk_compilation.{name}")
+
+    def build():
+        SharedMemoryManager.reset_memories()
+        # Some examples print their output
+        with contextlib.redirect_stdout(io.StringIO()):
+            module.main(no_output=True)  # type: ignore
+
+    return build
+
+
+_ping_pong_ids = count()
+
+
+def setup_ping_pong(size: int) -> Callable[[], Any]:
+    suffix = next(_ping_pong_ids)
+    sockets = {}
+
+    def connect(app_name, remote_app_name):
+        sockets[app_name] = ThreadSocket(app_name, remote_app_name, timeout=10)
+
+    names = f"alice{suffix}", f"bob{suffix}"
+    threads = [
+        threading.Thread(target=connect, args=names),
+        threading.Thread(target=connect, args=names[::-1]),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    alice, bob = sockets[names[0]], sockets[names[1]]
+
+    def pong():
+        for _ in range(size):
+            bob.send(bob.recv(timeout=10))
+
+    def ping_pong():
+        # Poll for messages without sleeping, such that the time of the sockets
+        # themselves is measured instead of the polling interval of the hub
+        recv_sleep_time = _SocketHub._RECV_SLEEP_TIME
+        _SocketHub._RECV_SLEEP_TIME = 0
+        try:
+            thread = threading.Thread(target=pong)
+            thread.start()
+            for i in range(size):
+                alice.send(str(i))
+                alice.recv(timeout=10)
+            thread.join()
+        finally:
+            _SocketHub._RECV_SLEEP_TIME = recv_sleep_time
+
+    return ping_pong
+
+
+BENCHMARKS = [
+    Benchmark("parse_text_subroutine", SIZES, setup_parse),
+    Benchmark("assemble_subroutine", SIZES, setup_assemble),
+    Benchmark("NVSubroutineTranspiler.transpile", SIZES, setup_transpile),
+    Benchmark("Subroutine.__bytes__", SIZES, setup_serialize),
+    Benchmark("deserialize", SIZES, setup_deserialize),
+    Benchmark("verify_subroutine", SIZES, setup_verify),
+    Benchmark("execute_subroutine(loop)", SIZES, setup_execute_loop),
+    Benchmark("execute_subroutine(loop, trusted)", SIZES, setup_execute_loop_trusted),
+    Benchmark("execute_subroutine(qubits)", SIZES, setup_execute_qubits),
+    Benchmark("Builder(sdk example)", SDK_EXAMPLES, setup_sdk_example),
+    Benchmark("ThreadSocket ping-pong", [1, 10], setup_ping_pong),
+]
+
+
+def run(benchmarks: List[Benchmark], repeat: int) -> Dict[str, float]:
+    """Run benchmarks and return the time per call, per benchmark and parameter."""
+    results = {}
+    for benchmark in benchmarks:
+        for param in benchmark.params:
+            key = f"{benchmark.name}[{param}]"
+            timer = timeit.Timer(benchmark.setup(param))
+            number, _ = timer.autorange()
+            results[key] = min(timer.repeat(repeat=repeat, number=number)) / number
+            print(f"{key:<48}{format_time(results[key]):>12}", flush=True)
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Print the results relative to a baseline and return the keys of benchmarks
+    that are slower by more than a fraction `threshold`."""
+    slower = []
+    print(f"\n{'':<48}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for key, time in results.items():
+        if key not in baseline:
+            continue
+        ratio = time / baseline[key]
+        flag = ""
+        if ratio > 1 + threshold:
+            slower.append(key)
+            flag = "  SLOWER"
+        print(
+            f"{key:<48}{format_time(baseline[key]):>12}{format_time(time):>12}"
+            f"{ratio:>8.2f}{flag}"
+        )
+    return slower
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    return f"{seconds * 1e3:.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run benchmarks whose name contains this"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="compare with results saved in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="fraction by which a benchmark may be slower than the baseline",
+    )
+    args = parser.parse_args()
+
+    benchmarks = [b for b in BENCHMARKS if args.filter in b.name]
+    results = run(benchmarks, repeat=args.repeat)
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        slower = compare(results, baseline, args.threshold)
+        if len(slower) > 0:
+            print(f"\n{len(slower)} benchmark(s) slower than the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
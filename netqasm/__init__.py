@@ -1,7 +1,13 @@
-from importlib.metadata import PackageNotFoundError, version
+def __getattr__(name):
+    # Reading the package metadata is slow, so only do it when the version is used
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version
 
-try:
-    __version__ = version("netqasm")
-except PackageNotFoundError:
-    # package is not installed
-    pass
+        try:
+            globals()["__version__"] = version("netqasm")
+        except PackageNotFoundError:
+            # package is not installed
+            pass
+        else:
+            return globals()["__version__"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
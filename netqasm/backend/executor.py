@@ -8,7 +8,9 @@ as a base class for executing NetQASM instructions.
 from __future__ import annotations
 
 import logging
+import math
 import os
+import time
 import traceback
 from collections import defaultdict
 from dataclasses import dataclass
@@ -28,19 +30,21 @@ from typing import (
     Union,
 )
 
-import numpy as np
 import qlink_interface as qlink_1_0
 
 from netqasm.backend.network_stack import OK_FIELDS_K as OK_FIELDS
 from netqasm.backend.network_stack import BaseNetworkStack
+from netqasm.backend.profiling import WAIT_INSTRUCTIONS, ExecutorProfile, new_profile
 from netqasm.lang import instr as ins
 from netqasm.lang import operand
 from netqasm.lang.encoding import RegisterName
 from netqasm.lang.instr.base import NetQASMInstruction
 from netqasm.lang.operand import Address, ArrayEntry, ArraySlice
 from netqasm.lang.parsing import parse_address
+from netqasm.lang.verifier import SubroutineVerification, verify_subroutine
 from netqasm.logging.glob import get_netqasm_logger
 from netqasm.logging.output import InstrLogger
+from netqasm.logging.trace import TraceWriter, get_tracer
 from netqasm.qlink_compat import (
     LinkLayerCreate,
     LinkLayerErr,
@@ -52,6 +56,7 @@ from netqasm.qlink_compat import (
     get_creator_node_id,
     response_from_qlink_1_0,
 )
+from netqasm.runtime.settings import get_profiling, get_trusted_execution
 from netqasm.sdk import shared_memory
 from netqasm.sdk.shared_memory import Arrays, SharedMemory, SharedMemoryManager
 from netqasm.util.error import NotAllocatedError
@@ -80,6 +85,10 @@ class EprCmdData:
     request: Optional[LinkLayerCreate]
     tot_pairs: int
     pairs_left: int
+    # Time (`time.perf_counter`) of the request, if the executor is profiled
+    request_time: Optional[float] = None
+    # ID of the asynchronous span of the request, if tracing is enabled
+    trace_id: Optional[int] = None
 
 
 def inc_program_counter(method):
@@ -147,6 +156,19 @@ class Executor:
         # Arrays stored in memory for different apps
         self._app_arrays: Dict[int, Arrays] = {}
 
+        # For arrays that have been returned to the host, the range (start, stop) of
+        # entries that changed since, or None if nothing changed. Arrays that have not
+        # been returned since they were (re-)initialized are not included, and are
+        # returned as a whole.
+        self._dirty_array_ranges: Dict[int, Dict[int, Optional[Tuple[int, int]]]] = {}
+
+        # For arrays that were written to the shared memory by ret_arr instructions
+        # since `pop_returned_arrays` was last called, the range (start, stop) of
+        # entries that were written, or None if the whole array was written.
+        self._returned_array_ranges: Dict[
+            int, Dict[int, Optional[Tuple[int, int]]]
+        ] = {}
+
         # Shared memory with host for different apps
         self._shared_memories: Dict[int, SharedMemory] = {}
 
@@ -158,6 +180,13 @@ class Executor:
         # Keep track of what subroutines are currently handled
         self._subroutines: Dict[int, subrt_module.Subroutine] = {}
 
+        # Whether subroutines are verified before they are executed (trusted execution)
+        self._trusted: bool = get_trusted_execution()
+
+        # Verifications of the subroutines currently handled that were verified,
+        # for which runtime checks that are proven to succeed are skipped
+        self._verifications: Dict[int, SubroutineVerification] = {}
+
         # Keep track of which subroutine in the order
         self._next_subroutine_id: int = 0
 
@@ -197,6 +226,11 @@ class Executor:
                 executor=self,
             )
 
+        # Statistics of executed instructions, if profiling is enabled
+        self._profile: Optional[ExecutorProfile] = (
+            new_profile(node_name=self._name) if get_profiling() else None
+        )
+
         # Logger
         self._logger: logging.Logger = get_netqasm_logger(
             f"{self.__class__.__name__}({self._name})"
@@ -210,6 +244,15 @@ class Executor:
         """
         return self._name
 
+    @property
+    def profile(self) -> Optional[ExecutorProfile]:
+        """Get the statistics of the instructions executed by this executor.
+
+        :return: the profile, or None if profiling was not enabled when this executor
+            was created
+        """
+        return self._profile
+
     @property
     def node_id(self) -> int:
         """Get the ID of the node this Executor runs on
@@ -288,6 +331,8 @@ class Executor:
     def _setup_arrays(self, app_id: int) -> None:
         """Setup memory for storing arrays for application"""
         self._app_arrays[app_id] = Arrays()
+        self._dirty_array_ranges[app_id] = {}
+        self._returned_array_ranges[app_id] = {}
 
     def _new_shared_memory(self, app_id: int) -> None:
         """Instantiate a new shared memory with an application"""
@@ -343,6 +388,8 @@ class Executor:
 
     def _clear_arrays(self, app_id: int) -> None:
         self._app_arrays.pop(app_id)
+        self._dirty_array_ranges.pop(app_id)
+        self._returned_array_ranges.pop(app_id)
 
     def _clear_shared_memory(self, app_id: int) -> None:
         self._shared_memories.pop(app_id)
@@ -355,6 +402,7 @@ class Executor:
         """Clears a subroutine from the executor"""
         self._reset_program_counter(subroutine_id=subroutine_id)
         self._subroutines.pop(subroutine_id, 0)
+        self._verifications.pop(subroutine_id, None)
 
     def _get_instruction_handlers(self) -> Dict[str, Callable]:
         """Creates the dictionary of instruction handlers"""
@@ -419,11 +467,58 @@ class Executor:
         subroutine_id = self._get_new_subroutine_id()
         self._subroutines[subroutine_id] = subroutine
         self._reset_program_counter(subroutine_id)
+        self._setup_verification(subroutine_id, subroutine)
+        tracer = get_tracer()
+        if tracer is not None:
+            start = tracer.timestamp()
+            start_sim_time = self._get_simulated_time()
         output = self._execute_commands(subroutine_id, subroutine.instructions)
         if isinstance(output, GeneratorType):
             yield from output
+        if tracer is not None:
+            tracer.complete(
+                node_name=self._name,
+                track=f"executor app {self._get_app_id(subroutine_id=subroutine_id)}",
+                name="subroutine",
+                start=start,
+                cat="executor",
+                args={
+                    "subroutine_id": subroutine_id,
+                    "num_instructions": len(subroutine.instructions),
+                    "start_sim_time": start_sim_time,
+                    "end_sim_time": self._get_simulated_time(),
+                },
+            )
         self._clear_subroutine(subroutine_id=subroutine_id)
 
+    def _setup_verification(
+        self, subroutine_id: int, subroutine: subrt_module.Subroutine
+    ) -> None:
+        """Skip runtime checks for the subroutine if it was verified, verifying it
+        first if trusted execution is enabled."""
+        verification = subroutine.verification
+        if verification is None and self._trusted:
+            verification = verify_subroutine(subroutine)
+        if verification is None:
+            return
+        if verification.verified:
+            self._verifications[subroutine_id] = verification
+        else:
+            self._logger.debug(
+                f"Executing subroutine {subroutine_id} with all runtime checks: "
+                + "; ".join(verification.problems)
+            )
+
+    def _is_safe_array_access(self, subroutine_id: int) -> bool:
+        """Whether the array entry of the current instruction of a subroutine is
+        proven to be within its array."""
+        verification = self._verifications.get(subroutine_id)
+        return (
+            verification is not None
+            and self._program_counters[subroutine_id]
+            in verification.safe_array_accesses
+        )
+
     def _get_new_subroutine_id(self) -> int:
         self._next_subroutine_id += 1
         return self._next_subroutine_id - 1
@@ -438,11 +533,17 @@ class Executor:
         :param commands: list of NetQASM instructions
         :yield: [description]
         """
+        tracer = get_tracer()
         while self._program_counters[subroutine_id] < len(commands):
             prog_counter = self._program_counters[subroutine_id]
             command = commands[prog_counter]
             try:
-                output = self._execute_command(subroutine_id, command)
+                if self._profile is None:
+                    output = self._execute_command(subroutine_id, command)
+                else:
+                    output = self._execute_profiled_command(subroutine_id, command)
+                if tracer is not None and isinstance(command, WAIT_INSTRUCTIONS):
+                    output = self._trace_command(tracer, subroutine_id, command, output)
                 if isinstance(
                     output, GeneratorType
                 ):  # sanity check: should always be the case
@@ -452,6 +553,48 @@ class Executor:
                 self._handle_command_exception(exc, prog_counter, traceback_str)
                 break
 
+    def _execute_profiled_command(
+        self, subroutine_id: int, command: NetQASMInstruction
+    ) -> Generator[Any, None, None]:
+        """Execute a single NetQASM instruction (command) and record its duration in
+        the profile of this executor."""
+        assert self._profile is not None
+        start = time.perf_counter()
+        output = self._execute_command(subroutine_id, command)
+        if isinstance(output, GeneratorType):
+            yield from output
+        self._profile.record_instruction(
+            app_id=self._get_app_id(subroutine_id=subroutine_id),
+            instr_name=command.__class__.__name__,
+            duration=time.perf_counter() - start,
+            wait=isinstance(command, WAIT_INSTRUCTIONS),
+        )
+
+    def _trace_command(
+        self,
+        tracer: TraceWriter,
+        subroutine_id: int,
+        command: NetQASMInstruction,
+        output: Generator[Any, None, None],
+    ) -> Generator[Any, None, None]:
+        """Execute a single NetQASM instruction (command), given the generator
+        returned by `_execute_command`, and add it as a slice to the trace."""
+        start = tracer.timestamp()
+        start_sim_time = self._get_simulated_time()
+        yield from output
+        tracer.complete(
+            node_name=self._name,
+            track=f"executor app {self._get_app_id(subroutine_id=subroutine_id)}",
+            name=command.mnemonic,
+            start=start,
+            cat="executor",
+            args={
+                "subroutine_id": subroutine_id,
+                "start_sim_time": start_sim_time,
+                "end_sim_time": self._get_simulated_time(),
+            },
+        )
+
     def _handle_command_exception(
         self, exc: Exception, prog_counter: int, traceback_str: str
     ) -> None:
@@ -520,15 +663,36 @@ class Executor:
         """Handle a NetQASM 'set' instruction."""
         self._logger.debug(f"Set register {instr.reg} to {instr.imm}")
         app_id = self._get_app_id(subroutine_id=subroutine_id)
-        self._set_register(app_id, instr.reg, instr.imm.value)
+        verified = subroutine_id in self._verifications
+        self._set_register(app_id, instr.reg, instr.imm.value, verified=verified)
 
     def _set_register(
-        self, app_id: int, register: operand.Register, value: int
+        self,
+        app_id: int,
+        register: operand.Register,
+        value: int,
+        verified: bool = False,
     ) -> None:
-        """Set the value of a register."""
-        self._registers[app_id][register.name][register.index] = value
+        """Set the value of a register.
+
+        :param verified: whether the register is known to exist, see
+            :mod:`netqasm.lang.verifier`
+        """
+        if verified:
+            self._registers[app_id][register.name].set_verified(register.index, value)
+        else:
+            self._registers[app_id][register.name][register.index] = value
+
+    def _get_register(
+        self, app_id: int, register: operand.Register, verified: bool = False
+    ) -> Optional[int]:
+        """Get the value of a register.
 
-    def _get_register(self, app_id: int, register: operand.Register) -> Optional[int]:
+        :param verified: whether the register is known to exist, see
+            :mod:`netqasm.lang.verifier`
+        """
+        if verified:
+            return self._registers[app_id][register.name].get_verified(register.index)
         return self._registers[app_id][register.name][register.index]
 
     @inc_program_counter
@@ -557,13 +721,19 @@ class Executor:
         register = instr.reg
         array_entry = instr.entry
         app_id = self._get_app_id(subroutine_id=subroutine_id)
-        value = self._get_register(app_id, register)
+        verified = subroutine_id in self._verifications
+        value = self._get_register(app_id, register, verified=verified)
         if value is None:
             raise RuntimeError(f"value in register {register} is not defined")
         self._logger.debug(
             f"Storing value {value} from register {register} to array entry {array_entry}"
         )
-        self._set_array_entry(app_id=app_id, array_entry=array_entry, value=value)
+        self._set_array_entry(
+            app_id=app_id,
+            array_entry=array_entry,
+            value=value,
+            verified=self._is_safe_array_access(subroutine_id),
+        )
 
     @inc_program_counter
     def _instr_load(self, subroutine_id: int, instr: ins.core.LoadInstruction) -> None:
@@ -574,13 +744,18 @@ class Executor:
         register = instr.reg
         array_entry = instr.entry
         app_id = self._get_app_id(subroutine_id=subroutine_id)
-        value = self._get_array_entry(app_id=app_id, array_entry=array_entry)
+        value = self._get_array_entry(
+            app_id=app_id,
+            array_entry=array_entry,
+            verified=self._is_safe_array_access(subroutine_id),
+        )
         if value is None:
             raise RuntimeError(f"array value at {array_entry} is not defined")
         self._logger.debug(
             f"Storing value {value} from array entry {array_entry} to register {register}"
         )
-        self._set_register(app_id, register, value)
+        verified = subroutine_id in self._verifications
+        self._set_register(app_id, register, value, verified=verified)
 
     @inc_program_counter
     def _instr_lea(self, subroutine_id: int, instr: ins.core.LeaInstruction) -> None:
@@ -589,7 +764,12 @@ class Executor:
         address = instr.address
         self._logger.debug(f"Storing address of {address} to register {register}")
         app_id = self._get_app_id(subroutine_id=subroutine_id)
-        self._set_register(app_id=app_id, register=register, value=address.address)
+        self._set_register(
+            app_id=app_id,
+            register=register,
+            value=address.address,
+            verified=subroutine_id in self._verifications,
+        )
 
     @inc_program_counter
     def _instr_undef(
@@ -602,7 +782,12 @@ class Executor:
         array_entry = instr.entry
         self._logger.debug(f"Unset array entry {array_entry}")
         app_id = self._get_app_id(subroutine_id=subroutine_id)
-        self._set_array_entry(app_id=app_id, array_entry=array_entry, value=None)
+        self._set_array_entry(
+            app_id=app_id,
+            array_entry=array_entry,
+            value=None,
+            verified=self._is_safe_array_access(subroutine_id),
+        )
 
     @inc_program_counter
     def _instr_array(
@@ -613,7 +798,9 @@ class Executor:
         Instantiates a new array with the relevant length.
         """
         app_id = self._get_app_id(subroutine_id=subroutine_id)
-        length = self._get_register(app_id, instr.size)
+        length = self._get_register(
+            app_id, instr.size, verified=subroutine_id in self._verifications
+        )
         assert length is not None
         address = instr.address
         self._logger.debug(
@@ -624,6 +811,7 @@ class Executor:
     def _initialize_array(self, app_id: int, address: Address, length: int) -> None:
         arrays = self._app_arrays[app_id]
         arrays.init_new_array(address.address, length)
+        self._dirty_array_ranges[app_id].pop(address.address, None)
 
     def _handle_branch_instr(
         self,
@@ -640,14 +828,19 @@ class Executor:
         or to the next instruction (no jump).
         """
         app_id = self._get_app_id(subroutine_id=subroutine_id)
+        verified = subroutine_id in self._verifications
         a, b = None, None
         registers = []
         if isinstance(instr, ins.core.BranchUnaryInstruction):
-            a = self._get_register(app_id=app_id, register=instr.reg)
+            a = self._get_register(app_id=app_id, register=instr.reg, verified=verified)
             registers = [instr.reg]
         elif isinstance(instr, ins.core.BranchBinaryInstruction):
-            a = self._get_register(app_id=app_id, register=instr.reg0)
-            b = self._get_register(app_id=app_id, register=instr.reg1)
+            a = self._get_register(
+                app_id=app_id, register=instr.reg0, verified=verified
+            )
+            b = self._get_register(
+                app_id=app_id, register=instr.reg1, verified=verified
+            )
             registers = [instr.reg0, instr.reg1]
 
         if isinstance(instr, ins.core.JmpInstruction):
@@ -659,6 +852,13 @@ class Executor:
 
         if condition:
             jump_address = instr.line
+            if not verified:
+                num_instructions = len(self._subroutines[subroutine_id].instructions)
+                if not 0 <= jump_address.value <= num_instructions:
+                    raise RuntimeError(
+                        f"Cannot branch to line {jump_address}, since the subroutine "
+                        f"has {num_instructions} instructions"
+                    )
             self._logger.debug(
                 f"Branching to line {jump_address}, since {instr}(a={a}, b={b}) "
                 f"is True, with values from registers {registers}"
@@ -682,13 +882,16 @@ class Executor:
     ) -> None:
         """Handle a NetQASM branching instruction with a binary condition."""
         app_id = self._get_app_id(subroutine_id=subroutine_id)
+        verified = subroutine_id in self._verifications
         mod = None
         if isinstance(instr, ins.core.ClassicalOpModInstruction):
-            mod = self._get_register(app_id=app_id, register=instr.regmod)
+            mod = self._get_register(
+                app_id=app_id, register=instr.regmod, verified=verified
+            )
         if mod is not None and mod < 1:
             raise RuntimeError(f"Modulus needs to be greater or equal to 1, not {mod}")
-        a = self._get_register(app_id=app_id, register=instr.regin0)
-        b = self._get_register(app_id=app_id, register=instr.regin1)
+        a = self._get_register(app_id=app_id, register=instr.regin0, verified=verified)
+        b = self._get_register(app_id=app_id, register=instr.regin1, verified=verified)
         assert a is not None
         assert b is not None
         value = self._compute_binary_classical_instr(instr, a, b, mod=mod)
@@ -697,7 +900,9 @@ class Executor:
             f"Performing {instr} of a={a} and b={b} {mod_str} "
             f"and storing the value {value} at register {instr.regout}"
         )
-        self._set_register(app_id=app_id, register=instr.regout, value=value)
+        self._set_register(
+            app_id=app_id, register=instr.regout, value=value, verified=verified
+        )
 
     def _compute_binary_classical_instr(
         self, instr: NetQASMInstruction, a: int, b: int, mod: Optional[int] = 1
@@ -802,7 +1007,7 @@ class Executor:
             yield from output
 
     def _get_rotation_angle_from_operands(self, app_id: int, n: int, d: int) -> float:
-        return float(n * np.pi / 2**d)
+        return float(n * math.pi / 2**d)
 
     def _do_single_qubit_rotation(
         self,
@@ -1024,6 +1229,13 @@ class Executor:
                 request=create_request,
                 tot_pairs=create_request.number,
                 pairs_left=create_request.number,
+                request_time=self._get_request_time(),
+                trace_id=self._trace_epr_request(
+                    name="create_epr",
+                    subroutine_id=subroutine_id,
+                    request_key=(remote_node_id, create_request.purpose_id),
+                    num_pairs=create_request.number,
+                ),
             )
         )
         return None
@@ -1139,6 +1351,13 @@ class Executor:
                 request=None,
                 tot_pairs=num_pairs,
                 pairs_left=num_pairs,
+                request_time=self._get_request_time(),
+                trace_id=self._trace_epr_request(
+                    name="recv_epr",
+                    subroutine_id=subroutine_id,
+                    request_key=(remote_node_id, purpose_id),
+                    num_pairs=num_pairs,
+                ),
             )
         )
         return None
@@ -1254,9 +1473,50 @@ class Executor:
         #         f"Trying to return array {array} but not all values are defined yet"
         #     )
 
-        self._update_shared_memory(
-            app_id=app_id, entry=address, value=array  # type: ignore
-        )
+        # Only return the entries that changed since the array was last returned
+        dirty_ranges = self._dirty_array_ranges[app_id]
+        if address.address not in dirty_ranges:
+            self._update_shared_memory(
+                app_id=app_id, entry=address, value=array  # type: ignore
+            )
+            self._mark_array_returned(app_id, address.address, None)
+        else:
+            dirty_range = dirty_ranges[address.address]
+            if dirty_range is not None:
+                start, stop = dirty_range
+                self._update_shared_memory(
+                    app_id=app_id,
+                    entry=ArraySlice(address, start, stop),
+                    value=array[start:stop],  # type: ignore
+                )
+                self._mark_array_returned(app_id, address.address, dirty_range)
+        dirty_ranges[address.address] = None
+
+    def _mark_array_returned(
+        self, app_id: int, address: int, written: Optional[Tuple[int, int]]
+    ) -> None:
+        """Record which entries of an array were written to the shared memory."""
+        returned_ranges = self._returned_array_ranges[app_id]
+        if address in returned_ranges:
+            previous = returned_ranges[address]
+            if previous is None or written is None:
+                written = None
+            else:
+                written = (min(previous[0], written[0]), max(previous[1], written[1]))
+        returned_ranges[address] = written
+
+    def pop_returned_arrays(self, app_id: int) -> Dict[int, Optional[Tuple[int, int]]]:
+        """Get the arrays that were returned to the Host since the last call.
+
+        :param app_id: ID of the application
+        :return: for the address of each array that was written to the shared memory
+            by a ret_arr instruction, the range (start, stop) of the entries that were
+            written, or None if the whole array was written
+        """
+        returned_ranges = self._returned_array_ranges.get(app_id, {})
+        if app_id in self._returned_array_ranges:
+            self._returned_array_ranges[app_id] = {}
+        return returned_ranges
 
     def _update_shared_memory(
         self,
@@ -1317,17 +1577,80 @@ class Executor:
     def _get_array(self, app_id: int, address: Address) -> List[Optional[int]]:
         return self._app_arrays[app_id]._get_array(address.address)
 
-    def _get_array_entry(self, app_id: int, array_entry: ArrayEntry) -> Optional[int]:
+    def _get_array_entry(
+        self, app_id: int, array_entry: ArrayEntry, verified: bool = False
+    ) -> Optional[int]:
+        """Get the value of an array entry.
+
+        :param verified: whether the index of the entry is a register with a constant
+            value that is known to be within the array, see
+            :mod:`netqasm.lang.verifier`
+        """
+        if verified:
+            return self._app_arrays[app_id].get_verified(
+                array_entry.address.address,
+                self._get_verified_index(app_id, array_entry),
+            )
         address, index = self._expand_array_part(app_id=app_id, array_part=array_entry)
         result = self._app_arrays[app_id][address, index]
         assert (result is None) or isinstance(result, int)
         return result
 
     def _set_array_entry(
-        self, app_id: int, array_entry: ArrayEntry, value: Optional[int]
+        self,
+        app_id: int,
+        array_entry: ArrayEntry,
+        value: Optional[int],
+        verified: bool = False,
     ) -> None:
-        address, index = self._expand_array_part(app_id=app_id, array_part=array_entry)
-        self._app_arrays[app_id][address, index] = value
+        """Set the value of an array entry.
+
+        :param verified: whether the index of the entry is a register with a constant
+            value that is known to be within the array, see
+            :mod:`netqasm.lang.verifier`
+        """
+        address: int
+        index: Union[int, slice]
+        if verified:
+            address = array_entry.address.address
+            index = self._get_verified_index(app_id, array_entry)
+            self._app_arrays[app_id].set_verified(address, index, value)
+        else:
+            address, index = self._expand_array_part(
+                app_id=app_id, array_part=array_entry
+            )
+            self._app_arrays[app_id][address, index] = value
+        self._mark_array_dirty(app_id=app_id, address=address, index=index)
+
+    def _get_verified_index(self, app_id: int, array_entry: ArrayEntry) -> int:
+        index = array_entry.index
+        if isinstance(index, int):
+            return index
+        value = self._registers[app_id][index.name].get_verified(index.index)
+        assert value is not None
+        return value
+
+    def _mark_array_dirty(
+        self, app_id: int, address: int, index: Union[int, slice]
+    ) -> None:
+        """Mark array entries as changed since the array was returned to the host."""
+        dirty_ranges = self._dirty_array_ranges[app_id]
+        if address not in dirty_ranges:
+            # The array is returned as a whole anyway
+            return
+        length = len(self._app_arrays[app_id]._get_array(address))
+        if isinstance(index, int):
+            start = index % length
+            stop = start + 1
+        else:
+            start, stop, step = index.indices(length)
+            if step != 1 or start >= stop:
+                start, stop = 0, length
+        dirty_range = dirty_ranges[address]
+        if dirty_range is not None:
+            start = min(start, dirty_range[0])
+            stop = max(stop, dirty_range[1])
+        dirty_ranges[address] = (start, stop)
 
     def _get_array_slice(
         self, app_id: int, array_slice: ArraySlice
@@ -1516,6 +1839,8 @@ class Executor:
                     )
                 if handled:
                     epr_cmd_data.pairs_left -= 1
+                    self._profile_epr_pair(epr_cmd_data, request_key)
+                    self._trace_epr_pair(epr_cmd_data, is_creator)
 
                     self._handle_last_epr_pair(
                         epr_cmd_data=epr_cmd_data,
@@ -1535,6 +1860,78 @@ class Executor:
         else:
             self._handle_pending_epr_responses()
 
+    def _get_request_time(self) -> Optional[float]:
+        return None if self._profile is None else time.perf_counter()
+
+    def _profile_epr_pair(
+        self, epr_cmd_data: EprCmdData, request_key: T_RequestKey
+    ) -> None:
+        if self._profile is None or epr_cmd_data.request_time is None:
+            return
+        remote_node_id, purpose_id = request_key
+        self._profile.record_epr_pair(
+            remote_node_id=remote_node_id,
+            purpose_id=purpose_id,
+            latency=time.perf_counter() - epr_cmd_data.request_time,
+        )
+
+    def _trace_epr_request(
+        self,
+        name: str,
+        subroutine_id: int,
+        request_key: T_RequestKey,
+        num_pairs: int,
+    ) -> Optional[int]:
+        """Start an asynchronous span in the trace for an EPR request, if tracing is
+        enabled, and return its ID."""
+        tracer = get_tracer()
+        if tracer is None:
+            return None
+        remote_node_id, purpose_id = request_key
+        trace_id = tracer.new_id()
+        tracer.async_begin(
+            node_name=self._name,
+            track=f"executor app {self._get_app_id(subroutine_id=subroutine_id)}",
+            name=name,
+            id=trace_id,
+            cat="epr",
+            args={
+                "remote_node_id": remote_node_id,
+                "purpose_id": purpose_id,
+                "num_pairs": num_pairs,
+                "sim_time": self._get_simulated_time(),
+            },
+        )
+        return trace_id
+
+    def _trace_epr_pair(self, epr_cmd_data: EprCmdData, is_creator: bool) -> None:
+        tracer = get_tracer()
+        if tracer is None or epr_cmd_data.trace_id is None:
+            return
+        app_id = self._get_app_id(subroutine_id=epr_cmd_data.subroutine_id)
+        track = f"executor app {app_id}"
+        name = "create_epr" if is_creator else "recv_epr"
+        args = {
+            "pair_index": epr_cmd_data.tot_pairs - epr_cmd_data.pairs_left - 1,
+            "sim_time": self._get_simulated_time(),
+        }
+        tracer.async_instant(
+            node_name=self._name,
+            track=track,
+            name="pair",
+            id=epr_cmd_data.trace_id,
+            cat="epr",
+            args=args,
+        )
+        if epr_cmd_data.pairs_left == 0:
+            tracer.async_end(
+                node_name=self._name,
+                track=track,
+                name=name,
+                id=epr_cmd_data.trace_id,
+                cat="epr",
+            )
+
     def _wait_to_handle_epr_responses(self) -> None:
         # This can be subclassed to sleep a little before handling again
         self._handle_pending_epr_responses()
@@ -1605,6 +2002,11 @@ class Executor:
         self._app_arrays[app_id][
             ent_results_array_address, arr_start:arr_stop
         ] = ent_info
+        self._mark_array_dirty(
+            app_id=app_id,
+            address=ent_results_array_address,
+            index=slice(arr_start, arr_stop),
+        )
 
     def _handle_epr_ok_k_response(
         self, epr_cmd_data: EprCmdData, response: LinkLayerOKTypeK, pair_index: int
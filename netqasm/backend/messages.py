@@ -4,7 +4,7 @@ Definitions of messages between the Host and the quantum node controller.
 
 import ctypes
 from enum import Enum
-from typing import Union
+from typing import List, Optional, Union
 
 from netqasm.lang.encoding import INTEGER, Address, OptionalInt, Register
 from netqasm.lang.subroutine import Subroutine
@@ -18,6 +18,7 @@ EPR_SOCKET_ID = INTEGER
 EPR_FIDELITY = ctypes.c_uint8
 NODE_ID = INTEGER
 SIGNAL = ctypes.c_uint8
+NUM_EPR_SOCKETS = ctypes.c_uint32
 
 MESSAGE_TYPE_BYTES = len(bytes(MESSAGE_TYPE()))  # type: ignore
 
@@ -42,6 +43,7 @@ class MessageType(Enum):
     SUBROUTINE = 0x02
     STOP_APP = 0x03
     SIGNAL = 0x04
+    SETUP_APP = 0x05
 
 
 class Message(ctypes.Structure):
@@ -51,7 +53,7 @@ class Message(ctypes.Structure):
     ]
 
     @classmethod
-    def deserialize_from(cls, raw: bytes):
+    def deserialize_from(cls, raw: Union[bytes, memoryview]):
         return cls.from_buffer_copy(raw)
 
     def __str__(self):
@@ -148,7 +150,7 @@ class SubroutineMessage:
     def deserialize_from(cls, raw: bytes):
         # NOTE we don't deserialize the subroutine here, since we need to know which flavour
         # is being used
-        return cls(subroutine=raw[MESSAGE_TYPE_BYTES:])
+        return cls(subroutine=bytes(raw[MESSAGE_TYPE_BYTES:]))
 
 
 class StopAppMessage(Message):
@@ -186,19 +188,93 @@ class SignalMessage(Message):
         self.signal = signal.value
 
 
+class SetupAppMessage:
+    """Message sent to the quantum node controller to register a new application and
+    open its EPR sockets at once.
+
+    The quantum node controller handles this message as an `InitNewAppMessage`
+    followed by the `OpenEPRSocketMessage`s, but only replies once, which saves a
+    round trip per EPR socket when starting an application.
+    """
+
+    TYPE = MessageType.SETUP_APP
+
+    def __init__(
+        self,
+        init_new_app: InitNewAppMessage,
+        open_epr_sockets: Optional[List[OpenEPRSocketMessage]] = None,
+    ):
+        """
+        NOTE this message does not subclass from `Message` since it contains
+        a variable number of `OpenEPRSocketMessage`s.
+        Still this class defines the methods `__bytes__` and `deserialize_from`
+        so that it can be packed and unpacked.
+        The packed form of the message is:
+
+        .. code-block:: text
+
+            | TYP | INIT_NEW_APP | NUM_EPR_SOCKETS | OPEN_EPR_SOCKET | ... |
+
+        """
+        self.type = self.TYPE.value
+        self.init_new_app = init_new_app
+        self.open_epr_sockets: List[OpenEPRSocketMessage] = (
+            [] if open_epr_sockets is None else open_epr_sockets
+        )
+
+    def __bytes__(self):
+        return (
+            bytes(MESSAGE_TYPE(self.type))
+            + bytes(self.init_new_app)
+            + bytes(NUM_EPR_SOCKETS(len(self.open_epr_sockets)))
+            + b"".join(bytes(msg) for msg in self.open_epr_sockets)
+        )
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}(init_new_app={self.init_new_app}, "
+            f"open_epr_sockets=[{', '.join(map(str, self.open_epr_sockets))}])"
+        )
+
+    def __len__(self):
+        return len(bytes(self))
+
+    @classmethod
+    def deserialize_from(cls, raw: Union[bytes, memoryview]):
+        offset = MESSAGE_TYPE_BYTES
+        init_new_app = InitNewAppMessage.deserialize_from(
+            raw[offset : offset + ctypes.sizeof(InitNewAppMessage)]
+        )
+        offset += ctypes.sizeof(InitNewAppMessage)
+        num_epr_sockets = NUM_EPR_SOCKETS.from_buffer_copy(
+            raw[offset : offset + ctypes.sizeof(NUM_EPR_SOCKETS)]
+        ).value
+        offset += ctypes.sizeof(NUM_EPR_SOCKETS)
+        open_epr_sockets = []
+        for _ in range(num_epr_sockets):
+            open_epr_sockets.append(
+                OpenEPRSocketMessage.deserialize_from(
+                    raw[offset : offset + ctypes.sizeof(OpenEPRSocketMessage)]
+                )
+            )
+            offset += ctypes.sizeof(OpenEPRSocketMessage)
+        return cls(init_new_app=init_new_app, open_epr_sockets=open_epr_sockets)
+
+
 MESSAGE_CLASSES = {
     MessageType.INIT_NEW_APP: InitNewAppMessage,
     MessageType.OPEN_EPR_SOCKET: OpenEPRSocketMessage,
     MessageType.SUBROUTINE: SubroutineMessage,
     MessageType.STOP_APP: StopAppMessage,
     MessageType.SIGNAL: SignalMessage,
+    MessageType.SETUP_APP: SetupAppMessage,
 }
 
 
-def deserialize_host_msg(raw: bytes) -> Message:
+def deserialize_host_msg(raw: Union[bytes, memoryview]) -> Message:
     """Convert a serialized message into a `Message` object
 
-    :param raw: serialized message (string of bytes)
+    :param raw: serialized message (string of bytes, or a view of them)
     :return: deserialized message object
     """
     message_type = MessageType(
@@ -219,6 +295,7 @@ class ReturnMessageType(Enum):
     ERR = 0x01
     RET_ARR = 0x02
     RET_REG = 0x03
+    RET_ARR_SLICE = 0x04
 
 
 class MsgDoneMessage(ReturnMessage):
@@ -316,10 +393,81 @@ class ReturnArrayMessage:
         hdr = ReturnArrayMessageHeader.from_buffer_copy(raw)
         array_type = OptionalInt * hdr.length
         raw = raw[ReturnArrayMessageHeader.len() :]
-        values = list(v.value for v in array_type.from_buffer_copy(raw))
+        values = list(
+            None if v.type == OptionalInt._NULL_TYPE else v.value
+            for v in array_type.from_buffer_copy(raw)
+        )
         return cls(address=hdr.address.address, values=values)
 
 
+class ReturnArraySliceMessageHeader(ctypes.Structure):
+    """Header for a message with a slice of a returned array coming from the quantum
+    node controller.
+    """
+
+    _pack = 1
+    _fields_ = [
+        ("address", Address),
+        ("start", INTEGER),
+        ("length", INTEGER),
+    ]
+
+    @classmethod
+    def len(cls):
+        return len(bytes(cls()))
+
+
+class ReturnArraySliceMessage:
+    """Message with the values of a slice of a returned array coming from the quantum
+    node controller. The Host already has the other values of the array."""
+
+    TYPE = ReturnMessageType.RET_ARR_SLICE
+
+    def __init__(self, address, start, values):
+        """The packed form of the message is:
+
+        .. code-block:: text
+
+            | ADDRESS | START | LENGTH | VALUES ... |
+
+        """
+        self.type = self.TYPE.value
+        self.address = address
+        self.start = start
+        self.values = values
+
+    def __bytes__(self):
+        array_type = OptionalInt * len(self.values)
+        payload = array_type(*(OptionalInt(v) for v in self.values))
+        hdr = ReturnArraySliceMessageHeader(
+            address=Address(self.address),
+            start=self.start,
+            length=len(self.values),
+        )
+        return bytes(MESSAGE_TYPE(self.type)) + bytes(hdr) + bytes(payload)
+
+    def __str__(self):
+        return (
+            f"{self.__class__.__name__}(address={self.address}, start={self.start}, "
+            f"values={self.values})"
+        )
+
+    def __len__(self):
+        return len(bytes(self))
+
+    @classmethod
+    def deserialize_from(cls, raw: bytes):
+        raw = raw[MESSAGE_TYPE_BYTES:]
+        hdr = ReturnArraySliceMessageHeader.from_buffer_copy(raw)
+        array_type = OptionalInt * hdr.length
+        raw = raw[ReturnArraySliceMessageHeader.len() :]
+        values = list(
+            None if v.type == OptionalInt._NULL_TYPE else v.value
+            for v in array_type.from_buffer_copy(raw)
+        )
+        return cls(address=hdr.address.address, start=hdr.start, values=values)
+
+
 class ReturnRegMessage(ReturnMessage):
     """Message with a returned register coming from the quantum node controller."""
 
@@ -341,13 +489,14 @@ RETURN_MESSAGE_CLASSES = {
     ReturnMessageType.ERR: ErrorMessage,
     ReturnMessageType.RET_REG: ReturnRegMessage,
     ReturnMessageType.RET_ARR: ReturnArrayMessage,
+    ReturnMessageType.RET_ARR_SLICE: ReturnArraySliceMessage,
 }
 
 
-def deserialize_return_msg(raw: bytes) -> Message:
+def deserialize_return_msg(raw: Union[bytes, memoryview]) -> Message:
     """Convert a serialized 'return' message into a `Message` object
 
-    :param raw: serialized message (string of bytes)
+    :param raw: serialized message (string of bytes, or a view of them)
     :return: deserialized message object
     """
     message_type = ReturnMessageType(
@@ -0,0 +1,150 @@
+"""
+Profiling of the execution of subroutines.
+
+This module provides the `ExecutorProfile` class, in which an
+:class:`~netqasm.backend.executor.Executor` records statistics about the instructions
+it executes and the EPR pairs it receives. Executors only do so if profiling was
+enabled (see :func:`netqasm.runtime.settings.set_profiling`) when they were created.
+The profiles of all such executors in this process can be obtained using
+`get_profiles`.
+"""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from netqasm.lang.instr import core
+
+# Instructions that wait for entries of an array to become defined
+WAIT_INSTRUCTIONS = (
+    core.WaitAllInstruction,
+    core.WaitAnyInstruction,
+    core.WaitSingleInstruction,
+)
+
+# Upper bounds (in seconds) of the buckets of latency histograms, from 1 us to 1 s.
+# The last bucket of a histogram counts all latencies above the last bound.
+HISTOGRAM_BOUNDS: Tuple[float, ...] = tuple(10.0**exp for exp in range(-6, 1))
+
+
+@dataclass
+class LatencyStats:
+    """Number, total duration and histogram of durations of events."""
+
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    # Number of events per bucket, see `HISTOGRAM_BOUNDS`
+    histogram: List[int] = field(
+        default_factory=lambda: [0] * (len(HISTOGRAM_BOUNDS) + 1)
+    )
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.count if self.count > 0 else 0.0
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, duration)] += 1
+
+
+@dataclass
+class ExecutorProfile:
+    """Statistics of the execution of subroutines by a single executor.
+
+    Durations are wall-clock times in seconds. For simulators, the duration of an
+    instruction also includes the time that the simulator spends on other nodes while
+    the instruction is waiting for (simulated) time to pass.
+    """
+
+    node_name: str
+    # Per app ID and instruction class
+    instructions: Dict[int, Dict[str, LatencyStats]] = field(default_factory=dict)
+    # Per app ID, total duration of wait instructions (see `WAIT_INSTRUCTIONS`)
+    wait_time: Dict[int, float] = field(default_factory=dict)
+    # Per app ID, total duration of all other instructions
+    compute_time: Dict[int, float] = field(default_factory=dict)
+    # Per (remote node ID, purpose ID), time from the request to each of the pairs
+    epr_latencies: Dict[Tuple[int, int], LatencyStats] = field(default_factory=dict)
+
+    def record_instruction(
+        self, app_id: int, instr_name: str, duration: float, wait: bool
+    ) -> None:
+        """Record the execution of an instruction."""
+        app_instructions = self.instructions.setdefault(app_id, {})
+        stats = app_instructions.get(instr_name)
+        if stats is None:
+            stats = app_instructions[instr_name] = LatencyStats()
+        stats.add(duration)
+        times = self.wait_time if wait else self.compute_time
+        times[app_id] = times.get(app_id, 0.0) + duration
+
+    def record_epr_pair(
+        self, remote_node_id: int, purpose_id: int, latency: float
+    ) -> None:
+        """Record the time from an EPR request until one of its pairs was handled."""
+        key = (remote_node_id, purpose_id)
+        stats = self.epr_latencies.get(key)
+        if stats is None:
+            stats = self.epr_latencies[key] = LatencyStats()
+        stats.add(latency)
+
+    def summary(self) -> str:
+        """Format the statistics as tables."""
+        lines = [f"Profile of node {self.node_name}"]
+        lines.append(
+            f"{'app':>5}  {'instruction':<32}{'count':>8}"
+            f"{'total (ms)':>12}{'mean (us)':>12}{'max (us)':>12}"
+        )
+        for app_id, app_instructions in sorted(self.instructions.items()):
+            for instr_name, stats in sorted(
+                app_instructions.items(), key=lambda item: -item[1].total_time
+            ):
+                lines.append(
+                    f"{app_id:>5}  {instr_name:<32}{stats.count:>8}"
+                    f"{stats.total_time * 1e3:>12.3f}{stats.mean_time * 1e6:>12.1f}"
+                    f"{stats.max_time * 1e6:>12.1f}"
+                )
+        for app_id in sorted(self.instructions):
+            lines.append(
+                f"app {app_id}: "
+                f"{self.compute_time.get(app_id, 0.0) * 1e3:.3f} ms computing, "
+                f"{self.wait_time.get(app_id, 0.0) * 1e3:.3f} ms waiting"
+            )
+        if len(self.epr_latencies) > 0:
+            lines.append(
+                f"{'remote node':>12}{'purpose':>9}{'pairs':>8}"
+                f"{'mean latency (ms)':>20}{'max latency (ms)':>19}"
+            )
+            for (remote_node_id, purpose_id), stats in sorted(
+                self.epr_latencies.items()
+            ):
+                lines.append(
+                    f"{remote_node_id:>12}{purpose_id:>9}{stats.count:>8}"
+                    f"{stats.mean_time * 1e3:>20.3f}{stats.max_time * 1e3:>19.3f}"
+                )
+        return "\n".join(lines)
+
+
+_profiles: List[ExecutorProfile] = []
+
+
+def new_profile(node_name: str) -> ExecutorProfile:
+    """Create a profile that is included in the results of `get_profiles`."""
+    profile = ExecutorProfile(node_name=node_name)
+    _profiles.append(profile)
+    return profile
+
+
+def get_profiles() -> List[ExecutorProfile]:
+    """Get the profiles of all profiled executors in this process."""
+    return list(_profiles)
+
+
+def reset_profiles() -> None:
+    """Forget the profiles of all executors created so far."""
+    _profiles.clear()
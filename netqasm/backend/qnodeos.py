@@ -8,7 +8,7 @@ as a base class for modeling the quantum node controller.
 import abc
 import logging
 from types import GeneratorType
-from typing import Any, Callable, Dict, Generator, List, Optional, Set, Type
+from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple, Type
 
 from netqasm.backend.executor import Executor
 from netqasm.backend.messages import (
@@ -16,6 +16,7 @@ from netqasm.backend.messages import (
     Message,
     MessageType,
     OpenEPRSocketMessage,
+    SetupAppMessage,
     Signal,
     SignalMessage,
     StopAppMessage,
@@ -107,6 +108,11 @@ class QNodeController:
     def has_active_apps(self) -> bool:
         return len(self._active_app_ids) > 0
 
+    def pop_returned_arrays(self, app_id: int) -> Dict[int, Optional[Tuple[int, int]]]:
+        """Get the arrays that the executor returned to the Host since the last call,
+        see :meth:`~.Executor.pop_returned_arrays`."""
+        return self._executor.pop_returned_arrays(app_id=app_id)
+
     @property
     def network_stack(self) -> Optional[BaseNetworkStack]:
         return self._executor.network_stack
@@ -122,6 +128,7 @@ class QNodeController:
             MessageType.INIT_NEW_APP: self._handle_init_new_app,
             MessageType.STOP_APP: self._handle_stop_app,
             MessageType.OPEN_EPR_SOCKET: self._handle_open_epr_socket,
+            MessageType.SETUP_APP: self._handle_setup_app,
         }
 
     def add_network_stack(self, network_stack: BaseNetworkStack) -> None:
@@ -186,3 +193,8 @@ class QNodeController:
             remote_node_id=msg.remote_node_id,
             remote_epr_socket_id=msg.remote_epr_socket_id,
         )
+
+    def _handle_setup_app(self, msg: SetupAppMessage) -> Generator[Any, None, None]:
+        self._handle_init_new_app(msg.init_new_app)
+        for open_epr_socket in msg.open_epr_sockets:
+            yield from self._handle_open_epr_socket(open_epr_socket)
@@ -0,0 +1,367 @@
+"""
+Transport of messages between the Host and the quantum node controller over
+Unix-domain sockets.
+
+This module provides the `QNodeControllerServer` class, which serves any
+`QNodeController` to Hosts that connect with a
+:class:`~netqasm.sdk.unix_connection.UnixSocketConnection`.
+
+Messages are sent as frames: a `MessageHeader`, containing the ID and the length of
+the message, followed by the serialized message itself. The Host chooses the message
+IDs, and may send new messages before earlier ones have been handled. For each
+message, the quantum node controller replies with frames that have the same ID: the
+values returned by a subroutine (`ReturnRegMessage`, and `ReturnArrayMessage` or
+`ReturnArraySliceMessage`), and finally either a `MsgDoneMessage` or an
+`ErrorMessage`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import socket
+import threading
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+
+from netqasm.backend.messages import (
+    ErrorCode,
+    ErrorMessage,
+    Message,
+    MessageHeader,
+    MsgDoneMessage,
+    ReturnArrayMessage,
+    ReturnArraySliceMessage,
+    ReturnRegMessage,
+    SetupAppMessage,
+    StopAppMessage,
+    SubroutineMessage,
+    deserialize_host_msg,
+)
+from netqasm.backend.qnodeos import QNodeController
+from netqasm.lang import operand
+from netqasm.lang.instr import Flavour
+from netqasm.lang.instr.core import RetArrInstruction, RetRegInstruction
+from netqasm.lang.parsing import deserialize
+from netqasm.logging.glob import get_netqasm_logger
+from netqasm.sdk.shared_memory import SharedMemoryManager
+
+T_HostMessage = Union[Message, SubroutineMessage, SetupAppMessage]
+T_ReturnValueMessage = Union[
+    ReturnRegMessage, ReturnArrayMessage, ReturnArraySliceMessage
+]
+T_ReturnMessage = Union[T_ReturnValueMessage, MsgDoneMessage]
+
+_HEADER_LEN = MessageHeader.len()
+
+
+def encode_frame(msg_id: int, raw_msg: bytes) -> bytes:
+    """Prefix a serialized message with a `MessageHeader`."""
+    return bytes(MessageHeader(id=msg_id, length=len(raw_msg))) + raw_msg
+
+
+class FrameReader:
+    """Reads frames, each a `MessageHeader` followed by a message, from a socket.
+
+    Data is received with `recv_into` into a buffer that is reused for all frames.
+    Iterating over the reader yields (message ID, message) tuples, where the message
+    is a `memoryview` into this buffer, such that it can be deserialized without
+    intermediate copies. The message is only valid until the next frame is requested.
+    """
+
+    _INITIAL_BUFFER_SIZE: int = 2**16
+
+    def __init__(self, sock: socket.socket):
+        self._sock: socket.socket = sock
+
+        # Received data that is not parsed yet is in `_buffer[_start:_end]`
+        self._buffer: bytearray = bytearray(self._INITIAL_BUFFER_SIZE)
+        self._view: memoryview = memoryview(self._buffer)
+        self._start: int = 0
+        self._end: int = 0
+
+    def __iter__(self) -> Iterator[Tuple[int, memoryview]]:
+        """Yield frames until the remote socket closes the connection.
+
+        :raises ConnectionError: if the connection is lost, or closed in the middle
+            of a frame
+        """
+        while True:
+            while self._end - self._start >= _HEADER_LEN:
+                header = MessageHeader.from_buffer_copy(self._buffer, self._start)
+                msg_start = self._start + _HEADER_LEN
+                msg_end = msg_start + header.length
+                if msg_end > self._end:
+                    # Make sure the whole frame fits in the buffer
+                    self._reserve(_HEADER_LEN + header.length)
+                    break
+                self._start = msg_end
+                yield header.id, self._view[msg_start:msg_end]
+            if self._start == self._end:
+                self._start = self._end = 0
+            if not self._fill():
+                return
+
+    def _fill(self) -> bool:
+        if self._end == len(self._buffer):
+            # Make room for at least one more byte
+            self._reserve(self._end - self._start + 1)
+        try:
+            num_bytes = self._sock.recv_into(self._view[self._end :])
+        except OSError as error:
+            raise ConnectionError(f"Connection lost: {error}") from error
+        if num_bytes == 0:
+            if self._end > self._start:
+                raise ConnectionError("Connection closed in the middle of a frame")
+            return False
+        self._end += num_bytes
+        return True
+
+    def _reserve(self, size: int) -> None:
+        """Make sure `size` bytes fit in the buffer, counting from `_start`."""
+        num_bytes = self._end - self._start
+        if size <= len(self._buffer) - self._start:
+            return
+        if size <= len(self._buffer):
+            # Move the unparsed data to the front
+            self._buffer[:num_bytes] = self._buffer[self._start : self._end]
+        else:
+            # NOTE the old buffer is not resized, since messages that were yielded
+            # before may still refer to it
+            buffer = bytearray(max(size, 2 * len(self._buffer)))
+            buffer[:num_bytes] = self._view[self._start : self._end]
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        self._start = 0
+        self._end = num_bytes
+
+
+@lru_cache(maxsize=256)
+def _get_returned_registers(
+    raw_subroutine: bytes, flavour: Optional[Flavour]
+) -> Tuple[int, Tuple[operand.Register, ...], bool]:
+    """App ID of a subroutine, the registers that it returns and whether it returns
+    any arrays."""
+    subroutine = deserialize(raw_subroutine, flavour=flavour)
+    registers: List[operand.Register] = []
+    returns_arrays = False
+    for instr in subroutine.instructions:
+        if isinstance(instr, RetRegInstruction):
+            registers.append(instr.reg)
+        elif isinstance(instr, RetArrInstruction):
+            returns_arrays = True
+    assert subroutine.app_id is not None
+    return subroutine.app_id, tuple(registers), returns_arrays
+
+
+class QNodeControllerServer:
+    """Serves a quantum node controller to Hosts over a Unix-domain socket.
+
+    Messages from all connected Hosts are handled one at a time, in the order in
+    which they are received, by letting the controller handle them with
+    `handle_netqasm_message`. Any values that the controller yields while handling
+    a message are ignored, so the controller should not depend on a simulator to
+    process them.
+
+    Values that are returned by subroutines are read from the shared memory that the
+    executor of the controller writes to, and are sent back to the Host. Of arrays
+    that were returned before, only the slice of entries that the executor wrote to
+    the shared memory is sent (see :meth:`~.Executor.pop_returned_arrays`).
+
+    The server stops when the controller has finished, i.e. after handling a
+    `SignalMessage` with `Signal.STOP`, or when `stop` is called.
+
+    .. code-block::
+
+        server = QNodeControllerServer(controller, path="/tmp/alice.sock")
+        server.serve_forever()
+    """
+
+    def __init__(self, controller: QNodeController, path: str):
+        """QNodeControllerServer constructor.
+
+        :param controller: the quantum node controller to serve
+        :param path: path of the Unix-domain socket to listen on
+        """
+        self._controller: QNodeController = controller
+        self._path: str = path
+
+        self._server_socket: Optional[socket.socket] = None
+        self._clients: List[socket.socket] = []
+        self._clients_lock: threading.Lock = threading.Lock()
+
+        # Received messages that are not handled yet, None to stop handling
+        self._requests: queue.Queue[
+            Optional[Tuple[socket.socket, int, T_HostMessage]]
+        ] = queue.Queue()
+        self._stopped: threading.Event = threading.Event()
+
+        self._logger: logging.Logger = get_netqasm_logger(
+            f"{self.__class__.__name__}({controller.name})"
+        )
+
+    @property
+    def controller(self) -> QNodeController:
+        return self._controller
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def __enter__(self) -> QNodeControllerServer:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start listening and handling messages in background threads."""
+        if self._server_socket is not None:
+            raise RuntimeError("Server has already been started")
+        if os.path.exists(self._path):
+            os.remove(self._path)
+        self._server_socket = socket.socket(socket.AF_UNIX)
+        self._server_socket.bind(self._path)
+        self._server_socket.listen()
+        self._logger.debug(f"Listening on {self._path}")
+
+        for target in (self._accept_clients, self._handle_requests):
+            threading.Thread(target=target, daemon=True).start()
+
+    def serve_forever(self) -> None:
+        """Start the server (if needed) and block until it stops."""
+        if self._server_socket is None:
+            self.start()
+        self._stopped.wait()
+
+    def stop(self) -> None:
+        """Stop the server and close the connections with all Hosts.
+
+        Messages that have been received but not handled yet are dropped.
+        """
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._requests.put(None)
+        if self._server_socket is not None:
+            _close_socket(self._server_socket)
+            if os.path.exists(self._path):
+                os.remove(self._path)
+        with self._clients_lock:
+            for client in self._clients:
+                _close_socket(client)
+            self._clients.clear()
+        self._logger.debug("Stopped")
+
+    def _accept_clients(self) -> None:
+        assert self._server_socket is not None
+        while True:
+            try:
+                client, _ = self._server_socket.accept()
+            except OSError:
+                # The server was stopped
+                return
+            with self._clients_lock:
+                if self._stopped.is_set():
+                    client.close()
+                    return
+                self._clients.append(client)
+            self._logger.debug("Accepted connection from a Host")
+            threading.Thread(
+                target=self._read_requests, args=(client,), daemon=True
+            ).start()
+
+    def _read_requests(self, client: socket.socket) -> None:
+        try:
+            for msg_id, raw_msg in FrameReader(client):
+                self._requests.put((client, msg_id, deserialize_host_msg(raw_msg)))
+        except ConnectionError as error:
+            self._logger.debug(f"Connection with Host lost: {error}")
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+                client.close()
+
+    def _handle_requests(self) -> None:
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            client, msg_id, msg = request
+            replies = self._handle_request(msg_id, msg)
+            try:
+                client.sendall(
+                    b"".join(encode_frame(msg_id, bytes(r)) for r in replies)
+                )
+            except OSError as error:
+                self._logger.debug(f"Could not reply to message {msg_id}: {error}")
+            if self._controller.finished:
+                self.stop()
+                return
+
+    def _handle_request(
+        self, msg_id: int, msg: T_HostMessage
+    ) -> List[Union[T_ReturnMessage, ErrorMessage]]:
+        try:
+            for _ in self._controller.handle_netqasm_message(msg_id=msg_id, msg=msg):  # type: ignore
+                pass
+            replies: List[Union[T_ReturnMessage, ErrorMessage]] = []
+            if isinstance(msg, SubroutineMessage):
+                replies += self._get_returned_values(msg)
+            elif isinstance(msg, StopAppMessage):
+                # Such that the app ID can be used again by a later application
+                SharedMemoryManager.remove_shared_memory(
+                    self._controller.name, key=msg.app_id
+                )
+        except Exception as error:
+            self._logger.warning(f"Failed to handle message {msg}: {error!r}")
+            return [ErrorMessage(ErrorCode.GENERAL)]
+        replies.append(MsgDoneMessage(msg_id=msg_id))
+        return replies
+
+    def _get_returned_values(
+        self, msg: SubroutineMessage
+    ) -> List[T_ReturnValueMessage]:
+        app_id, registers, returns_arrays = _get_returned_registers(
+            msg.subroutine, self._controller.flavour
+        )
+        if len(registers) == 0 and not returns_arrays:
+            return []
+        memory = SharedMemoryManager.get_shared_memory(
+            self._controller.name, key=app_id
+        )
+        if memory is None:
+            raise RuntimeError(f"No shared memory for application with app ID {app_id}")
+        returned: List[T_ReturnValueMessage] = [
+            ReturnRegMessage(register=reg.cstruct, value=memory.get_register(reg))
+            for reg in registers
+        ]
+        # Only the entries that the executor wrote to the memory are sent
+        for address, written in self._controller.pop_returned_arrays(app_id).items():
+            if written is None:
+                values = memory[address]
+                assert isinstance(values, list)
+                returned.append(ReturnArrayMessage(address=address, values=values))
+            else:
+                start, stop = written
+                values = memory.get_array_part(address, slice(start, stop))
+                assert isinstance(values, list)
+                returned.append(
+                    ReturnArraySliceMessage(address=address, start=start, values=values)
+                )
+        return returned
+
+
+def _close_socket(sock: socket.socket) -> None:
+    # Shutting down also wakes up threads that are blocked on the socket
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    sock.close()
@@ -11,26 +11,19 @@ from netqasm.sdk.external import NetQASMConnection, Socket
 
 logger = get_netqasm_logger()
 
-buf_msgs = []  # type: ignore
-EOF = "EOF"
 ALL_MEASURED = "All qubits measured"
 
 
 def recv_single_msg(socket):
-    """Used to not get multiple messages at a time"""
-    if len(buf_msgs) > 0:
-        msg = buf_msgs.pop(0)
-    else:
-        msgs = socket.recv().split(EOF)[:-1]
-        buf_msgs.extend(msgs[1:])
-        msg = msgs[0]
+    """Receive a single message, even if multiple messages arrived at once"""
+    msg = socket.recv_many(max_n=1)[0]
     logger.debug(f"Bob received msg {msg}")
     return msg
 
 
 def send_single_msg(socket, msg):
-    """Used to not get multiple messages at a time"""
-    socket.send(msg + EOF)
+    """Send a message that is received by `recv_single_msg`"""
+    socket.send_many([msg])
 
 
 def sendClassicalAssured(socket, data):
@@ -170,7 +163,7 @@ def main(app_config=None, num_bits=100):
             )
         )
 
-    socket.send(ALL_MEASURED)
+    send_single_msg(socket, ALL_MEASURED)
     pairs_info = filter_bases(socket, pairs_info)
 
     pairs_info, error_rate = estimate_error_rate(socket, pairs_info, num_test_bits)
@@ -1,13 +1,16 @@
+from __future__ import annotations
+
 from abc import abstractmethod
 from dataclasses import dataclass
-from typing import List, Union
-
-import numpy as np
+from typing import TYPE_CHECKING, List, Union
 
 from netqasm.lang.operand import Immediate, Operand, Register, Template
 
 from . import base
 
+if TYPE_CHECKING:
+    import numpy as np
+
 # Explicit core NetQASM instructions.
 
 
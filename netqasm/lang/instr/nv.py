@@ -1,13 +1,15 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-import numpy as np
+from . import core
 
-from netqasm.util.quantum_gates import (
-    get_controlled_rotation_matrix,
-    get_rotation_matrix,
-)
+if TYPE_CHECKING:
+    import numpy as np
 
-from . import core
+# NOTE: `netqasm.util.quantum_gates` (and hence NumPy) is only imported when a matrix
+# is requested, such that importing instructions stays cheap.
 
 # Explicit instruction types in the NV flavour.
 
@@ -18,7 +20,9 @@ class GateXInstruction(core.SingleQubitInstruction):
     mnemonic: str = "x"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[0, 1], [1, 0]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.X
 
 
 @dataclass
@@ -27,7 +31,9 @@ class GateYInstruction(core.SingleQubitInstruction):
     mnemonic: str = "y"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[0, -1j], [1j, 0]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.Y
 
 
 @dataclass
@@ -36,7 +42,9 @@ class GateZInstruction(core.SingleQubitInstruction):
     mnemonic: str = "z"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[1, 0], [0, -1]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.Z
 
 
 @dataclass
@@ -45,9 +53,9 @@ class GateHInstruction(core.SingleQubitInstruction):
     mnemonic: str = "h"
 
     def to_matrix(self) -> np.ndarray:
-        X = GateXInstruction().to_matrix()
-        Z = GateZInstruction().to_matrix()
-        return (X + Z) / np.sqrt(2)  # type: ignore
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.H
 
 
 @dataclass
@@ -56,9 +64,11 @@ class RotXInstruction(core.RotationInstruction):
     mnemonic: str = "rot_x"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [1, 0, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (1, 0, 0), self.angle_num.value, self.angle_denom.value
+        )
 
 
 @dataclass
@@ -67,9 +77,11 @@ class RotYInstruction(core.RotationInstruction):
     mnemonic: str = "rot_y"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [0, 1, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (0, 1, 0), self.angle_num.value, self.angle_denom.value
+        )
 
 
 @dataclass
@@ -78,9 +90,11 @@ class RotZInstruction(core.RotationInstruction):
     mnemonic: str = "rot_z"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [0, 0, 1]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (0, 0, 1), self.angle_num.value, self.angle_denom.value
+        )
 
 
 @dataclass
@@ -89,14 +103,18 @@ class ControlledRotXInstruction(core.ControlledRotationInstruction):
     mnemonic: str = "crot_x"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [1, 0, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_controlled_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_controlled_rotation_matrix(
+            (1, 0, 0), self.angle_num.value, self.angle_denom.value
+        )
 
     def to_matrix_target_only(self) -> np.ndarray:
-        axis = [1, 0, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (1, 0, 0), self.angle_num.value, self.angle_denom.value
+        )
 
 
 @dataclass
@@ -105,11 +123,15 @@ class ControlledRotYInstruction(core.ControlledRotationInstruction):
     mnemonic: str = "crot_y"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [1, 0, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_controlled_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_controlled_rotation_matrix(
+            (0, 1, 0), self.angle_num.value, self.angle_denom.value
+        )
 
     def to_matrix_target_only(self) -> np.ndarray:
-        axis = [1, 0, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (0, 1, 0), self.angle_num.value, self.angle_denom.value
+        )
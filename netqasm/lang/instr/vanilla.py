@@ -1,10 +1,15 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-import numpy as np
+from . import core
 
-from netqasm.util.quantum_gates import get_rotation_matrix
+if TYPE_CHECKING:
+    import numpy as np
 
-from . import core
+# NOTE: `netqasm.util.quantum_gates` (and hence NumPy) is only imported when a matrix
+# is requested, such that importing instructions stays cheap.
 
 # Explicit instruction types in the Vanilla flavour.
 
@@ -15,7 +20,9 @@ class GateXInstruction(core.SingleQubitInstruction):
     mnemonic: str = "x"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[0, 1], [1, 0]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.X
 
 
 @dataclass
@@ -24,7 +31,9 @@ class GateYInstruction(core.SingleQubitInstruction):
     mnemonic: str = "y"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[0, -1j], [1j, 0]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.Y
 
 
 @dataclass
@@ -33,7 +42,9 @@ class GateZInstruction(core.SingleQubitInstruction):
     mnemonic: str = "z"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[1, 0], [0, -1]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.Z
 
 
 @dataclass
@@ -42,9 +53,9 @@ class GateHInstruction(core.SingleQubitInstruction):
     mnemonic: str = "h"
 
     def to_matrix(self) -> np.ndarray:
-        X = GateXInstruction().to_matrix()
-        Z = GateZInstruction().to_matrix()
-        return (X + Z) / np.sqrt(2)  # type: ignore
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.H
 
 
 @dataclass
@@ -53,7 +64,9 @@ class GateSInstruction(core.SingleQubitInstruction):
     mnemonic: str = "s"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[1, 0], [0, 1j]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.S
 
 
 @dataclass
@@ -62,9 +75,9 @@ class GateKInstruction(core.SingleQubitInstruction):
     mnemonic: str = "k"
 
     def to_matrix(self) -> np.ndarray:
-        Y = GateYInstruction().to_matrix()
-        Z = GateZInstruction().to_matrix()
-        return (Y + Z) / np.sqrt(2)  # type: ignore
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.K
 
 
 @dataclass
@@ -73,7 +86,9 @@ class GateTInstruction(core.SingleQubitInstruction):
     mnemonic: str = "t"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[1, 0], [0, (1 + 1j) / np.sqrt(2)]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.T
 
 
 @dataclass
@@ -82,9 +97,11 @@ class RotXInstruction(core.RotationInstruction):
     mnemonic: str = "rot_x"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [1, 0, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (1, 0, 0), self.angle_num.value, self.angle_denom.value
+        )
 
 
 @dataclass
@@ -93,9 +110,11 @@ class RotYInstruction(core.RotationInstruction):
     mnemonic: str = "rot_y"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [0, 1, 0]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (0, 1, 0), self.angle_num.value, self.angle_denom.value
+        )
 
 
 @dataclass
@@ -104,9 +123,11 @@ class RotZInstruction(core.RotationInstruction):
     mnemonic: str = "rot_z"
 
     def to_matrix(self) -> np.ndarray:
-        axis = [0, 0, 1]
-        angle = self.angle_num.value * np.pi / 2**self.angle_denom.value
-        return get_rotation_matrix(axis, angle)
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.get_cached_rotation_matrix(
+            (0, 0, 1), self.angle_num.value, self.angle_denom.value
+        )
 
 
 @dataclass
@@ -115,10 +136,14 @@ class CnotInstruction(core.TwoQubitInstruction):
     mnemonic: str = "cnot"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.CNOT
 
     def to_matrix_target_only(self) -> np.ndarray:
-        return np.array([[0, 1], [1, 0]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.X
 
 
 @dataclass
@@ -127,10 +152,14 @@ class CphaseInstruction(core.TwoQubitInstruction):
     mnemonic: str = "cphase"
 
     def to_matrix(self) -> np.ndarray:
-        return np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, -1]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.CPHASE
 
     def to_matrix_target_only(self) -> np.ndarray:
-        return np.array([[1, 0], [0, -1]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.Z
 
 
 @dataclass
@@ -142,7 +171,9 @@ class MovInstruction(core.TwoQubitInstruction):
 
     def to_matrix(self) -> np.ndarray:
         # NOTE: Currently this is represented as a full SWAP.
-        return np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+        from netqasm.util import quantum_gates
+
+        return quantum_gates.SWAP
 
     def to_matrix_target_only(self) -> np.ndarray:  # type: ignore
         # NOTE: The mov instruction is not meant to be viewed as control-target gate.
@@ -539,64 +539,223 @@ for index in [2, 3, 4, 5]:
     _REPLACE_CONSTANTS_EXCEPTION.append((GenericInstr.MEAS_BASIS, index))
 
 
+_BRANCH_INSTRUCTIONS = [
+    GenericInstr.JMP,
+    GenericInstr.BEZ,
+    GenericInstr.BNZ,
+    GenericInstr.BEQ,
+    GenericInstr.BNE,
+    GenericInstr.BLT,
+    GenericInstr.BGE,
+]
+
+
 def _replace_constants(commands: List[Union[ICmd, BranchLabel]]):
+    """Replace integer operands by registers which are set to the constant value.
+
+    Registers that are not used by the subroutine itself are used as temporary
+    registers. Since only the `set` commands inserted here write to them, a
+    temporary register keeps its constant value until the next branch label, and
+    is reused for later uses of the same constant. For loops (a label which is only
+    jumped back to from later commands), the constants used in the loop are set
+    once before the loop label, if enough registers are available.
+    """
     current_registers = get_current_registers(commands)
+    free_registers = [
+        Register(RegisterName.R, i)
+        for i in range(2**REG_INDEX_BITS)
+        if str(Register(RegisterName.R, i)) not in current_registers
+    ]
+    # Branch targets given as line numbers cannot be tracked through the inserted
+    # commands, so don't reuse any registers in that case.
+    reuse = not any(
+        isinstance(command, ICmd)
+        and command.instruction in _BRANCH_INSTRUCTIONS
+        and not any(isinstance(operand, Label) for operand in command.operands)
+        for command in commands
+    )
+    loops = _find_loops(commands) if reuse else {}
 
-    def reg_and_set_cmd(value, tmp_registers: List[Register], lineno=None):
-        for i in range(2**REG_INDEX_BITS):
-            register = Register(RegisterName.R, i)
-            if str(register) not in current_registers and register not in tmp_registers:
-                break
-        else:
-            raise RuntimeError("Could not replace constant since no registers left")
-        set_command = ICmd(
+    # Constant value -> register currently holding it, in least-recently-used order
+    cached: Dict[int, Register] = {}
+    # Constants hoisted out of the loop that is currently being processed
+    hoisted: Dict[int, Register] = {}
+    loop_end: Optional[int] = None
+
+    new_commands: List[Union[ICmd, BranchLabel]] = []
+
+    def set_command(register: Register, value: int, lineno) -> ICmd:
+        return ICmd(
             instruction=GenericInstr.SET,
             args=[],
             operands=[register, value],
             lineno=lineno,
         )
+
+    def get_register(value: int, tmp_registers: List[Register], lineno) -> Register:
+        register = cached.pop(value, None)
+        if register is None:
+            register = _get_tmp_register(free_registers, cached, hoisted, tmp_registers)
+            new_commands.append(set_command(register, value, lineno))
+        if reuse:
+            cached[value] = register
         tmp_registers.append(register)
+        return register
+
+    for i, command in enumerate(commands):
+        if i in loops and loop_end is None:
+            loop_end = loops[i]
+            values = _get_loop_constants_to_hoist(
+                commands[i : loop_end + 1], len(free_registers)
+            )
+            # Keep constants in place that are already in a register
+            hoisted = {value: cached[value] for value in values if value in cached}
+            available = [r for r in free_registers if r not in hoisted.values()]
+            for value in values:
+                if value not in hoisted:
+                    hoisted[value] = available.pop(0)
+                    new_commands.append(
+                        set_command(hoisted[value], value, command.lineno)
+                    )
+            cached = dict(hoisted)
+
+        if isinstance(command, BranchLabel):
+            # Can be jumped to, so only hoisted constants are known to be set
+            cached = dict(hoisted)
+            new_commands.append(command)
+        else:
+            tmp_registers: List[Register] = []
+            for j, operand in enumerate(command.operands):
+                if (
+                    isinstance(operand, int)
+                    and (command.instruction, j) not in _REPLACE_CONSTANTS_EXCEPTION
+                ):
+                    command.operands[j] = get_register(
+                        operand, tmp_registers, command.lineno
+                    )
+                else:
+                    for attr in _get_array_index_attrs(operand):
+                        value = getattr(operand, attr)
+                        if isinstance(value, int):
+                            register = get_register(
+                                value, tmp_registers, command.lineno
+                            )
+                            setattr(operand, attr, register)
+            new_commands.append(command)
+
+        if i == loop_end:
+            loop_end = None
+            hoisted = {}
+    return new_commands
+
+
+def _get_array_index_attrs(operand) -> List[str]:
+    if isinstance(operand, ArrayEntry):
+        return ["index"]
+    elif isinstance(operand, ArraySlice):
+        return ["start", "stop"]
+    else:
+        return []
 
-        return register, set_command
 
-    i = 0
-    while i < len(commands):
-        command = commands[i]
-        if not isinstance(command, ICmd):
-            i += 1
+def _get_constants(command: T_Cmd) -> List[int]:
+    """Get the constants in a command that are to be replaced by registers."""
+    if not isinstance(command, ICmd):
+        return []
+    constants = []
+    for j, operand in enumerate(command.operands):
+        if (
+            isinstance(operand, int)
+            and (command.instruction, j) not in _REPLACE_CONSTANTS_EXCEPTION
+        ):
+            constants.append(operand)
+        else:
+            for attr in _get_array_index_attrs(operand):
+                value = getattr(operand, attr)
+                if isinstance(value, int):
+                    constants.append(value)
+    return constants
+
+
+def _get_tmp_register(
+    free_registers: List[Register],
+    cached: Dict[int, Register],
+    hoisted: Dict[int, Register],
+    tmp_registers: List[Register],
+) -> Register:
+    """Get a register to put a new constant in, evicting a cached one if needed."""
+    unavailable = list(hoisted.values()) + tmp_registers
+    for register in free_registers:
+        if register not in cached.values() and register not in unavailable:
+            return register
+    # Evict the least recently used constant
+    for value, register in cached.items():
+        if register not in unavailable:
+            cached.pop(value)
+            return register
+    raise RuntimeError("Could not replace constant since no registers left")
+
+
+def _find_loops(commands: List[T_Cmd]) -> Dict[int, int]:
+    """Find the outermost loops in a list of commands.
+
+    A loop starts at a branch label that is only jumped to by commands after it,
+    and ends at the last of these commands. Loops that can be entered from outside
+    (other than through their first label) are ignored.
+
+    :return: mapping of index of the loop label to index of its last command
+    """
+    label_indices: Dict[str, int] = {}
+    jumps_from: Dict[str, List[int]] = defaultdict(list)
+    for i, command in enumerate(commands):
+        if isinstance(command, BranchLabel):
+            label_indices[command.name] = i
+        elif command.instruction in _BRANCH_INSTRUCTIONS:
+            for operand in command.operands:
+                if isinstance(operand, Label):
+                    jumps_from[operand.name].append(i)
+
+    loops: Dict[int, int] = {}
+    for name, start in label_indices.items():
+        sources = jumps_from[name]
+        if len(sources) == 0 or min(sources) < start:
             continue
-        tmp_registers: List[Register] = []
-        for j, operand in enumerate(command.operands):
-            if (
-                isinstance(operand, int)
-                and (command.instruction, j) not in _REPLACE_CONSTANTS_EXCEPTION
-            ):
-                register, set_command = reg_and_set_cmd(
-                    operand, tmp_registers, lineno=command.lineno
-                )
-                commands.insert(i, set_command)
-                command.operands[j] = register
-
-                i += 1
-            else:
-                if isinstance(operand, ArrayEntry):
-                    attrs = ["index"]
-                elif isinstance(operand, ArraySlice):
-                    attrs = ["start", "stop"]
-                else:
-                    continue
-                for attr in attrs:
-                    value = getattr(operand, attr)
-                    if isinstance(value, int):
-                        register, set_command = reg_and_set_cmd(
-                            value, tmp_registers, lineno=command.lineno
-                        )
-                        commands.insert(i, set_command)
-                        setattr(operand, attr, register)
-
-                        i += 1
-        i += 1
-    return commands
+        end = max(sources)
+        # Labels inside the loop should not be jumped to from outside the loop
+        enclosed = True
+        for other, index in label_indices.items():
+            if start < index <= end:
+                if any(s < start or s > end for s in jumps_from[other]):
+                    enclosed = False
+                    break
+        if not enclosed:
+            continue
+        # Only keep the outermost loops
+        if any(s <= start and end <= e for s, e in loops.items()):
+            continue
+        loops = {s: e for s, e in loops.items() if not (start <= s and e <= end)}
+        loops[start] = end
+    return loops
+
+
+def _get_loop_constants_to_hoist(
+    loop_commands: List[T_Cmd], num_free_registers: int
+) -> List[int]:
+    """Choose which constants used in a loop get a register for the whole loop.
+
+    The most frequently used constants are hoisted, while keeping enough registers
+    available for the constants of any single command.
+    """
+    counts: Dict[int, int] = defaultdict(int)
+    reserve = 0
+    for command in loop_commands:
+        constants = _get_constants(command)
+        reserve = max(reserve, len(constants))
+        for value in constants:
+            counts[value] += 1
+    num_hoisted = max(0, num_free_registers - reserve)
+    # Sort by count, keeping order of first use for equal counts
+    return sorted(counts, key=lambda value: -counts[value])[:num_hoisted]
 
 
 def get_current_registers(commands: List[T_Cmd]) -> Set[str]:
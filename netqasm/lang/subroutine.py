@@ -8,7 +8,7 @@ executed) NetQASM subroutine.
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 from netqasm.lang import encoding
 from netqasm.lang.instr import DebugInstruction, NetQASMInstruction
@@ -16,6 +16,9 @@ from netqasm.lang.operand import Operand, Template
 from netqasm.lang.version import NETQASM_VERSION
 from netqasm.util.string import rspaces
 
+if TYPE_CHECKING:
+    from netqasm.lang.verifier import SubroutineVerification
+
 
 class Subroutine:
     """
@@ -41,6 +44,9 @@ class Subroutine:
         self._netqasm_version: Tuple[int, int] = netqasm_version
         self._app_id: Optional[int] = app_id
 
+        # Properties proven by `netqasm.lang.verifier.verify_subroutine`
+        self._verification: Optional[SubroutineVerification] = None
+
         self._instructions: List[NetQASMInstruction] = []
         if instructions is not None:
             self.instructions = instructions
@@ -74,6 +80,22 @@ class Subroutine:
     @instructions.setter
     def instructions(self, new_instructions: List[NetQASMInstruction]) -> None:
         self._instructions = new_instructions
+        # The new instructions have not been verified
+        self._verification = None
+
+    @property
+    def verification(self) -> Optional[SubroutineVerification]:
+        """Properties of the instructions that were proven by
+        `netqasm.lang.verifier.verify_subroutine`, or None if the subroutine was not
+        verified since its instructions were set.
+
+        Instructions should not be modified in place after verification.
+        """
+        return self._verification
+
+    @verification.setter
+    def verification(self, verification: Optional[SubroutineVerification]) -> None:
+        self._verification = verification
 
     @property
     def arguments(self) -> List[str]:
@@ -0,0 +1,201 @@
+"""
+Static verification of NetQASM subroutines.
+
+This module contains the `verify_subroutine` function, which proves properties of a
+`Subroutine` that would otherwise be checked at runtime, every time an instruction is
+executed:
+
+* all registers used by instructions have an index within their register group,
+* all branch targets are lines of the subroutine,
+* array entries accessed by `store`, `load` and `undef` instructions are within their
+  array, if the index register always has the same value at that instruction, and the
+  array was always declared with the same size before.
+
+The result is stored on the subroutine (see `Subroutine.verification`). An
+:class:`~netqasm.backend.executor.Executor` skips the corresponding runtime checks
+when executing a verified subroutine.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Union
+
+from netqasm.lang.encoding import REG_INDEX_BITS
+from netqasm.lang.instr import NetQASMInstruction, core
+from netqasm.lang.operand import (
+    Address,
+    ArrayEntry,
+    ArraySlice,
+    Immediate,
+    Operand,
+    Register,
+)
+from netqasm.lang.subroutine import Subroutine
+
+BRANCH_INSTRUCTIONS = (
+    core.JmpInstruction,
+    core.BranchUnaryInstruction,
+    core.BranchBinaryInstruction,
+)
+
+# Values of registers and sizes of arrays (by address)
+T_Constants = Dict[Union[Register, Address], int]
+
+# Instructions that access a single entry of an array
+ARRAY_ENTRY_INSTRUCTIONS = (
+    core.StoreInstruction,
+    core.LoadInstruction,
+    core.UndefInstruction,
+)
+
+
+@dataclass(frozen=True)
+class SubroutineVerification:
+    """Properties of a subroutine that were proven by `verify_subroutine`."""
+
+    # Whether all registers have an index within their register group
+    registers_in_range: bool
+    # Whether all branch targets are lines of the subroutine, or the line after the
+    # last instruction
+    branch_targets_valid: bool
+    # Lines of instructions (see `ARRAY_ENTRY_INSTRUCTIONS`) whose array entry is
+    # within the array whenever the instruction is executed
+    safe_array_accesses: FrozenSet[int]
+    # Reasons why properties could not be proven
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def verified(self) -> bool:
+        """Whether all register indices and branch targets are valid."""
+        return self.registers_in_range and self.branch_targets_valid
+
+
+def verify_subroutine(subroutine: Subroutine) -> SubroutineVerification:
+    """Prove properties of a subroutine, and store the result on the subroutine.
+
+    Subroutines with arguments should be instantiated first.
+
+    :param subroutine: subroutine to verify
+    :return: the proven properties
+    """
+    instructions = subroutine.instructions
+    problems: List[str] = []
+
+    registers_in_range = True
+    branch_targets_valid = True
+    for line, instr in enumerate(instructions):
+        for op in instr.operands:
+            for register in _get_registers(op):
+                if not 0 <= register.index < 2**REG_INDEX_BITS:
+                    problems.append(f"line {line}: register {register} does not exist")
+                    registers_in_range = False
+        if isinstance(instr, BRANCH_INSTRUCTIONS):
+            target = instr.line
+            if not (
+                isinstance(target, Immediate) and 0 <= target.value <= len(instructions)
+            ):
+                problems.append(f"line {line}: invalid branch target {target}")
+                branch_targets_valid = False
+
+    verification = SubroutineVerification(
+        registers_in_range=registers_in_range,
+        branch_targets_valid=branch_targets_valid,
+        safe_array_accesses=_find_safe_array_accesses(instructions),
+        problems=problems,
+    )
+    subroutine.verification = verification
+    return verification
+
+
+def _get_registers(op: Operand) -> List[Register]:
+    """Get the registers used by an operand, including those of array indices."""
+    if isinstance(op, Register):
+        return [op]
+    if isinstance(op, ArrayEntry):
+        return [op.index] if isinstance(op.index, Register) else []
+    if isinstance(op, ArraySlice):
+        return [s for s in [op.start, op.stop] if isinstance(s, Register)]
+    return []
+
+
+def _find_safe_array_accesses(instructions: List[NetQASMInstruction]) -> FrozenSet[int]:
+    """Find the lines of instructions that access an array entry at a constant index,
+    that is smaller than the constant size with which the array was declared."""
+    constants = _propagate_constants(instructions)
+    safe_lines = []
+    for line, instr in enumerate(instructions):
+        known = constants[line]
+        if known is None or not isinstance(instr, ARRAY_ENTRY_INSTRUCTIONS):
+            continue
+        entry: ArrayEntry = instr.entry
+        size = known.get(entry.address)
+        index = entry.index if isinstance(entry.index, int) else known.get(entry.index)
+        if size is not None and index is not None and 0 <= index < size:
+            safe_lines.append(line)
+    return frozenset(safe_lines)
+
+
+def _propagate_constants(
+    instructions: List[NetQASMInstruction],
+) -> List[Optional[T_Constants]]:
+    """Find the values of registers, and the sizes of arrays, that are the same
+    whenever an instruction is executed, per line.
+
+    Values from before the subroutine are unknown. Lines that are never reached are
+    None.
+    """
+    constants: List[Optional[T_Constants]] = [None] * len(instructions)
+    if len(instructions) == 0:
+        return constants
+    constants[0] = {}
+    lines_to_visit = [0]
+    while len(lines_to_visit) > 0:
+        line = lines_to_visit.pop()
+        instr = instructions[line]
+        before = constants[line]
+        assert before is not None
+        after = _get_constants_after(instr, before)
+        for next_line in _get_next_lines(line, instr, len(instructions)):
+            current = constants[next_line]
+            if current is None:
+                constants[next_line] = after
+            else:
+                # Only values that are the same on both paths are known
+                merged = {
+                    key: value
+                    for key, value in current.items()
+                    if after.get(key) == value
+                }
+                if len(merged) == len(current):
+                    continue
+                constants[next_line] = merged
+            lines_to_visit.append(next_line)
+    return constants
+
+
+def _get_constants_after(instr: NetQASMInstruction, before: T_Constants) -> T_Constants:
+    after = dict(before)
+    if isinstance(instr, core.ArrayInstruction):
+        size = before.get(instr.size)
+        if size is None:
+            after.pop(instr.address, None)
+        else:
+            after[instr.address] = size
+    for register in instr.writes_to():
+        after.pop(register, None)
+    if isinstance(instr, core.SetInstruction) and isinstance(instr.imm, Immediate):
+        after[instr.reg] = instr.imm.value
+    return after
+
+
+def _get_next_lines(
+    line: int, instr: NetQASMInstruction, num_instructions: int
+) -> List[int]:
+    """Get the lines of the instructions that may be executed after an instruction."""
+    next_lines = []
+    if not isinstance(instr, core.JmpInstruction):
+        next_lines.append(line + 1)
+    if isinstance(instr, BRANCH_INSTRUCTIONS) and isinstance(instr.line, Immediate):
+        next_lines.append(instr.line.value)
+    return [next_line for next_line in next_lines if 0 <= next_line < num_instructions]
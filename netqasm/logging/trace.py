@@ -0,0 +1,308 @@
+"""
+Export of traces in the Chrome Trace Event format.
+
+While tracing is enabled (see `start_tracing`), the following events are written to
+a JSON file that can be loaded in Perfetto (https://ui.perfetto.dev) or
+``chrome://tracing``:
+
+* the execution of subroutines and blocking wait instructions by an
+  :class:`~netqasm.backend.executor.Executor`, on a track per application of a node,
+* EPR requests of `create_epr` and `recv_epr` instructions, as asynchronous spans that
+  end when the link layer delivered the last pair (with an instant event per pair),
+* flushes of a :class:`~netqasm.sdk.connection.BaseNetQASMConnection`, on a track per
+  Host application,
+* classical messages sent and received by a
+  :class:`~netqasm.sdk.classical_communication.thread_socket.socket.ThreadSocket`,
+  as slices on the track of the Host with a flow arrow from each send to the
+  matching receive.
+
+Each node is shown as a separate process. Timestamps are wall-clock times since
+tracing was started. Events are written as soon as they are complete, such that the
+trace does not need to be kept in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from itertools import count
+from typing import IO, Any, Deque, Dict, List, Optional, Tuple
+
+# (sender app name, receiver app name, socket ID)
+T_ChannelKey = Tuple[str, str, int]
+
+
+class TraceWriter:
+    """Writes events in the Chrome Trace Event format to a file.
+
+    The file is a JSON array of events. Methods of this class can be called from
+    multiple threads.
+    """
+
+    def __init__(self, filepath: str):
+        self._filepath = filepath
+        self._file: Optional[IO[str]] = open(filepath, "w")
+        self._file.write("[")
+        self._num_events = 0
+        self._lock = threading.Lock()
+        self._start_time = time.perf_counter()
+
+        # Process IDs per node name
+        self._pids: Dict[str, int] = {}
+        # Thread IDs per (node name, track name)
+        self._tids: Dict[Tuple[str, str], int] = {}
+        # Node names per application (Host) name, for sockets that only know the
+        # name of the application
+        self._app_nodes: Dict[str, str] = {}
+
+        self._ids = count(1)
+        # IDs of flows of messages that are sent but not yet received, per channel
+        self._pending_flows: Dict[T_ChannelKey, Deque[int]] = defaultdict(deque)
+
+    @property
+    def filepath(self) -> str:
+        return self._filepath
+
+    def timestamp(self) -> float:
+        """Current time in microseconds since tracing started."""
+        return (time.perf_counter() - self._start_time) * 1e6
+
+    def new_id(self) -> int:
+        """Get a new ID for asynchronous events."""
+        return next(self._ids)
+
+    def register_app(self, app_name: str, node_name: str) -> None:
+        """Show events of sockets of an application on the process of its node."""
+        self._app_nodes[app_name] = node_name
+
+    def get_app_node(self, app_name: str) -> str:
+        return self._app_nodes.get(app_name, app_name)
+
+    def complete(
+        self,
+        node_name: str,
+        track: str,
+        name: str,
+        start: float,
+        cat: str,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Add a slice from `start` (see `timestamp`) until now."""
+        event = self._new_event(node_name, track, "X", name, cat, start, args)
+        event["dur"] = self.timestamp() - start
+        self._write([event])
+
+    def async_begin(
+        self,
+        node_name: str,
+        track: str,
+        name: str,
+        id: int,
+        cat: str,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Start an asynchronous span, which may overlap other slices."""
+        event = self._new_event(node_name, track, "b", name, cat, None, args)
+        event["id"] = id
+        self._write([event])
+
+    def async_instant(
+        self,
+        node_name: str,
+        track: str,
+        name: str,
+        id: int,
+        cat: str,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Add an instant event to an asynchronous span."""
+        event = self._new_event(node_name, track, "n", name, cat, None, args)
+        event["id"] = id
+        self._write([event])
+
+    def async_end(
+        self,
+        node_name: str,
+        track: str,
+        name: str,
+        id: int,
+        cat: str,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """End an asynchronous span."""
+        event = self._new_event(node_name, track, "e", name, cat, None, args)
+        event["id"] = id
+        self._write([event])
+
+    def new_flows(self, channel: T_ChannelKey, num_messages: int = 1) -> List[int]:
+        """Get IDs of the flows of messages that are about to be sent on a channel.
+
+        This should be called before the messages are sent, such that the receiver
+        can find them.
+        """
+        flow_ids = [self.new_id() for _ in range(num_messages)]
+        with self._lock:
+            self._pending_flows[channel].extend(flow_ids)
+        return flow_ids
+
+    def message_sent(
+        self,
+        channel: T_ChannelKey,
+        start: float,
+        flow_ids: List[int],
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Add a slice for sending messages on a channel from `start` until now,
+        from which the flows (see `new_flows`) start that end where the messages are
+        received."""
+        sender, receiver, socket_id = channel
+        node_name = self.get_app_node(sender)
+        track = f"host {sender}"
+        events = [self._send_recv_slice(node_name, track, "send", start, args)]
+        for flow_id in flow_ids:
+            events.append(self._flow_event(node_name, track, "s", flow_id, start))
+        self._write(events)
+
+    def message_received(
+        self,
+        channel: T_ChannelKey,
+        start: float,
+        num_messages: int = 1,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Add a slice for receiving (and waiting for) messages on a channel from
+        `start` until now, at which the flows of the messages end."""
+        sender, receiver, socket_id = channel
+        node_name = self.get_app_node(receiver)
+        track = f"host {receiver}"
+        flow_ids: List[int] = []
+        with self._lock:
+            pending = self._pending_flows[channel]
+            # Messages that were sent before tracing started have no flow
+            while len(flow_ids) < num_messages and len(pending) > 0:
+                flow_ids.append(pending.popleft())
+        events = [self._send_recv_slice(node_name, track, "recv", start, args)]
+        for flow_id in flow_ids:
+            event = self._flow_event(node_name, track, "f", flow_id, start)
+            # Bind to the enclosing slice, i.e. the receive
+            event["bp"] = "e"
+            events.append(event)
+        self._write(events)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write("\n]\n")
+            self._file.close()
+            self._file = None
+
+    def _send_recv_slice(
+        self,
+        node_name: str,
+        track: str,
+        name: str,
+        start: float,
+        args: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        event = self._new_event(node_name, track, "X", name, "socket", start, args)
+        event["dur"] = self.timestamp() - start
+        return event
+
+    def _flow_event(
+        self, node_name: str, track: str, phase: str, id: int, ts: float
+    ) -> Dict[str, Any]:
+        event = self._new_event(node_name, track, phase, "message", "socket", ts, None)
+        event["id"] = id
+        return event
+
+    def _new_event(
+        self,
+        node_name: str,
+        track: str,
+        phase: str,
+        name: str,
+        cat: str,
+        ts: Optional[float],
+        args: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        pid, tid = self._get_ids(node_name, track)
+        event: Dict[str, Any] = {
+            "name": name,
+            "cat": cat,
+            "ph": phase,
+            "ts": self.timestamp() if ts is None else ts,
+            "pid": pid,
+            "tid": tid,
+        }
+        if args is not None:
+            event["args"] = args
+        return event
+
+    def _get_ids(self, node_name: str, track: str) -> Tuple[int, int]:
+        """Get the process and thread ID of a track of a node, adding metadata events
+        that name them if they are new."""
+        key = node_name, track
+        tid = self._tids.get(key)
+        if tid is not None:
+            return self._pids[node_name], tid
+        with self._lock:
+            metadata = []
+            pid = self._pids.get(node_name)
+            if pid is None:
+                pid = self._pids[node_name] = len(self._pids) + 1
+                metadata.append(self._metadata("process_name", pid, 0, node_name))
+            tid = self._tids.setdefault(key, len(self._tids) + 1)
+            metadata.append(self._metadata("thread_name", pid, tid, track))
+            self._write_unlocked(metadata)
+        return pid, tid
+
+    @staticmethod
+    def _metadata(name: str, pid: int, tid: int, value: str) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "ph": "M",
+            "pid": pid,
+            "tid": tid,
+            "args": {"name": value},
+        }
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._write_unlocked(events)
+
+    def _write_unlocked(self, events: List[Dict[str, Any]]) -> None:
+        if self._file is None:
+            # Tracing was stopped
+            return
+        for event in events:
+            separator = "\n" if self._num_events == 0 else ",\n"
+            self._file.write(separator + json.dumps(event))
+            self._num_events += 1
+
+
+_tracer: Optional[TraceWriter] = None
+
+
+def start_tracing(filepath: str) -> TraceWriter:
+    """Write a trace of everything that happens in this process from now on to
+    `filepath`, until `stop_tracing` is called."""
+    global _tracer
+    stop_tracing()
+    _tracer = TraceWriter(filepath)
+    return _tracer
+
+
+def stop_tracing() -> None:
+    """Stop tracing and finish the trace file."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
+
+
+def get_tracer() -> Optional[TraceWriter]:
+    """Get the trace writer, or None if tracing is not enabled."""
+    return _tracer
@@ -113,7 +113,8 @@ def app_instance_from_path(app_dir: Optional[str] = None) -> ApplicationInstance
     Uses the current working directory if `app_dir` is None.
     """
     app_dir = os.path.abspath(".") if app_dir is None else os.path.expanduser(app_dir)
-    sys.path.append(app_dir)
+    if app_dir not in sys.path:
+        sys.path.append(app_dir)
     program_files = env.load_app_files(app_dir)
 
     programs = []
@@ -16,20 +16,17 @@ import click
 
 import netqasm
 from netqasm.logging.glob import get_netqasm_logger, set_log_level
-from netqasm.runtime.application import (
-    app_instance_from_path,
-    network_cfg_from_path,
-    post_function_from_path,
-)
 from netqasm.runtime.env import get_example_apps, init_folder, new_folder
-from netqasm.runtime.process_logs import create_app_instr_logs, make_last_log
 from netqasm.runtime.settings import (
     Formalism,
     Simulator,
     set_is_using_hardware,
+    set_profiling,
     set_simulator,
 )
-from netqasm.sdk.config import LogConfig
+
+# Modules needed to run applications are only imported by the commands using them,
+# such that e.g. `netqasm --help` or `netqasm new` do not pay for importing them.
 
 EXAMPLE_APPS = get_example_apps()
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
@@ -286,6 +283,19 @@ option_specify_host = click.option(
 @click.option(
     "--num", type=int, default=1, help="Number of times to run this application."
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes to simulate rounds in parallel. Default is 1.",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=None,
+    help="Seed the random number generators of each round (round i uses seed + i). "
+    "Results do not depend on the number of workers.",
+)
 @click.option(
     "--sim-context/--no-sim-context",
     type=bool,
@@ -304,6 +314,21 @@ option_specify_host = click.option(
     default=False,
     help="Measure and display how much time the simulation took",
 )
+@click.option(
+    "--profile/--no-profile",
+    type=bool,
+    default=False,
+    help="Record and display statistics of the instructions executed by each node. "
+    "Can only be used with a single worker.",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write a trace of the executed subroutines, EPR requests and classical "
+    "messages to this file, which can be loaded in Perfetto or chrome://tracing. "
+    "Can only be used with a single worker.",
+)
 def simulate(
     app_dir,
     track_lines,
@@ -315,15 +340,34 @@ def simulate(
     simulator,
     formalism,
     num,
+    workers,
+    seed,
     sim_context,
     hardware,
     timer,
+    profile,
+    trace,
 ):
     """
     Simulate an application on a simulated QNodeOS.
     """
     set_log_level(log_level)
 
+    if profile:
+        if workers > 1:
+            raise click.UsageError("--profile can only be used with a single worker")
+        from netqasm.backend.profiling import reset_profiles
+
+        set_profiling(True)
+        reset_profiles()
+
+    if trace is not None:
+        if workers > 1:
+            raise click.UsageError("--trace can only be used with a single worker")
+        from netqasm.logging.trace import start_tracing
+
+        start_tracing(trace)
+
     if simulator is None:
         simulator = os.environ.get("NETQASM_SIMULATOR", Simulator.NETSQUID.value)
     else:
@@ -331,11 +375,48 @@ def simulate(
     formalism = Formalism(formalism)
     set_simulator(simulator=simulator)
 
+    if app_dir is None:
+        app_dir = "."
+
+    if workers > 1 or seed is not None:
+        from netqasm.runtime.parallel import SimulationSettings, simulate_rounds
+
+        settings = SimulationSettings(
+            app_dir=app_dir,
+            network_config_file=network_config_file,
+            post_function_file=post_function_file,
+            log_dir=log_dir,
+            track_lines=track_lines,
+            simulator=Simulator(simulator),
+            formalism=formalism,
+            use_app_config=sim_context,
+            enable_logging=log_to_files,
+            hardware=hardware,
+        )
+        if timer:
+            start = time.perf_counter()
+        simulate_rounds(settings, num_rounds=num, workers=workers, seed=seed)
+        if timer:
+            print(
+                f"finished simulation in {round(time.perf_counter() - start, 2)} seconds"
+            )
+        if profile:
+            _print_profiles()
+        if trace is not None:
+            _stop_tracing()
+        return
+
+    from netqasm.runtime.application import (
+        app_instance_from_path,
+        network_cfg_from_path,
+        post_function_from_path,
+    )
+    from netqasm.runtime.process_logs import create_app_instr_logs, make_last_log
+    from netqasm.sdk.config import LogConfig
+
     simulate_application = importlib.import_module(
         "netqasm.sdk.external"
     ).simulate_application
-    if app_dir is None:
-        app_dir = "."
     app_instance = app_instance_from_path(app_dir)
     network_cfg = network_cfg_from_path(app_dir, network_config_file)
     post_function = post_function_from_path(app_dir, post_function_file)
@@ -362,6 +443,142 @@ def simulate(
 
     if timer:
         print(f"finished simulation in {round(time.perf_counter() - start, 2)} seconds")
+    if profile:
+        _print_profiles()
+    if trace is not None:
+        _stop_tracing()
+
+
+def _print_profiles():
+    from netqasm.backend.profiling import get_profiles
+
+    profiles = get_profiles()
+    if len(profiles) == 0:
+        print("no profiling statistics were recorded by the simulator")
+    for executor_profile in profiles:
+        print(executor_profile.summary())
+
+
+def _stop_tracing():
+    from netqasm.logging.trace import get_tracer, stop_tracing
+
+    tracer = get_tracer()
+    if tracer is not None:
+        print(f"trace written to {tracer.filepath}")
+    stop_tracing()
+
+
+#########
+# sweep #
+#########
+
+
+@cli.command()
+@option_app_dir
+@option_log_level
+@click.option(
+    "--sweep-file",
+    type=str,
+    default=None,
+    help="File specifying the parameters to sweep, default is `app-folder/sweep.yaml`.",
+)
+@click.option(
+    "--network-config-file",
+    type=str,
+    default=None,
+    help="Explicitly choose the base network config file, "
+    "default is `app-folder/network.yaml`.",
+)
+@click.option(
+    "--results-file",
+    type=str,
+    default=None,
+    help="CSV file to write the results table to, "
+    "default is `app-folder/sweep_results.csv`.",
+)
+@click.option(
+    "--cache-dir",
+    type=str,
+    default=None,
+    help="Directory of the result cache, default is `app-folder/sweep_cache`.",
+)
+@click.option(
+    "--simulator",
+    type=click.Choice([sim.value for sim in Simulator]),
+    default=None,
+    help="Choose with simulator to use, "
+    "default uses what environment variable 'NETQASM_SIMULATOR' is set to, otherwise 'netsquid'",
+)
+@click.option(
+    "--formalism",
+    type=click.Choice([f.value for f in Formalism]),
+    default=Formalism.KET.value,
+    help="Choose which quantum state formalism is used by the simulator. Default is 'ket'.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes to simulate points in parallel. Default is 1.",
+)
+@click.option(
+    "--log-to-files/--no-log-to-files",
+    default=False,
+    help="Whether to write logs of every point to the cache directory.",
+)
+def sweep(
+    app_dir,
+    log_level,
+    sweep_file,
+    network_config_file,
+    results_file,
+    cache_dir,
+    simulator,
+    formalism,
+    workers,
+    log_to_files,
+):
+    """
+    Simulate an application for a grid of network parameters.
+
+    The sweep file is a YAML file with a `parameters` mapping from parameter paths
+    (e.g. `links.fidelity` or `nodes.alice.qubits.t1`) to lists of values, and
+    optionally the `num_rounds` per point and the `seed`.
+    Results of points that were simulated before are taken from the cache.
+    """
+    from netqasm.runtime.parallel import SimulationSettings
+    from netqasm.runtime.sweep import load_sweep_file
+    from netqasm.runtime.sweep import sweep as run_sweep
+
+    set_log_level(log_level)
+
+    if simulator is None:
+        simulator = os.environ.get("NETQASM_SIMULATOR", Simulator.NETSQUID.value)
+    if app_dir is None:
+        app_dir = "."
+    if sweep_file is None:
+        sweep_file = os.path.join(app_dir, "sweep.yaml")
+    if results_file is None:
+        results_file = os.path.join(app_dir, "sweep_results.csv")
+    spec = load_sweep_file(sweep_file)
+
+    settings = SimulationSettings(
+        app_dir=app_dir,
+        network_config_file=network_config_file,
+        simulator=Simulator(simulator),
+        formalism=Formalism(formalism),
+        enable_logging=log_to_files,
+    )
+    run_sweep(
+        settings,
+        parameters=spec["parameters"],
+        num_rounds=spec.get("num_rounds", 1),
+        seed=spec.get("seed", 0),
+        workers=workers,
+        cache_dir=cache_dir,
+        results_file=results_file,
+    )
+    logger.info(f"Results written to {results_file}")
 
 
 ##################
@@ -397,7 +614,9 @@ def run(
 
     if app_dir is None:
         app_dir = "."
-    app_instance = netqasm.runtime.application.app_instance_from_path(app_dir)
+    app_instance = importlib.import_module(
+        "netqasm.runtime.application"
+    ).app_instance_from_path(app_dir)
 
     run_application(
         app_instance=app_instance,
@@ -1,20 +1,24 @@
 """Execution of application scripts without setting up a backend.
 
-The `run_applications` function simply spawns a thread for each of the applications
-given to it, and runs the Python script of each application.
+The `run_application` function simply spawns a thread for each of the programs
+of the application given to it, and runs the Python script of each program.
+The `run_application_async` function instead runs all programs as tasks in a single
+asyncio event loop.
 The relevant quantum node controllers are expected to be setup elsewhere, e.g. as real
 hardware that is connected to the machine that runs `run_applications`.
 """
 
-from multiprocessing.pool import ThreadPool
+import asyncio
+from typing import Any, Dict
 
 from netqasm.logging.glob import get_netqasm_logger
 from netqasm.logging.output import save_all_struct_loggers
-from netqasm.util.thread import as_completed
+from netqasm.sdk.classical_communication import reset_async_socket_hub
+from netqasm.util.thread import as_completed, run_in_daemon_thread
 from netqasm.util.yaml import dump_yaml
 
 from .app_config import AppConfig
-from .application import ApplicationInstance
+from .application import ApplicationInstance, Program
 
 logger = get_netqasm_logger()
 
@@ -25,37 +29,96 @@ def run_application(
     results_file=None,
     use_app_config=True,  # whether to give app_config as argument to app's main()
 ):
-    programs = app_instance.app.programs
-
-    with ThreadPool(len(programs) + 1) as executor:
-        # Start the program threads
-        program_futures = []
-        for program in programs:
-            inputs = app_instance.program_inputs[program.party]
-            if use_app_config:
-                app_cfg = AppConfig(
-                    app_name=program.party,
-                    node_name=app_instance.party_alloc[program.party],
-                    main_func=program.entry,
-                    log_config=app_instance.logging_cfg,
-                    inputs=inputs,
-                )
-                inputs["app_config"] = app_cfg
-            future = executor.apply_async(program.entry, kwds=inputs)
-            program_futures.append(future)
-
-        # Join the application threads and the backend
-        program_names = [program.party for program in app_instance.app.programs]
-        # NOTE: use app_<name> instead of prog_<name> for now for backward compatibility
-        names = [f"app_{prog_name}" for prog_name in program_names]
-        results = {}
-        for future, name in as_completed(program_futures, names=names):
-            results[name] = future.get()
-        if results_file is not None:
-            save_results(results=results, results_file=results_file)
+    # Start the program threads.
+    # These are daemon threads, such that an exception raised by one program is
+    # re-raised immediately, even if other programs are blocked forever, e.g. waiting
+    # for a message from the failed program.
+    program_futures = []
+    for program in app_instance.app.programs:
+        inputs = _get_program_inputs(app_instance, program, use_app_config)
+        future = run_in_daemon_thread(program.entry, **inputs)
+        program_futures.append(future)
+
+    # Join the application threads and the backend
+    names = _get_result_names(app_instance)
+    results = {}
+    for future, name in as_completed(program_futures, names=names):
+        # Re-raises any exception raised by the program
+        results[name] = future.result()
+    if results_file is not None:
+        save_results(results=results, results_file=results_file)
 
     save_all_struct_loggers()
 
 
+def run_application_async(
+    app_instance: ApplicationInstance,
+    post_function=None,
+    results_file=None,
+    use_app_config=True,  # whether to give app_config as argument to app's main()
+):
+    """Run all programs of an application as tasks in a single asyncio event loop.
+
+    Entry points of programs that are coroutine functions (`async def main(...)`) are
+    awaited as tasks in the event loop. Other entry points are run in their own
+    (daemon) thread, such that they do not block the other programs.
+    Typically, the programs communicate using `AsyncSocket`s and flush subroutines
+    using an `AsyncNetQASMConnection`.
+    """
+    results = asyncio.run(_run_programs_async(app_instance, use_app_config))
+    if results_file is not None:
+        save_results(results=results, results_file=results_file)
+
+    save_all_struct_loggers()
+
+
+async def _run_programs_async(
+    app_instance: ApplicationInstance, use_app_config: bool
+) -> Dict[str, Any]:
+    # Queues of a previous event loop cannot be used in this one
+    reset_async_socket_hub()
+
+    tasks = []
+    for program in app_instance.app.programs:
+        inputs = _get_program_inputs(app_instance, program, use_app_config)
+        if asyncio.iscoroutinefunction(program.entry):
+            task = asyncio.ensure_future(program.entry(**inputs))
+        else:
+            # Not run in the default executor, since its threads are joined when the
+            # event loop is closed, which would hang if a program is blocked
+            task = asyncio.wrap_future(run_in_daemon_thread(program.entry, **inputs))
+        tasks.append(task)
+
+    try:
+        # Re-raises the first exception raised by any of the programs
+        outputs = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return dict(zip(_get_result_names(app_instance), outputs))
+
+
+def _get_program_inputs(
+    app_instance: ApplicationInstance, program: Program, use_app_config: bool
+) -> Dict[str, Any]:
+    inputs = app_instance.program_inputs[program.party]
+    if use_app_config:
+        app_cfg = AppConfig(
+            app_name=program.party,
+            node_name=app_instance.party_alloc[program.party],
+            main_func=program.entry,
+            log_config=app_instance.logging_cfg,
+            inputs=inputs,
+        )
+        inputs["app_config"] = app_cfg
+    return inputs
+
+
+def _get_result_names(app_instance: ApplicationInstance):
+    # NOTE: use app_<name> instead of prog_<name> for now for backward compatibility
+    return [f"app_{program.party}" for program in app_instance.app.programs]
+
+
 def save_results(results, results_file):
     dump_yaml(data=results, file_path=results_file)
@@ -0,0 +1,187 @@
+"""Parallel simulation of independent rounds of an application.
+
+Rounds of a simulation are independent (Monte-Carlo) repetitions of the same
+application. The `simulate_rounds` function runs them in a pool of worker processes.
+Every round is seeded separately, such that the results do not depend on how the
+rounds are distributed over the workers: running with the same seed gives the same
+results for any number of workers.
+"""
+
+import functools
+import importlib
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from netqasm.logging.glob import get_netqasm_logger
+from netqasm.runtime.application import (
+    app_instance_from_path,
+    network_cfg_from_path,
+    post_function_from_path,
+)
+from netqasm.runtime.interface.config import NetworkConfig
+from netqasm.runtime.process_logs import create_app_instr_logs, make_last_log
+from netqasm.runtime.settings import Formalism, Simulator, set_simulator
+from netqasm.sdk.classical_communication import reset_async_socket_hub, reset_socket_hub
+from netqasm.sdk.config import LogConfig
+from netqasm.sdk.shared_memory import SharedMemoryManager
+
+logger = get_netqasm_logger("parallel")
+
+# Seeds of NumPy's legacy random state must fit in 32 bits
+_SEED_RANGE = 2**32
+
+
+@dataclass
+class SimulationSettings:
+    """Description of how to simulate an application, which can be sent to worker
+    processes.
+
+    Workers load the application, network configuration and post function from
+    the paths themselves, since the entry points of an application can not always
+    be pickled.
+
+    :param app_dir: path to the app directory
+    :param network_config_file: network config file, relative to `app_dir`
+    :param post_function_file: file defining the post function, relative to `app_dir`
+    :param log_dir: directory for the logs of all rounds
+    :param track_lines: whether to track lines of the application code in the logs
+    :param simulator: simulator to use
+    :param formalism: quantum state formalism used by the simulator
+    :param use_app_config: whether to pass an AppConfig to a program's main function
+    :param enable_logging: whether to write logs to files
+    :param hardware: quantum hardware to use if no network config is specified
+    :param network_cfg: network configuration to use instead of the one in
+        `network_config_file`
+    """
+
+    app_dir: str
+    network_config_file: Optional[str] = None
+    post_function_file: Optional[str] = None
+    log_dir: Optional[str] = None
+    track_lines: bool = True
+    simulator: Simulator = Simulator.NETSQUID
+    formalism: Formalism = Formalism.KET
+    use_app_config: bool = True
+    enable_logging: bool = True
+    hardware: str = "generic"
+    network_cfg: Optional[NetworkConfig] = None
+
+
+def simulate_rounds(
+    settings: SimulationSettings,
+    num_rounds: int,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    simulate_function: Optional[Callable] = None,
+) -> List[Any]:
+    """Simulate rounds of an application, possibly in multiple worker processes.
+
+    Round `i` is simulated in a fresh state (shared memories and socket hubs are
+    reset) with the random number generators seeded by `seed + i`. Logs of round `i`
+    are written to the subdirectory `round<i>` of the log directory, each of which is
+    split per run according to `LogConfig.split_runs`.
+
+    :param settings: how to simulate the application
+    :param num_rounds: number of rounds to simulate
+    :param workers: number of worker processes. If 1, rounds are simulated in the
+        current process.
+    :param seed: seed of the first round. If None, a random seed is chosen.
+    :param simulate_function: function with the signature of `simulate_application`
+        that simulates the rounds. Must be picklable if `workers` is larger than 1.
+        Defaults to `netqasm.sdk.external.simulate_application`.
+    :return: the return values of the simulation of each round, in round order
+    """
+    if workers < 1:
+        raise ValueError(f"Number of workers must be at least 1, not {workers}")
+    if seed is None:
+        seed = random.SystemRandom().randrange(_SEED_RANGE)
+        logger.info(f"Simulating rounds with seed {seed}")
+
+    simulate_round = functools.partial(
+        _simulate_round, settings, seed, simulate_function=simulate_function
+    )
+    if workers == 1:
+        outputs = [simulate_round(round_index) for round_index in range(num_rounds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Returns outputs in round order, independent of which round finishes first
+            outputs = list(executor.map(simulate_round, range(num_rounds)))
+
+    if len(outputs) > 0:
+        _, last_log_subroutines_dir = outputs[-1]
+        if last_log_subroutines_dir is not None:
+            make_last_log(last_log_subroutines_dir)
+
+    return [result for result, _ in outputs]
+
+
+def _simulate_round(
+    settings: SimulationSettings,
+    seed: int,
+    round_index: int,
+    simulate_function: Optional[Callable] = None,
+) -> Tuple[Any, Optional[str]]:
+    _reset_state()
+    _seed_random((seed + round_index) % _SEED_RANGE)
+
+    set_simulator(simulator=settings.simulator)
+    if simulate_function is None:
+        simulate_function = importlib.import_module(
+            "netqasm.sdk.external"
+        ).simulate_application
+
+    app_dir = settings.app_dir
+    log_dir = settings.log_dir
+    if log_dir is None:
+        log_dir = os.path.join(app_dir, "log")
+    log_cfg = LogConfig(
+        app_dir=app_dir,
+        log_dir=os.path.join(log_dir, f"round{round_index}"),
+        track_lines=settings.track_lines,
+    )
+
+    network_cfg = settings.network_cfg
+    if network_cfg is None:
+        network_cfg = network_cfg_from_path(app_dir, settings.network_config_file)
+
+    result = simulate_function(
+        app_instance=app_instance_from_path(app_dir),
+        num_rounds=1,
+        network_cfg=network_cfg,
+        formalism=settings.formalism,
+        post_function=post_function_from_path(app_dir, settings.post_function_file),
+        log_cfg=log_cfg,
+        use_app_config=settings.use_app_config,
+        enable_logging=settings.enable_logging,
+        hardware=settings.hardware,
+    )
+
+    log_subroutines_dir = None
+    if settings.enable_logging and log_cfg.log_subroutines_dir is not None:
+        log_subroutines_dir = log_cfg.log_subroutines_dir
+        create_app_instr_logs(log_subroutines_dir)
+
+    return result, log_subroutines_dir
+
+
+def _reset_state() -> None:
+    """Reset global state, which worker processes may inherit from their parent."""
+    SharedMemoryManager.reset_memories()
+    reset_socket_hub()
+    reset_async_socket_hub()
+
+
+def _seed_random(seed: int) -> None:
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        import netsquid as ns  # type: ignore
+    except ModuleNotFoundError:
+        pass
+    else:
+        ns.set_random_state(seed=seed)
@@ -39,6 +39,53 @@ def _default_simulator():
     return Simulator.NETSQUID
 
 
+CROSS_PROCESS_SHARED_MEMORY_ENV = "NETQASM_CROSS_PROCESS_SHARED_MEMORY"
+
+
+def set_cross_process_shared_memory(enabled: bool) -> None:
+    """Whether shared memories should be accessible by other processes.
+
+    This is stored in an environment variable, such that it is inherited by processes
+    that are started later on.
+    """
+    os.environ[CROSS_PROCESS_SHARED_MEMORY_ENV] = "1" if enabled else "0"
+
+
+def get_cross_process_shared_memory() -> bool:
+    return os.environ.get(CROSS_PROCESS_SHARED_MEMORY_ENV, "0") == "1"
+
+
+PROFILING_ENV = "NETQASM_PROFILING"
+
+
+def set_profiling(enabled: bool) -> None:
+    """Whether executors that are created from now on record profiling statistics.
+
+    See :mod:`netqasm.backend.profiling`.
+    """
+    os.environ[PROFILING_ENV] = "1" if enabled else "0"
+
+
+def get_profiling() -> bool:
+    return os.environ.get(PROFILING_ENV, "0") == "1"
+
+
+TRUSTED_EXECUTION_ENV = "NETQASM_TRUSTED_EXECUTION"
+
+
+def set_trusted_execution(enabled: bool) -> None:
+    """Whether executors that are created from now on verify the subroutines they
+    execute, and skip runtime checks that are proven to succeed.
+
+    See :mod:`netqasm.lang.verifier`.
+    """
+    os.environ[TRUSTED_EXECUTION_ENV] = "1" if enabled else "0"
+
+
+def get_trusted_execution() -> bool:
+    return os.environ.get(TRUSTED_EXECUTION_ENV, "0") == "1"
+
+
 _is_using_hardware = False
 
 
@@ -0,0 +1,316 @@
+"""Parameter sweeps of an application over network configurations.
+
+A sweep simulates an application for every point in a grid of network parameters,
+like link fidelities, qubit `t1`/`t2` times or gate fidelities of nodes. Parameters
+are given by paths into the `NetworkConfig`:
+
+- `links.fidelity`: the fidelity of all links
+- `links.<link_name>.fidelity`: the fidelity of a single link
+- `nodes.gate_fidelity`: the gate fidelity of all nodes
+- `nodes.<node_name>.qubits.t1`: the `t1` time of all qubits of a single node
+
+The results of each point are cached on disk, keyed by a hash of everything that
+determines them (application sources and inputs, network configuration, seed and
+simulation settings). Running a sweep again, e.g. after it was interrupted, only
+simulates the points that are not in the cache yet.
+"""
+
+import copy
+import csv
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from netqasm.logging.glob import get_netqasm_logger
+from netqasm.runtime import env
+from netqasm.runtime.application import app_instance_from_path, network_cfg_from_path
+from netqasm.runtime.interface.config import (
+    NetworkConfig,
+    QuantumHardware,
+    default_network_config,
+)
+from netqasm.runtime.parallel import SimulationSettings, simulate_rounds
+from netqasm.util.yaml import dump_yaml, load_yaml
+
+logger = get_netqasm_logger("sweep")
+
+# Fields of nodes, links and qubits that identify them, and hence can not be swept
+_NON_PARAMETER_FIELDS = {"name", "node_name1", "node_name2", "id", "qubits"}
+
+T_SweepParameters = Dict[str, List[Any]]
+T_Table = Dict[str, List[Any]]
+
+
+def sweep(
+    settings: SimulationSettings,
+    parameters: T_SweepParameters,
+    num_rounds: int = 1,
+    seed: int = 0,
+    workers: int = 1,
+    cache_dir: Optional[str] = None,
+    results_file: Optional[str] = None,
+    simulate_function: Optional[Callable] = None,
+) -> T_Table:
+    """Simulate an application for all combinations of the given parameter values.
+
+    The network configuration of `settings` (or the one in the app directory, or a
+    default one) is used as the base configuration of which the swept parameters
+    are changed. Points are simulated in parallel in `workers` processes, each with
+    `num_rounds` rounds that are seeded the same for all points (see
+    :func:`~netqasm.runtime.parallel.simulate_rounds`).
+
+    :param settings: how to simulate the application
+    :param parameters: values of each parameter, keyed by parameter path
+    :param num_rounds: number of rounds to simulate for each point
+    :param seed: seed of the first round of each point
+    :param workers: number of worker processes
+    :param cache_dir: directory of the on-disk result cache. Defaults to the
+        `sweep_cache` subdirectory of the app directory.
+    :param results_file: if not None, write the table of results to this CSV file
+    :param simulate_function: function with the signature of `simulate_application`,
+        see :func:`~netqasm.runtime.parallel.simulate_rounds`
+    :return: table of results with a column for each parameter, the round and each
+        of the (flattened) results, and a row for each round of each point
+    """
+    if workers < 1:
+        raise ValueError(f"Number of workers must be at least 1, not {workers}")
+    if cache_dir is None:
+        cache_dir = os.path.join(settings.app_dir, "sweep_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+
+    base_cfg = _get_base_network_config(settings)
+    # Everything except the network configuration that determines the results
+    description = {
+        "app": _hash_app(settings.app_dir, cache_dir),
+        "inputs": app_instance_from_path(settings.app_dir).program_inputs,
+        "num_rounds": num_rounds,
+        "seed": seed,
+        "simulator": settings.simulator,
+        "formalism": settings.formalism,
+        "hardware": settings.hardware,
+        "use_app_config": settings.use_app_config,
+    }
+
+    names = list(parameters.keys())
+    points = [
+        dict(zip(names, values))
+        for values in itertools.product(*[parameters[name] for name in names])
+    ]
+
+    point_settings = []
+    cache_files = []
+    for point in points:
+        network_cfg = get_network_config_variant(base_cfg, point)
+        key = _get_cache_key(description, network_cfg)
+        log_dir = os.path.join(cache_dir, f"{key}_log")
+        point_settings.append(
+            dataclasses.replace(settings, network_cfg=network_cfg, log_dir=log_dir)
+        )
+        cache_files.append(os.path.join(cache_dir, f"{key}.yaml"))
+
+    # Only simulate points that are not in the cache yet
+    todo = [
+        i for i, cache_file in enumerate(cache_files) if not os.path.exists(cache_file)
+    ]
+    logger.info(
+        f"Sweeping {len(points)} points, of which {len(points) - len(todo)} are cached"
+    )
+    args = [
+        (point_settings[i], num_rounds, seed, cache_files[i], simulate_function)
+        for i in todo
+    ]
+    if workers == 1 or len(args) <= 1:
+        for arg in args:
+            _simulate_point(arg)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Each point writes its own cache file as soon as it finishes
+            for _ in executor.map(_simulate_point, args):
+                pass
+
+    rows = []
+    for point, cache_file in zip(points, cache_files):
+        for round_index, result in enumerate(load_yaml(cache_file)["results"]):
+            row = dict(point)
+            row["round"] = round_index
+            row.update(_flatten(result))
+            rows.append(row)
+    table = _to_table(rows)
+
+    if results_file is not None:
+        save_table(table, results_file)
+    return table
+
+
+def get_network_config_variant(
+    network_cfg: NetworkConfig, point: Dict[str, Any]
+) -> NetworkConfig:
+    """Get a copy of a network configuration with the given parameter values.
+
+    :param network_cfg: the base network configuration, which is not changed
+    :param point: values of parameters, keyed by parameter path (see module docs)
+    :return: the new network configuration
+    """
+    variant = copy.deepcopy(network_cfg)
+    for path, value in point.items():
+        for item, field in _get_parameter_targets(variant, path):
+            setattr(item, field, value)
+    return variant
+
+
+def _get_parameter_targets(
+    network_cfg: NetworkConfig, path: str
+) -> List[Tuple[Any, str]]:
+    section, *parts = path.split(".")
+    items: List[Any]
+    if section == "nodes":
+        items = network_cfg.nodes
+    elif section == "links":
+        items = network_cfg.links
+    else:
+        raise ValueError(
+            f"Invalid sweep parameter {path}: must start with 'nodes' or 'links'"
+        )
+
+    if len(parts) > 1 and parts[0] in {item.name for item in items}:
+        items = [item for item in items if item.name == parts[0]]
+        parts = parts[1:]
+    if section == "nodes" and len(parts) > 1 and parts[0] == "qubits":
+        items = [
+            qubit
+            for node in network_cfg.nodes
+            if node in items
+            for qubit in node.qubits
+        ]
+        parts = parts[1:]
+
+    if len(parts) != 1:
+        raise ValueError(f"Invalid sweep parameter {path}")
+    field = parts[0]
+    if field in _NON_PARAMETER_FIELDS:
+        raise ValueError(f"Invalid sweep parameter {path}: {field} can not be swept")
+    for item in items:
+        if field not in {f.name for f in dataclasses.fields(item)}:
+            raise ValueError(
+                f"Invalid sweep parameter {path}: "
+                f"{item.__class__.__name__} has no field {field}"
+            )
+    return [(item, field) for item in items]
+
+
+def save_table(table: T_Table, file_path: str) -> None:
+    """Write a table of results (as returned by :func:`sweep`) to a CSV file."""
+    columns = list(table.keys())
+    num_rows = len(table[columns[0]]) if len(columns) > 0 else 0
+    with open(file_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for i in range(num_rows):
+            writer.writerow([table[column][i] for column in columns])
+
+
+def load_sweep_file(file_path: str) -> Dict[str, Any]:
+    """Load a sweep specification.
+
+    The file is a YAML file with the keys `parameters` (mapping of parameter paths
+    to lists of values) and optionally `num_rounds` and `seed`.
+    """
+    spec = load_yaml(file_path)
+    if not isinstance(spec, dict) or not isinstance(spec.get("parameters"), dict):
+        raise ValueError(f"Sweep file {file_path} has no 'parameters' mapping")
+    return spec
+
+
+def _simulate_point(
+    args: Tuple[SimulationSettings, int, int, str, Optional[Callable]]
+) -> None:
+    settings, num_rounds, seed, cache_file, simulate_function = args
+    outputs = simulate_rounds(
+        settings,
+        num_rounds=num_rounds,
+        seed=seed,
+        simulate_function=simulate_function,
+    )
+    # `simulate_application` returns a list with the results of each of its rounds
+    results = [
+        output[0] if isinstance(output, list) and len(output) == 1 else output
+        for output in outputs
+    ]
+    # Write atomically, such that an interrupted sweep never leaves a partial entry
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    dump_yaml(data={"results": results}, file_path=tmp_file)
+    os.replace(tmp_file, cache_file)
+
+
+def _get_base_network_config(settings: SimulationSettings) -> NetworkConfig:
+    if settings.network_cfg is not None:
+        return settings.network_cfg
+    network_cfg = network_cfg_from_path(settings.app_dir, settings.network_config_file)
+    if network_cfg is not None:
+        return network_cfg
+    hardware = (
+        QuantumHardware.NV if settings.hardware == "nv" else QuantumHardware.Generic
+    )
+    node_names = list(app_instance_from_path(settings.app_dir).party_alloc.values())
+    return default_network_config(node_names, hardware=hardware)
+
+
+def _hash_app(app_dir: str, cache_dir: str) -> str:
+    """Hash the sources, inputs and roles of an application.
+
+    All Python files in the app directory and its subdirectories are hashed, except
+    those in the cache directory. Other files, like the sweep file and the network
+    configuration (which is part of the cache key by itself), are not hashed.
+    """
+    file_names = {f"{party}.yaml" for party in env.load_app_files(app_dir)}
+    file_names.add("roles.yaml")
+    cache_dir = os.path.abspath(cache_dir)
+    for root, dir_names, entries in os.walk(app_dir):
+        dir_names[:] = [
+            dir_name
+            for dir_name in dir_names
+            if dir_name != "__pycache__"
+            and os.path.abspath(os.path.join(root, dir_name)) != cache_dir
+        ]
+        rel_root = os.path.relpath(root, app_dir)
+        for entry in entries:
+            if entry.endswith(".py"):
+                file_names.add(os.path.normpath(os.path.join(rel_root, entry)))
+
+    app_hash = hashlib.sha256()
+    for entry in sorted(file_names):
+        file_path = os.path.join(app_dir, entry)
+        if os.path.isfile(file_path):
+            # Use the same separators on all platforms
+            app_hash.update(entry.replace(os.sep, "/").encode())
+            with open(file_path, "rb") as f:
+                app_hash.update(hashlib.sha256(f.read()).digest())
+    return app_hash.hexdigest()
+
+
+def _get_cache_key(description: Dict[str, Any], network_cfg: NetworkConfig) -> str:
+    description = dict(description, network=dataclasses.asdict(network_cfg))
+    raw = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _flatten(value: Any, prefix: Optional[str] = None) -> Dict[str, Any]:
+    """Flatten nested dictionaries into a single dictionary with dotted keys."""
+    if not isinstance(value, dict):
+        return {"result" if prefix is None else prefix: value}
+    flat: Dict[str, Any] = {}
+    for key, sub_value in value.items():
+        sub_prefix = str(key) if prefix is None else f"{prefix}.{key}"
+        flat.update(_flatten(sub_value, sub_prefix))
+    return flat
+
+
+def _to_table(rows: List[Dict[str, Any]]) -> T_Table:
+    columns: Dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    return {column: [row.get(column) for row in rows] for column in columns}
@@ -1,4 +1,52 @@
-from .classical_communication import ThreadBroadcastChannel, ThreadSocket
-from .epr_socket import EPRSocket
-from .qubit import Qubit
-from .toolbox import create_ghz, parity_meas, set_qubit_state, t_inverse, toffoli_gate
+from typing import TYPE_CHECKING
+
+from netqasm.util.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .classical_communication import (
+        AsyncBroadcastChannel,
+        AsyncSocket,
+        ThreadBroadcastChannel,
+        ThreadSocket,
+    )
+    from .epr_socket import EPRSocket
+    from .qubit import Qubit
+    from .toolbox import (
+        create_ghz,
+        parity_meas,
+        set_qubit_state,
+        t_inverse,
+        toffoli_gate,
+    )
+
+__all__ = [
+    "AsyncBroadcastChannel",
+    "AsyncSocket",
+    "ThreadBroadcastChannel",
+    "ThreadSocket",
+    "EPRSocket",
+    "Qubit",
+    "create_ghz",
+    "parity_meas",
+    "set_qubit_state",
+    "t_inverse",
+    "toffoli_gate",
+]
+
+# Submodules are only imported when one of their names is used
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "AsyncBroadcastChannel": ".classical_communication",
+        "AsyncSocket": ".classical_communication",
+        "ThreadBroadcastChannel": ".classical_communication",
+        "ThreadSocket": ".classical_communication",
+        "EPRSocket": ".epr_socket",
+        "Qubit": ".qubit",
+        "create_ghz": ".toolbox",
+        "parity_meas": ".toolbox",
+        "set_qubit_state": ".toolbox",
+        "t_inverse": ".toolbox",
+        "toffoli_gate": ".toolbox",
+    },
+)
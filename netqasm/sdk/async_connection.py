@@ -0,0 +1,101 @@
+"""Asyncio interface to connections with the quantum node controller.
+
+This module contains the `AsyncNetQASMConnection` class, which wraps any
+`BaseNetQASMConnection` such that flushing subroutines can be awaited, without
+blocking the thread (and hence the event loop) that runs the application.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from netqasm.sdk.builder import Builder
+    from netqasm.sdk.connection import BaseNetQASMConnection
+
+
+class AsyncNetQASMConnection:
+    """Connection to the quantum node controller for applications using asyncio.
+
+    An `AsyncNetQASMConnection` wraps a (synchronous) `BaseNetQASMConnection`.
+    Building subroutines works exactly as with the wrapped connection, and all of its
+    methods and attributes (like `new_array` or `loop`) are available on this object
+    as well. The difference is that :meth:`flush` is a coroutine that only suspends
+    the current task while the quantum node controller executes the subroutine, such
+    that programs of other nodes can run in the same event loop in the meantime.
+
+    Futures (e.g. measurement outcomes) can be awaited as well, which suspends the
+    task until the quantum node controller has written their value.
+
+    The wrapped connection must support non-blocking flushes, i.e.
+    `flush(block=False, callback=callback)` must call `callback` once the results of
+    the subroutine have been written to the shared memory.
+
+    .. code-block::
+
+        async def main(app_config=None):
+            conn = NetQASMConnection(app_name=app_config.app_name)
+            async with AsyncNetQASMConnection(conn) as alice:
+                q = Qubit(alice)
+                q.H()
+                m = q.measure()
+                await alice.flush()
+                print(int(m))
+    """
+
+    def __init__(self, connection: BaseNetQASMConnection):
+        """AsyncNetQASMConnection constructor.
+
+        :param connection: the connection to wrap
+        """
+        self._connection: BaseNetQASMConnection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes that are not defined on this class
+        return getattr(self._connection, name)
+
+    @property
+    def connection(self) -> BaseNetQASMConnection:
+        """Get the wrapped (synchronous) connection."""
+        return self._connection
+
+    @property
+    def builder(self) -> Builder:
+        return self._connection.builder
+
+    async def __aenter__(self) -> AsyncNetQASMConnection:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Flush all pending operations and close the wrapped connection."""
+        if exc_type is None:
+            await self.flush()
+        # Closing the connection may block on the quantum node controller
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None,
+            functools.partial(self._connection.__exit__, exc_type, exc_val, exc_tb),
+        )
+
+    async def flush(self) -> None:
+        """Compile and send all pending operations to the quantum node controller,
+        and wait until the results are available.
+
+        This is the asynchronous version of
+        :meth:`~netqasm.sdk.connection.BaseNetQASMConnection.flush`.
+        """
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future = loop.create_future()
+
+        def set_done() -> None:
+            if not done.done():
+                done.set_result(None)
+
+        def callback(*args, **kwargs) -> None:
+            # May be called from another thread than the one running the event loop
+            loop.call_soon_threadsafe(set_done)
+
+        if self._connection._commit_pending_subroutine(block=False, callback=callback):
+            await done
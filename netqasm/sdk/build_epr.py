@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from netqasm.qlink_compat import BellState, EPRRole, EPRType, RandomBasis, TimeUnit
 from netqasm.sdk.build_types import T_PostRoutine
@@ -228,6 +228,34 @@ def basis_to_rotation(basis: EprMeasBasis) -> Tuple[int, int, int]:
         assert False, f"invalid EprMeasBasis {basis}"
 
 
+# Measurement bases for which the outcome needs to be flipped, for each Bell state,
+# such that the statistics are as if the Phi+ state was produced.
+_FLIPPED_BASES: Dict[BellState, List[EprMeasBasis]] = {
+    BellState.PHI_PLUS: [],
+    # correct for Z-gate applied to Phi+
+    BellState.PHI_MINUS: [
+        EprMeasBasis.X,
+        EprMeasBasis.MX,
+        EprMeasBasis.Y,
+        EprMeasBasis.MY,
+    ],
+    # correct for X-gate applied to Phi+
+    BellState.PSI_PLUS: [
+        EprMeasBasis.Y,
+        EprMeasBasis.MY,
+        EprMeasBasis.Z,
+        EprMeasBasis.MZ,
+    ],
+    # correct for X-gate and Z-gate applied to Phi+
+    BellState.PSI_MINUS: [
+        EprMeasBasis.X,
+        EprMeasBasis.MX,
+        EprMeasBasis.Z,
+        EprMeasBasis.MZ,
+    ],
+}
+
+
 @dataclass
 class EprMeasureResult:
     raw_measurement_outcome: Future
@@ -287,33 +315,8 @@ class EprMeasureResult:
             assert m == 0 or m == 1
 
             # Correct for Bell flips.
-            if self.bell_state == BellState.PHI_MINUS:
-                # correct for Z-gate applied to Phi+
-                if local in [
-                    EprMeasBasis.X,
-                    EprMeasBasis.MX,
-                    EprMeasBasis.Y,
-                    EprMeasBasis.MY,
-                ]:
-                    m = m ^ 1
-            elif self.bell_state == BellState.PSI_PLUS:
-                # correct for X-gate applied to Phi+
-                if local in [
-                    EprMeasBasis.Y,
-                    EprMeasBasis.MY,
-                    EprMeasBasis.Z,
-                    EprMeasBasis.MZ,
-                ]:
-                    m = m ^ 1
-            elif self.bell_state == BellState.PSI_MINUS:
-                # correct for X-gate and Z-gate applied to Phi+
-                if local in [
-                    EprMeasBasis.X,
-                    EprMeasBasis.MX,
-                    EprMeasBasis.Z,
-                    EprMeasBasis.MZ,
-                ]:
-                    m = m ^ 1
+            if local in _FLIPPED_BASES[self.bell_state]:
+                m = m ^ 1
 
             return m
 
@@ -6,6 +6,7 @@ Python application script code into NetQASM subroutines.
 
 from __future__ import annotations
 
+import weakref
 from contextlib import contextmanager
 from itertools import count
 from typing import (
@@ -204,6 +205,8 @@ class Builder:
         log_config: Optional[LogConfig] = None,
         compiler: Optional[Type[SubroutineTranspiler]] = None,
         return_arrays: bool = True,
+        auto_flush: bool = False,
+        max_instructions: Optional[int] = None,
     ):
         """Builder constructor. Typically not used directly by the Host script.
 
@@ -219,6 +222,10 @@ class Builder:
             each subroutine (for all arrays that are used in the subroutine). May be
             set to False if the quantum node controller does not support returning
             arrays.
+        :param auto_flush: whether to automatically flush the connection when the
+            current subroutine is about to exceed its limits
+        :param max_instructions: if `auto_flush` is True, the maximum number of
+            commands in a single subroutine. If None, there is no limit.
         """
         self._connection = connection
         self._app_id = app_id
@@ -237,6 +244,27 @@ class Builder:
 
         self._label_mgr = LabelManager()
 
+        # Auto-flush policy
+        self._auto_flush: bool = auto_flush
+        self._max_instructions: Optional[int] = max_instructions
+
+        # Number of contexts (if-statements, loops, EPR operations, ...) that are
+        # currently being built. Subroutines can only be cut when this is 0.
+        self._context_depth: int = 0
+
+        # Arrays and registers that still need to be returned after a subroutine was
+        # cut automatically, since they may be written to by the next subroutine.
+        # Arrays are weakly referenced, such that arrays that the Host does not hold
+        # anymore are not returned.
+        self._carried_arrays: List[weakref.ReferenceType[Array]] = []
+        self._carried_registers: List[operand.Register] = []
+
+        # Futures of measurement outcomes that are stored in M-registers by the
+        # current subroutine. These are resolved when the subroutine is flushed, since
+        # the M-registers are re-used by the next subroutine (see
+        # `_get_reg_future_operand`).
+        self._meas_reg_futures: List[RegFuture] = []
+
         # Can be set to false for e.g. debugging, not exposed to user atm
         self._clear_app_on_exit: bool = True
         self._stop_backend_on_exit: bool = True
@@ -261,7 +289,7 @@ class Builder:
 
         # If an NV compiler is specified but not an NV hardware config,
         # make sure an NV config is used after all.
-        if compiler == NVSubroutineTranspiler:
+        if compiler is not None and issubclass(compiler, NVSubroutineTranspiler):
             num_qubits = self._hardware_config.qubit_count
             self._hardware_config = NVHardwareConfig(num_qubits)
 
@@ -280,8 +308,19 @@ class Builder:
         return self._mem_mgr.get_new_qubit_address()
 
     def alloc_array(
-        self, length: int = 1, init_values: Optional[List[Optional[int]]] = None
+        self,
+        length: int = 1,
+        init_values: Optional[List[Optional[int]]] = None,
+        return_array: bool = True,
     ) -> Array:
+        """Allocate a new array.
+
+        :param length: length of the array
+        :param init_values: initial values of the array
+        :param return_array: whether to return the array to the Host at the end of
+            the subroutine. Should be False for arrays that are only read by the
+            quantum node controller, like qubit IDs and EPR request arguments.
+        """
         address = self._mem_mgr.get_new_array_address()
         lineno = self._line_tracker.get_line()
         array = Array(
@@ -292,9 +331,22 @@ class Builder:
             lineno=lineno,
         )
         self._mem_mgr.add_array_to_return(array)
+        if not return_array:
+            self._mem_mgr.add_input_array(array)
         return array
 
+    def reuse_array(self, array: Array) -> None:
+        """Re-initialize an array that was allocated for an earlier subroutine.
+
+        The array is cleared and returned at the end of the current subroutine, like
+        a newly allocated array, but keeps its address in shared memory.
+        """
+        to_return = self._mem_mgr.get_arrays_to_return()
+        if all(arr.address != array.address for arr in to_return):
+            self._mem_mgr.add_array_to_return(array)
+
     def new_register(self, init_value: int = 0) -> RegFuture:
+        self._auto_flush_point()
         reg = self._mem_mgr.get_inactive_register(activate=True)
         self.subrt_add_pending_command(
             ICmd(instruction=GenericInstr.SET, operands=[reg, init_value])
@@ -341,6 +393,56 @@ class Builder:
             self._log_subroutine(subroutine=subroutine)
         return subroutine
 
+    def _enter_context(self) -> None:
+        """Mark the start of building a context, like an if-statement, loop or
+        EPR operation. Subroutines are never cut automatically inside a context."""
+        self._auto_flush_point()
+        self._context_depth += 1
+
+    def _exit_context(self) -> None:
+        """Mark the end of building a context."""
+        self._context_depth -= 1
+
+    @contextmanager
+    def _context(self) -> Iterator[None]:
+        """Build a context, which is also ended if building it fails."""
+        self._enter_context()
+        try:
+            yield
+        finally:
+            self._exit_context()
+
+    def _auto_flush_point(self, meas_registers: int = 0) -> None:
+        """Flush if the current subroutine is about to exceed its limits.
+
+        Should only be called at points where the subroutine can safely be cut, i.e.
+        between two operations. Does nothing if auto-flushing is disabled or if a
+        context is being built.
+
+        :param meas_registers: number of M-registers needed by the next operation
+        """
+        if not self._auto_flush or self._context_depth > 0:
+            return
+        if len(self._pending_commands) == 0:
+            return
+        if self._mem_mgr.get_num_free_meas_registers() >= meas_registers and (
+            self._max_instructions is None
+            or len(self._pending_commands) < self._max_instructions
+        ):
+            return
+
+        arrays = self._get_arrays_to_return()
+        registers = [
+            reg
+            for reg in self._carried_registers + self._mem_mgr.get_registers_to_return()
+            if reg.name != RegisterName.M
+        ]
+
+        self._connection.flush()
+
+        self._carried_arrays = [weakref.ref(array) for array in arrays]
+        self._carried_registers = list(dict.fromkeys(registers))
+
     def _log_subroutine(self, subroutine: Subroutine) -> None:
         self._committed_subroutines.append(subroutine)
 
@@ -354,7 +456,7 @@ class Builder:
     def _alloc_epr_create_args(self, tp: EPRType, params: EntRequestParams) -> Array:
         serialized_args = serialize_request(tp, params)
         return self.alloc_array(
-            length=len(serialized_args), init_values=serialized_args
+            length=len(serialized_args), init_values=serialized_args, return_array=False
         )
 
     def _build_cmds_wait_move_epr_to_mem(
@@ -556,7 +658,9 @@ class Builder:
 
         # NetQASM array with IDs for the generated qubits.
         virtual_qubit_ids = [q.qubit_id for q in qubit_futures]
-        qubit_ids_array = self.alloc_array(init_values=virtual_qubit_ids)  # type: ignore
+        qubit_ids_array = self.alloc_array(
+            init_values=virtual_qubit_ids, return_array=False  # type: ignore
+        )
 
         # Construct and add the NetQASM instructions
         if role == EPRRole.CREATE:
@@ -749,6 +853,44 @@ class Builder:
         #     raise RuntimeError("Should not have active registers left when flushing")
         self._mem_mgr.reset()
         self._pre_context_commands = {}
+        self._carried_arrays = []
+        self._carried_registers = []
+        for future in self._meas_reg_futures:
+            future._try_get_value()
+        self._meas_reg_futures = []
+
+    def _get_arrays_to_return(self) -> List[Array]:
+        """Get the arrays that are returned at the end of the current subroutine,
+        without duplicates."""
+        carried = [ref() for ref in self._carried_arrays]
+        arrays = [array for array in carried if array is not None]
+        arrays += self._mem_mgr.get_arrays_to_return()
+        return list({array.address: array for array in arrays}.values())
+
+    def _get_reg_future_operand(
+        self, future: RegFuture
+    ) -> Union[int, operand.Register]:
+        """Get the operand to use for the value of a RegFuture in the current
+        subroutine.
+
+        This is the register of the future, unless it is an M-register that was
+        written by a subroutine that has already been flushed. Since M-registers are
+        re-used by each subroutine, the value that was returned to the Host is used
+        instead.
+        """
+        reg = future.reg
+        assert reg is not None
+        if reg.name != RegisterName.M or any(
+            future is pending for pending in self._meas_reg_futures
+        ):
+            return reg
+        value = future.value
+        if value is None:
+            raise RuntimeError(
+                f"Cannot use {reg} of a previous subroutine, since its value has "
+                "not been returned yet"
+            )
+        return value
 
     def _get_condition_operand(
         self, value: T_CValue
@@ -761,8 +903,7 @@ class Builder:
             load = ICmd(instruction=GenericInstr.LOAD, operands=[reg, address_entry])
             return [load], reg
         elif isinstance(value, RegFuture):
-            assert value.reg is not None
-            return [], value.reg
+            return [], self._get_reg_future_operand(value)
         elif isinstance(value, int):
             return [], value
         else:
@@ -956,6 +1097,7 @@ class Builder:
         ]
 
     def if_context_enter(self, context_id: int) -> None:
+        self._enter_context()
         pre_commands = self.subrt_pop_all_pending_commands()
         self._pre_context_commands[context_id] = pre_commands
 
@@ -966,27 +1108,35 @@ class Builder:
         op0: T_CValue,
         op1: Optional[T_CValue],
     ) -> None:
-        # pop commands that were added while evaluting the context body
-        body_commands = self.subrt_pop_all_pending_commands()
+        try:
+            # pop commands that were added while evaluting the context body
+            body_commands = self.subrt_pop_all_pending_commands()
 
-        # get all commands that were pending before entering this context
-        pre_context_commands = self._pre_context_commands.pop(context_id, None)
-        if pre_context_commands is None:
-            raise RuntimeError("Something went wrong, no pre_context_commands")
+            # get all commands that were pending before entering this context
+            pre_context_commands = self._pre_context_commands.pop(context_id, None)
+            if pre_context_commands is None:
+                raise RuntimeError("Something went wrong, no pre_context_commands")
 
-        self._build_cmds_condition(
-            pre_commands=pre_context_commands,
-            body_commands=body_commands,
-            condition=condition,
-            op0=op0,
-            op1=op1,
-        )
+            self._build_cmds_condition(
+                pre_commands=pre_context_commands,
+                body_commands=body_commands,
+                condition=condition,
+                op0=op0,
+                op1=op1,
+            )
+        finally:
+            self._exit_context()
 
     def _foreach_context_enter(
         self, context_id: int, array: Array, return_index: bool
     ) -> Union[Tuple[operand.Register, Future], Future]:
-        pre_commands = self.subrt_pop_all_pending_commands()
-        loop_register = self._mem_mgr.get_inactive_register(activate=True)
+        self._enter_context()
+        try:
+            pre_commands = self.subrt_pop_all_pending_commands()
+            loop_register = self._mem_mgr.get_inactive_register(activate=True)
+        except BaseException:
+            self._exit_context()
+            raise
 
         # NOTE (BUG): the below assignment is NOT consistent with the type of _pre_context_commands
         # It works (maybe?) because the values are pushed only temporarily
@@ -997,24 +1147,27 @@ class Builder:
             return array.get_future_index(loop_register)
 
     def _foreach_context_exit(self, context_id: int, array: Array) -> None:
-        body_commands = self.subrt_pop_all_pending_commands()
-        pre_context_commands: Tuple[List[T_Cmd], operand.Register] = self._pre_context_commands.pop(  # type: ignore
-            context_id, None  # type: ignore
-        )
-        if pre_context_commands is None:
-            raise RuntimeError("Something went wrong, no pre_context_commands")
+        try:
+            body_commands = self.subrt_pop_all_pending_commands()
+            pre_context_commands: Tuple[List[T_Cmd], operand.Register] = self._pre_context_commands.pop(  # type: ignore
+                context_id, None  # type: ignore
+            )
+            if pre_context_commands is None:
+                raise RuntimeError("Something went wrong, no pre_context_commands")
 
-        # NOTE (BUG): see NOTE (BUG) in _foreach_context_enter
-        pre_commands, loop_register = pre_context_commands  # type: ignore
-        self._build_cmds_loop(
-            pre_commands=pre_commands,
-            body_commands=body_commands,
-            stop=len(array),
-            start=0,
-            step=1,
-            loop_register=loop_register,
-        )
-        self._mem_mgr.remove_active_register(loop_register)
+            # NOTE (BUG): see NOTE (BUG) in _foreach_context_enter
+            pre_commands, loop_register = pre_context_commands  # type: ignore
+            self._build_cmds_loop(
+                pre_commands=pre_commands,
+                body_commands=body_commands,
+                stop=len(array),
+                start=0,
+                step=1,
+                loop_register=loop_register,
+            )
+            self._mem_mgr.remove_active_register(loop_register)
+        finally:
+            self._exit_context()
 
     def _loop_until_context_enter(self, context_id: int) -> operand.Register:
         pre_commands = self.subrt_pop_all_pending_commands()
@@ -1061,6 +1214,7 @@ class Builder:
         d: int = 0,
         angle: Optional[float] = None,
     ) -> None:
+        self._auto_flush_point()
         if angle is not None:
             nds = get_angle_spec_from_float(angle=angle)
             for n, d in nds:
@@ -1086,6 +1240,7 @@ class Builder:
         self.subrt_add_pending_command(rot_command)
 
     def _build_cmds_single_qubit(self, instr: GenericInstr, qubit_id: int) -> None:
+        self._auto_flush_point()
         register = self._get_qubit_register()
         self._build_cmds_set_register_value(register, qubit_id)
         # Construct the qubit command
@@ -1098,6 +1253,7 @@ class Builder:
     def _build_cmds_two_qubit(
         self, instr: GenericInstr, control_qubit_id: int, target_qubit_id: int
     ) -> None:
+        self._auto_flush_point()
         register1 = self._get_qubit_register(0)
         self._build_cmds_set_register_value(register1, control_qubit_id)
         register2 = self._get_qubit_register(1)
@@ -1123,6 +1279,7 @@ class Builder:
         basis: QubitMeasureBasis = QubitMeasureBasis.Z,
         rotations: Optional[Tuple[int, int, int]] = None,
     ) -> None:
+        self._auto_flush_point(meas_registers=1)
         if isinstance(self._hardware_config, NVHardwareConfig):
             # If compiling for NV, only virtual ID 0 can be used to measure a qubit.
             # So, if this qubit is already in use, we need to move it away first.
@@ -1174,6 +1331,7 @@ class Builder:
             elif isinstance(future, RegFuture):
                 future.reg = outcome_reg
                 self._mem_mgr.add_register_to_return(outcome_reg)
+                self._meas_reg_futures.append(future)
                 outcome_commands = []
             else:
                 outcome_commands = []
@@ -1181,6 +1339,7 @@ class Builder:
         self.subrt_add_pending_commands(commands)  # type: ignore
 
     def _build_cmds_new_qubit(self, qubit_id: int) -> None:
+        self._auto_flush_point()
         qubit_reg = self._get_qubit_register()
         self._build_cmds_set_register_value(qubit_reg, qubit_id)
         qalloc_command = ICmd(
@@ -1195,6 +1354,7 @@ class Builder:
         self.subrt_add_pending_commands(commands)  # type: ignore
 
     def _build_cmds_init_qubit(self, qubit_id: int) -> None:
+        self._auto_flush_point()
         qubit_reg = self._get_qubit_register()
         self._build_cmds_set_register_value(qubit_reg, qubit_id)
         init_command = ICmd(
@@ -1204,6 +1364,7 @@ class Builder:
         self.subrt_add_pending_command(init_command)
 
     def _build_cmds_qfree(self, qubit_id: int) -> None:
+        self._auto_flush_point()
         qubit_reg = self._get_qubit_register()
         self._build_cmds_set_register_value(qubit_reg, qubit_id)
         qfree_command = ICmd(
@@ -1220,8 +1381,9 @@ class Builder:
         self.subrt_add_pending_commands(current_commands)
 
         if self._return_arrays:
-            for array in self._mem_mgr.get_arrays_to_return():
-                self._build_cmds_return_array(array)
+            for array in self._get_arrays_to_return():
+                if not self._mem_mgr.is_input_array(array):
+                    self._build_cmds_return_array(array)
 
     def _build_cmds_init_array(self, array: Array) -> None:
         commands: List[T_Cmd] = []
@@ -1295,7 +1457,13 @@ class Builder:
 
     def _build_cmds_return_registers(self) -> None:
         ret_reg_instrs: List[T_Cmd] = []
-        for reg in self._mem_mgr.get_registers_to_return():
+        registers = self._mem_mgr.get_registers_to_return()
+        for reg in self._carried_registers:
+            if reg not in registers:
+                ret_reg_instrs.append(
+                    ICmd(instruction=GenericInstr.RET_REG, operands=[reg])
+                )
+        for reg in registers:
             ret_reg_instrs.append(
                 ICmd(instruction=GenericInstr.RET_REG, operands=[reg])
             )
@@ -1657,32 +1825,33 @@ class Builder:
         """An effective loop-statement where body is a function executed, a number of times specified
         by `start`, `stop` and `step`.
         """
-        loop_register = self._loop_get_register(loop_register)
-        pre_commands = self.subrt_pop_all_pending_commands()
+        with self._context():
+            loop_register = self._loop_get_register(loop_register)
+            pre_commands = self.subrt_pop_all_pending_commands()
 
-        loop_register_already_activated: bool = self._mem_mgr.is_register_active(
-            loop_register
-        )
+            loop_register_already_activated: bool = self._mem_mgr.is_register_active(
+                loop_register
+            )
 
-        if not loop_register_already_activated:
-            self._mem_mgr.add_active_register(loop_register)
-        # evaluate body (will add pending commands)
-        body(
-            self._connection,
-            RegFuture(connection=self._connection, reg=loop_register),
-        )
-        body_commands = self.subrt_pop_all_pending_commands()
+            if not loop_register_already_activated:
+                self._mem_mgr.add_active_register(loop_register)
+            # evaluate body (will add pending commands)
+            body(
+                self._connection,
+                RegFuture(connection=self._connection, reg=loop_register),
+            )
+            body_commands = self.subrt_pop_all_pending_commands()
 
-        self._build_cmds_loop(
-            pre_commands=pre_commands,
-            body_commands=body_commands,
-            stop=stop,
-            start=start,
-            step=step,
-            loop_register=loop_register,
-        )
-        if not loop_register_already_activated:
-            self._mem_mgr.remove_active_register(loop_register)
+            self._build_cmds_loop(
+                pre_commands=pre_commands,
+                body_commands=body_commands,
+                stop=stop,
+                start=start,
+                step=step,
+                loop_register=loop_register,
+            )
+            if not loop_register_already_activated:
+                self._mem_mgr.remove_active_register(loop_register)
 
     def _build_cmds_loop(
         self,
@@ -1772,22 +1941,23 @@ class Builder:
         body: T_BranchRoutine,
     ) -> None:
         """Used to build effective if-statements"""
-        current_commands = self.subrt_pop_all_pending_commands()
+        with self._context():
+            current_commands = self.subrt_pop_all_pending_commands()
 
-        # evaluate body (will add pending commands)
-        body(self._connection)
+            # evaluate body (will add pending commands)
+            body(self._connection)
 
-        # get those commands
-        body_commands = self.subrt_pop_all_pending_commands()
+            # get those commands
+            body_commands = self.subrt_pop_all_pending_commands()
 
-        # combine existing commands with body commands and branch instructions
-        self._build_cmds_condition(
-            pre_commands=current_commands,
-            body_commands=body_commands,
-            condition=condition,
-            op0=op0,
-            op1=op1,
-        )
+            # combine existing commands with body commands and branch instructions
+            self._build_cmds_condition(
+                pre_commands=current_commands,
+                body_commands=body_commands,
+                condition=condition,
+                op0=op0,
+                op1=op1,
+            )
 
     def _build_cmds_condition(
         self,
@@ -1830,77 +2000,82 @@ class Builder:
     ) -> Tuple[List[Qubit], Array]:
         """Build commands for an EPR keep operation and return the result futures."""
         self._check_epr_args(tp=EPRType.K, params=params)
+        with self._context():
 
-        # Setup NetQASM arrays and SDK handles.
+            # Setup NetQASM arrays and SDK handles.
 
-        # NetQASM array for entanglement results.
-        # This will be filled in by the quantum node controller.
-        ent_results_array: Array = self._alloc_ent_results_array(
-            number=params.number, tp=EPRType.K
-        )
+            # NetQASM array for entanglement results.
+            # This will be filled in by the quantum node controller.
+            ent_results_array: Array = self._alloc_ent_results_array(
+                number=params.number, tp=EPRType.K
+            )
 
-        # SDK handles to result values (Qubit objects).
-        qubit_futures: List[Qubit] = self._get_qubit_futures(
-            params.number, params.sequential, ent_results_array
-        )
-        assert all(isinstance(q, Qubit) for q in qubit_futures)
+            # SDK handles to result values (Qubit objects).
+            qubit_futures: List[Qubit] = self._get_qubit_futures(
+                params.number, params.sequential, ent_results_array
+            )
+            assert all(isinstance(q, Qubit) for q in qubit_futures)
 
-        # NetQASM array with IDs for the generated qubits.
-        if (
-            self._hardware_config is not None
-            and self._hardware_config.comm_qubit_count == 1
-        ):
-            # If there is only one comm qubit, only ID 0 can be used to receive the
-            # EPR qubit. The Builder will however insert instructions to move this
-            # qubit to one of the memory qubits. The corresponding QubitFuture object
-            # still has the ID of this memory qubit (and not ID 0)!
-            virtual_qubit_ids = [0 for _ in qubit_futures]
-        else:
-            virtual_qubit_ids = [q.qubit_id for q in qubit_futures]
-        qubit_ids_array: Array = self.alloc_array(init_values=virtual_qubit_ids)  # type: ignore
+            # NetQASM array with IDs for the generated qubits.
+            if (
+                self._hardware_config is not None
+                and self._hardware_config.comm_qubit_count == 1
+            ):
+                # If there is only one comm qubit, only ID 0 can be used to receive the
+                # EPR qubit. The Builder will however insert instructions to move this
+                # qubit to one of the memory qubits. The corresponding QubitFuture object
+                # still has the ID of this memory qubit (and not ID 0)!
+                virtual_qubit_ids = [0 for _ in qubit_futures]
+            else:
+                virtual_qubit_ids = [q.qubit_id for q in qubit_futures]
+            qubit_ids_array: Array = self.alloc_array(
+                init_values=virtual_qubit_ids, return_array=False  # type: ignore
+            )
 
-        single_comm_qubit: bool = (
-            self._hardware_config is not None
-            and self._hardware_config.comm_qubit_count == 1
-        )
+            single_comm_qubit: bool = (
+                self._hardware_config is not None
+                and self._hardware_config.comm_qubit_count == 1
+            )
 
-        # If there is a post routine, handle pairs one by one.
-        # If there is only one comm qubit, handle pairs one by one.
-        if params.post_routine is not None or single_comm_qubit:
-            wait_all = False
-        else:
-            wait_all = True
+            # If there is a post routine, handle pairs one by one.
+            # If there is only one comm qubit, handle pairs one by one.
+            if params.post_routine is not None or single_comm_qubit:
+                wait_all = False
+            else:
+                wait_all = True
 
-        if reset_results_array:
-            self._build_cmds_undefine_array(ent_results_array)
+            if reset_results_array:
+                self._build_cmds_undefine_array(ent_results_array)
 
-        # Construct and add the NetQASM instructions
-        if role == EPRRole.CREATE:
-            # NetQASM array for entanglement request parameters.
-            create_args_array: Array = self._alloc_epr_create_args(EPRType.K, params)
+            # Construct and add the NetQASM instructions
+            if role == EPRRole.CREATE:
+                # NetQASM array for entanglement request parameters.
+                create_args_array: Array = self._alloc_epr_create_args(
+                    EPRType.K, params
+                )
 
-            self._build_cmds_epr_create_keep(
-                create_args_array,
-                qubit_ids_array,
-                ent_results_array,
-                wait_all,
-                params,
-            )
-        else:
-            self._build_cmds_epr_recv_keep(
-                qubit_ids_array, ent_results_array, wait_all, params
-            )
+                self._build_cmds_epr_create_keep(
+                    create_args_array,
+                    qubit_ids_array,
+                    ent_results_array,
+                    wait_all,
+                    params,
+                )
+            else:
+                self._build_cmds_epr_recv_keep(
+                    qubit_ids_array, ent_results_array, wait_all, params
+                )
 
-        if params.post_routine is None and single_comm_qubit:
-            self._build_cmds_wait_move_epr_to_mem(
-                params=params, ent_results_array=ent_results_array, role=role
-            )
+            if params.post_routine is None and single_comm_qubit:
+                self._build_cmds_wait_move_epr_to_mem(
+                    params=params, ent_results_array=ent_results_array, role=role
+                )
 
-        # Construct and add NetQASM instructions for post routine
-        if params.post_routine:
-            self._build_cmds_post_epr(
-                qubit_ids_array, params, ent_results_array, EPRType.K, role
-            )
+            # Construct and add NetQASM instructions for post routine
+            if params.post_routine:
+                self._build_cmds_post_epr(
+                    qubit_ids_array, params, ent_results_array, EPRType.K, role
+                )
 
         return qubit_futures, ent_results_array
 
@@ -1911,29 +2086,32 @@ class Builder:
     ) -> List[EprMeasureResult]:
         """Build commands for an EPR measure operation and return the result futures."""
         self._check_epr_args(tp=EPRType.M, params=params)
+        with self._context():
 
-        # Setup NetQASM arrays and SDK handles.
+            # Setup NetQASM arrays and SDK handles.
 
-        # Entanglement results array.
-        # This will be filled in by the quantum node controller.
-        ent_results_array = self._alloc_ent_results_array(
-            number=params.number, tp=EPRType.M
-        )
+            # Entanglement results array.
+            # This will be filled in by the quantum node controller.
+            ent_results_array = self._alloc_ent_results_array(
+                number=params.number, tp=EPRType.M
+            )
 
-        wait_all = params.post_routine is None
+            wait_all = params.post_routine is None
 
-        # Construct and add the NetQASM instructions
-        if role == EPRRole.CREATE:
-            # NetQASM array for entanglement request parameters.
-            create_args_array: Array = self._alloc_epr_create_args(EPRType.M, params)
+            # Construct and add the NetQASM instructions
+            if role == EPRRole.CREATE:
+                # NetQASM array for entanglement request parameters.
+                create_args_array: Array = self._alloc_epr_create_args(
+                    EPRType.M, params
+                )
 
-            self._build_cmds_epr_create_measure(
-                create_args_array, ent_results_array, wait_all, params
-            )
-        else:
-            self._build_cmds_epr_recv_measure(ent_results_array, wait_all, params)
+                self._build_cmds_epr_create_measure(
+                    create_args_array, ent_results_array, wait_all, params
+                )
+            else:
+                self._build_cmds_epr_recv_measure(ent_results_array, wait_all, params)
 
-        results = deserialize_epr_measure_results(params, ent_results_array, role)
+            results = deserialize_epr_measure_results(params, ent_results_array, role)
         return results
 
     def sdk_epr_rsp_create(
@@ -1943,24 +2121,25 @@ class Builder:
         """Build commands for a 'create remote state preparation' EPR operation
         and return the result futures."""
         self._check_epr_args(tp=EPRType.R, params=params)
+        with self._context():
 
-        # Setup NetQASM arrays and SDK handles.
+            # Setup NetQASM arrays and SDK handles.
 
-        # Entanglement results array.
-        # This will be filled in by the quantum node controller.
-        ent_results_array = self._alloc_ent_results_array(
-            number=params.number, tp=EPRType.R
-        )
+            # Entanglement results array.
+            # This will be filled in by the quantum node controller.
+            ent_results_array = self._alloc_ent_results_array(
+                number=params.number, tp=EPRType.R
+            )
 
-        # NetQASM array for entanglement request parameters.
-        create_args_array: Array = self._alloc_epr_create_args(EPRType.R, params)
+            # NetQASM array for entanglement request parameters.
+            create_args_array: Array = self._alloc_epr_create_args(EPRType.R, params)
 
-        wait_all = params.post_routine is None
+            wait_all = params.post_routine is None
 
-        # Construct and add the NetQASM instructions
-        self._build_cmds_epr_create_rsp(
-            create_args_array, ent_results_array, wait_all, params
-        )
+            # Construct and add the NetQASM instructions
+            self._build_cmds_epr_create_rsp(
+                create_args_array, ent_results_array, wait_all, params
+            )
 
         return deserialize_epr_measure_results(
             params, ent_results_array, role=EPRRole.CREATE
@@ -1973,35 +2152,38 @@ class Builder:
         """Build commands for a 'receive remote state preparation' EPR operation
         and return the created qubits and result futures."""
         self._check_epr_args(tp=EPRType.R, params=params)
+        with self._context():
 
-        # Setup NetQASM arrays and SDK handles.
+            # Setup NetQASM arrays and SDK handles.
 
-        # Entanglement results array.
-        # This will be filled in by the quantum node controller.
-        ent_results_array = self._alloc_ent_results_array(
-            number=params.number, tp=EPRType.K  # Keep since we are receiving RSP
-        )
+            # Entanglement results array.
+            # This will be filled in by the quantum node controller.
+            ent_results_array = self._alloc_ent_results_array(
+                number=params.number, tp=EPRType.K  # Keep since we are receiving RSP
+            )
 
-        qubit_ids_array: Optional[Array] = None
+            qubit_ids_array: Optional[Array] = None
 
-        # SDK handles to result values (Qubit objects).
-        qubit_futures = self._get_qubit_futures(
-            params.number, params.sequential, ent_results_array
-        )
-        assert all(isinstance(q, Qubit) for q in qubit_futures)
+            # SDK handles to result values (Qubit objects).
+            qubit_futures = self._get_qubit_futures(
+                params.number, params.sequential, ent_results_array
+            )
+            assert all(isinstance(q, Qubit) for q in qubit_futures)
 
-        # Receivers of R-type requests need an array for IDs for the generated qubits.
-        virtual_qubit_ids = [q.qubit_id for q in qubit_futures]
-        qubit_ids_array = self.alloc_array(init_values=virtual_qubit_ids)  # type: ignore
+            # Receivers of R-type requests need an array for IDs for the generated qubits.
+            virtual_qubit_ids = [q.qubit_id for q in qubit_futures]
+            qubit_ids_array = self.alloc_array(
+                init_values=virtual_qubit_ids, return_array=False  # type: ignore
+            )
 
-        wait_all = params.post_routine is None
+            wait_all = params.post_routine is None
 
-        # Construct and add the NetQASM instructions
-        self._build_cmds_epr_recv_rsp(
-            qubit_ids_array, ent_results_array, wait_all, params
-        )
+            # Construct and add the NetQASM instructions
+            self._build_cmds_epr_recv_rsp(
+                qubit_ids_array, ent_results_array, wait_all, params
+            )
 
-        epr_results = deserialize_epr_keep_results(params, ent_results_array)
+            epr_results = deserialize_epr_keep_results(params, ent_results_array)
         return qubit_futures, epr_results
 
     def sdk_create_epr_keep(
@@ -2149,21 +2331,22 @@ class Builder:
         loop_register: Optional[Union[operand.Register, str]] = None,
     ) -> Iterator[operand.Register]:
         """Build commands for a 'loop' context and return the context object."""
-        try:
+        with self._context():
             pre_commands = self.subrt_pop_all_pending_commands()
             loop_register_result = self._loop_get_register(loop_register, activate=True)
-            yield loop_register_result
-        finally:
-            body_commands = self.subrt_pop_all_pending_commands()
-            self._build_cmds_loop(
-                pre_commands=pre_commands,
-                body_commands=body_commands,
-                stop=stop,
-                start=start,
-                step=step,
-                loop_register=loop_register_result,
-            )
-            self._mem_mgr.remove_active_register(loop_register_result)
+            try:
+                yield loop_register_result
+            finally:
+                body_commands = self.subrt_pop_all_pending_commands()
+                self._build_cmds_loop(
+                    pre_commands=pre_commands,
+                    body_commands=body_commands,
+                    stop=stop,
+                    start=start,
+                    step=step,
+                    loop_register=loop_register_result,
+                )
+                self._mem_mgr.remove_active_register(loop_register_result)
 
     def sdk_loop_body(
         self,
@@ -2227,22 +2410,23 @@ class Builder:
         self, max_iterations: int
     ) -> Iterator[SdkLoopUntilContext]:
         """Build commands for a 'loop_until' context and return the context object."""
-        try:
-            id = self._next_context_id
-            context = SdkLoopUntilContext(
-                id=id, builder=self, max_iterations=max_iterations
-            )
-            self._next_context_id += 1
+        id = self._next_context_id
+        context = SdkLoopUntilContext(
+            id=id, builder=self, max_iterations=max_iterations
+        )
+        self._next_context_id += 1
+        with self._context():
             loop_register = self._loop_until_context_enter(id)
             reg_future = RegFuture(self._connection, loop_register)
             context.set_loop_register(reg_future)
-            yield context
-        finally:
-            assert context.exit_condition is not None
-            self._loop_until_context_exit(
-                context_id=id,
-                context=context,
-            )
+            try:
+                yield context
+            finally:
+                assert context.exit_condition is not None
+                self._loop_until_context_exit(
+                    context_id=id,
+                    context=context,
+                )
 
     @contextmanager
     def sdk_try_context(
@@ -2250,13 +2434,14 @@ class Builder:
         max_tries: int = 1,
     ) -> Iterator[None]:
         """Build commands for a 'try' context."""
-        try:
+        with self._context():
             pre_commands = self.subrt_pop_all_pending_commands()
-            yield
-        finally:
-            body_commands = self.subrt_pop_all_pending_commands()
-            commands = pre_commands + body_commands
-            self.subrt_add_pending_commands(commands)
+            try:
+                yield
+            finally:
+                body_commands = self.subrt_pop_all_pending_commands()
+                commands = pre_commands + body_commands
+                self.subrt_add_pending_commands(commands)
 
     @contextmanager
     def sdk_create_epr_context(
@@ -2264,7 +2449,7 @@ class Builder:
     ) -> Iterator[Tuple[FutureQubit, RegFuture]]:
         """Build commands for an EPR context and return an iterator over
         the EPR qubits and indices created in this context."""
-        try:
+        with self._context():
             (
                 pre_commands,
                 loop_register,
@@ -2273,12 +2458,13 @@ class Builder:
                 pair,
             ) = self._pre_epr_context(role=EPRRole.CREATE, params=params)
             pair_future = RegFuture(self._connection, pair)
-            yield output, pair_future
-        finally:
-            self._post_epr_context(
-                pre_commands=pre_commands,
-                number=params.number,
-                loop_register=loop_register,
-                ent_results_array=ent_results_array,
-                pair=pair,
-            )
+            try:
+                yield output, pair_future
+            finally:
+                self._post_epr_context(
+                    pre_commands=pre_commands,
+                    number=params.number,
+                    loop_register=loop_register,
+                    ent_results_array=ent_results_array,
+                    pair=pair,
+                )
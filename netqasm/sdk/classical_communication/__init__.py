@@ -1 +1,43 @@
-from .thread_socket import ThreadBroadcastChannel, ThreadSocket, reset_socket_hub
+from typing import TYPE_CHECKING
+
+from netqasm.util.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .async_socket import AsyncBroadcastChannel, AsyncSocket, reset_async_socket_hub
+    from .codec import BinaryCodec, Codec, JsonCodec, PassthroughCodec
+    from .stream_socket import StreamSocket, reset_connection_pool
+    from .thread_socket import ThreadBroadcastChannel, ThreadSocket, reset_socket_hub
+
+__all__ = [
+    "AsyncBroadcastChannel",
+    "AsyncSocket",
+    "reset_async_socket_hub",
+    "BinaryCodec",
+    "Codec",
+    "JsonCodec",
+    "PassthroughCodec",
+    "StreamSocket",
+    "reset_connection_pool",
+    "ThreadBroadcastChannel",
+    "ThreadSocket",
+    "reset_socket_hub",
+]
+
+# Submodules are only imported when one of their names is used
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "AsyncBroadcastChannel": ".async_socket",
+        "AsyncSocket": ".async_socket",
+        "reset_async_socket_hub": ".async_socket",
+        "BinaryCodec": ".codec",
+        "Codec": ".codec",
+        "JsonCodec": ".codec",
+        "PassthroughCodec": ".codec",
+        "StreamSocket": ".stream_socket",
+        "reset_connection_pool": ".stream_socket",
+        "ThreadBroadcastChannel": ".thread_socket",
+        "ThreadSocket": ".thread_socket",
+        "reset_socket_hub": ".thread_socket",
+    },
+)
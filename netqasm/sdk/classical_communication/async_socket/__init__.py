@@ -0,0 +1,10 @@
+"""Implementations of classical messaging interfaces for asyncio applications.
+
+These implementations are most suitable for runtimes that run the Hosts (programs)
+of all nodes as tasks in a single asyncio event loop, where communication between
+Hosts is done by passing messages through `asyncio.Queue`s.
+"""
+
+from .broadcast_channel import AsyncBroadcastChannel
+from .socket import AsyncSocket
+from .socket_hub import reset_async_socket_hub
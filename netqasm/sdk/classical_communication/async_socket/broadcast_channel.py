@@ -0,0 +1,73 @@
+"""BroadcastChannel implementation for Hosts that run as asyncio tasks."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional, Tuple
+
+from .socket_hub import T_AsyncBroadcastKey, _async_socket_hub, _AsyncSocketHub
+
+
+class AsyncBroadcastChannel:
+    """Channel for broadcasting messages between Hosts that run in the same event loop.
+
+    The methods are the same as those of :class:`~.BroadcastChannel`, except that
+    they are coroutines and hence need to be awaited.
+
+    Each Host has a single `asyncio.Queue` holding the broadcast messages for it,
+    together with the name of the sender. Receiving therefore waits for the first
+    message from any of the remote Hosts, without polling the remote Hosts one by one.
+    """
+
+    _SOCKET_HUB: _AsyncSocketHub = _async_socket_hub
+
+    def __init__(self, app_name: str, remote_app_names: List[str]):
+        """AsyncBroadcastChannel constructor.
+
+        :param app_name: application/Host name of self
+        :param remote_app_names: list of receiving remote Hosts
+        """
+        self._app_name: str = app_name
+        self._remote_app_names: List[str] = list(remote_app_names)
+
+    @property
+    def app_name(self) -> str:
+        return self._app_name
+
+    @property
+    def key(self) -> T_AsyncBroadcastKey:
+        return (self._app_name,)
+
+    async def send(self, msg: str) -> None:
+        """Broadcast a message to all remote nodes."""
+        if not isinstance(msg, str):
+            raise TypeError(f"Messages needs to be a string, not {type(msg)}")
+        for remote_app_name in self._remote_app_names:
+            queue = self._SOCKET_HUB.get_queue((remote_app_name,))
+            queue.put_nowait((self._app_name, msg))
+
+    async def recv(
+        self, block: bool = True, timeout: Optional[float] = None
+    ) -> Tuple[str, str]:
+        """Receive a message that was broadcast.
+
+        :param block: whether to wait for an available message
+        :param timeout: optionally use a timeout for trying to recv a message. Only
+            used if `block=True`.
+        :return: tuple (remote_node_name, msg)
+        :raises RuntimeError: if `block=False` and there is no available message
+        :raises TimeoutError: if no message was received within `timeout` seconds
+        """
+        queue = self._SOCKET_HUB.get_queue(self.key)
+        sender_and_msg: Tuple[str, str]
+        if not block:
+            try:
+                sender_and_msg = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                raise RuntimeError("No message broadcasted")
+            return sender_and_msg
+        try:
+            sender_and_msg = await asyncio.wait_for(queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timeout while trying to receive broadcasted message")
+        return sender_and_msg
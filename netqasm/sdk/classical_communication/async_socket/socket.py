@@ -0,0 +1,266 @@
+"""Classical socket implementation for Hosts that run as asyncio tasks.
+
+This module contains the AsyncSocket class, which has the same interface as a Socket,
+except that sending and receiving messages are coroutines.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Optional, Union
+
+from netqasm.logging.glob import get_netqasm_logger
+from netqasm.logging.output import ClassCommLogger, SocketOperation
+from netqasm.sdk.classical_communication.message import StructuredMessage
+from netqasm.sdk.config import LogConfig
+from netqasm.util.log import LineTracker
+
+from ..thread_socket.socket import ThreadSocket, trim_msg
+from .socket_hub import T_AsyncSocketKey, _async_socket_hub, _AsyncSocketHub
+
+if TYPE_CHECKING:
+    import logging
+
+
+class AsyncSocket:
+    """Classical socket implementation for Hosts that run in the same event loop.
+
+    This implementation should be used when the programs of all Hosts are run as
+    tasks in a single asyncio event loop (see
+    :func:`~netqasm.runtime.hardware.run_application_async`).
+    Messages are passed through an `asyncio.Queue` for each socket, so waiting for a
+    message only suspends the waiting task and not the whole thread.
+
+    The methods are the same as those of :class:`~.Socket`, except that they are
+    coroutines and hence need to be awaited. There is no connection handshake:
+    messages that are sent before the remote socket exists are kept until the remote
+    socket receives them.
+    """
+
+    _SOCKET_HUB: _AsyncSocketHub = _async_socket_hub
+
+    def __init__(
+        self,
+        app_name: str,
+        remote_app_name: str,
+        socket_id: int = 0,
+        log_config: Optional[LogConfig] = None,
+    ):
+        """AsyncSocket constructor.
+
+        :param app_name: application/Host name of this socket's owner
+        :param remote_app_name: remote application/Host name
+        :param socket_id: local ID to use for this socket
+        :param log_config: logging configuration for this socket
+        """
+        self._app_name: str = app_name
+        self._remote_app_name: str = remote_app_name
+        self._id: int = socket_id
+        if app_name == remote_app_name:
+            raise ValueError(
+                f"Cannot connect to itself app_name {app_name} = remote_app_name {remote_app_name}"
+            )
+
+        if log_config is None:
+            log_config = LogConfig()
+
+        self._line_tracker: LineTracker = LineTracker(log_config=log_config)
+
+        self._logger: logging.Logger = get_netqasm_logger(
+            f"{self.__class__.__name__}{self.key}"
+        )
+
+        # Classical communication logger, shared with ThreadSockets of the same app
+        self._comm_logger: Optional[ClassCommLogger]
+        if log_config.comm_log_dir is None:
+            self._comm_logger = None
+        else:
+            self._comm_logger = ThreadSocket.get_comm_logger(
+                app_name=self.app_name,
+                comm_log_dir=log_config.comm_log_dir,
+            )
+
+    @property
+    def app_name(self) -> str:
+        return self._app_name
+
+    @property
+    def remote_app_name(self) -> str:
+        return self._remote_app_name
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def key(self) -> T_AsyncSocketKey:
+        return self.app_name, self.remote_app_name, self.id
+
+    @property
+    def remote_key(self) -> T_AsyncSocketKey:
+        return self.remote_app_name, self.app_name, self.id
+
+    async def send(self, msg: str) -> None:
+        """Sends a message to the remote node.
+
+        :param msg: message to be sent
+        :raises TypeError: if the message is not a string
+        """
+        if not isinstance(msg, str):
+            raise TypeError(f"Messages needs to be a string, not {type(msg)}")
+        trimmed_msg = trim_msg(msg)
+        self._log(
+            socket_op=SocketOperation.SEND,
+            msg=trimmed_msg,
+            sender=self._app_name,
+            receiver=self._remote_app_name,
+            log=f"Send classical message to {self.remote_app_name}: {trimmed_msg}",
+        )
+        self._put(msg)
+
+    async def recv(
+        self,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        maxsize: Optional[int] = None,
+    ) -> str:
+        """Receive a message from the remote node.
+
+        If block is True the task waits until there is a message or a timeout is
+        reached. Otherwise a `RuntimeError` is raised if there is no message to
+        receive directly.
+
+        :param block: whether to wait for an available message
+        :param timeout: optionally use a timeout for trying to recv a message. Only
+            used if `block=True`.
+        :param maxsize: how many bytes to maximally receive (not used here)
+        :return: the message received
+        :raises RuntimeError: if `block=False` and there is no available message
+        :raises TimeoutError: if no message was received within `timeout` seconds
+        """
+        self._log_wait_recv()
+        msg = await self._get(str, block=block, timeout=timeout)
+        assert isinstance(msg, str)
+        trimmed_msg = trim_msg(msg)
+        self._log(
+            socket_op=SocketOperation.RECV,
+            msg=trimmed_msg,
+            sender=self._remote_app_name,
+            receiver=self._app_name,
+            log=f"Message received from {self.remote_app_name}: {trimmed_msg}",
+        )
+        return msg
+
+    async def send_structured(self, msg: StructuredMessage) -> None:
+        """Sends a structured message (with header and payload) to the remote node."""
+        self._log(
+            socket_op=SocketOperation.SEND,
+            msg=f"{msg.header}: {msg.payload}",
+            sender=self._app_name,
+            receiver=self._remote_app_name,
+            log=f"Send classical message to {self.remote_app_name}: {msg}",
+        )
+        self._put(msg)
+
+    async def recv_structured(
+        self,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        maxsize: Optional[int] = None,
+    ) -> StructuredMessage:
+        """Receive a message (with header and payload) from the remote node."""
+        self._log_wait_recv()
+        msg = await self._get(StructuredMessage, block=block, timeout=timeout)
+        assert isinstance(msg, StructuredMessage)
+        self._log(
+            socket_op=SocketOperation.RECV,
+            msg=f"{msg.header}: {msg.payload}",
+            sender=self._remote_app_name,
+            receiver=self._app_name,
+            log=f"Message received from {self.remote_app_name}: {msg}",
+        )
+        return msg
+
+    async def send_silent(self, msg: str) -> None:
+        """Sends a message without logging"""
+        if not isinstance(msg, str):
+            raise TypeError(f"Messages needs to be a string, not {type(msg)}")
+        self._put(msg)
+
+    async def recv_silent(
+        self,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        maxsize: Optional[int] = None,
+    ) -> str:
+        """Receive a message without logging"""
+        msg = await self._get(str, block=block, timeout=timeout)
+        assert isinstance(msg, str)
+        return msg
+
+    def _put(self, msg: Union[str, StructuredMessage]) -> None:
+        self._logger.debug(f"Message {msg} sent on socket {self.key}")
+        self._SOCKET_HUB.get_queue(self.remote_key).put_nowait(msg)
+
+    async def _get(
+        self, kind: type, block: bool = True, timeout: Optional[float] = None
+    ) -> Union[str, StructuredMessage]:
+        """Receive the next message, which is left to be received again if it is not
+        of type `kind`."""
+        queue = self._SOCKET_HUB.get_queue(self.key)
+        msg: Union[str, StructuredMessage]
+        if not block:
+            try:
+                msg = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                raise RuntimeError(f"No message to receive on socket {self.key}")
+        else:
+            try:
+                msg = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"Timeout while trying to receive message for socket {self.key}"
+                )
+        if not isinstance(msg, kind):
+            queue.put_back_nowait(msg)
+            raise RuntimeError(
+                f"Received message of type {type(msg)} instead of {kind.__name__}"
+            )
+        self._logger.debug(f"Got message {msg} for socket {self.key}")
+        return msg
+
+    def _log_wait_recv(self) -> None:
+        self._log(
+            socket_op=SocketOperation.WAIT_RECV,
+            msg=None,
+            sender=self._remote_app_name,
+            receiver=self._app_name,
+            log=f"Waiting for a classical message from {self.remote_app_name}...",
+        )
+
+    def _log(
+        self,
+        socket_op: SocketOperation,
+        msg: Optional[str],
+        sender: str,
+        receiver: str,
+        log: str,
+    ) -> None:
+        if self._comm_logger is None:
+            return
+        hln = None
+        hfl = None
+        hostline = self._line_tracker.get_line()
+        if hostline is not None:
+            hln = hostline.lineno
+            hfl = hostline.filename
+        self._comm_logger.log(
+            socket_op=socket_op,
+            msg=msg,
+            sender=sender,
+            receiver=receiver,
+            socket_id=self._id,
+            hln=hln,
+            hfl=hfl,
+            log=log,
+        )
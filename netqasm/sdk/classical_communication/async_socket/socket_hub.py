@@ -0,0 +1,63 @@
+"""Global management for classical sockets that live in the same event loop.
+
+This module contains the _AsyncSocketHub that holds the message queues of the
+sockets and broadcast channels of all Hosts running in one asyncio event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Tuple, Union
+
+# Key of the queue of an AsyncSocket: (app_name, remote_app_name, socket_id)
+T_AsyncSocketKey = Tuple[str, str, int]
+# Key of the queue of an AsyncBroadcastChannel: (app_name,)
+T_AsyncBroadcastKey = Tuple[str]
+
+
+class _MessageQueue(asyncio.Queue):
+    """Queue of messages, to which a message can be put back to be received first."""
+
+    def _init(self, maxsize: int) -> None:
+        self._queue: Deque[Any] = deque()
+
+    def put_back_nowait(self, item: Any) -> None:
+        """Put an item that was taken from the queue back at its front."""
+        self._queue.appendleft(item)
+        # Like `put_nowait`, wake up a task that is waiting for an item
+        self._wakeup_next(self._getters)  # type: ignore[attr-defined]
+
+
+class _AsyncSocketHub:
+    """Global manager for the message queues of sockets in the same event loop.
+
+    Every receiving end has its own `_MessageQueue`, which is created on first use
+    such that messages sent before the receiving end exists are not lost.
+
+    This class is used by AsyncSockets and AsyncBroadcastChannels and is typically
+    not used directly.
+    """
+
+    def __init__(self):
+        self._queues: Dict[
+            Union[T_AsyncSocketKey, T_AsyncBroadcastKey], _MessageQueue
+        ] = {}
+
+    def get_queue(
+        self, key: Union[T_AsyncSocketKey, T_AsyncBroadcastKey]
+    ) -> _MessageQueue:
+        """Get the queue of messages for the receiving end with the given key"""
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = _MessageQueue()
+            self._queues[key] = queue
+        return queue
+
+
+_async_socket_hub: _AsyncSocketHub = _AsyncSocketHub()
+
+
+def reset_async_socket_hub() -> None:
+    """Remove all queues, e.g. before running an application in a new event loop."""
+    _async_socket_hub.__init__()  # type: ignore
@@ -0,0 +1,121 @@
+"""Codecs that determine how structured messages are transferred by sockets.
+
+A codec encodes a :class:`~.StructuredMessage` into the object that is actually
+transferred to the remote socket, and decodes it again on the other side. Both sides
+of a connection must use the same codec.
+
+- :class:`JsonCodec` (default) encodes messages as JSON strings, which can be sent
+  over any transport and are readable in logs.
+- :class:`BinaryCodec` encodes messages as compact bytes, which is much faster for
+  large payloads and keeps NumPy arrays (including their dtype and shape) intact.
+- :class:`PassthroughCodec` does not encode messages at all, but hands the message
+  object straight to the remote socket. It can only be used by sockets within the
+  same process, like :class:`~.ThreadSocket`.
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+import pickle
+from typing import Any
+
+from netqasm.sdk.classical_communication.message import StructuredMessage
+
+# Protocol 5 (Python 3.8+) stores large buffers, like NumPy arrays, most efficiently
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+class Codec(abc.ABC):
+    """Base class for codecs of structured messages."""
+
+    @abc.abstractmethod
+    def encode(self, msg: StructuredMessage) -> Any:
+        """Encode a message into the object that is sent to the remote socket."""
+        pass
+
+    @abc.abstractmethod
+    def decode(self, raw_msg: Any) -> StructuredMessage:
+        """Decode an object that was received from the remote socket."""
+        pass
+
+
+class JsonCodec(Codec):
+    """Encodes messages as JSON strings.
+
+    Payloads must consist of JSON-serializable objects. NumPy arrays and scalars are
+    converted to (nested) lists and Python scalars, and tuples become lists.
+    """
+
+    def encode(self, msg: StructuredMessage) -> str:
+        return json.dumps(
+            {"header": msg.header, "payload": msg.payload}, default=_to_json
+        )
+
+    def decode(self, raw_msg: Any) -> StructuredMessage:
+        if not isinstance(raw_msg, str):
+            raise RuntimeError(
+                f"Received message of type {type(raw_msg)} instead of a JSON string"
+            )
+        msg_dict = json.loads(raw_msg)
+        return StructuredMessage(header=msg_dict["header"], payload=msg_dict["payload"])
+
+
+class BinaryCodec(Codec):
+    """Encodes messages as compact bytes, using `pickle`.
+
+    Payloads can be any picklable objects and keep their types, e.g. NumPy arrays
+    are transferred as their raw data instead of being converted to lists.
+
+    NOTE: Decoding bytes may execute arbitrary code, so this codec should only be
+    used between trusted Hosts.
+    """
+
+    def encode(self, msg: StructuredMessage) -> bytes:
+        return pickle.dumps((msg.header, msg.payload), protocol=_PICKLE_PROTOCOL)
+
+    def decode(self, raw_msg: Any) -> StructuredMessage:
+        if not isinstance(raw_msg, bytes):
+            raise RuntimeError(
+                f"Received message of type {type(raw_msg)} instead of bytes"
+            )
+        header, payload = pickle.loads(raw_msg)
+        return StructuredMessage(header=header, payload=payload)
+
+
+class PassthroughCodec(Codec):
+    """Hands the message object itself to the remote socket, without encoding it.
+
+    By default the remote socket receives the very same payload object as was sent,
+    so the sender should not change the payload after sending it. If `copy` is True,
+    the remote socket receives a deep copy of the payload instead, which is still
+    faster than encoding and decoding it as JSON. Payloads must then be picklable.
+    """
+
+    def __init__(self, copy: bool = False):
+        """PassthroughCodec constructor.
+
+        :param copy: whether to send a deep copy of the payload
+        """
+        self._copy: bool = copy
+
+    def encode(self, msg: StructuredMessage) -> StructuredMessage:
+        if self._copy:
+            # Much faster than `copy.deepcopy` for large lists
+            payload = pickle.loads(pickle.dumps(msg.payload, protocol=_PICKLE_PROTOCOL))
+            return StructuredMessage(header=msg.header, payload=payload)
+        return msg
+
+    def decode(self, raw_msg: Any) -> StructuredMessage:
+        if not isinstance(raw_msg, StructuredMessage):
+            raise RuntimeError(
+                f"Received message of type {type(raw_msg)} instead of StructuredMessage"
+            )
+        return raw_msg
+
+
+def _to_json(obj: Any) -> Any:
+    # NumPy arrays and scalars, without having to import NumPy here
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
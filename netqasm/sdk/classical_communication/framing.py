@@ -0,0 +1,88 @@
+"""Length-prefixed framing of classical messages.
+
+Some transports of classical messages do not preserve message boundaries (like TCP),
+so that multiple messages may arrive at once, or only part of a message. To still be
+able to split the received data into the original messages, each message is sent as
+a frame: the length of the message (in characters), a colon, and the message itself.
+For example, the messages `hello` and `bob` are sent as `5:hello3:bob`.
+"""
+
+from collections import deque
+from typing import Deque, Iterable, List, Optional
+
+_SEPARATOR = ":"
+
+
+def encode_frames(msgs: Iterable[str]) -> str:
+    """Encode messages as consecutive length-prefixed frames."""
+    return "".join(f"{len(msg)}{_SEPARATOR}{msg}" for msg in msgs)
+
+
+def decode_frames(data: str) -> List[str]:
+    """Decode a string consisting of complete length-prefixed frames.
+
+    :raises ValueError: if the data is not a sequence of complete frames
+    """
+    decoder = FrameDecoder()
+    decoder.feed(data)
+    if decoder.has_partial_frame:
+        raise ValueError("Data ends with an incomplete frame")
+    return decoder.pop()
+
+
+class FrameDecoder:
+    """Incrementally decodes length-prefixed frames from chunks of received data.
+
+    Chunks do not need to align with frames: data of incomplete frames is kept until
+    the rest of the frame is fed.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: str = ""
+        self._msgs: Deque[str] = deque()
+
+    def __len__(self) -> int:
+        """Number of decoded messages that have not been popped yet."""
+        return len(self._msgs)
+
+    @property
+    def has_partial_frame(self) -> bool:
+        """Whether part of a frame has been fed, of which the rest is still missing."""
+        return len(self._buffer) > 0
+
+    def feed(self, data: str) -> None:
+        """Decode the complete frames in the data fed so far.
+
+        :raises ValueError: if the data is not framed correctly
+        """
+        buffer = self._buffer + data
+        start = 0
+        while True:
+            separator = buffer.find(_SEPARATOR, start)
+            if separator == -1:
+                # At most (part of) the length of the next frame is left
+                rest = buffer[start:]
+                if len(rest) > 0 and not rest.isdigit():
+                    raise ValueError(f"Invalid frame length {rest!r}")
+                break
+            length_str = buffer[start:separator]
+            if not length_str.isdigit():
+                raise ValueError(f"Invalid frame length {length_str!r}")
+            end = separator + 1 + int(length_str)
+            if end > len(buffer):
+                break
+            self._msgs.append(buffer[separator + 1 : end])
+            start = end
+        self._buffer = buffer[start:]
+
+    def pop(self, max_n: Optional[int] = None) -> List[str]:
+        """Remove and return decoded messages, in the order in which they were sent.
+
+        :param max_n: maximum number of messages to return. If None, all decoded
+            messages are returned.
+        """
+        if max_n is None or max_n >= len(self._msgs):
+            msgs = list(self._msgs)
+            self._msgs.clear()
+            return msgs
+        return [self._msgs.popleft() for _ in range(max_n)]
@@ -6,12 +6,14 @@ communication (sending and receiving classical messages) between Hosts.
 from __future__ import annotations
 
 import abc
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional
 
+from netqasm.sdk.classical_communication.framing import FrameDecoder, encode_frames
 from netqasm.sdk.classical_communication.message import StructuredMessage
 
 if TYPE_CHECKING:
     from netqasm.sdk import config
+    from netqasm.sdk.classical_communication.codec import Codec
 
 
 class Socket(abc.ABC):
@@ -56,6 +58,7 @@ class Socket(abc.ABC):
         timeout: Optional[float] = None,
         use_callbacks: bool = False,
         log_config: Optional[config.LogConfig] = None,
+        codec: Optional[Codec] = None,
     ):
         """Socket constructor.
 
@@ -67,6 +70,9 @@ class Socket(abc.ABC):
         :param use_callbacks: whether to call the `recv_callback` method upon receiving
             a message
         :param log_config: logging configuration for this socket
+        :param codec: codec used to transfer structured messages (see
+            :mod:`~netqasm.sdk.classical_communication.codec`). Implementations may
+            only support some codecs.
         """
         pass
 
@@ -85,6 +91,57 @@ class Socket(abc.ABC):
         """Receive a message from the remote node."""
         pass
 
+    def send_many(self, msgs: List[str]) -> None:
+        """Send multiple messages to the remote node at once.
+
+        The remote socket receives the messages in the same order, and should
+        receive them using :meth:`recv_many`.
+
+        This default implementation sends the messages as a single message of
+        length-prefixed frames (see :mod:`~.framing`), such that the messages can be
+        split again even if the transport joins or splits the data it sends.
+        Subclasses may implement this more efficiently.
+
+        :param msgs: messages to be sent
+        """
+        for msg in msgs:
+            if not isinstance(msg, str):
+                raise TypeError(f"Messages needs to be a string, not {type(msg)}")
+        self.send(encode_frames(msgs))
+
+    def recv_many(
+        self,
+        max_n: Optional[int] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        """Receive multiple messages from the remote node at once.
+
+        Returns all messages that have been received, but at most `max_n`. If there
+        are none and `block` is True, this waits until at least one message arrives.
+        Messages are returned in the order in which they were sent.
+
+        This default implementation receives messages that were sent by the default
+        implementation of :meth:`send_many`.
+
+        :param max_n: maximum number of messages to return. If None, all available
+            messages are returned.
+        :param block: whether to wait for an available message
+        :param timeout: optionally use a timeout for trying to receive (each chunk
+            of) the messages. Only used if `block=True`.
+        :return: the messages received
+        """
+        if max_n is not None and max_n < 1:
+            raise ValueError(f"max_n must be at least 1, not {max_n}")
+        decoder = getattr(self, "_frame_decoder", None)
+        if decoder is None:
+            # Keeps messages of a batch that are not returned yet, and partial frames
+            decoder = FrameDecoder()
+            self._frame_decoder = decoder
+        while len(decoder) == 0:
+            decoder.feed(self.recv(block=block, timeout=timeout))
+        return decoder.pop(max_n)
+
     def send_structured(self, msg: StructuredMessage) -> None:
         """Sends a structured message (with header and payload) to the remote node."""
         raise NotImplementedError
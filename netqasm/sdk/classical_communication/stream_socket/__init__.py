@@ -0,0 +1,8 @@
+"""Implementation of classical messaging interfaces over TCP or Unix-domain sockets.
+
+This implementation is suitable when Hosts (nodes) run in separate processes, on the
+same machine or on different machines.
+"""
+
+from .registry import reset_connection_pool
+from .socket import StreamSocket
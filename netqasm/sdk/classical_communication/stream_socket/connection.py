@@ -0,0 +1,189 @@
+"""Connections that transfer length-prefixed frames over a stream socket.
+
+Every frame consists of a header, with the length of the payload and the kind of the
+frame, followed by the payload itself. Received data is read with `recv_into` into a
+buffer that is reused for all frames of a connection, from which the frames are
+parsed without intermediate copies.
+
+Each connection has a thread that receives frames as soon as they arrive, such that
+sending never blocks because the remote socket is not receiving (like with a
+ThreadSocket), even if both sides send large messages at the same time.
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+import threading
+from collections import deque
+from typing import Deque, Iterable, Optional, Tuple, Union
+
+# Length of the payload and kind of the frame
+_HEADER = struct.Struct("!IB")
+
+# Kinds of frames
+KIND_STR = 0  # message sent with `send`, payload is UTF-8
+KIND_STRUCTURED_STR = 1  # structured message encoded as a str by the codec
+KIND_STRUCTURED_BYTES = 2  # structured message encoded as bytes by the codec
+KIND_HELLO = 3  # first frame of a connection, payload is the key of the sender
+
+_STR_KINDS = {KIND_STR, KIND_STRUCTURED_STR, KIND_HELLO}
+
+T_Frame = Tuple[int, Union[str, bytes]]
+
+
+class _Connection:
+    """Connection between two StreamSockets, which sends and receives frames."""
+
+    _INITIAL_BUFFER_SIZE: int = 2**16
+
+    def __init__(self, sock: socket.socket):
+        self._sock: socket.socket = sock
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            # Frames are sent in one go, so do not wait to fill up packets
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Received data that is not parsed yet is in `_buffer[_start:_end]`
+        self._buffer: bytearray = bytearray(self._INITIAL_BUFFER_SIZE)
+        self._view: memoryview = memoryview(self._buffer)
+        self._start: int = 0
+        self._end: int = 0
+
+        self._send_lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+
+        # Frames that are received but not returned yet
+        self._frames: Deque[T_Frame] = deque()
+        self._error: Optional[ConnectionError] = None
+        self._condition: threading.Condition = threading.Condition()
+        self._reader: threading.Thread = threading.Thread(
+            target=self._read_frames, daemon=True
+        )
+        self._reader.start()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the connection was closed, by this or by the remote socket."""
+        return self._closed or self._error is not None
+
+    def send_frames(self, frames: Iterable[Tuple[int, Union[str, bytes]]]) -> None:
+        """Send frames, given as (kind, payload) tuples, with a single system call."""
+        parts = []
+        for kind, payload in frames:
+            if isinstance(payload, str):
+                payload = payload.encode("utf-8")
+            parts.append(_HEADER.pack(len(payload), kind))
+            parts.append(payload)
+        data = b"".join(parts)
+        with self._send_lock:
+            self._sock.sendall(data)
+
+    def recv_frame(
+        self, block: bool = True, timeout: Optional[float] = None, peek: bool = False
+    ) -> Optional[T_Frame]:
+        """Receive the next frame as a (kind, payload) tuple.
+
+        Payloads of frames containing text are decoded to str, others are bytes.
+
+        :param block: whether to wait for a frame if none has been received yet
+        :param timeout: maximum time to wait for a frame. Only used if `block=True`.
+        :param peek: if True, the frame is not removed, such that it is received again
+            by the next call
+        :return: the frame, or None if no frame was received in time
+        :raises ConnectionError: if the connection was closed
+        """
+        with self._condition:
+            if block:
+                self._condition.wait_for(
+                    lambda: len(self._frames) > 0 or self._error is not None, timeout
+                )
+            if len(self._frames) > 0:
+                return self._frames[0] if peek else self._frames.popleft()
+            if self._error is not None:
+                raise self._error
+            return None
+
+    def next_kind(self) -> Optional[int]:
+        """Kind of the next received frame, or None if no frame was received yet."""
+        with self._condition:
+            if len(self._frames) == 0:
+                return None
+            return self._frames[0][0]
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _next_frame(self) -> Optional[T_Frame]:
+        if self._end - self._start < _HEADER.size:
+            return None
+        length, kind = _HEADER.unpack_from(self._buffer, self._start)
+        payload_start = self._start + _HEADER.size
+        payload_end = payload_start + length
+        if payload_end > self._end:
+            # Make sure the whole frame fits in the buffer
+            self._reserve(_HEADER.size + length)
+            return None
+        payload_view = self._view[payload_start:payload_end]
+        payload: Union[str, bytes]
+        if kind in _STR_KINDS:
+            payload = str(payload_view, "utf-8")
+        else:
+            payload = payload_view.tobytes()
+        self._start = payload_end
+        if self._start == self._end:
+            self._start = self._end = 0
+        return kind, payload
+
+    def _read_frames(self) -> None:
+        try:
+            while True:
+                self._fill()
+                frames = []
+                frame = self._next_frame()
+                while frame is not None:
+                    frames.append(frame)
+                    frame = self._next_frame()
+                if len(frames) > 0:
+                    with self._condition:
+                        self._frames.extend(frames)
+                        self._condition.notify_all()
+        except ConnectionError as error:
+            with self._condition:
+                self._error = error
+                self._condition.notify_all()
+
+    def _fill(self) -> None:
+        if self._end == len(self._buffer):
+            # Make room for at least one more byte
+            self._reserve(self._end - self._start + 1)
+        try:
+            num_bytes = self._sock.recv_into(self._view[self._end :])
+        except OSError as error:
+            raise ConnectionError(f"Connection lost: {error}") from error
+        if num_bytes == 0:
+            raise ConnectionError("Connection closed by the remote socket")
+        self._end += num_bytes
+
+    def _reserve(self, size: int) -> None:
+        """Make sure `size` bytes fit in the buffer, counting from `_start`."""
+        num_bytes = self._end - self._start
+        if size <= len(self._buffer) - self._start:
+            return
+        if size <= len(self._buffer):
+            # Move the unparsed data to the front
+            self._buffer[:num_bytes] = self._buffer[self._start : self._end]
+        else:
+            buffer = bytearray(max(size, 2 * len(self._buffer)))
+            buffer[:num_bytes] = self._view[self._start : self._end]
+            self._view.release()
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        self._start = 0
+        self._end = num_bytes
@@ -0,0 +1,299 @@
+"""Rendezvous registry and connection pool of StreamSockets.
+
+Two StreamSockets find each other through a registry, which is a directory that
+is shared by all processes on a machine. Each application that accepts connections
+listens on a Unix-domain socket or a TCP port, and writes its address to the file
+`<app_name>.addr` in the registry directory.
+
+For every pair of sockets, the socket of the application with the smallest name
+connects to the listener of the other application, and identifies itself by the
+key of the socket. Connections are kept in a per-process pool, keyed by
+(app_name, remote_app_name, socket_id), such that they are reused by sockets that
+are created later with the same key (e.g. in the next round of an application).
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from netqasm.logging.glob import get_netqasm_logger
+
+from .connection import KIND_HELLO, _Connection
+
+if TYPE_CHECKING:
+    import logging
+
+T_StreamSocketKey = Tuple[str, str, int]
+
+# Environment variable of the default registry directory
+REGISTRY_DIR_ENV = "NETQASM_SOCKET_REGISTRY"
+
+# Environment variable of a namespace that is a subdirectory of the default registry
+# directory, to separate runs that use the same app names at the same time
+NAMESPACE_ENV = "NETQASM_SOCKET_NAMESPACE"
+
+
+def get_default_registry_dir() -> str:
+    directory = os.environ.get(
+        REGISTRY_DIR_ENV, os.path.join(tempfile.gettempdir(), "netqasm_sockets")
+    )
+    namespace = os.environ.get(NAMESPACE_ENV)
+    if namespace:
+        directory = os.path.join(directory, namespace)
+    return directory
+
+
+class _Registry:
+    """Directory with the addresses of the listeners of applications."""
+
+    def __init__(self, directory: str):
+        self._directory: str = os.path.abspath(directory)
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def register(self, app_name: str, address: str) -> None:
+        file_path = self._get_path(app_name)
+        tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_file_path, "w") as f:
+            f.write(address)
+        # Such that others never read a partially written address
+        os.replace(tmp_file_path, file_path)
+
+    def lookup(self, app_name: str) -> Optional[str]:
+        try:
+            with open(self._get_path(app_name)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def unregister(self, app_name: str, address: str) -> None:
+        # Only remove the entry if it was not replaced by another listener
+        if self.lookup(app_name) == address:
+            try:
+                os.remove(self._get_path(app_name))
+            except FileNotFoundError:
+                pass
+
+    def _get_path(self, app_name: str) -> str:
+        return os.path.join(self._directory, f"{app_name}.addr")
+
+
+class _Listener:
+    """Accepts connections for the sockets of an application."""
+
+    _HELLO_TIMEOUT: float = 10
+
+    def __init__(self, app_name: str, registry: _Registry, family: str, host: str):
+        self._app_name: str = app_name
+        self._registry: _Registry = registry
+        self._unix_path: Optional[str] = None
+
+        if family == "unix":
+            self._unix_path = os.path.join(registry.directory, f"{app_name}.sock")
+            if os.path.exists(self._unix_path):
+                os.remove(self._unix_path)
+            self._server: socket.socket = socket.socket(socket.AF_UNIX)
+            self._server.bind(self._unix_path)
+            self._address: str = f"unix:{self._unix_path}"
+        else:
+            self._server = socket.socket(socket.AF_INET)
+            self._server.bind((host, 0))
+            port = self._server.getsockname()[1]
+            self._address = f"tcp:{host}:{port}"
+        self._server.listen()
+
+        # Accepted connections that are not taken by a socket yet
+        self._pending: Dict[T_StreamSocketKey, _Connection] = {}
+        self._condition: threading.Condition = threading.Condition()
+        self._closed: bool = False
+
+        self._logger: logging.Logger = get_netqasm_logger(
+            f"{self.__class__.__name__}({app_name})"
+        )
+
+        self._thread: threading.Thread = threading.Thread(
+            target=self._accept_connections, daemon=True
+        )
+        self._thread.start()
+        registry.register(app_name, self._address)
+
+    def accept(
+        self, key: T_StreamSocketKey, timeout: Optional[float] = None
+    ) -> _Connection:
+        """Wait for the remote socket of the socket with the given key to connect."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: key in self._pending, timeout):
+                app_name, remote_app_name, socket_id = key
+                raise TimeoutError(
+                    f"Timeout while connection node ID {app_name} to "
+                    f"{remote_app_name} using socket {socket_id}"
+                )
+            return self._pending.pop(key)
+
+    def close(self) -> None:
+        self._server.close()
+        self._registry.unregister(self._app_name, self._address)
+        if self._unix_path is not None and os.path.exists(self._unix_path):
+            os.remove(self._unix_path)
+        with self._condition:
+            self._closed = True
+            for connection in self._pending.values():
+                connection.close()
+            self._pending.clear()
+
+    def _accept_connections(self) -> None:
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                # The listener was closed
+                return
+            # Such that a connection that does not identify itself does not delay the
+            # connections that are accepted after it
+            threading.Thread(
+                target=self._identify_connection, args=(sock,), daemon=True
+            ).start()
+
+    def _identify_connection(self, sock: socket.socket) -> None:
+        connection = _Connection(sock)
+        try:
+            frame = connection.recv_frame(timeout=self._HELLO_TIMEOUT)
+        except ConnectionError:
+            frame = None
+        if frame is None or frame[0] != KIND_HELLO:
+            self._logger.warning("Closing connection that did not identify itself")
+            connection.close()
+            return
+        remote_app_name, app_name, socket_id = json.loads(frame[1])
+        key = (app_name, remote_app_name, socket_id)
+        self._logger.debug(f"Accepted connection for socket {key}")
+        with self._condition:
+            if self._closed:
+                connection.close()
+                return
+            self._pending[key] = connection
+            self._condition.notify_all()
+
+
+class _ConnectionPool:
+    """Per-process pool of the connections (and listeners) of StreamSockets."""
+
+    _CONNECT_SLEEP_TIME: float = 0.01
+
+    def __init__(self):
+        self._connections: Dict[T_StreamSocketKey, _Connection] = {}
+        self._listeners: Dict[Tuple[str, str], _Listener] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def get_connection(
+        self,
+        key: T_StreamSocketKey,
+        registry: _Registry,
+        family: str = "unix",
+        host: str = "127.0.0.1",
+        timeout: Optional[float] = None,
+    ) -> _Connection:
+        """Get the pooled connection of a socket, or set up a new one.
+
+        :raises TimeoutError: if the connection could not be set up within `timeout`
+        """
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is not None:
+                if not connection.closed:
+                    return connection
+                # The remote socket went away, for example since the remote
+                # application was started again, so set up a new connection
+                connection.close()
+                del self._connections[key]
+
+        app_name, remote_app_name, _ = key
+        if app_name < remote_app_name:
+            connection = self._connect(key, registry, timeout=timeout)
+        else:
+            listener = self._get_listener(app_name, registry, family, host)
+            connection = listener.accept(key, timeout=timeout)
+
+        with self._lock:
+            self._connections[key] = connection
+        return connection
+
+    def close(self) -> None:
+        """Close all connections and listeners."""
+        with self._lock:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+            for listener in self._listeners.values():
+                listener.close()
+            self._listeners.clear()
+
+    def _get_listener(
+        self, app_name: str, registry: _Registry, family: str, host: str
+    ) -> _Listener:
+        with self._lock:
+            listener = self._listeners.get((registry.directory, app_name))
+            if listener is None:
+                listener = _Listener(app_name, registry, family=family, host=host)
+                self._listeners[(registry.directory, app_name)] = listener
+            return listener
+
+    def _connect(
+        self,
+        key: T_StreamSocketKey,
+        registry: _Registry,
+        timeout: Optional[float] = None,
+    ) -> _Connection:
+        app_name, remote_app_name, socket_id = key
+        t_start = time.monotonic()
+        while True:
+            address = registry.lookup(remote_app_name)
+            if address is not None:
+                try:
+                    sock = _open_socket(address)
+                except OSError:
+                    # The listener is not up (anymore), and may be replaced
+                    pass
+                else:
+                    connection = _Connection(sock)
+                    connection.send_frames([(KIND_HELLO, json.dumps(list(key)))])
+                    return connection
+            if timeout is not None and time.monotonic() - t_start > timeout:
+                raise TimeoutError(
+                    f"Timeout while connection node ID {app_name} to "
+                    f"{remote_app_name} using socket {socket_id}"
+                )
+            time.sleep(self._CONNECT_SLEEP_TIME)
+
+
+def _open_socket(address: str) -> socket.socket:
+    family, _, location = address.partition(":")
+    if family == "unix":
+        sock = socket.socket(socket.AF_UNIX)
+        try:
+            sock.connect(location)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    host, _, port = location.rpartition(":")
+    return socket.create_connection((host, int(port)))
+
+
+_connection_pool: _ConnectionPool = _ConnectionPool()
+atexit.register(_connection_pool.close)
+
+
+def reset_connection_pool() -> None:
+    """Close all pooled connections and listeners of this process."""
+    _connection_pool.close()
@@ -0,0 +1,308 @@
+"""Classical socket implementation over TCP or Unix-domain sockets.
+
+This module contains the StreamSocket class, which is an implementation of the Socket
+interface that can be used by Hosts that run in separate processes, on the same or
+on different machines.
+"""
+
+from __future__ import annotations
+
+import socket
+from typing import TYPE_CHECKING, List, Optional
+
+from netqasm.logging.glob import get_netqasm_logger
+from netqasm.logging.output import ClassCommLogger
+from netqasm.sdk.classical_communication.codec import Codec, JsonCodec, PassthroughCodec
+from netqasm.sdk.classical_communication.message import StructuredMessage
+from netqasm.sdk.config import LogConfig
+from netqasm.util.log import LineTracker
+
+from ..socket import Socket
+from ..thread_socket.socket import (
+    ThreadSocket,
+    log_recv,
+    log_recv_many,
+    log_recv_structured,
+    log_send,
+    log_send_many,
+    log_send_structured,
+)
+from .connection import (
+    KIND_STR,
+    KIND_STRUCTURED_BYTES,
+    KIND_STRUCTURED_STR,
+    T_Frame,
+    _Connection,
+)
+from .registry import (
+    T_StreamSocketKey,
+    _connection_pool,
+    _ConnectionPool,
+    _Registry,
+    get_default_registry_dir,
+)
+
+if TYPE_CHECKING:
+    import logging
+
+
+class StreamSocket(Socket):
+    """Classical socket implementation over TCP or Unix-domain sockets.
+
+    This implementation can be used when the Hosts run in separate processes. The
+    sockets of two Hosts find each other through a registry directory, which
+    defaults to the `NETQASM_SOCKET_REGISTRY` environment variable (or a directory
+    in the temporary directory of the system), see :mod:`.registry`.
+
+    Messages are sent as length-prefixed frames, so message boundaries are always
+    preserved. Connections are pooled per process, such that creating a socket with
+    the same key (app name, remote app name and socket ID) again reuses the
+    connection of the previous one.
+
+    Structured messages are encoded by the codec of the socket, which must not be a
+    :class:`~.PassthroughCodec`, since objects can not be passed between processes.
+    """
+
+    _CONNECTION_POOL: _ConnectionPool = _connection_pool
+
+    def __init__(
+        self,
+        app_name: str,
+        remote_app_name: str,
+        socket_id: int = 0,
+        timeout: Optional[float] = None,
+        use_callbacks: bool = False,
+        log_config: Optional[LogConfig] = None,
+        codec: Optional[Codec] = None,
+        family: str = "unix",
+        host: str = "127.0.0.1",
+        registry_dir: Optional[str] = None,
+    ):
+        """StreamSocket constructor.
+
+        :param app_name: application/Host name of this socket's owner
+        :param remote_app_name: remote application/Host name
+        :param socket_id: local ID to use for this socket
+        :param timeout: maximum amount of real time to try to connect to the remote
+            socket
+        :param use_callbacks: not supported by this implementation
+        :param log_config: logging configuration for this socket
+        :param codec: codec of structured messages, which should be the same as the
+            one of the remote socket. Defaults to a :class:`~.JsonCodec`.
+        :param family: "unix" to listen on a Unix-domain socket or "tcp" to listen
+            on a TCP port, if this socket accepts the connection
+        :param host: host to listen on if `family` is "tcp"
+        :param registry_dir: directory of the rendezvous registry. Defaults to the
+            `NETQASM_SOCKET_REGISTRY` environment variable, or `netqasm_sockets` in the
+            temporary directory, in a subdirectory named by the
+            `NETQASM_SOCKET_NAMESPACE` environment variable if it is set.
+        """
+        self._app_name: str = app_name
+        self._remote_app_name: str = remote_app_name
+        self._id: int = socket_id
+        if app_name == remote_app_name:
+            raise ValueError(
+                f"Cannot connect to itself app_name {app_name} = remote_app_name {remote_app_name}"
+            )
+        if use_callbacks:
+            raise ValueError("StreamSocket does not support callbacks")
+        if family not in ("unix", "tcp"):
+            raise ValueError(f"Unknown socket family {family}, use 'unix' or 'tcp'")
+        if family == "unix" and not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix-domain sockets are not supported on this platform")
+
+        self._codec: Codec = JsonCodec() if codec is None else codec
+        if isinstance(self._codec, PassthroughCodec):
+            raise ValueError("StreamSocket can not use a PassthroughCodec")
+
+        if log_config is None:
+            log_config = LogConfig()
+
+        self._line_tracker: LineTracker = LineTracker(log_config=log_config)
+
+        self._logger: logging.Logger = get_netqasm_logger(
+            f"{self.__class__.__name__}{self.key}"
+        )
+
+        # Classical communication logger, shared with ThreadSockets of the same app
+        self._comm_logger: Optional[ClassCommLogger]
+        if log_config.comm_log_dir is None:
+            self._comm_logger = None
+        else:
+            self._comm_logger = ThreadSocket.get_comm_logger(
+                app_name=self.app_name,
+                comm_log_dir=log_config.comm_log_dir,
+            )
+
+        if registry_dir is None:
+            registry_dir = get_default_registry_dir()
+        self._logger.debug("Setting up connection")
+        self._connection: _Connection = self._CONNECTION_POOL.get_connection(
+            self.key,
+            registry=_Registry(registry_dir),
+            family=family,
+            host=host,
+            timeout=timeout,
+        )
+
+    @property
+    def app_name(self) -> str:
+        return self._app_name
+
+    @property
+    def remote_app_name(self) -> str:
+        return self._remote_app_name
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def key(self) -> T_StreamSocketKey:
+        return self.app_name, self.remote_app_name, self.id
+
+    @property
+    def codec(self) -> Codec:
+        return self._codec
+
+    @property
+    def connected(self) -> bool:
+        return not self._connection.closed
+
+    @log_send
+    def send(self, msg: str) -> None:
+        """Sends a message to the remote node.
+
+        :param msg: message to be sent
+        :raises ConnectionError: if the connection is closed
+        """
+        self.send_silent(msg)
+
+    @log_recv
+    def recv(
+        self,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        maxsize: Optional[int] = None,
+    ) -> str:
+        """Receive a message from the remote node.
+
+        :param block: whether to wait for an available message
+        :param timeout: optionally use a timeout for trying to recv a message. Only
+            used if `block=True`.
+        :param maxsize: how many bytes to maximally receive (not used here)
+        :return: the message received
+        :raises RuntimeError: if `block=False` and there is no available message
+        :raises TimeoutError: if no message was received within `timeout` seconds
+        """
+        return self.recv_silent(block=block, timeout=timeout)
+
+    @log_send_many
+    def send_many(self, msgs: List[str]) -> None:
+        """Sends multiple messages to the remote node with a single system call.
+
+        Messages can be received both with :meth:`recv_many` and one by one with
+        :meth:`recv`.
+        """
+        for msg in msgs:
+            if not isinstance(msg, str):
+                raise TypeError(f"Messages needs to be a string, not {type(msg)}")
+        self._send_frames([(KIND_STR, msg) for msg in msgs])
+
+    @log_recv_many
+    def recv_many(
+        self,
+        max_n: Optional[int] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        """Receive multiple messages from the remote node at once.
+
+        Returns all messages that have been received, but at most `max_n`. If there
+        are none and `block` is True, this waits until at least one message arrives.
+        """
+        if max_n is not None and max_n < 1:
+            raise ValueError(f"max_n must be at least 1, not {max_n}")
+        msgs = [self.recv_silent(block=block, timeout=timeout)]
+        # Stop at a structured message, which should be received by `recv_structured`
+        while (
+            max_n is None or len(msgs) < max_n
+        ) and self._connection.next_kind() == KIND_STR:
+            msgs.append(self.recv_silent(block=False))
+        return msgs
+
+    @log_send_structured
+    def send_structured(self, msg: StructuredMessage) -> None:
+        """Sends a structured message (with header and payload) to the remote node.
+
+        The message is encoded by the codec of this socket.
+        """
+        raw_msg = self._codec.encode(msg)
+        kind = (
+            KIND_STRUCTURED_STR if isinstance(raw_msg, str) else KIND_STRUCTURED_BYTES
+        )
+        self._send_frames([(kind, raw_msg)])
+
+    @log_recv_structured
+    def recv_structured(
+        self,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        maxsize: Optional[int] = None,
+    ) -> StructuredMessage:
+        """Receive a structured message (with header and payload) from the remote node.
+
+        The message is decoded by the codec of this socket.
+        """
+        kind, raw_msg = self._peek_frame(block=block, timeout=timeout)
+        if kind not in (KIND_STRUCTURED_STR, KIND_STRUCTURED_BYTES):
+            # The message is left to be received by `recv`
+            raise RuntimeError(
+                f"Received a plain message on socket {self.key} instead of a "
+                f"structured message"
+            )
+        self._connection.recv_frame(block=False)
+        return self._codec.decode(raw_msg)
+
+    def send_silent(self, msg: str) -> None:
+        """Sends a message without logging"""
+        if not isinstance(msg, str):
+            raise TypeError(f"Messages needs to be a string, not {type(msg)}")
+        self._send_frames([(KIND_STR, msg)])
+
+    def recv_silent(
+        self,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        maxsize: Optional[int] = None,
+    ) -> str:
+        """Receive a message without logging"""
+        kind, msg = self._peek_frame(block=block, timeout=timeout)
+        if kind != KIND_STR or not isinstance(msg, str):
+            # The message is left to be received by `recv_structured`
+            raise RuntimeError(
+                f"Received a structured message on socket {self.key} instead of str"
+            )
+        self._connection.recv_frame(block=False)
+        return msg
+
+    def _send_frames(self, frames: List[T_Frame]) -> None:
+        if not self.connected:
+            raise ConnectionError("Socket is not connected so cannot send")
+        try:
+            self._connection.send_frames(frames)
+        except OSError as error:
+            raise ConnectionError(f"Connection lost: {error}") from error
+
+    def _peek_frame(
+        self, block: bool = True, timeout: Optional[float] = None
+    ) -> T_Frame:
+        """Get the next frame, without receiving it."""
+        frame = self._connection.recv_frame(block=block, timeout=timeout, peek=True)
+        if frame is None:
+            if not block:
+                raise RuntimeError(f"No message to receive on socket {self.key}")
+            raise TimeoutError(
+                f"Timeout while trying to receive message for socket {self.key}"
+            )
+        return frame
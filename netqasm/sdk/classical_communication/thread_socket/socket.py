@@ -6,12 +6,13 @@ interface that can be used by Hosts that run in a multi-thread simulation.
 
 from __future__ import annotations
 
-import json
 import os
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from netqasm.logging.glob import get_netqasm_logger
 from netqasm.logging.output import ClassCommLogger, SocketOperation
+from netqasm.logging.trace import get_tracer
+from netqasm.sdk.classical_communication.codec import Codec, JsonCodec
 from netqasm.sdk.classical_communication.message import StructuredMessage
 from netqasm.sdk.config import LogConfig
 from netqasm.util.log import LineTracker
@@ -61,6 +62,39 @@ def log_send(method):
     return new_method
 
 
+def log_send_many(method):
+    def new_method(self, msgs: List[str]) -> None:
+        if self._comm_logger is not None:
+            hln = None
+            hfl = None
+            if self._line_tracker is not None:
+                hostline = self._line_tracker.get_line()
+                if hostline is not None:
+                    hln = hostline.lineno
+                    hfl = hostline.filename
+
+            # A single record for the whole batch
+            trimmed_msgs = [trim_msg(msg) for msg in msgs]
+            log = (
+                f"Send {len(msgs)} classical messages to {self.remote_app_name}: "
+                f"{trimmed_msgs}"
+            )
+            self._comm_logger.log(
+                socket_op=SocketOperation.SEND,
+                msg=str(trimmed_msgs),
+                sender=self._app_name,
+                receiver=self._remote_app_name,
+                socket_id=self._id,
+                hln=hln,
+                hfl=hfl,
+                log=log,
+            )
+
+        method(self, msgs)
+
+    return new_method
+
+
 def log_send_structured(method):
     def new_method(self, msg: StructuredMessage):
         hln = None
@@ -71,11 +105,9 @@ def log_send_structured(method):
                 hln = hostline.lineno
                 hfl = hostline.filename
 
-        logged_msg = f"{msg.header}: {msg.payload}"
-        raw_msg = json.dumps(msg.__dict__)
-
         if self._comm_logger is not None:
-            log = f"Send classical message to {self.remote_app_name}: {raw_msg}"
+            logged_msg = f"{msg.header}: {msg.payload}"
+            log = f"Send classical message to {self.remote_app_name}: {msg}"
             self._comm_logger.log(
                 socket_op=SocketOperation.SEND,
                 msg=logged_msg,
@@ -87,7 +119,7 @@ def log_send_structured(method):
                 log=log,
             )
 
-        method(self, raw_msg)
+        method(self, msg)
 
     return new_method
 
@@ -136,6 +168,54 @@ def log_recv(method):
     return new_method
 
 
+def log_recv_many(method):
+    def new_method(self, *args, **kwargs):
+        hln = None
+        hfl = None
+        if self._comm_logger is not None:
+            if self._line_tracker is not None:
+                hostline = self._line_tracker.get_line()
+                if hostline is not None:
+                    hln = hostline.lineno
+                    hfl = hostline.filename
+
+            log = f"Waiting for classical messages from {self.remote_app_name}..."
+            self._comm_logger.log(
+                socket_op=SocketOperation.WAIT_RECV,
+                msg=None,
+                sender=self._remote_app_name,
+                receiver=self._app_name,
+                socket_id=self._id,
+                hln=hln,
+                hfl=hfl,
+                log=log,
+            )
+
+        msgs = method(self, *args, **kwargs)
+
+        if self._comm_logger is not None:
+            # A single record for the whole batch
+            trimmed_msgs = [trim_msg(msg) for msg in msgs]
+            log = (
+                f"{len(msgs)} messages received from {self.remote_app_name}: "
+                f"{trimmed_msgs}"
+            )
+            self._comm_logger.log(
+                socket_op=SocketOperation.RECV,
+                msg=str(trimmed_msgs),
+                sender=self._remote_app_name,
+                receiver=self._app_name,
+                socket_id=self._id,
+                hln=hln,
+                hfl=hfl,
+                log=log,
+            )
+
+        return msgs
+
+    return new_method
+
+
 def log_recv_structured(method):
     def new_method(self, *args, **kwargs):
         hln = None
@@ -159,12 +239,10 @@ def log_recv_structured(method):
                 log=log,
             )
 
-        raw_msg = method(self, *args, **kwargs)
-        msg_dict = json.loads(raw_msg)
-        msg = StructuredMessage(header=msg_dict["header"], payload=msg_dict["payload"])
-        logged_msg = f"{msg.header}: {msg.payload}"
+        msg = method(self, *args, **kwargs)
 
         if self._comm_logger is not None:
+            logged_msg = f"{msg.header}: {msg.payload}"
             log = f"Message received from {self.remote_app_name}: {msg}"
             self._comm_logger.log(
                 socket_op=SocketOperation.RECV,
@@ -182,6 +260,48 @@ def log_recv_structured(method):
     return new_method
 
 
+def trace_send(method):
+    """Add the sent message(s) to the trace, if tracing is enabled."""
+
+    def new_method(self, msg):
+        tracer = get_tracer()
+        if tracer is None:
+            return method(self, msg)
+        num_messages = len(msg) if isinstance(msg, list) else 1
+        start = tracer.timestamp()
+        flow_ids = tracer.new_flows(channel=self.key, num_messages=num_messages)
+        method(self, msg)
+        tracer.message_sent(
+            channel=self.key,
+            start=start,
+            flow_ids=flow_ids,
+            args={"receiver": self.remote_app_name, "socket_id": self.id},
+        )
+
+    return new_method
+
+
+def trace_recv(method):
+    """Add the received message(s) to the trace, if tracing is enabled."""
+
+    def new_method(self, *args, **kwargs):
+        tracer = get_tracer()
+        if tracer is None:
+            return method(self, *args, **kwargs)
+        start = tracer.timestamp()
+        output = method(self, *args, **kwargs)
+        num_messages = len(output) if isinstance(output, list) else 1
+        tracer.message_received(
+            channel=self.remote_key,
+            start=start,
+            num_messages=num_messages,
+            args={"sender": self.remote_app_name, "socket_id": self.id},
+        )
+        return output
+
+    return new_method
+
+
 class ThreadSocket(Socket):
     """Classical socket implementation for multi-threaded simulations.
 
@@ -205,6 +325,7 @@ class ThreadSocket(Socket):
         timeout: Optional[float] = None,
         use_callbacks: bool = False,
         log_config: Optional[LogConfig] = None,
+        codec: Optional[Codec] = None,
     ):
         """ThreadSocket constructor.
 
@@ -216,6 +337,8 @@ class ThreadSocket(Socket):
         :param use_callbacks: whether to call the `recv_callback` method upon receiving
             a message
         :param log_config: logging configuration for this socket
+        :param codec: codec of structured messages, which should be the same as the
+            one of the remote socket. Defaults to a :class:`~.JsonCodec`.
         """
         self._app_name: str = app_name
         self._remote_app_name: str = remote_app_name
@@ -234,6 +357,8 @@ class ThreadSocket(Socket):
         # Use callbacks
         self._use_callbacks: bool = use_callbacks
 
+        self._codec: Codec = JsonCodec() if codec is None else codec
+
         # Received messages
         # TODO: remove?
         self._received_messages: List[str] = []
@@ -306,6 +431,11 @@ class ThreadSocket(Socket):
     def use_callbacks(self, value: bool) -> None:
         self._use_callbacks = value
 
+    @property
+    def codec(self) -> Codec:
+        return self._codec
+
+    @trace_send
     @log_send
     def send(self, msg: str) -> None:
         """Sends a message to the remote node.
@@ -327,6 +457,7 @@ class ThreadSocket(Socket):
 
         self._SOCKET_HUB.send(self, msg)
 
+    @trace_recv
     @log_recv
     def recv(
         self,
@@ -359,18 +490,75 @@ class ThreadSocket(Socket):
             If `block=False` and there is no available message
         """
         # TODO use maxsize?
-        msg = self._SOCKET_HUB.recv(self, block=block, timeout=timeout)
-        if not isinstance(msg, str):
-            raise RuntimeError(f"Received message of type {type(msg)} instead of str")
+        msg = self._SOCKET_HUB.recv(self, block=block, timeout=timeout, kind=str)
+        assert isinstance(msg, str)
         return msg
 
+    @trace_send
+    @log_send_many
+    def send_many(self, msgs: List[str]) -> None:
+        """Sends multiple messages to the remote node at once.
+
+        The messages are added to the messages of the remote socket with a single
+        lock acquisition, and as a single record in the classical communication log.
+        Since the messages are kept apart, they can be received both with
+        :meth:`recv_many` and one by one with :meth:`recv`.
+
+        :param msgs: messages to be sent
+        :raises ConnectionError: if the remote connection is unresponsive
+        """
+        for msg in msgs:
+            if not isinstance(msg, str):
+                raise TypeError(f"Messages needs to be a string, not {type(msg)}")
+        if not self.connected:
+            raise ConnectionError("Socket is not connected so cannot send")
+
+        self._SOCKET_HUB.send_many(self, msgs)
+
+    @trace_recv
+    @log_recv_many
+    def recv_many(
+        self,
+        max_n: Optional[int] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        """Receive multiple messages from the remote node at once.
+
+        Returns all messages that have been received, but at most `max_n`. If there
+        are none and `block` is True, this waits until at least one message arrives.
+        Messages are returned in the order in which they were sent.
+
+        :param max_n: maximum number of messages to return. If None, all available
+            messages are returned.
+        :param block: whether to wait for an available message
+        :param timeout: optionally use a timeout for trying to receive messages. Only
+            used if `block=True`.
+        :return: the messages received. Stops at a structured message, which is left
+            to be received by :meth:`recv_structured`.
+        :raises RuntimeError: if `block=False` and there is no available message, or
+            if the next message is a structured message
+        """
+        if max_n is not None and max_n < 1:
+            raise ValueError(f"max_n must be at least 1, not {max_n}")
+        msgs = self._SOCKET_HUB.recv_many(
+            self, max_n=max_n, block=block, timeout=timeout, kind=str
+        )
+        return msgs  # type: ignore
+
+    @trace_send
     @log_send_structured
     def send_structured(self, msg: StructuredMessage) -> None:
+        """Sends a structured message (with header and payload) to the remote node.
+
+        The message is encoded by the codec of this socket.
+        """
         if not self.connected:
             raise ConnectionError("Socket is not connected so cannot send")
 
-        self._SOCKET_HUB.send(self, msg)
+        self._SOCKET_HUB.send(self, self._codec.encode(msg))
 
+    @trace_recv
     @log_recv_structured
     def recv_structured(
         self,
@@ -378,12 +566,13 @@ class ThreadSocket(Socket):
         timeout: Optional[float] = None,
         maxsize: Optional[int] = None,
     ) -> StructuredMessage:
+        """Receive a structured message (with header and payload) from the remote node.
+
+        The message is decoded by the codec of this socket.
+        """
         # TODO use maxsize?
-        msg = self._SOCKET_HUB.recv(self, block=block, timeout=timeout)
-        # if not isinstance(msg, StructuredMessage):
-        #     raise RuntimeError(f"Received message of type {type(msg)} instead of StructuredMessage")
-        # TODO fix return value type hints
-        return msg  # type: ignore
+        raw_msg = self._SOCKET_HUB.recv(self, block=block, timeout=timeout)
+        return self._codec.decode(raw_msg)
 
     def wait(self) -> None:
         """Waits until the connection gets lost"""
@@ -407,9 +596,8 @@ class ThreadSocket(Socket):
         maxsize: Optional[int] = None,
     ) -> str:
         """Receive a message without logging"""
-        msg = self._SOCKET_HUB.recv(self, block=block, timeout=timeout)
-        if not isinstance(msg, str):
-            raise RuntimeError(f"Received message of type {type(msg)} instead of str")
+        msg = self._SOCKET_HUB.recv(self, block=block, timeout=timeout, kind=str)
+        assert isinstance(msg, str)
         return msg
 
 
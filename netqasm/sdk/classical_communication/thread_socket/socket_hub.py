@@ -10,7 +10,7 @@ from collections import defaultdict
 from threading import Lock
 from time import sleep
 from timeit import default_timer as timer
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Union
 from weakref import WeakMethod
 
 from netqasm.logging.glob import get_netqasm_logger
@@ -42,7 +42,7 @@ class _SocketHub:
 
         self._messages: Dict[
             thread_socket.socket.T_ThreadSocketKey,
-            List[Union[str, message.StructuredMessage]],
+            List[Union[str, bytes, message.StructuredMessage]],
         ] = defaultdict(list)
         self._recv_callbacks: Dict[
             thread_socket.socket.T_ThreadSocketKey, WeakMethod
@@ -129,13 +129,16 @@ class _SocketHub:
     def send(
         self,
         socket: thread_socket.ThreadSocket,
-        msg: Union[str, message.StructuredMessage],
+        msg: Union[str, bytes, message.StructuredMessage],
     ) -> None:
         """Send a message using a given socket"""
         recv_callback = self._recv_callbacks.get(socket.remote_key)
         if recv_callback is not None:
+            # Let the logger format messages, which may be large, only if needed
             self._logger.debug(
-                f"Message {msg} sent on socket {socket.key}, calling callback for recv"
+                "Message %s sent on socket %s, calling callback for recv",
+                msg,
+                socket.key,
             )
             method = recv_callback()
             # This is a WeakMethod so check if it exists
@@ -148,18 +151,86 @@ class _SocketHub:
                 method(msg)
         else:
             self._logger.debug(
-                f"Message {msg} sent on socket {socket.key}, adding to pending received messages"
+                "Message %s sent on socket %s, adding to pending received messages",
+                msg,
+                socket.key,
             )
             with self._lock:
                 self._messages[socket.remote_key].append(msg)
 
+    def send_many(
+        self,
+        socket: thread_socket.ThreadSocket,
+        msgs: List[str],
+    ) -> None:
+        """Send multiple messages using a given socket, keeping their order"""
+        if socket.remote_key in self._recv_callbacks:
+            for msg in msgs:
+                self.send(socket, msg)
+        else:
+            self._logger.debug(
+                "%d messages sent on socket %s, adding to pending received messages",
+                len(msgs),
+                socket.key,
+            )
+            with self._lock:
+                self._messages[socket.remote_key].extend(msgs)
+
+    def recv_many(
+        self,
+        socket: thread_socket.ThreadSocket,
+        max_n: Optional[int] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+        kind: Optional[type] = None,
+    ) -> List[Union[str, bytes, message.StructuredMessage]]:
+        """Recv all (but at most `max_n`) pending messages of a given socket.
+
+        If `kind` is given, only messages of that type are received, up to the first
+        message of another type, which is left pending.
+        """
+        t_start = timer()
+        while True:
+            with self._lock:
+                messages = self._messages[socket.key]
+                num = len(messages) if max_n is None else min(max_n, len(messages))
+                if kind is not None:
+                    num = next(
+                        (i for i in range(num) if not isinstance(messages[i], kind)),
+                        num,
+                    )
+                    if num == 0 and len(messages) > 0:
+                        raise _unexpected_type_error(messages[0], kind)
+                msgs = messages[:num]
+                del messages[:num]
+            if len(msgs) > 0:
+                self._logger.debug("Got %d messages for socket %s", num, socket.key)
+                return msgs
+            if not block:
+                raise RuntimeError(f"No message to receive on socket {socket.key}")
+            if timeout is not None:
+                t_elapsed = timer() - t_start
+                if t_elapsed > timeout:
+                    raise TimeoutError(
+                        f"Timeout while trying to receive message for socket {socket.key}"
+                    )
+            self._logger.debug(
+                f"No message yet for socket {socket.key}, "
+                f"trying again in {self._RECV_SLEEP_TIME} s..."
+            )
+            sleep(self.__class__._RECV_SLEEP_TIME)
+
     def recv(
         self,
         socket: thread_socket.ThreadSocket,
         block: bool = True,
         timeout: Optional[float] = None,
-    ) -> Union[str, message.StructuredMessage]:
-        """Recv a message to a given socket"""
+        kind: Optional[type] = None,
+    ) -> Union[str, bytes, message.StructuredMessage]:
+        """Recv a message to a given socket.
+
+        If `kind` is given and the message is of another type, it is left pending.
+        """
         t_start = timer()
         while True:
             with self._lock:
@@ -169,8 +240,10 @@ class _SocketHub:
                     raise RuntimeError(f"No message to receive on socket {socket.key}")
             else:
                 with self._lock:
+                    if kind is not None and not isinstance(messages[0], kind):
+                        raise _unexpected_type_error(messages[0], kind)
                     msg = messages.pop(0)
-                self._logger.debug(f"Got message {msg} for socket {socket.key}")
+                self._logger.debug("Got message %s for socket %s", msg, socket.key)
                 return msg
             if timeout is not None:
                 t_now = timer()
@@ -186,6 +259,12 @@ class _SocketHub:
             sleep(self.__class__._RECV_SLEEP_TIME)
 
 
+def _unexpected_type_error(msg: Any, kind: type) -> RuntimeError:
+    return RuntimeError(
+        f"Received message of type {type(msg)} instead of {kind.__name__}"
+    )
+
+
 _socket_hub: _SocketHub = _SocketHub()
 
 
@@ -29,15 +29,18 @@ from netqasm.backend.messages import (
     InitNewAppMessage,
     Message,
     OpenEPRSocketMessage,
+    SetupAppMessage,
     Signal,
     SignalMessage,
     StopAppMessage,
     SubroutineMessage,
 )
 from netqasm.lang import operand
+from netqasm.lang.encoding import INTEGER_BITS
 from netqasm.lang.ir import BreakpointAction, BreakpointRole, ProtoSubroutine
 from netqasm.lang.subroutine import Subroutine
 from netqasm.logging.glob import get_netqasm_logger
+from netqasm.logging.trace import get_tracer
 from netqasm.sdk.build_types import (
     GenericHardwareConfig,
     HardwareConfig,
@@ -45,7 +48,7 @@ from netqasm.sdk.build_types import (
     T_LoopRoutine,
 )
 from netqasm.sdk.config import LogConfig
-from netqasm.sdk.futures import Array, Future, RegFuture, T_CValue
+from netqasm.sdk.futures import Array, NoValueError, T_CValue
 from netqasm.sdk.network import NetworkInfo
 from netqasm.sdk.progress_bar import ProgressBar
 from netqasm.sdk.qubit import Qubit
@@ -56,9 +59,9 @@ from netqasm.util.log import LineTracker
 from .builder import Builder, SdkLoopUntilContext
 
 # Generic type for messages sent to the quantum node controller.
-# Note that `SubroutineMessage` does not derive from `Message` so it has to be
-# mentioned explicitly.
-T_Message = Union[Message, SubroutineMessage]
+# Note that `SubroutineMessage` and `SetupAppMessage` do not derive from `Message` so
+# they have to be mentioned explicitly.
+T_Message = Union[Message, SubroutineMessage, SetupAppMessage]
 
 # Imports that are only needed for type checking
 if TYPE_CHECKING:
@@ -89,6 +92,11 @@ class BaseNetQASMConnection(abc.ABC):
     # Dict[node_name, Dict[app_id, app_name]]
     _app_names: Dict[str, Dict[int, str]] = {}
 
+    # Whether the quantum node controller that is connected to can handle a
+    # `SetupAppMessage`. If False, registering the application and opening each of its
+    # EPR sockets are separate messages, which is understood by all controllers.
+    _supports_setup_app_message: bool = False
+
     def __init__(
         self,
         app_name: str,
@@ -100,6 +108,8 @@ class BaseNetQASMConnection(abc.ABC):
         epr_sockets: Optional[List[esck.EPRSocket]] = None,
         compiler: Optional[Type[SubroutineTranspiler]] = None,
         return_arrays: bool = True,
+        auto_flush: bool = False,
+        max_instructions: Optional[int] = None,
         _init_app: bool = True,
         _setup_epr_sockets: bool = True,
     ):
@@ -150,6 +160,17 @@ class BaseNetQASMConnection(abc.ABC):
             of subroutines. A reason to set this to False could be that a quantum
             node controller does not support returning arrays back to the Host.
 
+        :param auto_flush: whether to automatically flush pending operations when
+            the current subroutine is about to exceed the limits of the quantum node
+            controller, i.e. when it runs out of measurement registers or exceeds
+            `max_instructions`. Subroutines are only cut between operations, and
+            never inside if-statements, loops or EPR operations.
+
+        :param max_instructions: maximum number of instructions in a single
+            subroutine when `auto_flush` is True. The limit is checked before
+            compilation, so compiled subroutines may be slightly larger.
+            If None, there is no limit.
+
         :param _init_app: whether to immediately send a "register application" message
             to the quantum node controller upon construction of this connection.
 
@@ -172,6 +193,10 @@ class BaseNetQASMConnection(abc.ABC):
             self._app_names[node_name] = {}
         self._app_names[node_name][self._app_id] = app_name
 
+        tracer = get_tracer()
+        if tracer is not None:
+            tracer.register_app(app_name=app_name, node_name=node_name)
+
         # Try to obtain the Shared Memory instance corresponding to this connection.
         # Depending on the runtime environment, this instance may not yet exist at
         # this moment. If this is the case, the SharedMemory instance *should*
@@ -207,6 +232,8 @@ class BaseNetQASMConnection(abc.ABC):
             hardware_config=hardware_config,
             compiler=compiler,
             return_arrays=return_arrays,
+            auto_flush=auto_flush,
+            max_instructions=max_instructions,
         )
 
         # What compiler (if any) to be used.
@@ -221,11 +248,19 @@ class BaseNetQASMConnection(abc.ABC):
             f"{self.__class__.__name__}({self.app_name})"
         )
 
-        if _init_app:
-            self._init_new_app(max_qubits=max_qubits)
+        if (
+            _init_app
+            and _setup_epr_sockets
+            and epr_sockets
+            and self._supports_setup_app_message
+        ):
+            self._setup_app(max_qubits=max_qubits, epr_sockets=epr_sockets)
+        else:
+            if _init_app:
+                self._init_new_app(max_qubits=max_qubits)
 
-        if _setup_epr_sockets:
-            self._setup_epr_sockets(epr_sockets=epr_sockets)
+            if _setup_epr_sockets:
+                self._setup_epr_sockets(epr_sockets=epr_sockets)
 
     @property
     def app_name(self) -> str:
@@ -432,6 +467,38 @@ class BaseNetQASMConnection(abc.ABC):
         """
         return self._builder._mem_mgr.get_active_qubits()
 
+    def _setup_app(self, max_qubits: int, epr_sockets: List[esck.EPRSocket]) -> None:
+        """Send a single message to the quantum node controller to register a new
+        application and open its EPR sockets.
+
+        Only used if `_supports_setup_app_message` is True. Otherwise, this is done
+        by :meth:`~._init_new_app` and :meth:`~._setup_epr_sockets`, which send a
+        message (and wait for the reply) for each of these steps.
+        """
+        open_epr_sockets = []
+        for epr_socket in epr_sockets:
+            self._bind_epr_socket(epr_socket)
+            open_epr_sockets.append(
+                OpenEPRSocketMessage(
+                    app_id=self._app_id,
+                    epr_socket_id=epr_socket.epr_socket_id,
+                    remote_node_id=epr_socket.remote_node_id,
+                    remote_epr_socket_id=epr_socket.remote_epr_socket_id,
+                    min_fidelity=epr_socket.min_fidelity,
+                )
+            )
+        self._commit_message(
+            msg=SetupAppMessage(
+                init_new_app=InitNewAppMessage(
+                    app_id=self._app_id,
+                    max_qubits=max_qubits,
+                ),
+                open_epr_sockets=open_epr_sockets,
+            )
+        )
+
+        self._wait_for_shared_memory()
+
     def _init_new_app(self, max_qubits: int) -> None:
         """Send a message to the quantum node controller to register a new application.
 
@@ -445,21 +512,27 @@ class BaseNetQASMConnection(abc.ABC):
             )
         )
 
-        # Wait until a shared memory is available.
-        # This is to be sure that we can access the shared memory at any time
-        # during the application.
-        # TODO: improve how this is handled
-        while self.shared_memory is None:
-            pass
+        self._wait_for_shared_memory()
+
+    def _wait_for_shared_memory(self) -> None:
+        """Wait until the shared memory of this application is available.
+
+        This is to be sure that we can access the shared memory at any time
+        during the application.
+        """
+        if self._shared_memory is None:
+            memory = SharedMemoryManager.wait_for_shared_memory(
+                self.node_name, key=self._app_id
+            )
+            assert memory is not None
+            self._shared_memory = memory
 
     def _setup_epr_sockets(self, epr_sockets: Optional[List[esck.EPRSocket]]) -> None:
         """Send messages to the quantum node controller to open EPR sockets."""
         if epr_sockets is None:
             return
         for epr_socket in epr_sockets:
-            if epr_socket._remote_app_name == self.app_name:
-                raise ValueError("A node cannot setup an EPR socket with itself")
-            epr_socket.conn = self
+            self._bind_epr_socket(epr_socket)
             self._setup_epr_socket(
                 epr_socket_id=epr_socket.epr_socket_id,
                 remote_node_id=epr_socket.remote_node_id,
@@ -467,6 +540,12 @@ class BaseNetQASMConnection(abc.ABC):
                 min_fidelity=epr_socket.min_fidelity,
             )
 
+    def _bind_epr_socket(self, epr_socket: esck.EPRSocket) -> None:
+        """Let an EPR socket use this connection."""
+        if epr_socket._remote_app_name == self.app_name:
+            raise ValueError("A node cannot setup an EPR socket with itself")
+        epr_socket.conn = self
+
     def _setup_epr_socket(
         self,
         epr_socket_id: int,
@@ -498,15 +577,37 @@ class BaseNetQASMConnection(abc.ABC):
         :param callback: if `block` is False, this callback is called when the quantum
             node controller sends the subroutine results.
         """
+        self._commit_pending_subroutine(block=block, callback=callback)
+
+    def _commit_pending_subroutine(
+        self, block: bool = True, callback: Optional[Callable] = None
+    ) -> bool:
+        """Compile and commit all pending operations, see `flush`.
+
+        :return: whether there were pending operations to commit
+        """
         protosubroutine = self._builder.subrt_pop_pending_subroutine()
         if protosubroutine is None:
-            return
+            return False
 
+        tracer = get_tracer()
+        if tracer is not None:
+            start = tracer.timestamp()
         self.commit_protosubroutine(
             protosubroutine=protosubroutine,
             block=block,
             callback=callback,
         )
+        if tracer is not None:
+            tracer.complete(
+                node_name=self.node_name,
+                track=f"host {self.app_name}",
+                name="flush",
+                start=start,
+                cat="host",
+                args={"app_id": self.app_id, "block": block},
+            )
+        return True
 
     def compile(self) -> Optional[Subroutine]:
         """Compile the previous SDK commands into a NetQASM subroutine.
@@ -769,69 +870,87 @@ class BaseNetQASMConnection(abc.ABC):
         preparation: Callable[[BaseNetQASMConnection], Qubit],
         iterations: int,
         progress: bool = True,
+        chunk_size: Optional[int] = None,
     ) -> Dict[str, float]:
         """
         Does a tomography on the output from the preparation specified.
         The frequencies from X, Y and Z measurements are returned as a tuple (f_X,f_Y,f_Z).
 
+        The preparation and measurement are compiled into a NetQASM loop, so the
+        preparation must be compilable to NetQASM (see `loop`). If `iterations` is
+        larger than `chunk_size`, the measurements are split over multiple subroutines,
+        which all write their outcomes to the same array.
+
         - **Arguments**
 
             :preparation:     A function that takes a NetQASMConnection as input and prepares a qubit and returns this
             :iterations:     Number of measurements in each basis.
             :progress_bar:     Displays a progress bar
+            :chunk_size:     Maximum number of measurements in a single subroutine.
+                             Defaults to the most that fit in a loop and an array.
         """
-        outcomes: Dict[str, List[Union[Future, RegFuture]]] = {
-            "X": [],
-            "Y": [],
-            "Z": [],
-        }
+        max_chunk_size = self._get_max_loop_array_length()
+        if chunk_size is None or chunk_size > max_chunk_size:
+            chunk_size = max_chunk_size
+
         if progress:
             bar = ProgressBar(3 * iterations)
 
-        # Measure in X
-        for _ in range(iterations):
-            # Progress bar
-            if progress:
-                bar.increase()
+        outcomes = self.new_array(min(chunk_size, iterations))
+        counts: Dict[str, int] = {}
+        for basis in ["X", "Y", "Z"]:
+            counts[basis] = 0
+            for start in range(0, iterations, chunk_size):
+                num = min(chunk_size, iterations - start)
+                self._measure_preparation(preparation, basis, num, outcomes)
+
+                # Progress bar
+                if progress:
+                    bar.increase(num)
+
+                values = outcomes.to_numpy()[:num]
+                if values.mask.any():
+                    raise NoValueError(
+                        f"Not all {num} outcomes of the measurements in the {basis} "
+                        "basis were returned"
+                    )
+                counts[basis] += int(values.sum())
 
-            # prepare and measure
-            q = preparation(self)
-            q.H()
-            m = q.measure()
-            outcomes["X"].append(m)
+        if progress:
+            bar.close()
+            del bar
 
-        # Measure in Y
-        for _ in range(iterations):
-            # Progress bar
-            if progress:
-                bar.increase()
+        freqs = {key: value / iterations for key, value in counts.items()}
+        return freqs
 
-            # prepare and measure
-            q = preparation(self)
-            q.K()
-            m = q.measure()
-            outcomes["Y"].append(m)
+    def _get_max_loop_array_length(self) -> int:
+        """Maximum number of iterations of a loop that writes to an array entry per
+        iteration, limited by the size of integers in `set` instructions and by the shared memory."""
+        max_iterations: int = (1 << (INTEGER_BITS - 1)) - 1
+        return min(max_iterations, self.shared_memory.max_array_length)
 
-        # Measure in Z
-        for _ in range(iterations):
-            # Progress bar
-            if progress:
-                bar.increase()
+    def _measure_preparation(
+        self,
+        preparation: Callable[[BaseNetQASMConnection], Qubit],
+        basis: str,
+        num: int,
+        outcomes: Array,
+    ) -> None:
+        """Prepare and measure a qubit `num` times in a loop, and flush.
 
-            # prepare and measure
+        The outcomes are written to the first `num` entries of `outcomes`, which is
+        re-initialized if it was allocated for an earlier subroutine.
+        """
+        self._builder.reuse_array(outcomes)
+        with self.loop(num) as i:
             q = preparation(self)
-            m = q.measure()
-            outcomes["Z"].append(m)
-
-        if progress:
-            bar.close()
-            del bar
-
+            if basis == "X":
+                q.H()
+            elif basis == "Y":
+                q.K()
+            q.measure(future=outcomes.get_future_index(i))
         self.flush()
 
-        freqs = {key: sum(value) / iterations for key, value in outcomes.items()}
-        return freqs
-
     def test_preparation(
         self,
         preparation: Callable[[BaseNetQASMConnection], Qubit],
@@ -839,6 +958,7 @@ class BaseNetQASMConnection(abc.ABC):
         conf: float = 2,
         iterations: int = 100,
         progress: bool = True,
+        chunk_size: Optional[int] = None,
     ) -> bool:
         """Test the preparation of a qubit.
         Returns True if the expected values are inside the confidence interval produced from the data received from
@@ -851,10 +971,13 @@ class BaseNetQASMConnection(abc.ABC):
             :conf:         Determines the confidence region (+/- conf/sqrt(iterations) )
             :iterations:     Number of measurements in each basis.
             :progress_bar:     Displays a progress bar
+            :chunk_size:     Maximum number of measurements in a single subroutine.
         """
         epsilon = conf / math.sqrt(iterations)
 
-        freqs = self.tomography(preparation, iterations, progress=progress)
+        freqs = self.tomography(
+            preparation, iterations, progress=progress, chunk_size=chunk_size
+        )
         for basis, exp_value in zip(["X", "Y", "Z"], exp_values):
             f = freqs[basis]
             if abs(f - exp_value) > epsilon:
@@ -886,11 +1009,18 @@ class DebugConnection(BaseNetQASMConnection):
     def shared_memory(self) -> SharedMemory:
         return SharedMemory()
 
+    def _wait_for_shared_memory(self) -> None:
+        # Nothing is executed, so no shared memory is created
+        pass
+
     def _commit_serialized_message(
         self, raw_msg: bytes, block: bool = True, callback: Optional[Callable] = None
     ) -> None:
         """Commit a message to the backend/qnodeos"""
         self.storage.append(raw_msg)
+        # Nothing is executed, so there are no results to wait for
+        if not block and callback is not None:
+            callback()
 
     def _get_network_info(self) -> Type[NetworkInfo]:
         return DebugNetworkInfo
@@ -7,7 +7,8 @@ This module contains the `BaseFuture` class and its subclasses.
 from __future__ import annotations
 
 import abc
-from typing import TYPE_CHECKING, List, Optional, Union
+import asyncio
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 from netqasm.lang import operand
 from netqasm.lang.ir import GenericInstr, ICmd, Symbols
@@ -17,6 +18,8 @@ from netqasm.typedefs import T_Cmd
 from netqasm.util.log import HostLine
 
 if TYPE_CHECKING:
+    import numpy as np
+
     from netqasm.lang import ir
     from netqasm.sdk import connection as sdkconn
     from netqasm.sdk.builder import Builder, SdkForEachContext, SdkIfContext
@@ -172,6 +175,75 @@ class BaseFuture(int):
     def _try_get_value(self) -> Optional[int]:
         raise NotImplementedError
 
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Block until the value of this Future is available.
+
+        Waits for the quantum node controller to write the value to the shared
+        memory, without polling. Can be used to wait for the result of a subroutine
+        that was flushed without blocking.
+
+        :param timeout: maximum number of seconds to wait. If None, wait indefinitely.
+        :return: the value, or None if the timeout expired
+        """
+        if self._value is not None:
+            return self._value
+        value = self._wait_for_value(timeout)
+        if value is not None:
+            self._set_value(value)
+        return value
+
+    def _wait_for_value(self, timeout: Optional[float]) -> Optional[int]:
+        raise NotImplementedError(
+            f"wait is not implemented for {self.__class__.__name__}"
+        )
+
+    def _set_value(self, value: int) -> None:
+        self._value = value
+
+    def __await__(self):
+        return self.wait_async().__await__()
+
+    async def wait_async(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Wait until the value of this Future is available, as a coroutine.
+
+        The same as :meth:`wait`, but only suspends the current asyncio task instead
+        of blocking the thread. Awaiting the Future itself (`await future`) is the
+        same as awaiting this method without a timeout.
+
+        :param timeout: maximum number of seconds to wait. If None, wait indefinitely.
+        :return: the value, or None if the timeout expired
+        """
+        if self._value is not None:
+            return self._value
+
+        loop = asyncio.get_running_loop()
+        written = asyncio.Event()
+
+        def on_write() -> None:
+            loop.call_soon_threadsafe(written.set)
+
+        shared_memory = self._connection.shared_memory
+        shared_memory.add_write_listener(on_write)
+        try:
+            value = await asyncio.wait_for(
+                self._wait_async_for_value(written), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            shared_memory.remove_write_listener(on_write)
+        self._set_value(value)
+        return value
+
+    async def _wait_async_for_value(self, written: asyncio.Event) -> int:
+        while True:
+            # Clear before checking, such that a write after the check is not missed
+            written.clear()
+            value = self._try_get_value()
+            if value is not None:
+                return value
+            await written.wait()
+
     def add(
         self,
         other: Union[int, str, operand.Register, BaseFuture],
@@ -251,6 +323,8 @@ class Future(BaseFuture):
         super().__init__(connection=connection)
         self._address: int = address
         self._index: Union[int, Future, operand.Register, RegFuture] = index
+        # Cache of the array that hands out this Future, while it is unresolved
+        self._cache: Optional[Dict[int, Future]] = None
 
     def __str__(self) -> str:
         value = self.value
@@ -274,9 +348,25 @@ class Future(BaseFuture):
                 f"Something went wrong: future value {value} is not an int or None"
             )
         if value is not None:
-            self._value = value
+            self._set_value(value)
         return value
 
+    def _set_value(self, value: int) -> None:
+        super()._set_value(value)
+        if self._cache is not None:
+            # A resolved Future keeps its value, so it is not handed out again in
+            # case the array is overwritten by a later subroutine
+            assert isinstance(self._index, int)
+            del self._cache[self._index]
+            self._cache = None
+
+    def _wait_for_value(self, timeout: Optional[float]) -> Optional[int]:
+        if not isinstance(self._index, int):
+            raise NonConstantIndexError("index is not constant and cannot be resolved")
+        return self._connection.shared_memory.wait_for_array_part(
+            address=self._address, index=self._index, timeout=timeout
+        )
+
     def add(
         self,
         other: Union[int, str, operand.Register, BaseFuture],
@@ -367,7 +457,7 @@ class Future(BaseFuture):
             assert (
                 self._index.reg is not None
             ), "Trying to use RegFuture that has no value yet"
-            index = self._index.reg
+            index = self.builder._get_reg_future_operand(self._index)
         elif isinstance(self._index, int) or isinstance(self._index, operand.Register):
             index = self._index
         else:
@@ -395,7 +485,8 @@ class Future(BaseFuture):
                 f"cannot use RegFuture {self._index} as array index since "
                 f"it does not yet have a value"
             )
-            return ArrayEntry(Address(self._address), self._index.reg)
+            index = self.builder._get_reg_future_operand(self._index)
+            return ArrayEntry(Address(self._address), index)
         elif isinstance(self._index, int) or isinstance(self._index, operand.Register):
             return ArrayEntry(Address(self._address), self._index)
         else:
@@ -449,9 +540,15 @@ class RegFuture(BaseFuture):
         except KeyError:
             return None
         if value is not None:
-            self._value = value
+            self._set_value(value)
         return value
 
+    def _wait_for_value(self, timeout: Optional[float]) -> Optional[int]:
+        assert self.reg is not None
+        return self._connection.shared_memory.wait_for_register(
+            self.reg, timeout=timeout
+        )
+
     def add(
         self,
         other: Union[int, str, operand.Register, BaseFuture],
@@ -519,6 +616,17 @@ class Array:
     Elements or slices of the array can be captured as Futures.
     """
 
+    __slots__ = (
+        "_connection",
+        "_length",
+        "_address",
+        "_init_values",
+        "_lineno",
+        "_futures",
+        # Such that the Builder can tell whether the Host still holds the array
+        "__weakref__",
+    )
+
     def __init__(
         self,
         connection: sdkconn.BaseNetQASMConnection,
@@ -545,6 +653,9 @@ class Array:
         self._address: int = address
         self._init_values: Optional[List[Optional[int]]] = init_values
         self._lineno: Optional[HostLine] = lineno
+        # Unresolved Futures for constant indices, created lazily by
+        # `get_future_index`
+        self._futures: Optional[Dict[int, Future]] = None
 
     @property
     def lineno(self) -> Optional[HostLine]:
@@ -569,17 +680,53 @@ class Array:
     def builder(self) -> Builder:
         return self._connection.builder
 
+    def get_values(self) -> List[Optional[int]]:
+        """Get all values of the array at once.
+
+        Undefined values are `None`. Only gives the actual values after the
+        subroutine that returns this array has been flushed.
+        """
+        values = self[:]
+        assert isinstance(values, list)
+        return list(values)
+
+    def to_numpy(self) -> np.ma.MaskedArray:
+        """Get all values of the array as a NumPy array of `int64`s.
+
+        Undefined values are masked. This is much faster than resolving a Future
+        for each element separately.
+        """
+        return self._connection.shared_memory.get_array_view(self._address)
+
     def get_future_index(
         self, index: Union[int, str, operand.Register, RegFuture]
     ) -> Future:
-        """Get a Future representing a particular array element"""
+        """Get a Future representing a particular array element.
+
+        Futures for constant indices are cached, such that the same Future is
+        returned as long as its value has not been resolved yet. Resolved Futures
+        are removed from the cache, such that they can be freed.
+        """
         if isinstance(index, str):
             index = parse_register(index)
-        return Future(
-            connection=self._connection,
-            address=self._address,
-            index=index,
-        )
+        if type(index) is not int:
+            return Future(
+                connection=self._connection,
+                address=self._address,
+                index=index,
+            )
+        if self._futures is None:
+            self._futures = {}
+        future = self._futures.get(index)
+        if future is None:
+            future = Future(
+                connection=self._connection,
+                address=self._address,
+                index=index,
+            )
+            future._cache = self._futures
+            self._futures[index] = future
+        return future
 
     def get_future_slice(self, s: slice) -> List[Future]:
         """Get a list of Futures each representing one element in a particular
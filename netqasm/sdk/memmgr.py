@@ -39,6 +39,10 @@ class MemoryManager:
         # Arrays that need to be returned at the end of the subroutine.
         self._arrays_to_return: List[Array] = []
 
+        # Addresses of arrays that are only read by the quantum node controller.
+        # These are initialized like the arrays above, but not returned.
+        self._input_array_addresses: Set[int] = set()
+
     def inactivate_qubits(self) -> None:
         """Mark all registers as inactive (i.e. not in use)."""
         while len(self._active_qubits) > 0:
@@ -104,6 +108,10 @@ class MemoryManager:
                 return reg
         raise RuntimeError("Ran out of M-registers")
 
+    def get_num_free_meas_registers(self) -> int:
+        """Get the number of measurement registers that are not in use."""
+        return sum(not used for used in self._used_meas_registers.values())
+
     def reset_used_meas_registers(self) -> None:
         """Mark all measurement registers as 'not in use'."""
         self._used_meas_registers = {
@@ -150,6 +158,15 @@ class MemoryManager:
         """Get all arrays that are returned at the end of the subroutine."""
         return self._arrays_to_return
 
+    def add_input_array(self, array: Array) -> None:
+        """Mark an array as only being read by the quantum node controller, such
+        that it does not need to be returned."""
+        self._input_array_addresses.add(array.address)
+
+    def is_input_array(self, array: Array) -> bool:
+        """Check if an array is only read by the quantum node controller."""
+        return array.address in self._input_array_addresses
+
     def reset_arrays_to_return(self) -> None:
         """Clear list of arrays that are returned at the end of the subroutine."""
         self._arrays_to_return = []
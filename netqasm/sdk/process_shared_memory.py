@@ -0,0 +1,669 @@
+"""Shared memory between the Host and the quantum node controller that can be
+accessed from multiple processes.
+
+This module provides the `ProcessSharedMemory` class, which stores the registers and
+arrays of an application in a `multiprocessing.shared_memory` segment. The segment
+has a fixed layout of signed 64-bit slots:
+
+.. code-block:: text
+
+    | HEADER | REGISTERS | ARRAY DIRECTORY | ARENA |
+
+The header contains a magic number, the sequence counter, the number of arena slots
+in use, the sizes of the directory and the arena, the number of arrays, the generation
+of the segment and the generation of the segment that it moved to (if any). There is
+one slot for each register. The array directory is a hash table, keyed by array
+address, of entries `(address + 1, offset, length, capacity)`, which refer to the
+values of the arrays in the arena. Undefined values are stored as the smallest 64-bit
+integer.
+
+Arrays are never removed, since their values may be read at any time after they were
+returned. When the directory or the arena is full, the owner moves the memory to a
+new segment of the next generation, with a larger directory or arena, in which the
+arrays are compacted. The segments that were moved from are kept (and point to the
+latest generation), such that others follow the move on their next access.
+
+Only a single process (typically the quantum node controller) should write to a
+shared memory. Writes are bracketed by incrementing the sequence counter, such that it
+is odd while a write is in progress. Readers retry until they read the same, even,
+sequence number before and after reading, so they always see a consistent snapshot
+without taking locks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from array import array
+from multiprocessing import parent_process, resource_tracker
+from multiprocessing import shared_memory as mp_shared_memory
+from multiprocessing import util as mp_util
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from netqasm.lang import operand
+from netqasm.lang.encoding import REG_INDEX_BITS, RegisterName
+from netqasm.lang.parsing import parse_register
+
+from .shared_memory import SharedMemory
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Environment variable of a namespace that is included in the names of segments, to
+# separate runs that use the same node names at the same time
+NAMESPACE_ENV = "NETQASM_SHARED_MEMORY_NAMESPACE"
+
+_T = TypeVar("_T")
+
+_UNDEFINED = -(2**63)
+_MAGIC = 0x6E71736D31  # "nqsm1"
+
+# Slots of the header
+_MAGIC_SLOT = 0
+_SEQ_SLOT = 1
+_ARENA_USED_SLOT = 2
+_MAX_ARRAYS_SLOT = 3
+_ARENA_SIZE_SLOT = 4
+_NUM_ARRAYS_SLOT = 5
+_GENERATION_SLOT = 6
+_MOVED_SLOT = 7
+_HEADER_SLOTS = 8
+
+_REGISTERS_PER_NAME = 2**REG_INDEX_BITS
+_REGISTER_SLOTS = len(RegisterName) * _REGISTERS_PER_NAME
+_DIRECTORY_ENTRY_SLOTS = 4
+# Maximum fraction of the directory that is in use, such that finding the entry of an
+# array that does not exist stays fast
+_MAX_DIRECTORY_LOAD = 0.75
+
+# Polling interval while waiting for writes of other processes
+_MIN_POLL_INTERVAL = 5e-5
+_MAX_POLL_INTERVAL = 5e-3
+
+# Names of the segments that were created by this process (or the process it was
+# forked from), which share the resource tracker of this process
+_created_names: Set[str] = set()
+
+
+def get_segment_name(node_name: str, key: Optional[int] = None) -> str:
+    """Name of the segment of the shared memory of a node and key."""
+    namespace = os.environ.get(NAMESPACE_ENV, "")
+    digest = hashlib.sha1(f"{namespace}\0{node_name}\0{key}".encode()).hexdigest()
+    # Segment names are limited to 31 characters on some platforms, including the
+    # suffix of the generation (see `_get_generation_name`)
+    return f"netqasm_{digest[:16]}"
+
+
+class _Segment:
+    """A segment of a shared memory, and the layout of its slots."""
+
+    def __init__(self, segment: mp_shared_memory.SharedMemory):
+        self.segment: mp_shared_memory.SharedMemory = segment
+        self.slots: memoryview = _get_slots(segment)
+        self.generation: int = self.slots[_GENERATION_SLOT]
+        self.max_arrays: int = self.slots[_MAX_ARRAYS_SLOT]
+        self.arena_size: int = self.slots[_ARENA_SIZE_SLOT]
+        self.directory_start: int = _HEADER_SLOTS + _REGISTER_SLOTS
+        self.arena_start: int = (
+            self.directory_start + self.max_arrays * _DIRECTORY_ENTRY_SLOTS
+        )
+
+    @classmethod
+    def create(
+        cls, name: str, max_arrays: int, arena_size: int, generation: int = 0
+    ) -> _Segment:
+        """Create a new segment, with undefined registers and no arrays.
+
+        :raises FileExistsError: if a segment with this name already exists
+        """
+        num_slots = (
+            _HEADER_SLOTS
+            + _REGISTER_SLOTS
+            + max_arrays * _DIRECTORY_ENTRY_SLOTS
+            + arena_size
+        )
+        segment = mp_shared_memory.SharedMemory(
+            name=name, create=True, size=num_slots * 8
+        )
+        _created_names.add(name)
+        slots = _get_slots(segment)
+        register_start = _HEADER_SLOTS
+        slots[register_start : register_start + _REGISTER_SLOTS] = array(
+            "q", [_UNDEFINED] * _REGISTER_SLOTS
+        )
+        slots[_MAX_ARRAYS_SLOT] = max_arrays
+        slots[_ARENA_SIZE_SLOT] = arena_size
+        slots[_GENERATION_SLOT] = generation
+        # Written last, such that others only attach once the layout is complete
+        slots[_MAGIC_SLOT] = _MAGIC
+        slots.release()
+        return cls(segment)
+
+    def get_directory_entries(self) -> List[Tuple[int, int, int]]:
+        """Address, offset (in slots from the start of the memory) and length of all
+        arrays."""
+        entries = []
+        for i in range(self.max_arrays):
+            start = self.directory_start + i * _DIRECTORY_ENTRY_SLOTS
+            key, offset, length, _ = self.slots[
+                start : start + _DIRECTORY_ENTRY_SLOTS
+            ].tolist()
+            if key != 0:
+                entries.append((key - 1, self.arena_start + offset, length))
+        return entries
+
+    def find_directory_entry(self, address: int) -> Tuple[int, bool]:
+        """Slot of the directory entry of an array, or of the first empty entry where
+        it would be inserted, and whether the array was found."""
+        slots = self.slots
+        for i in range(self.max_arrays):
+            start = (
+                self.directory_start
+                + ((address + i) % self.max_arrays) * _DIRECTORY_ENTRY_SLOTS
+            )
+            key = slots[start]
+            if key == address + 1:
+                return start, True
+            if key == 0:
+                return start, False
+        raise MemoryError(f"Shared memory {self.segment.name} has too many arrays")
+
+    def find_array(self, address: int) -> Optional[Tuple[int, int]]:
+        """Offset (in slots from the start of the memory) and length of an array."""
+        start, found = self.find_directory_entry(address)
+        if not found:
+            return None
+        slots = self.slots
+        return self.arena_start + slots[start + 1], slots[start + 2]
+
+    def release(self) -> None:
+        self.slots.release()
+        self.segment.close()
+
+
+class ProcessSharedMemory(SharedMemory):
+    """Shared memory of an application, stored in a segment that can be attached to by
+    other processes.
+
+    The process that creates the segment owns it: the segment is unlinked when the
+    owner calls `unlink` or `close`, when the owner garbage collects it, or when the
+    owner exits (also when it is a `multiprocessing` child process). Only the owner
+    can move the memory to a larger segment when it is full.
+
+    Waiting for values (`wait_for_*`) is notified by writes of this process, and polls
+    for writes of other processes. Write listeners are only called for writes of this
+    process.
+    """
+
+    DEFAULT_MAX_ARRAYS: int = 1024
+    DEFAULT_ARENA_SIZE: int = 2**17
+    # Maximum number of arena slots that a segment can grow to
+    MAX_ARENA_SIZE: int = 2**31
+
+    def __init__(self, segment: mp_shared_memory.SharedMemory, owner: bool):
+        """ProcessSharedMemory constructor.
+
+        Use `create` or `attach` instead of calling this directly.
+        """
+        super().__init__()
+        current = _Segment(segment)
+        self._name: str = _get_base_name(segment.name, current.generation)
+        # All segments that this process attached to, of which the last one is in use
+        self._segments: List[_Segment] = [current]
+        self._current: _Segment = current
+        self._moving: threading.Lock = threading.Lock()
+        self._owner: bool = owner
+        self._pid: int = os.getpid()
+        self._finalizer: mp_util.Finalize = mp_util.Finalize(
+            self,
+            _release_segments,
+            args=(self._segments, owner, self._pid),
+            exitpriority=0,
+        )
+
+    @classmethod
+    def create(
+        cls,
+        name: str,
+        max_arrays: Optional[int] = None,
+        arena_size: Optional[int] = None,
+    ) -> ProcessSharedMemory:
+        """Create a new segment.
+
+        :param name: name of the segment
+        :param max_arrays: initial maximum number of arrays
+        :param arena_size: initial maximum total length of all arrays
+        :raises FileExistsError: if a segment with this name already exists
+        """
+        if max_arrays is None:
+            max_arrays = cls.DEFAULT_MAX_ARRAYS
+        if arena_size is None:
+            arena_size = cls.DEFAULT_ARENA_SIZE
+        segment = _Segment.create(name, max_arrays=max_arrays, arena_size=arena_size)
+        return cls(segment.segment, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> Optional[ProcessSharedMemory]:
+        """Attach to an existing segment.
+
+        :param name: name of the segment
+        :return: the shared memory, or None if the segment does not exist (yet)
+        """
+        segment = _attach_segment(name)
+        return None if segment is None else cls(segment, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def owner(self) -> bool:
+        return self._owner
+
+    @property
+    def max_array_length(self) -> int:
+        return min(super().max_array_length, self.MAX_ARENA_SIZE)
+
+    def unlink(self) -> None:
+        """Remove the segments if this process owns them, such that others can not
+        attach anymore. The memory can still be used by those that are attached."""
+        # Forked processes inherit the memory, but do not own it
+        if self._owner and os.getpid() == self._pid:
+            for segment in self._segments:
+                _unlink_segment(segment.segment)
+
+    def close(self) -> None:
+        """Detach from the segments (and remove them if this process owns them).
+
+        The memory can not be used anymore afterwards.
+        """
+        self._finalizer()
+
+    def get_register(self, register: Union[str, operand.Register]) -> Optional[int]:
+        slot = self._get_register_slot(register)
+        value = self._read(lambda segment: segment.slots[slot])
+        return None if value == _UNDEFINED else value
+
+    def set_register(self, register: Union[str, operand.Register], value: int) -> None:
+        slot = self._get_register_slot(register)
+
+        def write() -> None:
+            self._current.slots[slot] = value
+
+        self._write(write)
+
+    def get_array_part(
+        self, address: int, index: Union[int, slice]
+    ) -> Union[None, int, List[Optional[int]]]:
+        def read(segment: _Segment) -> Union[None, int, List[Optional[int]]]:
+            entry = segment.find_array(address)
+            if entry is None:
+                return None
+            offset, length = entry
+            positions = _get_positions(address, index, length)
+            if isinstance(positions, int):
+                value = segment.slots[offset + positions]
+                return None if value == _UNDEFINED else value
+            assert isinstance(index, slice)
+            return _to_values(segment.slots[offset : offset + length].tolist()[index])
+
+        return self._read(read)
+
+    def set_array_part(
+        self,
+        address: int,
+        index: Union[int, slice],
+        value: Union[None, int, List[Optional[int]]],
+    ):
+        def write() -> None:
+            slots = self._current.slots
+            entry = self._current.find_array(address)
+            if entry is None:
+                raise IndexError(f"No array with address {address}")
+            offset, length = entry
+            positions = _get_positions(address, index, length)
+            if isinstance(positions, int):
+                if isinstance(value, list):
+                    raise TypeError(f"expected 'int' or 'None', not {type(value)}")
+                slots[offset + positions] = _to_slot(value)
+                return
+            if not isinstance(value, list):
+                raise TypeError(f"expected 'list', not {type(value)}")
+            assert len(positions) == len(value), "value not of correct length"
+            for position, v in zip(positions, value):
+                slots[offset + position] = _to_slot(v)
+
+        self._write(write)
+
+    def _get_array(self, address: int) -> List[Optional[int]]:
+        def read(segment: _Segment) -> List[Optional[int]]:
+            entry = segment.find_array(address)
+            if entry is None:
+                raise IndexError(f"No array with address {address}")
+            offset, length = entry
+            return _to_values(segment.slots[offset : offset + length].tolist())
+
+        return self._read(read)
+
+    def has_array(self, address: int) -> bool:
+        return self._read(lambda segment: segment.find_array(address) is not None)
+
+    def get_array_view(self, address: int) -> np.ma.MaskedArray:
+        import numpy as np
+
+        def read(segment: _Segment) -> np.ndarray:
+            entry = segment.find_array(address)
+            if entry is None:
+                raise IndexError(f"No array with address {address}")
+            offset, length = entry
+            return np.array(segment.slots[offset : offset + length], dtype=np.int64)
+
+        data = self._read(read)
+        mask = data == _UNDEFINED
+        data[mask] = 0
+        return np.ma.MaskedArray(data, mask=mask)
+
+    def init_new_array(
+        self,
+        address: int,
+        length: int = 1,
+        new_array: Optional[List[Optional[int]]] = None,
+    ) -> None:
+        if new_array is not None:
+            length = len(new_array)
+            values = array("q", (_to_slot(v) for v in new_array))
+        else:
+            values = array("q", [_UNDEFINED]) * length
+
+        def write() -> None:
+            offset = self._allocate_array(address, length)
+            self._current.slots[offset : offset + length] = values
+
+        self._write(write)
+
+    def _wait_for(
+        self, get_value: Callable[[], Any], timeout: Optional[float] = None
+    ) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        poll_interval = _MIN_POLL_INTERVAL
+        while True:
+            slots = self._current.slots
+            seq = slots[_SEQ_SLOT]
+            value = get_value()
+            if value is not None:
+                return value
+            wait_time = poll_interval
+            if deadline is not None:
+                wait_time = min(wait_time, deadline - time.monotonic())
+                if wait_time <= 0:
+                    return None
+            with self._written:
+                # Writes of this process notify, those of other processes are polled
+                if slots[_SEQ_SLOT] == seq:
+                    self._written.wait(wait_time)
+            poll_interval = min(2 * poll_interval, _MAX_POLL_INTERVAL)
+
+    def _get_active_values(
+        self,
+    ) -> List[Union[Tuple[operand.Register, int], Tuple[operand.ArrayEntry, int]]]:
+        return self._read(self._copy)._get_active_values()
+
+    @staticmethod
+    def _copy(segment: _Segment) -> SharedMemory:
+        memory = SharedMemory()
+        for i, value in enumerate(
+            segment.slots[_HEADER_SLOTS : _HEADER_SLOTS + _REGISTER_SLOTS].tolist()
+        ):
+            if value != _UNDEFINED:
+                reg_name = RegisterName(i // _REGISTERS_PER_NAME)
+                memory._registers[reg_name][i % _REGISTERS_PER_NAME] = value
+        for address, offset, length in segment.get_directory_entries():
+            memory._arrays.init_new_array(address, length)
+            memory._arrays._set_array(
+                address, _to_values(segment.slots[offset : offset + length].tolist())
+            )
+        return memory
+
+    def _read(self, read: Callable[[_Segment], _T]) -> _T:
+        while True:
+            segment = self._get_current_segment()
+            slots = segment.slots
+            seq = slots[_SEQ_SLOT]
+            if seq % 2 == 0:
+                try:
+                    value = read(segment)
+                except Exception:
+                    # The data may have been inconsistent because of a write
+                    if slots[_SEQ_SLOT] == seq:
+                        raise
+                else:
+                    if slots[_SEQ_SLOT] == seq:
+                        return value
+            # A write is in progress
+            time.sleep(0)
+
+    def _write(self, write: Callable[[], None]) -> None:
+        with self._written:
+            segment = self._get_current_segment()
+            segment.slots[_SEQ_SLOT] += 1
+            try:
+                write()
+            finally:
+                if self._current is not segment:
+                    # The memory moved to a new segment during the write
+                    self._current.slots[_SEQ_SLOT] += 1
+                segment.slots[_SEQ_SLOT] += 1
+            self._notify_written()
+
+    def _get_current_segment(self) -> _Segment:
+        """The segment that the memory is in, after following moves of the owner."""
+        segment = self._current
+        while segment.slots[_MOVED_SLOT] != 0:
+            with self._moving:
+                if self._current is segment:
+                    name = _get_generation_name(self._name, segment.slots[_MOVED_SLOT])
+                    moved_to = _attach_segment(name)
+                    if moved_to is None:
+                        # The owner removed the memory, so it does not change anymore
+                        return segment
+                    self._segments.append(_Segment(moved_to))
+                    self._current = self._segments[-1]
+                segment = self._current
+        return segment
+
+    @staticmethod
+    def _get_register_slot(register: Union[str, operand.Register]) -> int:
+        if isinstance(register, str):
+            register = parse_register(register)
+        if not (0 <= register.index < _REGISTERS_PER_NAME):
+            raise IndexError(
+                f"index {register.index} is not within 0 and {_REGISTERS_PER_NAME}"
+            )
+        slot: int = (
+            _HEADER_SLOTS + register.name.value * _REGISTERS_PER_NAME + register.index
+        )
+        return slot
+
+    def _allocate_array(self, address: int, length: int) -> int:
+        segment = self._current
+        slots = segment.slots
+        start, found = segment.find_directory_entry(address)
+        if found and length <= slots[start + 3]:
+            # Reuse the space of the previous array at this address
+            slots[start + 2] = length
+            return segment.arena_start + slots[start + 1]
+        num_arrays = slots[_NUM_ARRAYS_SLOT] + (0 if found else 1)
+        if (
+            num_arrays > segment.max_arrays * _MAX_DIRECTORY_LOAD
+            or slots[_ARENA_USED_SLOT] + length > segment.arena_size
+        ):
+            if not self._owner:
+                raise MemoryError(
+                    f"Shared memory {self.name} has no space for an array of length "
+                    f"{length}, and can only be grown by its owner"
+                )
+            segment = self._move(num_arrays, length)
+            slots = segment.slots
+            start, found = segment.find_directory_entry(address)
+        offset = slots[_ARENA_USED_SLOT]
+        slots[_ARENA_USED_SLOT] = offset + length
+        slots[start + 1] = offset
+        slots[start + 2] = length
+        slots[start + 3] = length
+        if not found:
+            slots[_NUM_ARRAYS_SLOT] += 1
+            slots[start] = address + 1
+        return segment.arena_start + offset
+
+    def _move(self, num_arrays: int, length: int) -> _Segment:
+        """Move the memory to a new segment, with space for `num_arrays` arrays and a
+        new array of `length` slots. Must be called during a write."""
+        old = self._current
+        entries = old.get_directory_entries()
+        arena_used = sum(entry_length for _, _, entry_length in entries)
+        max_arrays = old.max_arrays
+        while num_arrays > max_arrays * _MAX_DIRECTORY_LOAD:
+            max_arrays *= 2
+        arena_size = old.arena_size
+        if old.slots[_ARENA_USED_SLOT] + length > arena_size:
+            # Also when compacting the arrays would make space, such that the total
+            # size of the segments that were moved from stays bounded
+            arena_size *= 2
+        while arena_used + length > arena_size:
+            arena_size *= 2
+        if arena_size > self.MAX_ARENA_SIZE:
+            raise MemoryError(
+                f"Shared memory {self.name} has no space for an array of length "
+                f"{length}"
+            )
+
+        generation = old.generation + 1
+        new = _Segment.create(
+            _get_generation_name(self._name, generation),
+            max_arrays=max_arrays,
+            arena_size=arena_size,
+            generation=generation,
+        )
+        slots = new.slots
+        # Others wait until the write is finished (see `_write`)
+        slots[_SEQ_SLOT] = old.slots[_SEQ_SLOT]
+        register_end = _HEADER_SLOTS + _REGISTER_SLOTS
+        slots[_HEADER_SLOTS:register_end] = old.slots[_HEADER_SLOTS:register_end]
+        offset = 0
+        for address, old_offset, entry_length in entries:
+            start, _ = new.find_directory_entry(address)
+            slots[start : start + _DIRECTORY_ENTRY_SLOTS] = array(
+                "q", [address + 1, offset, entry_length, entry_length]
+            )
+            new_offset = new.arena_start + offset
+            slots[new_offset : new_offset + entry_length] = old.slots[
+                old_offset : old_offset + entry_length
+            ]
+            offset += entry_length
+        slots[_ARENA_USED_SLOT] = offset
+        slots[_NUM_ARRAYS_SLOT] = len(entries)
+
+        for segment in self._segments:
+            segment.slots[_MOVED_SLOT] = generation
+        self._segments.append(new)
+        self._current = new
+        return new
+
+
+def _get_positions(
+    address: int, index: Union[int, slice], length: int
+) -> Union[int, range]:
+    try:
+        return range(length)[index]
+    except IndexError:
+        raise IndexError(
+            f"index {index} is out of range for array with address {address}"
+        )
+
+
+def _to_slot(value: Optional[int]) -> int:
+    return _UNDEFINED if value is None else value
+
+
+def _get_slots(segment: mp_shared_memory.SharedMemory) -> memoryview:
+    assert segment.buf is not None
+    return segment.buf.cast("q")
+
+
+def _to_values(slots: List[int]) -> List[Optional[int]]:
+    return [None if v == _UNDEFINED else v for v in slots]
+
+
+def _get_generation_name(name: str, generation: int) -> str:
+    """Name of the segment of a generation of the memory with a name."""
+    return name if generation == 0 else f"{name}_{generation}"
+
+
+def _get_base_name(name: str, generation: int) -> str:
+    """Name of the memory of the segment of a generation with a name."""
+    return name if generation == 0 else name[: -len(f"_{generation}")]
+
+
+def _attach_segment(name: str) -> Optional[mp_shared_memory.SharedMemory]:
+    """Open an existing segment, or None if it does not exist (yet)."""
+    try:
+        segment = _open_segment(name)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # The creator did not set the size of the segment yet, so it is empty
+        return None
+    slots = _get_slots(segment)
+    magic = slots[_MAGIC_SLOT]
+    slots.release()
+    if magic != _MAGIC:
+        segment.close()
+        if magic == 0:
+            # The creator did not finish setting up the layout yet
+            return None
+        raise RuntimeError(f"Segment {name} does not contain a shared memory")
+    return segment
+
+
+def _open_segment(name: str) -> mp_shared_memory.SharedMemory:
+    try:
+        # Only the owner should unlink the segment when it exits
+        return mp_shared_memory.SharedMemory(name=name, track=False)  # type: ignore
+    except TypeError:
+        # Before Python 3.13, segments are always tracked, and the resource tracker
+        # of a separately started process would unlink the segment of the owner when
+        # that process exits. Processes started by `multiprocessing` share the
+        # resource tracker of their parent, like the owner if it is this process, in
+        # which case the segment is already tracked for the owner.
+        segment = mp_shared_memory.SharedMemory(name=name)
+        if name not in _created_names and parent_process() is None:
+            resource_tracker.unregister(
+                segment._name, "shared_memory"  # type: ignore[attr-defined]
+            )
+        return segment
+
+
+def _unlink_segment(segment: mp_shared_memory.SharedMemory) -> None:
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _release_segments(segments: List[_Segment], owner: bool, pid: int) -> None:
+    for segment in segments:
+        segment.release()
+        if owner and os.getpid() == pid:
+            _unlink_segment(segment.segment)
@@ -13,8 +13,8 @@ class ProgressBar:
         print("")
         self.update()
 
-    def increase(self) -> None:
-        self.itr += 1
+    def increase(self, amount: int = 1) -> None:
+        self.itr += amount
         self.update()
 
     def update(self) -> None:
@@ -49,6 +49,8 @@ class Qubit:
     methods on a `Qubit` instance.
     """
 
+    __slots__ = ("_conn", "_qubit_id", "_active", "_ent_info", "_remote_ent_node")
+
     def __init__(
         self,
         conn: sdkconn.BaseNetQASMConnection,
@@ -393,6 +395,8 @@ class FutureQubit(Qubit):
     represent the qubits that will be available when EPR generation has finished.
     """
 
+    __slots__ = ()
+
     def __init__(self, conn: sdkconn.BaseNetQASMConnection, future_id: Future):
         """FutureQubit constructor. Typically not used directly.
 
@@ -402,7 +406,7 @@ class FutureQubit(Qubit):
         """
         self._conn: sdkconn.BaseNetQASMConnection = conn
 
-        self.qubit_id: Future = future_id
+        self.qubit_id = future_id
 
         self._activate()
 
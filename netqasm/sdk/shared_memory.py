@@ -4,13 +4,21 @@ the quantum node controller.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple, Union
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
 from netqasm.lang import operand
 from netqasm.lang.encoding import ADDRESS_BITS, REG_INDEX_BITS, RegisterName
 from netqasm.lang.ir import Symbols
 from netqasm.lang.parsing import parse_address, parse_register
-from netqasm.runtime.settings import get_is_using_hardware
+from netqasm.runtime.settings import (
+    get_cross_process_shared_memory,
+    get_is_using_hardware,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def _assert_within_width(value: int, width: int) -> None:
@@ -45,6 +53,15 @@ class RegisterGroup:
         self._assert_within_length(index)
         return self._register.get(index)
 
+    def get_verified(self, index: int) -> Optional[int]:
+        """Get the value of a register whose index is known to be within the group."""
+        return self._register.get(index)
+
+    def set_verified(self, index: int, value: int) -> None:
+        """Set the value of a register whose index is known to be within the group."""
+        _assert_within_width(value, ADDRESS_BITS)
+        self._register[index] = value
+
     def _assert_within_length(self, index: int) -> None:
         if not (0 <= index < len(self)):
             raise IndexError(f"index {index} is not within 0 and {len(self)}")
@@ -133,6 +150,15 @@ class Arrays:
             )
         return value
 
+    def get_verified(self, address: int, index: int) -> Optional[int]:
+        """Get an entry that is known to be within an existing array."""
+        return self._arrays[address][index]
+
+    def set_verified(self, address: int, index: int, value: Optional[int]) -> None:
+        """Set an entry that is known to be within an existing array, to a value
+        that is known to fit in an entry."""
+        self._arrays[address][index] = value
+
     def _get_array(self, address: int) -> List[Optional[int]]:
         if address not in self._arrays:
             raise IndexError(f"No array with address {address}")
@@ -147,6 +173,16 @@ class Arrays:
     def has_array(self, address: int) -> bool:
         return address in self._arrays
 
+    def get_array_view(self, address: int) -> np.ma.MaskedArray:
+        import numpy as np
+
+        # Converts the whole list at once, with undefined entries (None) as NaN.
+        # Entries fit in ADDRESS_BITS, so they are exact as floats.
+        values = np.array(self._get_array(address), dtype=np.float64)
+        mask = np.isnan(values)
+        values[mask] = 0
+        return np.ma.MaskedArray(values.astype(np.int64), mask=mask)
+
     @staticmethod
     def _extract_key(
         key: Tuple[int, Union[int, slice]]
@@ -200,11 +236,20 @@ class SharedMemory:
     shared memory" may simply be "sending values from the quantum node controller to
     the Host". On the other hand, a simulator that runs the Host and the quantum node
     controller in the same process might e.g. use a global shared object.
+
+    Threads can wait for values to be written to the shared memory by using the
+    `wait_for_*` methods. These do not poll, but are notified on each write.
+    Other waiters, like asyncio tasks, can register a listener that is called on
+    each write using `add_write_listener`.
     """
 
     def __init__(self):
         self._registers: Dict[RegisterName, RegisterGroup] = setup_registers()
         self._arrays: Arrays = Arrays()
+        # Notified whenever something is written to this shared memory
+        self._written: threading.Condition = threading.Condition()
+        # Called (without arguments) whenever something is written
+        self._write_listeners: List[Callable[[], None]] = []
 
     def __getitem__(
         self, key: Union[operand.Register, Tuple[int, Union[int, slice]], int]
@@ -217,6 +262,11 @@ class SharedMemory:
         elif isinstance(key, int):
             return self._get_array(key)
 
+    @property
+    def max_array_length(self) -> int:
+        """Maximum length of a single array in this shared memory."""
+        return (1 << (ADDRESS_BITS - 1)) - 1
+
     def get_register(self, register: Union[str, operand.Register]) -> Optional[int]:
         if isinstance(register, str):
             reg = parse_register(register)
@@ -229,7 +279,9 @@ class SharedMemory:
             reg = parse_register(register)
         else:
             reg = register
-        self._registers[reg.name][reg.index] = value
+        with self._written:
+            self._registers[reg.name][reg.index] = value
+            self._notify_written()
 
     def get_array_part(
         self, address: int, index: Union[int, slice]
@@ -242,11 +294,29 @@ class SharedMemory:
         index: Union[int, slice],
         value: Union[None, int, List[Optional[int]]],
     ):
-        self._arrays[address, index] = value
+        with self._written:
+            self._arrays[address, index] = value
+            self._notify_written()
 
     def _get_array(self, address: int) -> List[Optional[int]]:
         return self._arrays._get_array(address)
 
+    def has_array(self, address: int) -> bool:
+        return self._arrays.has_array(address)
+
+    def get_array_view(self, address: int) -> np.ma.MaskedArray:
+        """Get the values of a whole array at once.
+
+        The values are returned as a NumPy array of `int64`s, where undefined
+        (`None`) entries are masked.
+        The returned array is a copy, i.e. it does not change when the shared memory
+        is updated.
+
+        :param address: address of the array
+        :return: masked array containing all values of the array
+        """
+        return self._arrays.get_array_view(address)
+
     def init_new_array(
         self,
         address: int,
@@ -255,9 +325,89 @@ class SharedMemory:
     ) -> None:
         if new_array is not None:
             length = len(new_array)
-        self._arrays.init_new_array(address, length)
-        if new_array is not None:
-            self._arrays._set_array(address, new_array)
+        with self._written:
+            self._arrays.init_new_array(address, length)
+            if new_array is not None:
+                self._arrays._set_array(address, new_array)
+            self._notify_written()
+
+    def add_write_listener(self, listener: Callable[[], None]) -> None:
+        """Call `listener` whenever something is written to this shared memory.
+
+        The listener is called in the thread that writes, so it should return
+        quickly, e.g. by scheduling work on an event loop.
+        """
+        with self._written:
+            self._write_listeners.append(listener)
+
+    def remove_write_listener(self, listener: Callable[[], None]) -> None:
+        """Stop calling a listener that was added using `add_write_listener`."""
+        with self._written:
+            self._write_listeners.remove(listener)
+
+    def _notify_written(self) -> None:
+        # Must be called while holding `self._written`
+        self._written.notify_all()
+        for listener in self._write_listeners:
+            listener()
+
+    def _wait_for(
+        self, get_value: Callable[[], Any], timeout: Optional[float] = None
+    ) -> Any:
+        with self._written:
+            self._written.wait_for(lambda: get_value() is not None, timeout=timeout)
+            return get_value()
+
+    def wait_for_register(
+        self, register: Union[str, operand.Register], timeout: Optional[float] = None
+    ) -> Optional[int]:
+        """Block until a register has a value.
+
+        :param register: the register to wait for
+        :param timeout: maximum number of seconds to wait. If None, wait indefinitely.
+        :return: the value of the register, or None if the timeout expired
+        """
+        value: Optional[int] = self._wait_for(
+            lambda: self.get_register(register), timeout=timeout
+        )
+        return value
+
+    def wait_for_array_part(
+        self, address: int, index: int, timeout: Optional[float] = None
+    ) -> Optional[int]:
+        """Block until an array entry has a value.
+
+        :param address: address of the array
+        :param index: index of the entry in the array
+        :param timeout: maximum number of seconds to wait. If None, wait indefinitely.
+        :return: the value of the entry, or None if the timeout expired
+        """
+        value: Optional[int] = self._wait_for(
+            lambda: self.get_array_part(address, index), timeout=timeout
+        )
+        return value
+
+    def wait_for_array(
+        self, address: int, timeout: Optional[float] = None
+    ) -> Optional[List[Optional[int]]]:
+        """Block until an array exists in this shared memory.
+
+        Note that not all values in the array need to be defined.
+
+        :param address: address of the array
+        :param timeout: maximum number of seconds to wait. If None, wait indefinitely.
+        :return: the array, or None if the timeout expired
+        """
+
+        def get_array() -> Optional[List[Optional[int]]]:
+            if not self.has_array(address):
+                return None
+            return self._get_array(address)
+
+        array: Optional[List[Optional[int]]] = self._wait_for(
+            get_array, timeout=timeout
+        )
+        return array
 
     def _get_active_values(
         self,
@@ -283,9 +433,20 @@ class SharedMemoryManager:
     Simulators that simulate Hosts and the quantum node controllers in the same
     process may use this to have a single location for creating and accessing shared
     memories.
+
+    If cross-process shared memory is enabled (see
+    :func:`~netqasm.runtime.settings.set_cross_process_shared_memory`), shared
+    memories are created as :class:`~.ProcessSharedMemory`, and shared memories that
+    were created by other processes can be obtained in the same way. A shared memory
+    is removed when the process that created it removes it or exits.
     """
 
     _MEMORIES: Dict[Tuple[str, Optional[int]], Optional[SharedMemory]] = {}
+    # Notified whenever a shared memory is created
+    _CREATED: threading.Condition = threading.Condition()
+
+    # Interval for polling for shared memories that are created by other processes
+    _POLL_INTERVAL: float = 0.001
 
     @classmethod
     def create_shared_memory(
@@ -296,8 +457,22 @@ class SharedMemoryManager:
             raise RuntimeError(
                 f"Shared memory for (node, key): ({node_name}, {key}) already exists."
             )
-        memory = SharedMemory()
-        cls._MEMORIES[absolute_key] = memory
+        memory: SharedMemory
+        if get_cross_process_shared_memory():
+            from .process_shared_memory import ProcessSharedMemory, get_segment_name
+
+            try:
+                memory = ProcessSharedMemory.create(get_segment_name(node_name, key))
+            except FileExistsError:
+                raise RuntimeError(
+                    f"Shared memory for (node, key): ({node_name}, {key}) already "
+                    f"exists in another process."
+                )
+        else:
+            memory = SharedMemory()
+        with cls._CREATED:
+            cls._MEMORIES[absolute_key] = memory
+            cls._CREATED.notify_all()
         return memory
 
     @classmethod
@@ -306,9 +481,61 @@ class SharedMemoryManager:
     ) -> Optional[SharedMemory]:
         absolute_key = (node_name, key)
         memory = cls._MEMORIES.get(absolute_key)
+        if memory is None and get_cross_process_shared_memory():
+            from .process_shared_memory import ProcessSharedMemory, get_segment_name
+
+            memory = ProcessSharedMemory.attach(get_segment_name(node_name, key))
+            if memory is not None:
+                with cls._CREATED:
+                    memory = cls._MEMORIES.setdefault(absolute_key, memory)
         return memory
 
+    @classmethod
+    def wait_for_shared_memory(
+        cls, node_name: str, key: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Optional[SharedMemory]:
+        """Block until the shared memory for a node and key has been created.
+
+        :param node_name: name of the node
+        :param key: key of the shared memory, typically the app ID
+        :param timeout: maximum number of seconds to wait. If None, wait indefinitely.
+        :return: the shared memory, or None if the timeout expired
+        """
+        if not get_cross_process_shared_memory():
+            with cls._CREATED:
+                cls._CREATED.wait_for(
+                    lambda: cls.get_shared_memory(node_name, key) is not None,
+                    timeout=timeout,
+                )
+                return cls.get_shared_memory(node_name, key)
+
+        # Shared memories of other processes can only be polled for
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            memory = cls.get_shared_memory(node_name, key)
+            if memory is not None:
+                return memory
+            wait_time = cls._POLL_INTERVAL
+            if deadline is not None:
+                wait_time = min(wait_time, deadline - time.monotonic())
+                if wait_time <= 0:
+                    return None
+            with cls._CREATED:
+                cls._CREATED.wait(wait_time)
+
+    @classmethod
+    def remove_shared_memory(cls, node_name: str, key: Optional[int] = None) -> None:
+        """Remove a shared memory, such that one with the same key can be created.
+
+        Those that still have a reference to the shared memory can keep using it.
+        """
+        from .process_shared_memory import ProcessSharedMemory
+
+        memory = cls._MEMORIES.pop((node_name, key), None)
+        if isinstance(memory, ProcessSharedMemory):
+            memory.unlink()
+
     @classmethod
     def reset_memories(cls) -> None:
         for key in list(cls._MEMORIES.keys()):
-            cls._MEMORIES.pop(key)
+            cls.remove_shared_memory(*key)
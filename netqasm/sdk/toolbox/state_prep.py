@@ -1,9 +1,8 @@
 from __future__ import annotations
 
+import math
 from typing import TYPE_CHECKING, List, Tuple
 
-import numpy as np
-
 from netqasm.lang.encoding import IMMEDIATE_BITS
 
 if TYPE_CHECKING:
@@ -38,8 +37,8 @@ def get_angle_spec_from_float(angle: float, tol: float = 1e-4) -> List[Tuple[int
     tol : float
         Tolerance to use
     """
-    angle %= 2 * np.pi
-    rest = angle / np.pi
+    angle %= 2 * math.pi
+    rest = angle / math.pi
 
     # Max value of `n`
     n_max = 2**IMMEDIATE_BITS - 1
@@ -47,9 +46,9 @@ def get_angle_spec_from_float(angle: float, tol: float = 1e-4) -> List[Tuple[int
     nds = []
     while rest > tol:
         # Find the largest `d` such that `rest <= n_max / 2 ^ d`
-        d = int(np.floor(np.log2(n_max / rest)))
+        d = math.floor(math.log2(n_max / rest))
         # Find largest `n` such that `rest >= n / 2 ^ d`
-        n = int(np.floor(rest * 2**d))
+        n = math.floor(rest * 2**d)
         # Shouldn't happen, but lets make sure
         assert n <= n_max, "Something went wrong, n is bigger than n_max"
         nds.append((n, d))
@@ -6,6 +6,7 @@ flavour.
 """
 
 import abc
+import copy
 from typing import Dict, List, Optional, Set, Tuple, Union
 
 from netqasm.lang.instr import DebugInstruction, NetQASMInstruction, core, nv, vanilla
@@ -28,25 +29,41 @@ class SubroutineTranspiler(abc.ABC):
 class NVSubroutineTranspiler(SubroutineTranspiler):
     """A transpiler that converts a subroutine with the vanilla flavour to a subroutine
     with the NV flavour.
+
+    If `optimize_swaps` is True, the transpiler keeps track of which virtual qubit
+    currently lives in the electron after a carbon-carbon gate. Instead of swapping
+    the carbon state back out immediately, the swap-out is postponed until an
+    instruction needs the original layout again. Consecutive gates that act on the
+    same carbon then share a single swap-in/swap-out pair. Residency never crosses
+    basic-block boundaries (branch targets and branch instructions), so the
+    resulting subroutine implements the same operations as the non-optimized one.
     """
 
-    def __init__(self, subroutine: Subroutine, debug=False):
+    def __init__(self, subroutine: Subroutine, debug=False, optimize_swaps=False):
         self._subroutine: Subroutine = subroutine
         self._used_registers: Set[Register] = set()
         self._register_values: Dict[Register, Immediate] = dict()
         self._debug: bool = debug
+        self._optimize_swaps: bool = optimize_swaps
+
+        # Only used when optimizing swaps: (virtual ID, carbon register,
+        # electron register) of the carbon whose state currently lives in the
+        # electron, or None if all qubits are in their original place.
+        self._resident: Optional[Tuple[int, Register, Register]] = None
 
     def get_reg_value(self, reg: Register) -> Immediate:
         """Get the value of a register at this moment"""
         return self._register_values[reg]
 
-    def get_unused_register(self) -> Register:
+    def get_unused_register(self, exclude: Optional[List[Register]] = None) -> Register:
         """
         Naive approach: try to use Q0 if possible, otherwise Q1, etc.
         """
+        if exclude is None:
+            exclude = []
         for i in range(16):
             reg = Register(RegisterName.Q, i)
-            if reg not in self._used_registers:
+            if reg not in self._used_registers and reg not in exclude:
                 return reg
         raise RuntimeError("Could not find free register")
 
@@ -131,7 +148,14 @@ class NVSubroutineTranspiler(SubroutineTranspiler):
 
         index_changes = {}  # map index in commands to index in new_commands
 
+        block_starts = self._get_branch_targets()
+
         for i, instr in enumerate(self._subroutine.instructions):
+            if self._resident is not None and (
+                i in block_starts or not self._can_keep_resident(instr)
+            ):
+                new_commands += self._swap_out_resident()
+
             # check which registers are being written to
             affected_regs = instr.writes_to()
 
@@ -167,6 +191,9 @@ class NVSubroutineTranspiler(SubroutineTranspiler):
             else:
                 new_commands += [instr]
 
+        if self._resident is not None:
+            new_commands += self._swap_out_resident()
+
         add_no_op_at_end = False
 
         for instr in new_commands:
@@ -195,6 +222,141 @@ class NVSubroutineTranspiler(SubroutineTranspiler):
         self._subroutine.instructions = new_commands
         return self._subroutine
 
+    def _get_branch_targets(self) -> Set[int]:
+        """Get the indices of all instructions that can be jumped to."""
+        targets: Set[int] = set()
+        for instr in self._subroutine.instructions:
+            if isinstance(
+                instr,
+                (
+                    core.BranchUnaryInstruction,
+                    core.BranchBinaryInstruction,
+                    core.JmpInstruction,
+                ),
+            ):
+                targets.add(instr.line.value)
+        return targets
+
+    def _get_known_qubit_id(self, reg: Register) -> Optional[int]:
+        value = self._register_values.get(reg)
+        return None if value is None else value.value
+
+    def _can_keep_resident(self, instr: NetQASMInstruction) -> bool:
+        """Check if the current electron residency can survive `instr`.
+
+        This is only the case for instructions that are known not to touch the
+        electron's original qubit or the registers used for the swap.
+        """
+        assert self._resident is not None
+        resident_id, _, electron = self._resident
+        if isinstance(instr, core.SetInstruction):
+            # The carbon register may be reused, see `_swap_out_resident`.
+            return instr.reg != electron
+        if isinstance(
+            instr,
+            (
+                core.ClassicalOpInstruction,
+                core.ClassicalOpModInstruction,
+                core.ArrayInstruction,
+                core.StoreInstruction,
+                core.LoadInstruction,
+                core.UndefInstruction,
+                core.LeaInstruction,
+            ),
+        ):
+            # Purely classical.
+            return True
+        if isinstance(instr, (core.SingleQubitInstruction, core.RotationInstruction)):
+            qubit_id = self._get_known_qubit_id(instr.reg)
+            return qubit_id is not None and qubit_id != 0
+        if isinstance(instr, (vanilla.CnotInstruction, vanilla.CphaseInstruction)):
+            qubit_id0 = self._get_known_qubit_id(instr.reg0)
+            qubit_id1 = self._get_known_qubit_id(instr.reg1)
+            if qubit_id0 is None or qubit_id1 is None:
+                return False
+            # Only continue if the resident carbon is involved, otherwise
+            # a new carbon needs to be swapped in anyway.
+            return 0 not in [qubit_id0, qubit_id1] and resident_id in [
+                qubit_id0,
+                qubit_id1,
+            ]
+        return False
+
+    def _swap_out_resident(self) -> List[NetQASMInstruction]:
+        """Move the resident carbon state back from the electron."""
+        assert self._resident is not None
+        resident_id, carbon, electron = self._resident
+        self._resident = None
+
+        gates: List[NetQASMInstruction] = []
+        if self._get_known_qubit_id(carbon) != resident_id:
+            # The register that was used for the swap-in has been overwritten
+            # since, so use a fresh one.
+            carbon = self.get_unused_register(exclude=[electron])
+            gates += [
+                core.SetInstruction(lineno=None, reg=carbon, imm=Immediate(resident_id))
+            ]
+            self._register_values[carbon] = Immediate(resident_id)
+            self._used_registers.add(carbon)
+        return gates + self.swap(None, electron, carbon)
+
+    def _swap_in(
+        self, lineno: Optional[HostLine], carbon: Register
+    ) -> Tuple[Register, List[NetQASMInstruction]]:
+        """Swap the state of `carbon` into the electron.
+
+        Returns the electron register and the instructions to do the swap.
+        When optimizing swaps, the swap-out is postponed and the carbon is
+        registered as resident in the electron.
+        """
+        electron = self.get_unused_register()
+        set_electron = core.SetInstruction(
+            lineno=lineno, reg=electron, imm=Immediate(0)
+        )
+        gates: List[NetQASMInstruction] = [set_electron]
+        gates += self.swap(lineno, electron, carbon)
+        if self._optimize_swaps:
+            carbon_id = self.get_reg_value(carbon).value
+            self._resident = (carbon_id, carbon, electron)
+        return electron, gates
+
+    def _swap_back(
+        self, lineno: Optional[HostLine], electron: Register, carbon: Register
+    ) -> List[NetQASMInstruction]:
+        if self._optimize_swaps:
+            return []
+        return self.swap(lineno, electron, carbon)
+
+    def _map_with_resident(
+        self, instr: core.TwoQubitInstruction
+    ) -> List[NetQASMInstruction]:
+        """Map a carbon-carbon gate of which one carbon lives in the electron."""
+        assert self._resident is not None
+        resident_id, _, electron = self._resident
+        qubit_id0 = self.get_reg_value(instr.reg0).value
+        if isinstance(instr, vanilla.CphaseInstruction):
+            # CPHASE is symmetric, so the resident carbon can always act as control.
+            other = instr.reg1 if qubit_id0 == resident_id else instr.reg0
+            return self._map_cphase_electron_carbon(
+                vanilla.CphaseInstruction(
+                    lineno=instr.lineno, reg0=electron, reg1=other
+                )
+            )
+        assert isinstance(instr, vanilla.CnotInstruction)
+        if qubit_id0 == resident_id:
+            return self._map_cnot_electron_carbon(
+                vanilla.CnotInstruction(
+                    lineno=instr.lineno, reg0=electron, reg1=instr.reg1
+                )
+            )
+        else:
+            # The target lives in the electron, which is cheaper than swapping.
+            return self._map_cnot_carbon_electron(
+                vanilla.CnotInstruction(
+                    lineno=instr.lineno, reg0=instr.reg0, reg1=electron
+                )
+            )
+
     def _move_electron_carbon(
         self, instr: vanilla.MovInstruction
     ) -> List[NetQASMInstruction]:
@@ -281,6 +443,10 @@ class NVSubroutineTranspiler(SubroutineTranspiler):
 
         assert qubit_id0 != qubit_id1
 
+        if self._resident is not None:
+            # _can_keep_resident guarantees that the resident carbon is involved.
+            return self._map_with_resident(instr)
+
         # It is assumed that there is only one electron, and that its virtual ID is 0.
         if isinstance(instr, vanilla.CnotInstruction):
             if qubit_id0 == 0:
@@ -351,19 +517,12 @@ class NVSubroutineTranspiler(SubroutineTranspiler):
         See https://gitlab.tudelft.nl/qinc-wehner/netqasm/netqasm-docs/-/blob/master/nv-gates-docs.md
         for the circuit.
         """
-        electron = self.get_unused_register()
         carbon = instr.reg0
-        set_electron = core.SetInstruction(
-            lineno=instr.lineno, reg=electron, imm=Immediate(0)
-        )
+        electron, result = self._swap_in(instr.lineno, carbon)
         instr.reg0 = electron
 
-        result: List[NetQASMInstruction] = [set_electron]
-        result += (
-            self.swap(instr.lineno, electron, carbon)
-            + self._map_cphase_electron_carbon(instr)
-            + self.swap(instr.lineno, electron, carbon)
-        )
+        result += self._map_cphase_electron_carbon(instr)
+        result += self._swap_back(instr.lineno, electron, carbon)
         return result
 
     def _map_cnot_electron_carbon(
@@ -442,25 +601,24 @@ class NVSubroutineTranspiler(SubroutineTranspiler):
         See https://gitlab.tudelft.nl/qinc-wehner/netqasm/netqasm-docs/-/blob/master/nv-gates-docs.md
         for the circuit.
         """
-        electron = self.get_unused_register()
         carbon = instr.reg0
-        set_electron = core.SetInstruction(
-            lineno=instr.lineno, reg=electron, imm=Immediate(0)
-        )
+        electron, result = self._swap_in(instr.lineno, carbon)
         instr.reg0 = electron
 
-        result: List[NetQASMInstruction] = [set_electron]
-        result += (
-            self.swap(instr.lineno, electron, carbon)
-            + self._map_cnot_electron_carbon(instr)
-            + self.swap(instr.lineno, electron, carbon)
-        )
+        result += self._map_cnot_electron_carbon(instr)
+        result += self._swap_back(instr.lineno, electron, carbon)
         return result
 
     def _handle_single_qubit_gate(
         self,
         instr: Union[core.SingleQubitInstruction, core.RotationInstruction],
     ) -> List[NetQASMInstruction]:
+        if self._resident is not None:
+            resident_id, _, electron = self._resident
+            if self.get_reg_value(instr.reg).value == resident_id:
+                # The qubit currently lives in the electron, so act on that.
+                instr = copy.copy(instr)
+                instr.reg = electron
         return self._map_single_gate(instr)
 
     def _map_single_gate(
@@ -614,6 +772,16 @@ class NVSubroutineTranspiler(SubroutineTranspiler):
             )
 
 
+class SwapMinimizingNVSubroutineTranspiler(NVSubroutineTranspiler):
+    """NV transpiler with `optimize_swaps` enabled.
+
+    Can be passed as `compiler` to a connection, which only takes a class.
+    """
+
+    def __init__(self, subroutine: Subroutine, debug=False):
+        super().__init__(subroutine=subroutine, debug=debug, optimize_swaps=True)
+
+
 def get_hardware_num_denom(
     instr: core.RotationInstruction,
 ) -> Tuple[Immediate, Immediate]:
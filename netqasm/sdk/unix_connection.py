@@ -0,0 +1,231 @@
+"""
+Connection to a quantum node controller over a Unix-domain socket.
+
+This module provides the `UnixSocketConnection` class, which connects to a quantum
+node controller that is served by a
+:class:`~netqasm.backend.unix_socket.QNodeControllerServer`, possibly running in
+another process.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from itertools import count
+from typing import Callable, Dict, Optional, Type
+
+from netqasm.backend.messages import (
+    ErrorCode,
+    ErrorMessage,
+    Message,
+    MsgDoneMessage,
+    ReturnArrayMessage,
+    ReturnArraySliceMessage,
+    ReturnRegMessage,
+    deserialize_return_msg,
+)
+from netqasm.backend.unix_socket import FrameReader, encode_frame
+from netqasm.lang import operand
+from netqasm.sdk.connection import BaseNetQASMConnection, DebugNetworkInfo
+from netqasm.sdk.network import NetworkInfo
+from netqasm.sdk.shared_memory import SharedMemory
+
+
+class UnixSocketConnection(BaseNetQASMConnection):
+    """Connection to a quantum node controller that is served over a Unix-domain
+    socket.
+
+    Messages are sent without waiting for the replies to earlier messages, so that
+    multiple subroutines can be in flight at the same time when flushing with
+    `block=False`. Replies arrive asynchronously and are handled by a background
+    thread: returned values are written to the shared memory of this connection,
+    and then the callback of the message (if any) is called.
+
+    Since a server typically outlives the applications that connect to it, the
+    quantum node controller is not stopped when the connection context ends. Call
+    `close(stop_backend=True)` to stop it.
+    """
+
+    _CONNECT_SLEEP_TIME: float = 0.01
+
+    _supports_setup_app_message: bool = True
+
+    def __init__(
+        self,
+        app_name: str,
+        path: str,
+        timeout: Optional[float] = None,
+        network_info: Optional[Type[NetworkInfo]] = None,
+        **kwargs,
+    ):
+        """UnixSocketConnection constructor.
+
+        :param app_name: name of the application
+        :param path: path of the Unix-domain socket that the server listens on
+        :param timeout: maximum amount of real time to try to connect to the server.
+            If None, try indefinitely.
+        :param network_info: network information used by this connection.
+            Defaults to :class:`~.DebugNetworkInfo`.
+        :param kwargs: passed on to :class:`~.BaseNetQASMConnection`
+        """
+        self._network_info: Type[NetworkInfo] = (
+            DebugNetworkInfo if network_info is None else network_info
+        )
+        self._memory: SharedMemory = SharedMemory()
+
+        self._socket: socket.socket = self._connect(path, timeout=timeout)
+        self._send_lock: threading.Lock = threading.Lock()
+
+        self._msg_ids: count = count()
+        # Callbacks of messages that have been sent but are not done yet
+        self._pending: Dict[int, Optional[Callable]] = {}
+        # Errors reported by the quantum node controller that are not raised yet
+        self._errors: Dict[int, ErrorCode] = {}
+        self._connection_error: Optional[ConnectionError] = None
+        self._replies: threading.Condition = threading.Condition()
+
+        self._reader: threading.Thread = threading.Thread(
+            target=self._read_replies, daemon=True
+        )
+        self._reader.start()
+
+        super().__init__(app_name=app_name, **kwargs)
+
+        self._stop_backend_on_exit = False
+
+    @property
+    def shared_memory(self) -> SharedMemory:
+        return self._memory
+
+    def _wait_for_shared_memory(self) -> None:
+        # Returned values are written to the memory of this connection itself
+        pass
+
+    def _get_network_info(self) -> Type[NetworkInfo]:
+        return self._network_info
+
+    def _commit_serialized_message(
+        self, raw_msg: bytes, block: bool = True, callback: Optional[Callable] = None
+    ) -> None:
+        """Send a message to the quantum node controller.
+
+        :raises RuntimeError: if `block` is True and the quantum node controller
+            failed to handle this (or an earlier non-blocking) message
+        :raises ConnectionError: if the connection is lost
+        """
+        msg_id = next(self._msg_ids)
+        with self._replies:
+            if self._connection_error is not None:
+                raise self._connection_error
+            self._pending[msg_id] = None if block else callback
+        try:
+            with self._send_lock:
+                self._socket.sendall(encode_frame(msg_id, raw_msg))
+        except OSError as error:
+            raise ConnectionError(f"Connection lost: {error}") from error
+        if block:
+            self._wait_for_replies(lambda: msg_id not in self._pending)
+
+    def block(self) -> None:
+        """Block until all messages that have been sent are handled.
+
+        :raises RuntimeError: if the quantum node controller failed to handle one of
+            the messages
+        """
+        self._wait_for_replies(lambda: len(self._pending) == 0)
+
+    def close(
+        self,
+        clear_app: bool = True,
+        stop_backend: bool = False,
+        exception: bool = False,
+    ) -> None:
+        try:
+            super().close(
+                clear_app=clear_app, stop_backend=stop_backend, exception=exception
+            )
+        finally:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+
+    def _wait_for_replies(self, predicate: Callable[[], bool]) -> None:
+        with self._replies:
+            self._replies.wait_for(
+                lambda: predicate() or self._connection_error is not None
+            )
+            if len(self._errors) > 0:
+                msg_id, err_code = self._errors.popitem()
+                raise RuntimeError(
+                    f"Quantum node controller failed to handle message {msg_id} "
+                    f"with error {err_code.name}"
+                )
+            if not predicate():
+                assert self._connection_error is not None
+                raise self._connection_error
+
+    def _read_replies(self) -> None:
+        try:
+            for msg_id, raw_msg in FrameReader(self._socket):
+                self._handle_reply(msg_id, deserialize_return_msg(raw_msg))
+            error = ConnectionError("Connection closed by the quantum node controller")
+        except ConnectionError as e:
+            error = e
+        except Exception as e:
+            # Such that threads waiting for replies do not wait forever
+            error = ConnectionError(f"Failed to handle reply: {e!r}")
+            error.__cause__ = e
+        with self._replies:
+            self._connection_error = error
+            self._replies.notify_all()
+
+    def _handle_reply(self, msg_id: int, msg: Message) -> None:
+        if isinstance(msg, ReturnRegMessage):
+            self._memory.set_register(
+                operand.Register.from_raw(msg.register), msg.value
+            )
+        elif isinstance(msg, ReturnArrayMessage):
+            self._memory.init_new_array(address=msg.address, new_array=msg.values)
+        elif isinstance(msg, ReturnArraySliceMessage):
+            self._memory.set_array_part(
+                address=msg.address,
+                index=slice(msg.start, msg.start + len(msg.values)),
+                value=msg.values,
+            )
+        elif isinstance(msg, (MsgDoneMessage, ErrorMessage)):
+            with self._replies:
+                callback = self._pending.pop(msg_id, None)
+                if isinstance(msg, ErrorMessage):
+                    self._errors[msg_id] = ErrorCode(msg.err_code)
+                self._replies.notify_all()
+            if callback is not None:
+                try:
+                    callback()
+                except Exception as error:
+                    # The callback is user code, which should not stop the handling
+                    # of replies
+                    self._logger.warning(
+                        f"Callback of message {msg_id} failed: {error!r}"
+                    )
+        else:
+            raise TypeError(f"Unexpected reply {msg}")
+
+    @staticmethod
+    def _connect(path: str, timeout: Optional[float] = None) -> socket.socket:
+        t_start = time.monotonic()
+        while True:
+            sock = socket.socket(socket.AF_UNIX)
+            try:
+                sock.connect(path)
+                return sock
+            except OSError:
+                # The server may not be up yet
+                sock.close()
+            if timeout is not None and time.monotonic() - t_start > timeout:
+                raise TimeoutError(
+                    f"Timeout while connecting to quantum node controller at {path}"
+                )
+            time.sleep(UnixSocketConnection._CONNECT_SLEEP_TIME)
@@ -0,0 +1,50 @@
+"""Lazy loading of the attributes of a package (PEP 562).
+
+Packages like `netqasm.sdk` re-export names from many submodules. Importing all of
+these submodules when the package is imported makes importing the package slow, also
+when only a small part of it is used. Instead, a package can define its module-level
+`__getattr__` and `__dir__` using `lazy_attributes`, such that a submodule is only
+imported when one of its names is accessed.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_attributes(
+    package: str, attributes: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Create module-level `__getattr__` and `__dir__` functions for a package.
+
+    Attributes that are not in `attributes` are looked up as submodules of the
+    package, such that e.g. `netqasm.sdk.qubit` can still be used after only
+    importing `netqasm.sdk`.
+
+    :param package: name of the package, i.e. `__name__` of its `__init__` module
+    :param attributes: mapping of attribute names to the (relative) name of the
+        module that defines them
+    :return: the `__getattr__` and `__dir__` functions for the package
+    """
+    package_module = importlib.import_module(package)
+
+    def __getattr__(name: str) -> Any:
+        module_name = attributes.get(name)
+        if module_name is not None:
+            value = getattr(importlib.import_module(module_name, package), name)
+        else:
+            try:
+                value = importlib.import_module(f".{name}", package)
+            except ModuleNotFoundError as e:
+                if e.name != f"{package}.{name}":
+                    raise
+                raise AttributeError(
+                    f"module {package!r} has no attribute {name!r}"
+                ) from None
+        # Cache the value, such that `__getattr__` is not called again
+        setattr(package_module, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(package_module)) | set(attributes))
+
+    return __getattr__, __dir__
@@ -1,5 +1,8 @@
+import functools
+import math
+from typing import Tuple
+
 import numpy as np
-from scipy import linalg
 
 from netqasm.lang.ir import GenericInstr
 
@@ -9,13 +12,20 @@ X = np.array([[0, 1], [1, 0]])
 Y = np.array([[0, -1j], [1j, 0]])
 Z = np.array([[1, 0], [0, -1]])
 PAULIS = [X, Y, Z]
-H = (X + Z) * f
-K = (Y + Z) * f
+H: np.ndarray = (X + Z) * f
+K: np.ndarray = (Y + Z) * f
 S = np.array([[1, 0], [0, 1j]])
 T = np.array([[1, 0], [0, (1 + 1j) * f]])
 # Two-qubit gates
 CNOT = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]])
 CPHASE = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, -1]])
+SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]])
+
+# The matrices above are shared by everyone using them (e.g. all instructions
+# returning them from `to_matrix`), so make sure they can not be changed in-place.
+for _matrix in [X, Y, Z, H, K, S, T, CNOT, CPHASE, SWAP]:
+    _matrix.setflags(write=False)
+del _matrix
 
 
 STATIC_QUBIT_GATE_TO_MATRIX = {
@@ -33,25 +43,58 @@ STATIC_QUBIT_GATE_TO_MATRIX = {
 
 def get_rotation_matrix(axis, angle) -> np.ndarray:
     """Returns a single-qubit rotation matrix given an axis and an angle"""
-    norm = linalg.norm(axis)
+    norm = math.sqrt(sum(a * a for a in axis))
     if norm == 0:
         raise ValueError("Axis need to have non-negative norm")
-    axis = axis / norm
-    rot_mat = linalg.expm(-1j * angle / 2 * sum(a * P for a, P in zip(axis, PAULIS)))
-    return rot_mat  # type: ignore
+    nx, ny, nz = (a / norm for a in axis)
+    # exp(-i angle/2 n.P) = cos(angle/2) I - i sin(angle/2) n.P
+    c = math.cos(angle / 2)
+    s = math.sin(angle / 2)
+    return np.array(
+        [
+            [complex(c, -s * nz), complex(-s * ny, -s * nx)],
+            [complex(s * ny, -s * nx), complex(c, s * nz)],
+        ]
+    )
 
 
 def get_controlled_rotation_matrix(axis, angle) -> np.ndarray:
+    """Returns the matrix of a rotation of the target qubit (second qubit) by `angle`
+    if the control qubit is 0, and by `-angle` if it is 1."""
     target_pos = get_rotation_matrix(axis, angle)
     target_neg = get_rotation_matrix(axis, -angle)
 
-    ctrl_zero = np.array([[1, 0], [0, 0]])
-    ctrl_one = np.array([[0, 0], [0, 1]])
+    controlled_gate = np.zeros((4, 4), dtype=complex)
+    controlled_gate[:2, :2] = target_pos
+    controlled_gate[2:, 2:] = target_neg
+    return controlled_gate
+
+
+@functools.lru_cache(maxsize=1024)
+def get_cached_rotation_matrix(axis: Tuple[int, ...], n: int, d: int) -> np.ndarray:
+    """Returns the (read-only) matrix of a rotation by the angle `n * pi / 2^d`.
+
+    Rotations in NetQASM are always given as such a pair `(n, d)`, so the matrices
+    of a subroutine are computed only once for each axis and angle.
+
+    :param axis: the rotation axis, as a (hashable) tuple
+    :param n: numerator of the angle
+    :param d: exponent of the denominator of the angle
+    """
+    matrix = get_rotation_matrix(axis, n * math.pi / 2**d)
+    matrix.setflags(write=False)
+    return matrix
 
-    inv_controlled_gate = np.kron(ctrl_zero, target_pos) + np.kron(ctrl_one, np.eye(2))
-    controlled_gate = np.kron(ctrl_one, target_neg) + np.kron(ctrl_zero, np.eye(2))
 
-    return inv_controlled_gate @ controlled_gate
+@functools.lru_cache(maxsize=1024)
+def get_cached_controlled_rotation_matrix(
+    axis: Tuple[int, ...], n: int, d: int
+) -> np.ndarray:
+    """Returns the (read-only) matrix of a controlled rotation by the angle
+    `n * pi / 2^d`, see :func:`get_cached_rotation_matrix`."""
+    matrix = get_controlled_rotation_matrix(axis, n * math.pi / 2**d)
+    matrix.setflags(write=False)
+    return matrix
 
 
 def gate_to_matrix(instr, angle=None):
@@ -64,13 +107,13 @@ def gate_to_matrix(instr, angle=None):
                 "To get the matrix of a rotation an angle needs to be specified"
             )
         axis = {
-            GenericInstr.ROT_X: [1, 0, 0],
-            GenericInstr.ROT_Y: [0, 1, 0],
-            GenericInstr.ROT_Z: [0, 0, 1],
+            GenericInstr.ROT_X: (1, 0, 0),
+            GenericInstr.ROT_Y: (0, 1, 0),
+            GenericInstr.ROT_Z: (0, 0, 1),
         }[instr]
         if isinstance(angle, tuple):
             n, d = angle
-            angle = n * np.pi / 2**d
+            return get_cached_rotation_matrix(axis, n, d)
         return get_rotation_matrix(axis=axis, angle=angle)
     else:
         raise ValueError(f"{instr} is not a quantum gate")
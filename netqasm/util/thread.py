@@ -1,18 +1,63 @@
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from time import sleep
 
 
 def as_completed(futures, names=None, sleep_time=0):
-    futures = list(futures)
+    """Yield futures as they complete, optionally together with their names.
+
+    Futures that are found to be done at the same time are yielded in the order in
+    which they were given.
+
+    `concurrent.futures.Future` objects are waited on without polling. Other
+    future-like objects (having a `done()` method) are polled, waiting `sleep_time`
+    seconds between polls.
+    """
+    pending = list(futures)
     if names is not None:
-        names = list(names)
-    while len(futures) > 0:
-        for i, future in enumerate(futures):
+        pending_names = list(names)
+    else:
+        pending_names = [None] * len(pending)
+    while len(pending) > 0:
+        if all(isinstance(future, Future) for future in pending):
+            wait(pending, return_when=FIRST_COMPLETED)
+        still_pending = []
+        still_pending_names = []
+        for future, name in zip(pending, pending_names):
             if future.done():
-                futures.pop(i)
                 if names is None:
                     yield future
                 else:
-                    name = names.pop(i)
                     yield future, name
-        if sleep_time > 0:
+            else:
+                still_pending.append(future)
+                still_pending_names.append(name)
+        if len(still_pending) == len(pending) and sleep_time > 0:
             sleep(sleep_time)
+        pending = still_pending
+        pending_names = still_pending_names
+
+
+def run_in_daemon_thread(function, *args, **kwargs) -> Future:
+    """Call `function` with the given arguments in a new daemon thread.
+
+    Unlike the threads of a `ThreadPoolExecutor`, the thread does not need to finish
+    before the process exits. Use this for functions that may block forever, e.g.
+    programs waiting for a message from a program that failed.
+
+    :return: future that is set to the result (or exception) of the call
+    """
+    future: Future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
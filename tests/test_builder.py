@@ -218,6 +218,38 @@ def test_create_epr():
     )
 
 
+def test_return_only_host_arrays():
+    DebugConnection.node_ids = {
+        "Alice": 0,
+        "Bob": 1,
+    }
+
+    epr_socket = EPRSocket("Bob")
+
+    with DebugConnection("Alice", epr_sockets=[epr_socket]) as conn:
+        outcomes = conn.new_array(2)
+        epr_socket.create_keep(2)
+
+        subroutine = conn.builder.subrt_pop_pending_subroutine()
+        print(subroutine)
+
+    # Besides the outcomes array, there are arrays for the qubit IDs, the EPR request
+    # arguments and the entanglement results. Only the latter is read by the Host.
+    array_cmds = [
+        cmd
+        for cmd in subroutine.commands
+        if isinstance(cmd, ICmd) and cmd.instruction == GenericInstr.ARRAY
+    ]
+    returned_addresses = [
+        cmd.operands[0].address
+        for cmd in subroutine.commands
+        if isinstance(cmd, ICmd) and cmd.instruction == GenericInstr.RET_ARR
+    ]
+    assert len(array_cmds) == 4
+    # The entanglement results array is allocated right after the outcomes array
+    assert returned_addresses == [outcomes.address, outcomes.address + 1]
+
+
 def test_branching():
     with DebugConnection("Alice") as conn:
 
@@ -294,3 +294,18 @@ def test_init_no_overwrite():
 #             results = runner.invoke(cli, ["qne", "logout"])
 #             assert results.exit_code == 0
 #             assert not os.path.exists(f"{self.path}/api_token")
+
+
+def test_simulate_profile_workers():
+    runner = CliRunner()
+    results = runner.invoke(cli, ["simulate", "--profile", "--workers", "2"])
+    assert results.exit_code != 0
+    assert "single worker" in results.output
+
+
+def test_simulate_trace_workers(tmpdir):
+    runner = CliRunner()
+    trace_file = str(tmpdir.join("trace.json"))
+    results = runner.invoke(cli, ["simulate", "--trace", trace_file, "--workers", "2"])
+    assert results.exit_code != 0
+    assert "single worker" in results.output
@@ -4,9 +4,10 @@ import pytest
 
 from netqasm.backend.executor import Executor
 from netqasm.lang.encoding import RegisterName
-from netqasm.lang.operand import Register
+from netqasm.lang.operand import Immediate, Register
 from netqasm.lang.parsing import parse_text_subroutine
 from netqasm.logging.glob import set_log_level
+from netqasm.runtime.settings import set_trusted_execution
 from netqasm.sdk.shared_memory import SharedMemoryManager
 
 
@@ -49,6 +50,29 @@ from netqasm.sdk.shared_memory import SharedMemoryManager
             Register(RegisterName.R, 0),
             10,
         ),
+        (
+            """
+        # NETQASM 1.0
+        # APPID 0
+        set R0 0
+        set R1 0
+        LOOP:
+        beq R1 3 EXIT
+        set R2 0
+        INNER:
+        beq R2 4 INNER_EXIT
+        add R0 R0 2
+        add R2 R2 1
+        jmp INNER
+        INNER_EXIT:
+        add R1 R1 1
+        jmp LOOP
+        EXIT:
+        add R0 R0 1
+        """,
+            Register(RegisterName.R, 0),
+            25,
+        ),
     ],
 )
 def test_executor(subroutine_str, expected_register, expected_output):
@@ -115,6 +139,109 @@ def test_failing_executor(subroutine_str, error_type, error_line):
     assert str(exc.value).startswith(f"At line {error_line}")
 
 
+def test_return_array_changes():
+    SharedMemoryManager.reset_memories()
+    executor = Executor()
+    executor.init_new_application(app_id=0, max_qubits=1)
+    memory = SharedMemoryManager.get_shared_memory(executor.name, key=0)
+
+    writes = []
+    for method_name in ["init_new_array", "set_array_part"]:
+        method = getattr(memory, method_name)
+
+        def record(*args, method=method, method_name=method_name, **kwargs):
+            writes.append((method_name, kwargs.get("index")))
+            method(*args, **kwargs)
+
+        setattr(memory, method_name, record)
+
+    def execute(subroutine_str):
+        writes.clear()
+        subroutine = parse_text_subroutine(
+            "# NETQASM 0.0\n# APPID 0\n" + subroutine_str
+        )
+        list(executor.execute_subroutine(subroutine=subroutine))
+
+    execute("array 10 @0\nset R0 1\nstore R0 @0[3]\nret_arr @0")
+    assert writes == [("init_new_array", None)]
+    assert executor.pop_returned_arrays(app_id=0) == {0: None}
+
+    # Only the entries that changed are returned
+    execute("set R0 2\nstore R0 @0[5]\nstore R0 @0[7]\nret_arr @0")
+    assert writes == [("set_array_part", slice(5, 8))]
+    assert executor.pop_returned_arrays(app_id=0) == {0: (5, 8)}
+    execute("ret_arr @0")
+    assert writes == []
+    assert executor.pop_returned_arrays(app_id=0) == {}
+    assert memory[0] == [None] * 3 + [1, None, 2, None, 2, None, None]
+
+    # Arrays that are initialized again are returned as a whole
+    execute("array 2 @0\nret_arr @0")
+    assert writes == [("init_new_array", None)]
+    assert memory[0] == [None, None]
+
+    # Returned entries are accumulated until they are popped
+    execute("store R0 @0[1]\nret_arr @0")
+    execute("store R0 @0[0]\nret_arr @0")
+    assert executor.pop_returned_arrays(app_id=0) == {0: None}
+    execute("store R0 @0[1]\nret_arr @0")
+    execute("store R0 @0[0]\nret_arr @0")
+    assert executor.pop_returned_arrays(app_id=0) == {0: (0, 2)}
+
+
+def test_invalid_branch_target():
+    subroutine = parse_text_subroutine("# NETQASM 0.0\n# APPID 0\nset R0 0\njmp 0")
+    subroutine.instructions[1].line = Immediate(-1)
+
+    SharedMemoryManager.reset_memories()
+    executor = Executor()
+    executor.init_new_application(app_id=0, max_qubits=1)
+
+    with pytest.raises(RuntimeError) as exc:
+        executor.consume_execute_subroutine(subroutine=subroutine)
+    assert str(exc.value).startswith("At line 1")
+
+
+@pytest.fixture
+def trusted_execution():
+    set_trusted_execution(True)
+    yield
+    set_trusted_execution(False)
+
+
+def test_trusted_executor(trusted_execution):
+    SharedMemoryManager.reset_memories()
+    executor = Executor()
+    executor.init_new_application(app_id=0, max_qubits=1)
+    memory = SharedMemoryManager.get_shared_memory(executor.name, key=0)
+    subroutine = parse_text_subroutine(
+        """
+        # NETQASM 0.0
+        # APPID 0
+        array 4 @0
+        set R0 0
+        LOOP:
+        beq R0 3 EXIT
+        store R0 @0[R0]
+        add R0 R0 1
+        jmp LOOP
+        EXIT:
+        store R0 @0[3]
+        load R1 @0[1]
+        undef @0[0]
+        ret_arr @0
+        """
+    )
+
+    executor.consume_execute_subroutine(subroutine=subroutine)
+    assert subroutine.verification is not None
+    assert subroutine.verification.verified
+    assert len(subroutine.verification.safe_array_accesses) == 3
+    assert memory[0] == [None, 1, 2, 3]
+    assert executor._get_register(0, Register(RegisterName.R, 1)) == 1
+    assert executor._verifications == {}
+
+
 if __name__ == "__main__":
     subroutine_str = """
         # NETQASM 1.0
@@ -0,0 +1,68 @@
+import importlib
+import subprocess
+import sys
+
+import pytest
+
+# Budgets (in microseconds) of the cumulative import time of a statement, as reported
+# by `python -X importtime`. They are generous, such that they hold on slow machines,
+# but are exceeded when e.g. SciPy or all of the SDK are imported eagerly again.
+IMPORT_TIME_BUDGETS = [
+    ("import netqasm", "netqasm", 100_000),
+    ("import netqasm.sdk", "netqasm.sdk", 250_000),
+    ("import netqasm.runtime.cli", "netqasm.runtime.cli", 600_000),
+]
+
+# Modules that should not be imported by a statement
+DEFERRED_MODULES = [
+    ("import netqasm.sdk", ["numpy", "scipy", "netqasm.sdk.connection"]),
+    ("from netqasm.sdk import Qubit", ["numpy", "scipy"]),
+    ("import netqasm.lang.instr", ["numpy", "scipy"]),
+    ("import netqasm.runtime.cli", ["scipy", "netqasm.sdk.connection"]),
+]
+
+
+def _run_importtime(statement):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines are formatted as "import time: <self> | <cumulative> | <module name>"
+    cumulative_times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        cumulative_times[name.strip()] = int(cumulative)
+    return cumulative_times
+
+
+@pytest.mark.parametrize("statement, module, budget", IMPORT_TIME_BUDGETS)
+def test_import_time_budget(statement, module, budget):
+    cumulative_times = _run_importtime(statement)
+    assert module in cumulative_times
+    assert cumulative_times[module] < budget, (
+        f"`{statement}` took {cumulative_times[module]} us, "
+        f"which exceeds the budget of {budget} us"
+    )
+
+
+@pytest.mark.parametrize("statement, modules", DEFERRED_MODULES)
+def test_deferred_imports(statement, modules):
+    imported = _run_importtime(statement)
+    for module in modules:
+        assert module not in imported, f"`{statement}` imports {module}"
+
+
+@pytest.mark.parametrize(
+    "package", ["netqasm.sdk", "netqasm.sdk.classical_communication"]
+)
+def test_star_import(package):
+    module = importlib.import_module(package)
+    namespace: dict = {}
+    exec(f"from {package} import *", namespace)
+    assert set(module.__all__) <= set(namespace)
+    for name in module.__all__:
+        assert namespace[name] is getattr(module, name)
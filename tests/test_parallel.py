@@ -0,0 +1,52 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from netqasm.runtime.parallel import SimulationSettings, simulate_rounds
+from netqasm.runtime.settings import Simulator
+
+APP_CODE = """
+def main(app_config=None):
+    return {}
+"""
+
+
+def fake_simulate_application(app_instance, num_rounds, log_cfg, **kwargs):
+    assert num_rounds == 1
+    assert [program.party for program in app_instance.app.programs] == ["alice"]
+    round_dir = os.path.basename(log_cfg.log_dir)
+    return round_dir, random.random(), int(np.random.randint(1000))
+
+
+@pytest.fixture
+def settings(tmpdir):
+    with open(os.path.join(tmpdir, "app_alice.py"), "w") as f:
+        f.write(APP_CODE)
+    return SimulationSettings(app_dir=str(tmpdir), simulator=Simulator.DEBUG)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_simulate_rounds(settings, workers):
+    results = simulate_rounds(
+        settings,
+        num_rounds=5,
+        workers=workers,
+        seed=42,
+        simulate_function=fake_simulate_application,
+    )
+    assert [round_dir for round_dir, _, _ in results] == [f"round{i}" for i in range(5)]
+    # Every round has its own random stream
+    assert len({value for _, value, _ in results}) == 5
+
+    # Results do not depend on the number of workers
+    serial_results = simulate_rounds(
+        settings, num_rounds=5, seed=42, simulate_function=fake_simulate_application
+    )
+    assert results == serial_results
+
+
+def test_simulate_rounds_workers(settings):
+    with pytest.raises(ValueError):
+        simulate_rounds(settings, num_rounds=1, workers=0)
@@ -77,26 +77,22 @@ ret_arr @0
                 address=Address(address=2),
             ),
             instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 3),
+                reg=Register(RegisterName.R, 4),
                 imm=Immediate(1),
             ),
             instructions.core.AddInstruction(
                 reg0=Register(RegisterName.R, 1),
                 reg1=Register(RegisterName.R, 2),
-                reg2=Register(RegisterName.R, 3),
-            ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 3),
-                imm=Immediate(0),
+                reg2=Register(RegisterName.R, 4),
             ),
             instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 4),
+                reg=Register(RegisterName.R, 5),
                 imm=Immediate(0),
             ),
             instructions.core.BeqInstruction(
-                reg0=Register(RegisterName.R, 3),
-                reg1=Register(RegisterName.R, 4),
-                imm=Immediate(11),
+                reg0=Register(RegisterName.R, 5),
+                reg1=Register(RegisterName.R, 5),
+                imm=Immediate(10),
             ),
             instructions.core.RetRegInstruction(
                 reg=Register(RegisterName.R, 0),
@@ -224,6 +220,39 @@ EXIT:
     print(repr(expected))
 
 
+def test_replace_constants():
+    subroutine = """
+# NETQASM 0.0
+# APPID 0
+set R0 0
+store R0 @0[1]
+store R0 @1[1]
+add R0 R0 1
+LOOP:
+beq R0 10 EXIT
+store R0 @0[1]
+add R0 R0 1
+jmp LOOP
+EXIT:
+ret_arr @0
+"""
+    subroutine = parse_text_subroutine(subroutine)
+    print(subroutine)
+    instrs = subroutine.instructions
+
+    # The constant 1 is set once and reused
+    sets = [i for i in instrs if isinstance(i, instructions.core.SetInstruction)]
+    assert [s.imm.value for s in sets] == [0, 1, 10]
+
+    # Constants in the loop are set before the loop, not in the loop body
+    beq = [i for i in instrs if isinstance(i, instructions.core.BeqInstruction)][0]
+    jmp = [i for i in instrs if isinstance(i, instructions.core.JmpInstruction)][0]
+    assert jmp.line == Immediate(instrs.index(beq))
+    assert isinstance(instrs[instrs.index(beq) - 1], instructions.core.SetInstruction)
+    loop_body = instrs[instrs.index(beq) : instrs.index(jmp)]
+    assert not any(isinstance(i, instructions.core.SetInstruction) for i in loop_body)
+
+
 def test_rotations():
     subroutine = """
 # NETQASM 0.0
@@ -0,0 +1,87 @@
+import pytest
+
+from netqasm.backend.executor import Executor
+from netqasm.backend.profiling import (
+    HISTOGRAM_BOUNDS,
+    ExecutorProfile,
+    LatencyStats,
+    get_profiles,
+    reset_profiles,
+)
+from netqasm.lang.parsing import parse_text_subroutine
+from netqasm.runtime.settings import set_profiling
+from netqasm.sdk.shared_memory import SharedMemoryManager
+
+
+@pytest.fixture
+def profiling():
+    SharedMemoryManager.reset_memories()
+    reset_profiles()
+    set_profiling(True)
+    yield
+    set_profiling(False)
+    reset_profiles()
+
+
+def test_latency_stats():
+    stats = LatencyStats()
+    for duration in [5e-7, 2e-6, 3e-6, 2.0]:
+        stats.add(duration)
+    assert stats.count == 4
+    assert stats.max_time == 2.0
+    assert stats.mean_time == pytest.approx((5e-7 + 2e-6 + 3e-6 + 2.0) / 4)
+    assert len(stats.histogram) == len(HISTOGRAM_BOUNDS) + 1
+    assert stats.histogram[:2] == [1, 2]
+    assert stats.histogram[-1] == 1
+    assert sum(stats.histogram) == 4
+
+
+def test_executor_profile(profiling):
+    subroutine = parse_text_subroutine(
+        """
+        # NETQASM 0.0
+        # APPID 0
+        array 2 @0
+        set R0 0
+        store R0 @0[0]
+        store R0 @0[1]
+        wait_all @0[0:2]
+        ret_arr @0
+        """
+    )
+    executor = Executor(name="alice")
+    executor.init_new_application(app_id=0, max_qubits=1)
+    for _ in range(3):
+        list(executor.execute_subroutine(subroutine=subroutine))
+
+    profile = executor.profile
+    assert profile is not None
+    assert get_profiles() == [profile]
+    instructions = profile.instructions[0]
+    assert instructions["StoreInstruction"].count == 6
+    assert instructions["WaitAllInstruction"].count == 3
+    assert profile.wait_time[0] == instructions["WaitAllInstruction"].total_time
+    assert profile.compute_time[0] == pytest.approx(
+        sum(
+            stats.total_time
+            for name, stats in instructions.items()
+            if name != "WaitAllInstruction"
+        )
+    )
+
+    summary = profile.summary()
+    assert "Profile of node alice" in summary
+    assert "StoreInstruction" in summary
+
+
+def test_epr_latencies():
+    profile = ExecutorProfile(node_name="alice")
+    profile.record_epr_pair(remote_node_id=1, purpose_id=0, latency=0.002)
+    profile.record_epr_pair(remote_node_id=1, purpose_id=0, latency=0.004)
+    assert profile.epr_latencies[1, 0].count == 2
+    assert profile.epr_latencies[1, 0].mean_time == pytest.approx(0.003)
+    assert "mean latency" in profile.summary()
+
+
+def test_disabled():
+    assert Executor().profile is None
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from scipy import linalg
+
+from netqasm.lang.encoding import RegisterName
+from netqasm.lang.instr import nv, vanilla
+from netqasm.lang.operand import Immediate, Register
+from netqasm.util.quantum_gates import (
+    CNOT,
+    PAULIS,
+    H,
+    X,
+    get_cached_controlled_rotation_matrix,
+    get_cached_rotation_matrix,
+    get_controlled_rotation_matrix,
+    get_rotation_matrix,
+)
+
+
+def _expm_rotation(axis, angle):
+    axis = np.array(axis) / np.linalg.norm(axis)
+    return linalg.expm(-1j * angle / 2 * sum(a * P for a, P in zip(axis, PAULIS)))
+
+
+@pytest.mark.parametrize(
+    "axis", [[1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 0], [0.3, -2, 1.5]]
+)
+@pytest.mark.parametrize("angle", [0, np.pi / 4, np.pi / 2, np.pi, -3, 7])
+def test_rotation_matrix(axis, angle):
+    assert np.allclose(get_rotation_matrix(axis, angle), _expm_rotation(axis, angle))
+
+    target_pos = _expm_rotation(axis, angle)
+    target_neg = _expm_rotation(axis, -angle)
+    expected = np.block(
+        [[target_pos, np.zeros((2, 2))], [np.zeros((2, 2)), target_neg]]
+    )
+    assert np.allclose(get_controlled_rotation_matrix(axis, angle), expected)
+
+
+def test_zero_axis():
+    with pytest.raises(ValueError):
+        get_rotation_matrix([0, 0, 0], 1)
+
+
+def test_cached_rotation_matrix():
+    matrix = get_cached_rotation_matrix((0, 1, 0), 3, 2)
+    assert np.allclose(matrix, _expm_rotation([0, 1, 0], 3 * np.pi / 4))
+    assert get_cached_rotation_matrix((0, 1, 0), 3, 2) is matrix
+    assert not matrix.flags.writeable
+
+    matrix = get_cached_controlled_rotation_matrix((1, 0, 0), 1, 1)
+    assert np.allclose(matrix, get_controlled_rotation_matrix([1, 0, 0], np.pi / 2))
+    assert not matrix.flags.writeable
+
+
+def test_static_matrices_are_shared_and_read_only():
+    for matrix in [X, H, CNOT]:
+        assert not matrix.flags.writeable
+        with pytest.raises(ValueError):
+            matrix[0, 0] = 2
+
+    instr = vanilla.GateHInstruction(reg=Register(RegisterName.Q, 0))
+    assert instr.to_matrix() is H
+
+
+@pytest.mark.parametrize(
+    "instr_class, axis",
+    [
+        (nv.ControlledRotXInstruction, [1, 0, 0]),
+        (nv.ControlledRotYInstruction, [0, 1, 0]),
+    ],
+)
+def test_controlled_rotation_instruction(instr_class, axis):
+    instr = instr_class(
+        reg0=Register(RegisterName.Q, 0),
+        reg1=Register(RegisterName.Q, 1),
+        imm0=Immediate(3),
+        imm1=Immediate(2),
+    )
+    angle = 3 * np.pi / 4
+    assert np.allclose(instr.to_matrix(), get_controlled_rotation_matrix(axis, angle))
+    assert np.allclose(instr.to_matrix_target_only(), _expm_rotation(axis, angle))
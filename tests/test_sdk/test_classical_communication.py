@@ -1,11 +1,41 @@
+import asyncio
 import logging
+import multiprocessing
+import os
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from timeit import default_timer as timer
 
+import numpy as np
 import pytest
 
 from netqasm.logging.glob import set_log_level
-from netqasm.sdk import ThreadSocket
+from netqasm.runtime.application import Application, ApplicationInstance, Program
+from netqasm.runtime.hardware import run_application, run_application_async
+from netqasm.sdk import AsyncBroadcastChannel, AsyncSocket, ThreadSocket
+from netqasm.sdk.classical_communication import (
+    BinaryCodec,
+    JsonCodec,
+    PassthroughCodec,
+    StreamSocket,
+    reset_async_socket_hub,
+    reset_connection_pool,
+)
+from netqasm.sdk.classical_communication.framing import (
+    FrameDecoder,
+    decode_frames,
+    encode_frames,
+)
+from netqasm.sdk.classical_communication.message import StructuredMessage
+from netqasm.sdk.classical_communication.socket import Socket
+from netqasm.sdk.classical_communication.stream_socket.registry import (
+    NAMESPACE_ENV,
+    REGISTRY_DIR_ENV,
+    _open_socket,
+    get_default_registry_dir,
+)
+from netqasm.util.yaml import load_yaml
 
 
 def execute_functions(functions):
@@ -16,8 +46,7 @@ def execute_functions(functions):
             future = executor.submit(function)
             futures.append(future)
 
-        for future in futures:
-            future.result()
+        return [future.result() for future in futures]
 
 
 def test_init_error():
@@ -210,6 +239,474 @@ def test_ping_pong_counter_callbacks():
     execute_functions([alice, bob])
 
 
+@pytest.mark.parametrize(
+    "codec, expected_payload",
+    [
+        (None, [[0, 1], [2, 3]]),
+        (JsonCodec(), [[0, 1], [2, 3]]),
+        (BinaryCodec(), np.array([[0, 1], [2, 3]], dtype=np.uint8)),
+        (PassthroughCodec(), np.array([[0, 1], [2, 3]], dtype=np.uint8)),
+        (PassthroughCodec(copy=True), np.array([[0, 1], [2, 3]], dtype=np.uint8)),
+    ],
+)
+def test_send_recv_structured(codec, expected_payload):
+    payload = np.array([[0, 1], [2, 3]], dtype=np.uint8)
+
+    def alice():
+        socket = ThreadSocket("alice", "bob", codec=codec)
+        socket.send_structured(StructuredMessage("outcomes", payload))
+
+    def bob():
+        socket = ThreadSocket("bob", "alice", codec=codec)
+        msg = socket.recv_structured(timeout=1)
+        assert msg.header == "outcomes"
+        assert type(msg.payload) == type(expected_payload)
+        assert np.array_equal(msg.payload, expected_payload)
+        if isinstance(expected_payload, np.ndarray):
+            assert msg.payload.dtype == expected_payload.dtype
+        # Only a passthrough codec without copying hands over the object itself
+        same_object = isinstance(codec, PassthroughCodec) and codec.encode(msg) is msg
+        assert (msg.payload is payload) == same_object
+
+    execute_functions([alice, bob])
+
+
+def test_recv_structured_wrong_codec():
+    def alice():
+        socket = ThreadSocket("alice", "bob", codec=BinaryCodec())
+        socket.send_structured(StructuredMessage("header", "payload"))
+
+    def bob():
+        socket = ThreadSocket("bob", "alice", codec=JsonCodec())
+        with pytest.raises(RuntimeError):
+            socket.recv_structured(timeout=1)
+
+    execute_functions([alice, bob])
+
+
+def test_send_recv_many():
+    msgs = [f"msg{i}" for i in range(10)]
+
+    def alice():
+        socket = ThreadSocket("alice", "bob")
+        socket.send_many(msgs[:5])
+        socket.send("msg5")
+        socket.send_many(msgs[6:])
+
+    def bob():
+        socket = ThreadSocket("bob", "alice")
+        assert socket.recv(timeout=1) == msgs[0]
+        received = socket.recv_many(max_n=3, timeout=1)
+        assert received == msgs[1:4]
+        while len(received) < len(msgs) - 1:
+            received += socket.recv_many(timeout=1)
+        assert received == msgs[1:]
+        with pytest.raises(RuntimeError):
+            socket.recv_many(block=False)
+
+    execute_functions([alice, bob])
+
+
+def test_recv_many_structured():
+    def alice():
+        socket = ThreadSocket("alice", "bob", codec=BinaryCodec())
+        socket.send_structured(StructuredMessage("header", "payload"))
+        socket.send("a")
+
+    def bob():
+        socket = ThreadSocket("bob", "alice", codec=BinaryCodec())
+        # The structured message is not lost when trying to receive a str
+        with pytest.raises(RuntimeError):
+            socket.recv_many(timeout=1)
+        with pytest.raises(RuntimeError):
+            socket.recv(timeout=1)
+        assert socket.recv_structured(timeout=1).payload == "payload"
+        assert socket.recv_many(timeout=1) == ["a"]
+
+    execute_functions([alice, bob])
+
+
+class _StreamSocket(Socket):
+    """Socket that joins all sent data, like a stream transport might do"""
+
+    def __init__(self):
+        self.data = ""
+        self.chunk_size = 3
+
+    def send(self, msg):
+        self.data += msg
+
+    def recv(self, block=True, timeout=None, maxsize=None):
+        if len(self.data) == 0:
+            raise RuntimeError("No message")
+        chunk, self.data = self.data[: self.chunk_size], self.data[self.chunk_size :]
+        return chunk
+
+
+def test_default_send_recv_many():
+    socket = _StreamSocket()
+    socket.send_many(["hello", "", "a:b"])
+    socket.send_many(["12:x"])
+    assert socket.recv_many(max_n=1) == ["hello"]
+    received = []
+    while len(received) < 3:
+        received += socket.recv_many()
+    assert received == ["", "a:b", "12:x"]
+    with pytest.raises(TypeError):
+        socket.send_many([1])
+
+
+def test_framing():
+    msgs = ["hello", "", "a:b", "12:x"]
+    data = encode_frames(msgs)
+    assert decode_frames(data) == msgs
+    with pytest.raises(ValueError):
+        decode_frames(data[:-1])
+    with pytest.raises(ValueError):
+        decode_frames("x:hello")
+
+    decoder = FrameDecoder()
+    for char in data:
+        decoder.feed(char)
+    assert len(decoder) == len(msgs)
+    assert not decoder.has_partial_frame
+    assert decoder.pop(3) == msgs[:3]
+    assert decoder.pop() == msgs[3:]
+
+
+@pytest.fixture
+def registry_dir(tmpdir):
+    yield str(tmpdir)
+    reset_connection_pool()
+
+
+@pytest.mark.parametrize("family", ["unix", "tcp"])
+def test_stream_socket_send_recv(registry_dir, family):
+    payload = np.arange(10**5)
+
+    def alice():
+        socket = StreamSocket(
+            "alice",
+            "bob",
+            timeout=5,
+            codec=BinaryCodec(),
+            family=family,
+            registry_dir=registry_dir,
+        )
+        socket.send("hello")
+        socket.send_many(["a", "b", "c"])
+        socket.send_structured(StructuredMessage("payload", payload))
+        assert socket.recv(timeout=1) == "bye"
+
+    def bob():
+        socket = StreamSocket(
+            "bob",
+            "alice",
+            timeout=5,
+            codec=BinaryCodec(),
+            family=family,
+            registry_dir=registry_dir,
+        )
+        assert socket.recv(timeout=1) == "hello"
+        received = socket.recv_many(max_n=2, timeout=1)
+        assert received == ["a", "b"][: len(received)]
+        while len(received) < 3:
+            received += socket.recv_many(timeout=1)
+        assert received == ["a", "b", "c"]
+        msg = socket.recv_structured(timeout=1)
+        assert np.array_equal(msg.payload, payload)
+        with pytest.raises(RuntimeError):
+            socket.recv(block=False)
+        with pytest.raises(TimeoutError):
+            socket.recv(timeout=0.1)
+        socket.send("bye")
+
+    execute_functions([alice, bob])
+
+    # Creating the sockets again reuses the pooled connections
+    def alice_again():
+        socket = StreamSocket("alice", "bob", timeout=1, registry_dir=registry_dir)
+        socket.send("again")
+
+    def bob_again():
+        socket = StreamSocket("bob", "alice", timeout=1, registry_dir=registry_dir)
+        assert socket.recv(timeout=1) == "again"
+
+    execute_functions([alice_again, bob_again])
+
+
+def test_stream_socket_errors(registry_dir):
+    with pytest.raises(ValueError):
+        StreamSocket("alice", "alice", registry_dir=registry_dir)
+    with pytest.raises(ValueError):
+        StreamSocket(
+            "alice", "bob", codec=PassthroughCodec(), registry_dir=registry_dir
+        )
+    with pytest.raises(TimeoutError):
+        StreamSocket("alice", "bob", timeout=0.1, registry_dir=registry_dir)
+    with pytest.raises(TimeoutError):
+        StreamSocket("bob", "alice", timeout=0.1, registry_dir=registry_dir)
+
+
+def test_stream_socket_recv_mixed(registry_dir):
+    def alice():
+        socket = StreamSocket("alice", "bob", timeout=5, registry_dir=registry_dir)
+        socket.send_structured(StructuredMessage("header", "payload"))
+        socket.send("hello")
+
+    def bob():
+        socket = StreamSocket("bob", "alice", timeout=5, registry_dir=registry_dir)
+        # Messages of another kind are left to be received
+        with pytest.raises(RuntimeError):
+            socket.recv_silent(timeout=5)
+        assert socket.recv_structured(timeout=5) == StructuredMessage(
+            "header", "payload"
+        )
+        with pytest.raises(RuntimeError):
+            socket.recv_structured(timeout=5)
+        assert socket.recv(timeout=5) == "hello"
+
+    execute_functions([alice, bob])
+
+
+def test_stream_socket_silent_connection(registry_dir):
+    def bob():
+        socket = StreamSocket("bob", "alice", timeout=5, registry_dir=registry_dir)
+        assert socket.recv(timeout=5) == "hello"
+
+    def alice():
+        # A connection that never identifies itself does not delay other connections
+        address_path = os.path.join(registry_dir, "bob.addr")
+        while not os.path.exists(address_path):
+            time.sleep(0.01)
+        with open(address_path) as f:
+            silent = _open_socket(f.read())
+        try:
+            t_start = timer()
+            socket = StreamSocket("alice", "bob", timeout=5, registry_dir=registry_dir)
+            socket.send("hello")
+        finally:
+            silent.close()
+        return timer() - t_start
+
+    _, duration = execute_functions([bob, alice])
+    assert duration < 1
+
+
+def test_default_registry_dir(monkeypatch, tmpdir):
+    monkeypatch.setenv(REGISTRY_DIR_ENV, str(tmpdir))
+    monkeypatch.delenv(NAMESPACE_ENV, raising=False)
+    assert get_default_registry_dir() == str(tmpdir)
+    monkeypatch.setenv(NAMESPACE_ENV, "run")
+    assert get_default_registry_dir() == os.path.join(str(tmpdir), "run")
+
+
+def _echo_stream_socket(registry_dir, num):
+    socket = StreamSocket("bob", "alice", timeout=5, registry_dir=registry_dir)
+    for _ in range(num):
+        socket.send(socket.recv(timeout=5))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+def test_stream_socket_processes(registry_dir):
+    num = 10
+    process = multiprocessing.get_context("fork").Process(
+        target=_echo_stream_socket, args=(registry_dir, num)
+    )
+    process.start()
+    try:
+        socket = StreamSocket("alice", "bob", timeout=5, registry_dir=registry_dir)
+        for i in range(num):
+            socket.send(str(i))
+            assert socket.recv(timeout=5) == str(i)
+    finally:
+        process.join(timeout=5)
+    assert process.exitcode == 0
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+def test_stream_socket_reconnect(registry_dir):
+    ctx = multiprocessing.get_context("fork")
+    for i in range(2):
+        # The remote application is started again in a new process for every round
+        process = ctx.Process(target=_echo_stream_socket, args=(registry_dir, 1))
+        process.start()
+        try:
+            socket = StreamSocket("alice", "bob", timeout=5, registry_dir=registry_dir)
+            socket.send(str(i))
+            assert socket.recv(timeout=5) == str(i)
+        finally:
+            process.join(timeout=5)
+        assert process.exitcode == 0
+        t_start = timer()
+        while socket.connected and timer() - t_start < 5:
+            time.sleep(0.01)
+        assert not socket.connected
+
+
+def test_async_send_recv():
+    async def alice():
+        socket = AsyncSocket("alice", "bob")
+        await socket.send("hello")
+        return await socket.recv(timeout=1)
+
+    async def bob():
+        socket = AsyncSocket("bob", "alice")
+        msg = await socket.recv(timeout=1)
+        await socket.send(msg + " back")
+
+    async def run():
+        reset_async_socket_hub()
+        return await asyncio.gather(alice(), bob())
+
+    assert asyncio.run(run()) == ["hello back", None]
+
+
+def test_async_recv_block():
+    async def run():
+        reset_async_socket_hub()
+        socket = AsyncSocket("bob", "alice")
+        with pytest.raises(RuntimeError):
+            await socket.recv(block=False)
+        with pytest.raises(TimeoutError):
+            await socket.recv(timeout=0.1)
+        with pytest.raises(TypeError):
+            await socket.send(0)
+
+    asyncio.run(run())
+
+
+def test_async_recv_mixed():
+    async def alice():
+        socket = AsyncSocket("alice", "bob")
+        await asyncio.sleep(0.01)
+        await socket.send_structured(StructuredMessage("header", "payload"))
+        await socket.send("hello")
+
+    async def bob():
+        socket = AsyncSocket("bob", "alice")
+        # Messages of another kind are left to be received
+        with pytest.raises(RuntimeError):
+            await socket.recv(timeout=1)
+        with pytest.raises(RuntimeError):
+            await socket.recv_silent(block=False)
+        msg = await socket.recv_structured(timeout=1)
+        assert msg == StructuredMessage("header", "payload")
+        return await socket.recv(timeout=1)
+
+    async def run():
+        reset_async_socket_hub()
+        return await asyncio.gather(alice(), bob())
+
+    assert asyncio.run(run()) == [None, "hello"]
+
+
+def test_async_broadcast():
+    names = ["alice", "bob", "charlie"]
+
+    async def node(name):
+        channel = AsyncBroadcastChannel(name, [n for n in names if n != name])
+        await channel.send(name)
+        received = [await channel.recv(timeout=1) for _ in range(len(names) - 1)]
+        with pytest.raises(RuntimeError):
+            await channel.recv(block=False)
+        return sorted(sender for sender, msg in received if sender == msg)
+
+    async def run():
+        reset_async_socket_hub()
+        return await asyncio.gather(*[node(name) for name in names])
+
+    results = asyncio.run(run())
+    assert results == [["bob", "charlie"], ["alice", "charlie"], ["alice", "bob"]]
+
+
+def create_app_instance(entries):
+    programs = [
+        Program(party=party, entry=entry, args=[], results=["counter"])
+        for party, entry in entries
+    ]
+    return ApplicationInstance(
+        app=Application(programs=programs, metadata=None),
+        program_inputs={program.party: {} for program in programs},
+        network=None,
+        party_alloc={program.party: program.party for program in programs},
+        logging_cfg=None,
+    )
+
+
+def test_run_application_async(tmpdir):
+    max_value = 10
+
+    async def alice():
+        socket = AsyncSocket("alice", "bob")
+        counter = 0
+        while counter < max_value:
+            await socket.send(str(counter))
+            counter = int(await socket.recv()) + 1
+        return {"counter": counter}
+
+    async def bob():
+        socket = AsyncSocket("bob", "alice")
+        counter = 0
+        while counter < max_value - 1:
+            counter = int(await socket.recv()) + 1
+            await socket.send(str(counter))
+        return {"counter": counter}
+
+    def charlie():
+        # Synchronous programs are run in an executor
+        return {"counter": 0}
+
+    app_instance = create_app_instance(
+        [("alice", alice), ("bob", bob), ("charlie", charlie)]
+    )
+    results_file = os.path.join(tmpdir, "results.yaml")
+    run_application_async(app_instance, results_file=results_file, use_app_config=False)
+    assert load_yaml(results_file) == {
+        "app_alice": {"counter": 10},
+        "app_bob": {"counter": 9},
+        "app_charlie": {"counter": 0},
+    }
+
+
+@pytest.mark.parametrize("run", [run_application, run_application_async])
+def test_run_application_error(run):
+    # The error of alice is raised, even though bob keeps waiting for her
+    released = threading.Event()
+
+    def alice():
+        raise ValueError("alice failed")
+
+    def bob():
+        released.wait()
+        return {"counter": 0}
+
+    entries = [("alice", alice), ("bob", bob)]
+    try:
+        with pytest.raises(ValueError, match="alice failed"):
+            run(create_app_instance(entries), use_app_config=False)
+    finally:
+        released.set()
+
+
+def test_run_application_async_many_programs():
+    # All synchronous programs run at the same time, even if there are more of them
+    # than workers in the default executor of the event loop
+    num_programs = 50
+    barrier = threading.Barrier(num_programs, timeout=10)
+
+    def program():
+        barrier.wait()
+        return {"counter": 0}
+
+    entries = [(f"party{i}", program) for i in range(num_programs)]
+    run_application_async(create_app_instance(entries), use_app_config=False)
+
+
 if __name__ == "__main__":
     set_log_level(logging.DEBUG)
     test_connect()
@@ -177,28 +177,17 @@ def test_epr_k_create():
 # APPID 0
 set R0 10
 array R0 @0
-set R0 1
-array R0 @1
-set R0 0
-set R1 0
-store R0 @1[R1]
-set R0 20
-array R0 @2
-set R0 0
-set R1 0
-store R0 @2[R1]
-set R0 1
 set R1 1
-store R0 @2[R1]
-set R0 1
-set R1 0
-set R2 1
-set R3 2
-set R4 0
-create_epr R0 R1 R2 R3 R4
-set R0 0
-set R1 10
-wait_all @0[R0:R1]
+array R1 @1
+set R2 0
+store R2 @1[R2]
+set R3 20
+array R3 @2
+store R2 @2[R2]
+store R1 @2[R1]
+set R4 2
+create_epr R1 R2 R1 R4 R2
+wait_all @0[R2:R0]
 set Q0 0
 h Q0
 ret_arr @0
@@ -238,51 +227,38 @@ def test_epr_k_recv():
 # APPID 0
 set R5 10
 array R5 @0
-set R5 1
-array R5 @1
-set R5 0
-set R6 0
-store R5 @1[R6]
-set R5 1
-set R6 0
-set R7 1
-set R8 0
-recv_epr R5 R6 R7 R8
-set R5 0
-set R6 10
-wait_all @0[R5:R6]
+set R6 1
+array R6 @1
+set R7 0
+store R7 @1[R7]
+recv_epr R6 R7 R6 R7
+wait_all @0[R7:R5]
 set R2 0
-set R5 1
-beq R2 R5 42
+set R7 3
+set R8 2
+beq R2 R6 30
 load R0 @1[R2]
 set R3 9
 set R4 0
-beq R4 R2 27
-set R5 10
+beq R4 R2 19
 add R3 R3 R5
-set R5 1
-add R4 R4 R5
-jmp 21
+add R4 R4 R6
+jmp 15
 load R1 @0[R3]
 set R0 0
-set R5 3
-bne R1 R5 32
+bne R1 R7 23
 rot_z R0 16 4
-set R5 1
-bne R1 R5 35
+bne R1 R6 25
 rot_x R0 16 4
-set R5 2
-bne R1 R5 39
+bne R1 R8 28
 rot_x R0 16 4
 rot_z R0 16 4
-set R5 1
-add R2 R2 R5
-jmp 16
+add R2 R2 R6
+jmp 11
 set Q0 0
 h Q0
 ret_arr @0
 ret_arr @1
-ret_arr @2
 """
 
     expected = parse_text_subroutine(expected_text)
@@ -318,31 +294,17 @@ def test_two_epr_k_create():
 # APPID 0
 set R0 20
 array R0 @0
-set R0 2
-array R0 @1
-set R0 0
-set R1 0
-store R0 @1[R1]
-set R0 1
-set R1 1
-store R0 @1[R1]
-set R0 20
+set R1 2
+array R1 @1
+set R2 0
+store R2 @1[R2]
+set R3 1
+store R3 @1[R3]
 array R0 @2
-set R0 0
-set R1 0
-store R0 @2[R1]
-set R0 2
-set R1 1
-store R0 @2[R1]
-set R0 1
-set R1 0
-set R2 1
-set R3 2
-set R4 0
-create_epr R0 R1 R2 R3 R4
-set R0 0
-set R1 20
-wait_all @0[R0:R1]
+store R2 @2[R2]
+store R1 @2[R3]
+create_epr R3 R2 R3 R1 R2
+wait_all @0[R2:R0]
 set Q0 0
 h Q0
 set Q0 1
@@ -350,7 +312,7 @@ h Q0
 ret_arr @0
 ret_arr @1
 ret_arr @2
-    """
+"""
 
     expected = parse_text_subroutine(expected_text)
 
@@ -384,57 +346,43 @@ def test_two_epr_k_recv():
 # APPID 0
 set R5 20
 array R5 @0
-set R5 2
-array R5 @1
-set R5 0
-set R6 0
-store R5 @1[R6]
-set R5 1
-set R6 1
-store R5 @1[R6]
-set R5 1
-set R6 0
-set R7 1
-set R8 0
-recv_epr R5 R6 R7 R8
-set R5 0
-set R6 20
-wait_all @0[R5:R6]
+set R6 2
+array R6 @1
+set R7 0
+store R7 @1[R7]
+set R8 1
+store R8 @1[R8]
+recv_epr R8 R7 R8 R7
+wait_all @0[R7:R5]
 set R2 0
-set R5 2
-beq R2 R5 45
+set R5 10
+set R7 3
+beq R2 R6 32
 load R0 @1[R2]
 set R3 9
 set R4 0
-beq R4 R2 30
-set R5 10
+beq R4 R2 21
 add R3 R3 R5
-set R5 1
-add R4 R4 R5
-jmp 24
+add R4 R4 R8
+jmp 17
 load R1 @0[R3]
 set R0 0
-set R5 3
-bne R1 R5 35
+bne R1 R7 25
 rot_z R0 16 4
-set R5 1
-bne R1 R5 38
+bne R1 R8 27
 rot_x R0 16 4
-set R5 2
-bne R1 R5 42
+bne R1 R6 30
 rot_x R0 16 4
 rot_z R0 16 4
-set R5 1
-add R2 R2 R5
-jmp 19
+add R2 R2 R8
+jmp 13
 set Q0 0
 h Q0
 set Q0 1
 h Q0
 ret_arr @0
 ret_arr @1
-ret_arr @2
-    """
+"""
 
     expected = parse_text_subroutine(expected_text)
 
@@ -478,129 +426,87 @@ def test_epr_m():
             ),
             # ent info array
             instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
+                reg=Register(RegisterName.R, 2),
                 imm=Immediate(CREATE_FIELDS),
             ),
             instructions.core.ArrayInstruction(
-                reg=Register(RegisterName.R, 1),
+                reg=Register(RegisterName.R, 2),
                 address=Address(1),
             ),
             # tp arg
             instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
+                reg=Register(RegisterName.R, 3),
                 imm=Immediate(1),
             ),
             instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 2),
+                reg=Register(RegisterName.R, 4),
                 imm=Immediate(0),
             ),
             instructions.core.StoreInstruction(
-                reg=Register(RegisterName.R, 1),
-                entry=ArrayEntry(1, index=Register(RegisterName.R, 2)),
+                reg=Register(RegisterName.R, 3),
+                entry=ArrayEntry(
+                    address=Address(1),
+                    index=Register(RegisterName.R, 4),
+                ),
             ),
             # num pairs arg
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
-                imm=Immediate(1),
-            ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 2),
-                imm=Immediate(1),
-            ),
             instructions.core.StoreInstruction(
-                reg=Register(RegisterName.R, 1),
-                entry=ArrayEntry(1, index=Register(RegisterName.R, 2)),
-            ),
-            # create cmd
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
-                imm=Immediate(1),
-            ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 2),
-                imm=Immediate(0),
-            ),
-            instructions.core.SetInstruction(
                 reg=Register(RegisterName.R, 3),
-                imm=Immediate(1),
-            ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 4),
-                imm=Immediate(0),
+                entry=ArrayEntry(
+                    address=Address(1),
+                    index=Register(RegisterName.R, 3),
+                ),
             ),
+            # create cmd
             instructions.core.CreateEPRInstruction(
-                reg0=Register(RegisterName.R, 1),
-                reg1=Register(RegisterName.R, 2),
+                reg0=Register(RegisterName.R, 3),
+                reg1=Register(RegisterName.R, 4),
                 reg2=Register(RegisterName.C, 0),
                 reg3=Register(RegisterName.R, 3),
                 reg4=Register(RegisterName.R, 4),
             ),
             # wait cmd
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
-                imm=Immediate(0),
-            ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 2),
-                imm=Immediate(OK_FIELDS),
-            ),
             instructions.core.WaitAllInstruction(
                 slice=ArraySlice(
                     address=Address(0),
-                    start=Register(RegisterName.R, 1),
-                    stop=Register(RegisterName.R, 2),
+                    start=Register(RegisterName.R, 4),
+                    stop=Register(RegisterName.R, 1),
                 ),
             ),
             # if statement
             instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
+                reg=Register(RegisterName.R, 5),
                 imm=Immediate(2),
             ),
             instructions.core.LoadInstruction(
                 reg=Register(RegisterName.R, 0),
                 entry=ArrayEntry(
                     address=Address(0),
-                    index=Register(RegisterName.R, 1),
+                    index=Register(RegisterName.R, 5),
                 ),
             ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
-                imm=Immediate(0),
-            ),
             instructions.core.BneInstruction(
                 reg0=Register(RegisterName.R, 0),
-                reg1=Register(RegisterName.R, 1),
-                imm=Immediate(28),
-            ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
-                imm=Immediate(2),
+                reg1=Register(RegisterName.R, 4),
+                imm=Immediate(16),
             ),
             instructions.core.LoadInstruction(
                 reg=Register(RegisterName.R, 0),
                 entry=ArrayEntry(
                     address=Address(0),
-                    index=Register(RegisterName.R, 1),
+                    index=Register(RegisterName.R, 5),
                 ),
             ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
-                imm=Immediate(1),
-            ),
             instructions.core.AddInstruction(
                 reg0=Register(RegisterName.R, 0),
                 reg1=Register(RegisterName.R, 0),
-                reg2=Register(RegisterName.R, 1),
-            ),
-            instructions.core.SetInstruction(
-                reg=Register(RegisterName.R, 1),
-                imm=Immediate(2),
+                reg2=Register(RegisterName.R, 3),
             ),
             instructions.core.StoreInstruction(
                 reg=Register(RegisterName.R, 0),
                 entry=ArrayEntry(
                     address=Address(0),
-                    index=Register(RegisterName.R, 1),
+                    index=Register(RegisterName.R, 5),
                 ),
             ),
             # return cmds
@@ -643,35 +549,23 @@ def test_epr_r_create():
 # APPID 0
 set R1 10
 array R1 @0
-set R1 20
-array R1 @1
-set R1 2
-set R2 0
-store R1 @1[R2]
-set R1 1
-set R2 1
-store R1 @1[R2]
-set R1 1
-set R2 0
-set R3 1
+set R2 20
+array R2 @1
+set R3 2
 set R4 0
-create_epr R1 R2 C0 R3 R4
-set R1 0
-set R2 10
-wait_all @0[R1:R2]
-set R1 2
-load R0 @0[R1]
-set R1 0
-bne R0 R1 28
-set R1 2
-load R0 @0[R1]
-set R1 1
-add R0 R0 R1
-set R1 2
-store R0 @0[R1]
+store R3 @1[R4]
+set R5 1
+store R5 @1[R5]
+create_epr R5 R4 C0 R5 R4
+wait_all @0[R4:R1]
+load R0 @0[R3]
+bne R0 R4 16
+load R0 @0[R3]
+add R0 R0 R5
+store R0 @0[R3]
 ret_arr @0
 ret_arr @1
-    """
+"""
 
     expected = parse_text_subroutine(expected_text)
 
@@ -704,49 +598,37 @@ def test_epr_r_receive():
 # APPID 0
 set R5 10
 array R5 @0
-set R5 1
-array R5 @1
-set R5 0
-set R6 0
-store R5 @1[R6]
-set R5 1
-set R6 0
-set R7 1
-set R8 0
-recv_epr R5 R6 R7 R8
-set R5 0
-set R6 10
-wait_all @0[R5:R6]
+set R6 1
+array R6 @1
+set R7 0
+store R7 @1[R7]
+recv_epr R6 R7 R6 R7
+wait_all @0[R7:R5]
 set R2 0
-set R5 1
-beq R2 R5 42
+set R7 3
+set R8 2
+beq R2 R6 30
 load R0 @1[R2]
 set R3 9
 set R4 0
-beq R4 R2 27
-set R5 10
+beq R4 R2 19
 add R3 R3 R5
-set R5 1
-add R4 R4 R5
-jmp 21
+add R4 R4 R6
+jmp 15
 load R1 @0[R3]
 set R0 0
-set R5 3
-bne R1 R5 32
+bne R1 R7 23
 rot_z R0 16 4
-set R5 1
-bne R1 R5 35
+bne R1 R6 25
 rot_x R0 16 4
-set R5 2
-bne R1 R5 39
+bne R1 R8 28
 rot_x R0 16 4
 rot_z R0 16 4
-set R5 1
-add R2 R2 R5
-jmp 16
+add R2 R2 R6
+jmp 11
 ret_arr @0
 ret_arr @1
-    """
+"""
 
     expected = parse_text_subroutine(expected_text)
 
@@ -780,40 +662,28 @@ def test_epr_max_time():
 # APPID 0
 set R0 10
 array R0 @0
-set R0 1
-array R0 @1
-set R0 0
-set R1 0
-store R0 @1[R1]
-set R0 20
-array R0 @2
-set R0 0
-set R1 0
-store R0 @2[R1]
-set R0 1
 set R1 1
-store R0 @2[R1]
-set R0 1
-set R1 5
-store R0 @2[R1]
-set R0 25
-set R1 6
-store R0 @2[R1]
-set R0 1
-set R1 0
-set R2 1
-set R3 2
-set R4 0
-create_epr R0 R1 R2 R3 R4
-set R0 0
-set R1 10
-wait_all @0[R0:R1]
+array R1 @1
+set R2 0
+store R2 @1[R2]
+set R3 20
+array R3 @2
+store R2 @2[R2]
+store R1 @2[R1]
+set R4 5
+store R1 @2[R4]
+set R5 25
+set R6 6
+store R5 @2[R6]
+set R7 2
+create_epr R1 R2 R1 R7 R2
+wait_all @0[R2:R0]
 set Q0 0
 h Q0
 ret_arr @0
 ret_arr @1
 ret_arr @2
-    """
+"""
 
     expected = parse_text_subroutine(expected_text)
 
@@ -0,0 +1,259 @@
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+from netqasm.backend.executor import Executor
+from netqasm.lang.encoding import RegisterName
+from netqasm.lang.instr.core import BranchBinaryInstruction, RetArrInstruction
+from netqasm.lang.subroutine import Subroutine
+from netqasm.sdk.async_connection import AsyncNetQASMConnection
+from netqasm.sdk.connection import DebugConnection
+from netqasm.sdk.futures import NoValueError
+from netqasm.sdk.qubit import Qubit
+from netqasm.sdk.shared_memory import SharedMemory, SharedMemoryManager
+
+
+class ExecutingConnection(DebugConnection):
+    """Connection that executes subroutines directly using an Executor."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        SharedMemoryManager.reset_memories()
+        self.executor = Executor(name="test")
+        self.subroutines: List[Subroutine] = []
+        super().__init__("test", *args, **kwargs)
+
+    def _init_new_app(self, max_qubits):
+        self.executor.init_new_application(app_id=self.app_id, max_qubits=max_qubits)
+
+    @property
+    def shared_memory(self) -> SharedMemory:
+        return self.executor._shared_memories[self.app_id]
+
+    def commit_subroutine(self, subroutine, block=True, callback=None):
+        self.subroutines.append(subroutine)
+        list(self.executor.execute_subroutine(subroutine=subroutine))
+
+
+class ThreadedExecutingConnection(ExecutingConnection):
+    """Connection that executes subroutines in a separate thread if not blocking."""
+
+    def commit_subroutine(self, subroutine, block=True, callback=None):
+        if block:
+            return super().commit_subroutine(subroutine)
+
+        def execute():
+            super(ThreadedExecutingConnection, self).commit_subroutine(subroutine)
+            if callback is not None:
+                callback()
+
+        threading.Timer(0.05, execute).start()
+
+
+def prepare_plus(conn):
+    q = Qubit(conn)
+    q.H()
+    return q
+
+
+def test_tomography():
+    conn = ExecutingConnection()
+    freqs = conn.tomography(prepare_plus, iterations=25, progress=False)
+    # The Executor without a quantum backend always measures 0
+    assert freqs == {"X": 0, "Y": 0, "Z": 0}
+    assert len(conn.subroutines) == 3
+    # All outcomes were written to the same result array
+    assert conn.shared_memory.get_array_view(0).count() == 25
+    assert not conn.shared_memory.has_array(1)
+
+
+def test_tomography_chunks():
+    conn = ExecutingConnection()
+    conn.tomography(prepare_plus, iterations=25, progress=False, chunk_size=10)
+    assert len(conn.subroutines) == 9
+
+    # Subroutines have the same size, independent of the number of iterations
+    sizes = [len(subroutine.instructions) for subroutine in conn.subroutines]
+    assert max(sizes) <= 20
+
+
+def test_tomography_many_iterations(monkeypatch):
+    # Limit the length of arrays, such that the chunk size is derived from it
+    monkeypatch.setattr(SharedMemory, "max_array_length", 1000)
+    conn = ExecutingConnection()
+    freqs = conn.tomography(prepare_plus, iterations=4500, progress=False)
+    assert freqs == {"X": 0, "Y": 0, "Z": 0}
+    assert len(conn.subroutines) == 15
+
+    # A single result array is used by all subroutines
+    assert conn.shared_memory.get_array_view(0).count() == 500
+    assert not conn.shared_memory.has_array(1)
+
+
+def test_tomography_missing_outcome():
+    class LosingConnection(ExecutingConnection):
+        def commit_subroutine(self, subroutine, block=True, callback=None):
+            super().commit_subroutine(subroutine, block=block, callback=callback)
+            self.shared_memory.set_array_part(address=0, index=0, value=None)
+
+    conn = LosingConnection()
+    with pytest.raises(NoValueError):
+        conn.tomography(prepare_plus, iterations=25, progress=False)
+
+
+def test_auto_flush_meas_registers():
+    conn = ExecutingConnection()
+    with pytest.raises(RuntimeError):
+        for _ in range(20):
+            Qubit(conn).measure(store_array=False)
+
+    conn = ExecutingConnection(auto_flush=True)
+    outcomes = [Qubit(conn).measure(store_array=False) for _ in range(20)]
+    conn.flush()
+    assert len(conn.subroutines) == 2
+    assert all(m.value == 0 for m in outcomes)
+
+
+def test_auto_flush_condition_on_earlier_outcome():
+    conn = ExecutingConnection(auto_flush=True)
+    outcomes = [Qubit(conn).measure(store_array=False) for _ in range(20)]
+    result = conn.new_array(1)
+    with outcomes[0].if_eq(0):
+        Qubit(conn).measure(future=result.get_future_index(0))
+    conn.flush()
+    assert len(conn.subroutines) == 2
+    assert result.get_values() == [0]
+
+    # The M-register of the first outcome is re-used by the second subroutine, so
+    # the returned value is used instead
+    branches = [
+        instr
+        for instr in conn.subroutines[1].instructions
+        if isinstance(instr, BranchBinaryInstruction)
+    ]
+    assert len(branches) == 1
+    assert branches[0].reg0.name == RegisterName.R
+
+
+def test_auto_flush_returns_arrays_once():
+    conn = ExecutingConnection(auto_flush=True, max_instructions=20)
+    outcomes = conn.new_array(10)
+    for i in range(10):
+        Qubit(conn).measure(future=outcomes.get_future_index(i))
+        conn.builder.reuse_array(outcomes)
+    conn.flush()
+    assert len(conn.subroutines) > 1
+    for subroutine in conn.subroutines:
+        returned = [
+            instr
+            for instr in subroutine.instructions
+            if isinstance(instr, RetArrInstruction)
+        ]
+        assert len(returned) == 1
+
+
+def test_auto_flush_max_instructions():
+    conn = ExecutingConnection(auto_flush=True, max_instructions=20)
+    outcomes = conn.new_array(10)
+    for i in range(10):
+        q = Qubit(conn)
+        q.H()
+        q.measure(future=outcomes.get_future_index(i))
+    conn.flush()
+    assert len(conn.subroutines) > 1
+    # The array is still returned by the subroutines after the first one
+    assert outcomes.get_values() == [0] * 10
+
+
+def test_auto_flush_dropped_array():
+    conn = ExecutingConnection(auto_flush=True, max_instructions=20)
+    outcomes = conn.new_array(10)
+    dropped = conn.new_array(10)
+    del dropped
+    for i in range(10):
+        Qubit(conn).measure(future=outcomes.get_future_index(i))
+    conn.flush()
+    assert len(conn.subroutines) > 1
+    # Arrays that the Host does not hold anymore are not returned by later subroutines
+    for subroutine in conn.subroutines[1:]:
+        returned = [
+            instr.address.address
+            for instr in subroutine.instructions
+            if isinstance(instr, RetArrInstruction)
+        ]
+        assert returned == [outcomes.address]
+    assert outcomes.get_values() == [0] * 10
+
+
+def test_auto_flush_not_in_context():
+    conn = ExecutingConnection(auto_flush=True, max_instructions=5)
+    outcomes = conn.new_array(10)
+    with conn.loop(10) as i:
+        q = Qubit(conn)
+        for _ in range(10):
+            q.H()
+        q.measure(future=outcomes.get_future_index(i))
+    conn.flush()
+    assert len(conn.subroutines) == 1
+    assert outcomes.get_values() == [0] * 10
+
+
+def test_auto_flush_after_failed_context():
+    conn = ExecutingConnection(auto_flush=True)
+
+    def body(conn, i):
+        raise ValueError("failed to build the body")
+
+    with pytest.raises(ValueError):
+        conn.loop_body(body, stop=10)
+    with pytest.raises(ValueError):
+        with conn.loop(10):
+            raise ValueError("failed to build the body")
+    outcomes = [Qubit(conn).measure(store_array=False) for _ in range(20)]
+    conn.flush()
+    assert len(conn.subroutines) == 2
+    assert all(m.value == 0 for m in outcomes)
+
+
+def test_async_flush():
+    async def run():
+        async with AsyncNetQASMConnection(ThreadedExecutingConnection()) as conn:
+            m = Qubit(conn).measure()
+            await conn.flush()
+            assert m.value == 0
+            # Nothing to flush
+            await conn.flush()
+        return conn
+
+    conn = asyncio.run(run())
+    assert len(conn.subroutines) == 1
+
+
+def test_async_close():
+    class ClosingConnection(ThreadedExecutingConnection):
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            self.exit_thread = threading.current_thread()
+            super().__exit__(exc_type, exc_val, exc_tb)
+
+    async def run():
+        async with AsyncNetQASMConnection(ClosingConnection()) as conn:
+            Qubit(conn).measure()
+        return conn.connection
+
+    conn = asyncio.run(run())
+    assert len(conn.subroutines) == 1
+    # Closing the connection does not block the event loop
+    assert conn.exit_thread is not threading.current_thread()
+
+
+def test_await_future():
+    async def run():
+        sync_conn = ThreadedExecutingConnection()
+        conn = AsyncNetQASMConnection(sync_conn)
+        m = Qubit(conn).measure()
+        assert await m.wait_async(timeout=0.01) is None
+        sync_conn.flush(block=False)
+        assert await m == 0
+
+    asyncio.run(run())
@@ -1,8 +1,17 @@
+import threading
+
+import numpy as np
 import pytest
 
 from netqasm.lang.parsing import parse_register
-from netqasm.sdk.futures import Future, NonConstantIndexError, NoValueError
-from netqasm.sdk.shared_memory import SharedMemory
+from netqasm.sdk.futures import (
+    Array,
+    Future,
+    NonConstantIndexError,
+    NoValueError,
+    RegFuture,
+)
+from netqasm.sdk.shared_memory import SharedMemory, SharedMemoryManager
 
 
 class MockConnnection:
@@ -38,3 +47,85 @@ def test_with_value():
     print(m)
     print(m * 2)
     assert m * 2 == 8
+
+
+def test_array_values():
+    conn = MockConnnection()
+    conn.shared_memory.init_new_array(address=0, new_array=[3, None, 1])
+
+    array = Array(conn, length=3, address=0)
+    assert array.get_values() == [3, None, 1]
+
+    view = array.to_numpy()
+    assert view.dtype == np.int64
+    assert list(view.mask) == [False, True, False]
+    assert view.compressed().tolist() == [3, 1]
+
+    # The view is a copy
+    conn.shared_memory.set_array_part(address=0, index=1, value=2)
+    assert view.mask[1]
+    assert conn.shared_memory.get_array_view(0).tolist() == [3, 2, 1]
+
+
+def test_array_future_cache():
+    conn = MockConnnection()
+    conn.shared_memory.init_new_array(address=0, length=2)
+    array = Array(conn, length=2, address=0)
+
+    future = array.get_future_index(0)
+    assert array.get_future_index(0) is future
+    assert array.get_future_index(1) is not future
+    assert array.get_future_index(parse_register("R0")) is not future
+
+    # Once resolved, a Future is no longer kept by the array and a new Future is
+    # created for the entry
+    conn.shared_memory.set_array_part(address=0, index=0, value=1)
+    assert future == 1
+    assert array._futures is not None and 0 not in array._futures
+    conn.shared_memory.set_array_part(address=0, index=0, value=0)
+    assert array.get_future_index(0) is not future
+    assert array.get_future_index(0) == 0
+    assert 0 not in array._futures
+
+    # Also when resolved by waiting
+    future = array.get_future_index(1)
+    conn.shared_memory.set_array_part(address=0, index=1, value=1)
+    assert future.wait(timeout=1) == 1
+    assert array._futures == {}
+
+
+def test_wait():
+    conn = MockConnnection()
+    conn.shared_memory.init_new_array(address=0, length=1)
+
+    m = Future(conn, address=0, index=0)
+    assert m.wait(timeout=0.01) is None
+
+    timer = threading.Timer(
+        0.01,
+        conn.shared_memory.set_array_part,
+        kwargs=dict(address=0, index=0, value=1),
+    )
+    timer.start()
+    assert m.wait(timeout=10) == 1
+    assert m == 1
+    timer.join()
+
+    r = RegFuture(conn, reg=parse_register("M0"))
+    timer = threading.Timer(0.01, conn.shared_memory.set_register, args=("M0", 1))
+    timer.start()
+    assert r.wait(timeout=10) == 1
+    timer.join()
+
+
+def test_wait_for_shared_memory():
+    SharedMemoryManager.reset_memories()
+    assert SharedMemoryManager.wait_for_shared_memory("node", 0, timeout=0.01) is None
+    timer = threading.Timer(
+        0.01, SharedMemoryManager.create_shared_memory, args=("node", 0)
+    )
+    timer.start()
+    memory = SharedMemoryManager.wait_for_shared_memory("node", 0, timeout=10)
+    assert memory is SharedMemoryManager.get_shared_memory("node", 0)
+    timer.join()
+    SharedMemoryManager.reset_memories()
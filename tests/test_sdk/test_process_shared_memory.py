@@ -0,0 +1,205 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import uuid
+
+import numpy as np
+import pytest
+
+from netqasm.runtime.settings import set_cross_process_shared_memory
+from netqasm.sdk.process_shared_memory import (
+    NAMESPACE_ENV,
+    ProcessSharedMemory,
+    get_segment_name,
+)
+from netqasm.sdk.shared_memory import SharedMemory, SharedMemoryManager
+
+
+@pytest.fixture
+def cross_process(monkeypatch):
+    monkeypatch.setenv(NAMESPACE_ENV, uuid.uuid4().hex)
+    set_cross_process_shared_memory(True)
+    SharedMemoryManager.reset_memories()
+    yield
+    SharedMemoryManager.reset_memories()
+    set_cross_process_shared_memory(False)
+
+
+@pytest.fixture(params=["local", "process"])
+def memory(request):
+    if request.param == "local":
+        yield SharedMemory()
+    else:
+        memory = ProcessSharedMemory.create(f"netqasm_test_{uuid.uuid4().hex[:8]}")
+        yield memory
+        memory.close()
+
+
+def test_registers(memory):
+    assert memory.get_register("M0") is None
+    memory.set_register("M0", 5)
+    memory.set_register("R15", -3)
+    assert memory.get_register("M0") == 5
+    assert memory.get_register("R15") == -3
+    with pytest.raises(IndexError):
+        memory.get_register("R16")
+
+
+def test_arrays(memory):
+    assert memory.get_array_part(3, 0) is None
+    assert not memory.has_array(3)
+    memory.init_new_array(3, new_array=[1, None, 3])
+    memory.init_new_array(7, length=2)
+    memory.set_array_part(7, 1, 9)
+    memory.set_array_part(3, slice(0, 2), [4, 5])
+    assert memory[3] == [4, 5, 3]
+    assert memory[7] == [None, 9]
+    assert memory.get_array_part(3, -1) == 3
+    assert memory.get_array_part(3, slice(1, None)) == [5, 3]
+    view = memory.get_array_view(7)
+    assert view.mask.tolist() == [True, False]
+    assert view[1] == 9
+    with pytest.raises(IndexError):
+        memory.get_array_part(3, 3)
+    with pytest.raises(IndexError):
+        memory.set_array_part(4, 0, 1)
+
+    # Arrays can be initialized again, with a different length
+    memory.init_new_array(3, new_array=[6])
+    assert memory[3] == [6]
+    memory.init_new_array(3, length=4)
+    assert memory[3] == [None] * 4
+
+    assert sorted(value for _, value in memory._get_active_values()) == [9]
+
+
+def test_grow():
+    memory = ProcessSharedMemory.create(
+        f"netqasm_test_{uuid.uuid4().hex[:8]}", max_arrays=2, arena_size=10
+    )
+    attached = ProcessSharedMemory.attach(memory.name)
+    assert attached is not None
+    memory.set_register("M0", 1)
+    memory.init_new_array(0, new_array=[1, 2, 3])
+    assert attached[0] == [1, 2, 3]
+
+    # The memory moves to larger segments when the directory or the arena is full
+    num = ProcessSharedMemory.DEFAULT_MAX_ARRAYS + 100
+    for address in range(1, num):
+        memory.init_new_array(address, new_array=[address] * (address % 5))
+    memory.init_new_array(num, length=10**5)
+    assert attached.get_register("M0") == 1
+    assert attached[0] == [1, 2, 3]
+    assert all(attached[a] == [a] * (a % 5) for a in range(1, num))
+    assert attached[num] == [None] * 10**5
+
+    # Others can attach after the memory moved, and follow later moves
+    late = ProcessSharedMemory.attach(memory.name)
+    assert late is not None and late[num - 1] == memory[num - 1]
+    memory.init_new_array(0, length=10**6)
+    assert late.get_array_part(0, -1) is None
+    assert late.get_array_part(num - 1, slice(None)) == memory[num - 1]
+
+    # Only the owner can grow the memory
+    with pytest.raises(MemoryError):
+        attached.init_new_array(num + 1, length=10**7)
+    with pytest.raises(MemoryError):
+        memory.init_new_array(num + 1, length=ProcessSharedMemory.MAX_ARENA_SIZE)
+    memory.close()
+    assert ProcessSharedMemory.attach(memory.name) is None
+    assert late[1] == [1]
+    attached.close()
+    late.close()
+
+
+def test_attach():
+    memory = ProcessSharedMemory.create(f"netqasm_test_{uuid.uuid4().hex[:8]}")
+    attached = ProcessSharedMemory.attach(memory.name)
+    assert attached is not None and not attached.owner
+    memory.init_new_array(0, new_array=list(range(100)))
+    assert attached[0] == list(range(100))
+    assert attached.wait_for_register("M0", timeout=0.01) is None
+
+    memory.close()
+    assert ProcessSharedMemory.attach(memory.name) is None
+    # Processes that are attached can still read
+    assert np.array_equal(attached.get_array_view(0), np.arange(100))
+    attached.close()
+
+
+def test_attach_subprocess():
+    memory = ProcessSharedMemory.create(f"netqasm_test_{uuid.uuid4().hex[:8]}")
+    memory.set_register("R0", 3)
+    script = (
+        "from netqasm.sdk.process_shared_memory import ProcessSharedMemory\n"
+        f"memory = ProcessSharedMemory.attach({memory.name!r})\n"
+        "print(memory.get_register('R0'))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert completed.stdout.strip() == "3"
+    assert "leaked" not in completed.stderr
+
+    # A separately started process that exits does not remove the memory
+    attached = ProcessSharedMemory.attach(memory.name)
+    assert attached is not None and attached.get_register("R0") == 3
+    attached.close()
+    memory.close()
+
+
+def test_attach_empty():
+    posixshmem = pytest.importorskip("_posixshmem")
+    name = f"/netqasm_test_{uuid.uuid4().hex[:8]}"
+    # The creator opened the segment but did not set its size yet
+    fd = posixshmem.shm_open(name, os.O_CREAT | os.O_EXCL | os.O_RDWR, mode=0o600)
+    try:
+        assert ProcessSharedMemory.attach(name[1:]) is None
+    finally:
+        os.close(fd)
+        posixshmem.shm_unlink(name)
+
+
+def _write_values(node_name, ready, done):
+    memory = SharedMemoryManager.create_shared_memory(node_name, key=0)
+    ready.wait()
+    memory.init_new_array(1, new_array=[None, None])
+    memory.set_register("M0", 1)
+    memory.set_array_part(1, 1, 2)
+    done.wait()
+
+
+def test_manager_cross_process(cross_process):
+    ctx = multiprocessing.get_context("spawn")
+    ready, done = ctx.Event(), ctx.Event()
+    process = ctx.Process(
+        target=_write_values, args=("alice", ready, done), daemon=True
+    )
+    process.start()
+
+    try:
+        memory = SharedMemoryManager.wait_for_shared_memory("alice", key=0, timeout=10)
+        assert isinstance(memory, ProcessSharedMemory)
+        assert SharedMemoryManager.get_shared_memory("alice", key=0) is memory
+        ready.set()
+        assert memory.wait_for_register("M0", timeout=10) == 1
+        assert memory.wait_for_array_part(1, 1, timeout=10) == 2
+    finally:
+        ready.set()
+        done.set()
+        process.join(timeout=10)
+
+    # The memory is removed when the process that created it exits
+    assert ProcessSharedMemory.attach(get_segment_name("alice", key=0)) is None
+    assert memory[1] == [None, 2]
+
+
+def test_manager_remove(cross_process):
+    memory = SharedMemoryManager.create_shared_memory("alice", key=0)
+    assert isinstance(memory, ProcessSharedMemory)
+    SharedMemoryManager.remove_shared_memory("alice", key=0)
+    assert SharedMemoryManager.get_shared_memory("alice", key=0) is None
+    # A new memory can be created with the same key
+    SharedMemoryManager.create_shared_memory("alice", key=0)
+    assert SharedMemoryManager.wait_for_shared_memory("bob", timeout=0.01) is None
@@ -0,0 +1,151 @@
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from netqasm.runtime.interface.config import default_network_config
+from netqasm.runtime.parallel import SimulationSettings
+from netqasm.runtime.settings import Simulator
+from netqasm.runtime.sweep import get_network_config_variant, sweep
+
+APP_CODE = """
+def main(app_config=None):
+    return {}
+"""
+
+
+def fake_simulate_application(network_cfg, **kwargs):
+    fidelity = network_cfg.links[0].fidelity
+    t1 = network_cfg.nodes[0].qubits[0].t1
+    return [
+        {
+            "app_alice": {
+                "fidelity": fidelity,
+                "t1": t1,
+                "x": int(np.random.randint(100)),
+            }
+        }
+    ]
+
+
+def failing_simulate_application(**kwargs):
+    raise AssertionError("point should have been cached")
+
+
+@pytest.fixture
+def settings(tmpdir):
+    for name in ["alice", "bob"]:
+        with open(os.path.join(tmpdir, f"app_{name}.py"), "w") as f:
+            f.write(APP_CODE)
+    return SimulationSettings(
+        app_dir=str(tmpdir), simulator=Simulator.DEBUG, enable_logging=False
+    )
+
+
+def test_network_config_variant():
+    network_cfg = default_network_config(["alice", "bob"])
+    variant = get_network_config_variant(
+        network_cfg,
+        {
+            "links.fidelity": 0.9,
+            "nodes.bob.gate_fidelity": 0.5,
+            "nodes.alice.qubits.t1": 10,
+        },
+    )
+    assert [link.fidelity for link in variant.links] == [0.9, 0.9]
+    assert [node.gate_fidelity for node in variant.nodes] == [1, 0.5]
+    assert {qubit.t1 for qubit in variant.nodes[0].qubits} == {10}
+    assert {qubit.t1 for qubit in variant.nodes[1].qubits} == {0}
+    # The base config is not changed
+    assert [link.fidelity for link in network_cfg.links] == [1, 1]
+
+    for path in ["links", "links.unknown", "qubits.t1", "nodes.alice.qubits"]:
+        with pytest.raises(ValueError):
+            get_network_config_variant(network_cfg, {path: 0})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sweep(settings, workers, tmpdir):
+    parameters = {"links.fidelity": [0.8, 1.0], "nodes.qubits.t1": [0, 5]}
+    results_file = os.path.join(tmpdir, "results.csv")
+    table = sweep(
+        settings,
+        parameters=parameters,
+        num_rounds=2,
+        workers=workers,
+        results_file=results_file,
+        simulate_function=fake_simulate_application,
+    )
+    assert table["links.fidelity"] == [0.8] * 4 + [1.0] * 4
+    assert table["nodes.qubits.t1"] == [0, 0, 5, 5] * 2
+    assert table["round"] == [0, 1] * 4
+    assert table["app_alice.fidelity"] == table["links.fidelity"]
+    assert table["app_alice.t1"] == table["nodes.qubits.t1"]
+    # All points use the same seeds
+    assert len(set(table["app_alice.x"][::2])) == 1
+
+    with open(results_file) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(table.keys())
+    assert len(rows) == 9
+
+    # All points are cached, also when extending the sweep
+    cached_table = sweep(
+        settings,
+        parameters=parameters,
+        num_rounds=2,
+        simulate_function=failing_simulate_application,
+    )
+    assert cached_table == table
+    with pytest.raises(AssertionError):
+        sweep(
+            settings,
+            parameters={"links.fidelity": [0.8, 1.0, 0.9], "nodes.qubits.t1": [0, 5]},
+            num_rounds=2,
+            simulate_function=failing_simulate_application,
+        )
+
+
+def test_sweep_cache_key(settings):
+    parameters = {"links.fidelity": [0.8, 1.0]}
+    sweep(settings, parameters=parameters, simulate_function=fake_simulate_application)
+
+    # The sweep file does not determine the results
+    with open(os.path.join(settings.app_dir, "sweep.yaml"), "w") as f:
+        f.write("parameters:\n  links.fidelity: [0.8, 1.0]\n")
+    sweep(
+        settings, parameters=parameters, simulate_function=failing_simulate_application
+    )
+
+    # Inputs of the programs do
+    with open(os.path.join(settings.app_dir, "alice.yaml"), "w") as f:
+        f.write("x: 1\n")
+    with pytest.raises(AssertionError):
+        sweep(
+            settings,
+            parameters=parameters,
+            simulate_function=failing_simulate_application,
+        )
+
+
+def test_sweep_cache_key_subpackage(settings):
+    src_dir = os.path.join(settings.app_dir, "src")
+    os.makedirs(src_dir)
+    with open(os.path.join(src_dir, "shared.py"), "w") as f:
+        f.write("X = 1\n")
+    parameters = {"links.fidelity": [0.8, 1.0]}
+    sweep(settings, parameters=parameters, simulate_function=fake_simulate_application)
+    sweep(
+        settings, parameters=parameters, simulate_function=failing_simulate_application
+    )
+
+    # Modules in subdirectories are part of the application
+    with open(os.path.join(src_dir, "shared.py"), "w") as f:
+        f.write("X = 2\n")
+    with pytest.raises(AssertionError):
+        sweep(
+            settings,
+            parameters=parameters,
+            simulate_function=failing_simulate_application,
+        )
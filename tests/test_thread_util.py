@@ -0,0 +1,35 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from netqasm.util.thread import as_completed, run_in_daemon_thread
+
+
+def test_as_completed():
+    events = [threading.Event() for _ in range(3)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(event.wait) for event in events]
+        completed = as_completed(futures, names=["a", "b", "c"])
+        for i in [1, 2, 0]:
+            events[i].set()
+            future, name = next(completed)
+            assert future is futures[i]
+            assert name == "abc"[i]
+
+
+def test_as_completed_same_time():
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(lambda x: x, i) for i in range(3)]
+        for future in futures:
+            future.result()
+        assert list(as_completed(futures)) == futures
+
+
+def test_run_in_daemon_thread():
+    event = threading.Event()
+    future = run_in_daemon_thread(event.wait, timeout=5)
+    assert not future.done()
+    event.set()
+    assert future.result() is True
+
+    future = run_in_daemon_thread(int, "x")
+    assert isinstance(future.exception(), ValueError)
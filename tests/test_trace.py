@@ -0,0 +1,175 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from netqasm.backend.executor import EprCmdData, Executor
+from netqasm.lang.parsing import parse_text_subroutine
+from netqasm.logging.trace import TraceWriter, get_tracer, start_tracing, stop_tracing
+from netqasm.sdk import ThreadSocket
+from netqasm.sdk.async_connection import AsyncNetQASMConnection
+from netqasm.sdk.connection import DebugConnection
+from netqasm.sdk.qubit import Qubit
+from netqasm.sdk.shared_memory import SharedMemoryManager
+
+
+@pytest.fixture
+def trace_file(tmpdir):
+    SharedMemoryManager.reset_memories()
+    filepath = str(tmpdir.join("trace.json"))
+    start_tracing(filepath)
+    yield filepath
+    stop_tracing()
+
+
+def load_events(filepath):
+    stop_tracing()
+    with open(filepath) as f:
+        return json.load(f)
+
+
+def get_track(events, node_name, track):
+    pid = next(
+        e["pid"]
+        for e in events
+        if e["name"] == "process_name" and e["args"]["name"] == node_name
+    )
+    tid = next(
+        e["tid"]
+        for e in events
+        if e["name"] == "thread_name" and e["pid"] == pid and e["args"]["name"] == track
+    )
+    return [e for e in events if e["pid"] == pid and e["tid"] == tid and e["ph"] != "M"]
+
+
+def test_executor(trace_file):
+    subroutine = parse_text_subroutine(
+        """
+        # NETQASM 0.0
+        # APPID 0
+        array 2 @0
+        set R0 0
+        store R0 @0[0]
+        store R0 @0[1]
+        wait_all @0[0:2]
+        ret_arr @0
+        """
+    )
+    executor = Executor(name="alice")
+    executor.init_new_application(app_id=0, max_qubits=1)
+    for _ in range(2):
+        list(executor.execute_subroutine(subroutine=subroutine))
+
+    events = get_track(load_events(trace_file), "alice", "executor app 0")
+    subroutines = [e for e in events if e["name"] == "subroutine"]
+    waits = [e for e in events if e["name"] == "wait_all"]
+    assert len(subroutines) == 2
+    assert len(waits) == 2
+    for subroutine_event, wait in zip(subroutines, waits):
+        assert subroutine_event["ph"] == "X"
+        assert subroutine_event["args"]["num_instructions"] == len(
+            subroutine.instructions
+        )
+        # The wait is nested in the subroutine
+        assert subroutine_event["ts"] <= wait["ts"]
+        assert (
+            wait["ts"] + wait["dur"] <= subroutine_event["ts"] + subroutine_event["dur"]
+        )
+
+
+def test_epr_request(trace_file):
+    executor = Executor(name="alice")
+    executor.init_new_application(app_id=0, max_qubits=1)
+    subroutine = parse_text_subroutine("# NETQASM 0.0\n# APPID 0\n")
+    executor._subroutines[0] = subroutine
+    trace_id = executor._trace_epr_request(
+        name="create_epr", subroutine_id=0, request_key=(1, 0), num_pairs=2
+    )
+    epr_cmd_data = EprCmdData(
+        subroutine_id=0,
+        ent_results_array_address=0,
+        q_array_address=None,
+        request=None,
+        tot_pairs=2,
+        pairs_left=2,
+        trace_id=trace_id,
+    )
+    for _ in range(2):
+        epr_cmd_data.pairs_left -= 1
+        executor._trace_epr_pair(epr_cmd_data, is_creator=True)
+
+    events = get_track(load_events(trace_file), "alice", "executor app 0")
+    assert [e["ph"] for e in events] == ["b", "n", "n", "e"]
+    assert all(e["id"] == trace_id and e["cat"] == "epr" for e in events)
+    assert events[0]["args"]["remote_node_id"] == 1
+    assert [e["args"]["pair_index"] for e in events[1:3]] == [0, 1]
+
+
+def test_flush(trace_file, monkeypatch):
+    monkeypatch.setattr(DebugConnection, "node_ids", {"alice_node": 0})
+    with DebugConnection("alice", node_name="alice_node") as conn:
+        Qubit(conn).measure()
+
+    events = get_track(load_events(trace_file), "alice_node", "host alice")
+    assert [e["name"] for e in events] == ["flush"]
+
+
+def test_async_flush(trace_file, monkeypatch):
+    monkeypatch.setattr(DebugConnection, "node_ids", {"alice_node": 0})
+
+    async def run():
+        conn = DebugConnection("alice", node_name="alice_node")
+        async with AsyncNetQASMConnection(conn) as alice:
+            Qubit(alice).measure()
+
+    asyncio.run(run())
+    events = get_track(load_events(trace_file), "alice_node", "host alice")
+    assert [e["name"] for e in events] == ["flush"]
+    assert events[0]["args"]["block"] is False
+
+
+def test_socket_flows(trace_file):
+    msgs = [f"msg{i}" for i in range(4)]
+
+    def alice():
+        socket = ThreadSocket("alice", "bob")
+        socket.send(msgs[0])
+        socket.send_many(msgs[1:])
+
+    def bob():
+        socket = ThreadSocket("bob", "alice")
+        received = [socket.recv(timeout=1)]
+        while len(received) < len(msgs):
+            received += socket.recv_many(timeout=1)
+        assert received == msgs
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for future in [pool.submit(alice), pool.submit(bob)]:
+            future.result()
+
+    events = load_events(trace_file)
+    alice_events = get_track(events, "alice", "host alice")
+    bob_events = get_track(events, "bob", "host bob")
+    assert [e["name"] for e in alice_events if e["ph"] == "X"] == ["send", "send"]
+    flow_starts = [e["id"] for e in alice_events if e["ph"] == "s"]
+    flow_ends = [e["id"] for e in bob_events if e["ph"] == "f"]
+    assert len(flow_starts) == len(msgs)
+    assert sorted(flow_ends) == sorted(flow_starts)
+
+
+def test_writer(tmpdir):
+    filepath = str(tmpdir.join("trace.json"))
+    writer = TraceWriter(filepath)
+    writer.complete("alice", "host alice", "flush", start=writer.timestamp(), cat="")
+    # A message that is received before it was traced as sent has no flow
+    writer.message_received(("bob", "alice", 0), start=writer.timestamp())
+    writer.close()
+    writer.complete("alice", "host alice", "flush", start=writer.timestamp(), cat="")
+    with open(filepath) as f:
+        events = json.load(f)
+    assert [e["ph"] for e in events] == ["M", "M", "X", "X"]
+
+
+def test_disabled():
+    assert get_tracer() is None
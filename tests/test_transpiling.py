@@ -1,10 +1,10 @@
-from typing import Dict, Set
+from typing import Dict, List, Set
 
 import numpy as np
 import pytest
 
 from netqasm.backend.messages import deserialize_host_msg as deserialize_message
-from netqasm.lang.instr import core
+from netqasm.lang.instr import core, nv
 from netqasm.lang.instr.flavour import NVFlavour, VanillaFlavour
 from netqasm.lang.operand import Register
 from netqasm.lang.parsing import deserialize as deserialize_subroutine
@@ -13,7 +13,15 @@ from netqasm.lang.subroutine import Subroutine
 from netqasm.logging.glob import set_log_level
 from netqasm.sdk.connection import DebugConnection
 from netqasm.sdk.qubit import Qubit
-from netqasm.sdk.transpile import NVSubroutineTranspiler
+from netqasm.sdk.transpile import (
+    NVSubroutineTranspiler,
+    SwapMinimizingNVSubroutineTranspiler,
+)
+from netqasm.util.quantum_gates import (
+    are_matrices_equal,
+    get_controlled_rotation_matrix,
+    get_rotation_matrix,
+)
 
 
 def pad_single_matrix(m: np.ndarray, index: int, total: int) -> np.ndarray:
@@ -297,6 +305,172 @@ def test_transpiling_nv_using_sdk():
         assert instr.__class__ not in VanillaFlavour().instrs
 
 
+_NV_AXES = {
+    nv.RotXInstruction: [1, 0, 0],
+    nv.RotYInstruction: [0, 1, 0],
+    nv.RotZInstruction: [0, 0, 1],
+    nv.ControlledRotXInstruction: [1, 0, 0],
+    nv.ControlledRotYInstruction: [0, 1, 0],
+}
+
+
+def _apply_on_qubits(
+    unitary: np.ndarray, gate: np.ndarray, positions: List[int], total: int
+) -> np.ndarray:
+    """Apply `gate` on the qubits at `positions` (in that order) after `unitary`."""
+    k = len(positions)
+    gate = gate.reshape([2] * (2 * k))
+    state = unitary.reshape([2] * total + [2**total])
+    state = np.tensordot(gate, state, axes=(list(range(k, 2 * k)), positions))
+    state = np.moveaxis(state, list(range(k)), positions)
+    return state.reshape(2**total, 2**total)
+
+
+def _nv_subroutine_as_unitary(subroutine: Subroutine, virt_ids: List[int]):
+    """Unitary (on `virt_ids`) implemented by the gates of an NV subroutine."""
+    positions = {virt_id: i for i, virt_id in enumerate(virt_ids)}
+    qreg_values: Dict[Register, int] = dict()
+    total = len(virt_ids)
+    unitary = np.eye(2**total, dtype=complex)
+    for instr in subroutine.instructions:
+        if isinstance(instr, core.SetInstruction):
+            qreg_values[instr.reg] = instr.imm.value
+            continue
+        if isinstance(instr, core.ControlledRotationInstruction):
+            angle = instr.angle_num.value * np.pi / 2**instr.angle_denom.value
+            gate = get_controlled_rotation_matrix(_NV_AXES[type(instr)], angle)
+            qubits = [qreg_values[instr.reg0], qreg_values[instr.reg1]]
+        elif isinstance(instr, core.RotationInstruction):
+            angle = instr.angle_num.value * np.pi / 2**instr.angle_denom.value
+            gate = get_rotation_matrix(_NV_AXES[type(instr)], angle)
+            qubits = [qreg_values[instr.reg]]
+        else:
+            continue
+        unitary = _apply_on_qubits(unitary, gate, [positions[q] for q in qubits], total)
+    return unitary
+
+
+def _count_gates(subroutine: Subroutine) -> int:
+    return len(
+        [
+            instr
+            for instr in subroutine.instructions
+            if isinstance(
+                instr,
+                (core.RotationInstruction, core.ControlledRotationInstruction),
+            )
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "text_subroutine, virt_ids",
+    [
+        (
+            """
+        # NETQASM 0.0
+        # APPID 0
+        set Q0 1
+        set Q1 2
+        set Q2 3
+        cnot Q0 Q1
+        h Q0
+        cnot Q0 Q2
+        cphase Q1 Q0
+        cnot Q2 Q0
+        """,
+            [0, 1, 2, 3],
+        ),
+        (
+            """
+        # NETQASM 0.0
+        # APPID 0
+        set Q1 1
+        set Q2 2
+        cphase Q1 Q2
+        set Q3 0
+        x Q3
+        cnot Q1 Q2
+        set Q1 2
+        set Q2 3
+        cnot Q1 Q2
+        """,
+            [0, 1, 2, 3],
+        ),
+    ],
+)
+def test_swap_minimizing_equivalent(text_subroutine: str, virt_ids: List[int]):
+    plain = NVSubroutineTranspiler(parse_text_subroutine(text_subroutine)).transpile()
+    optimized = SwapMinimizingNVSubroutineTranspiler(
+        parse_text_subroutine(text_subroutine)
+    ).transpile()
+
+    assert _count_gates(optimized) <= _count_gates(plain)
+    for instr in optimized.instructions:
+        assert instr.__class__ not in VanillaFlavour().instrs
+
+    assert are_matrices_equal(
+        _nv_subroutine_as_unitary(plain, virt_ids),
+        _nv_subroutine_as_unitary(optimized, virt_ids),
+    )
+
+
+def test_swap_minimizing_basic_blocks():
+    text_subroutine = """
+# NETQASM 0.0
+# APPID 0
+set Q0 1
+set Q1 2
+set R0 0
+LOOP:
+beq R0 3 EXIT
+cnot Q0 Q1
+cnot Q0 Q1
+add R0 R0 1
+jmp LOOP
+EXIT:
+"""
+    plain = NVSubroutineTranspiler(parse_text_subroutine(text_subroutine)).transpile()
+    optimized = SwapMinimizingNVSubroutineTranspiler(
+        parse_text_subroutine(text_subroutine)
+    ).transpile()
+
+    # The second CNOT reuses the swap-in of the first one, but the swap-out must
+    # still happen before jumping back.
+    assert len(plain.instructions) - len(optimized.instructions) == 25
+    jmp = [i for i in optimized.instructions if isinstance(i, core.JmpInstruction)]
+    assert len(jmp) == 1
+    index = optimized.instructions.index(jmp[0])
+    assert isinstance(
+        optimized.instructions[index - 1], nv.RotZInstruction
+    )  # last gate of the swap-out
+
+
+def test_swap_minimizing_using_sdk():
+    subroutines = {}
+    for compiler in [NVSubroutineTranspiler, SwapMinimizingNVSubroutineTranspiler]:
+        with DebugConnection("Alice", compiler=compiler) as alice:
+            q0, q1, q2 = [Qubit(alice) for _ in range(3)]
+            q1.cnot(q2)
+            q1.H()
+            q1.cnot(q2)
+            q2.cphase(q1)
+
+        raw_subroutine = deserialize_message(raw=alice.storage[1]).subroutine
+        subroutines[compiler] = deserialize_subroutine(
+            raw_subroutine, flavour=NVFlavour()
+        )
+
+    plain = subroutines[NVSubroutineTranspiler]
+    optimized = subroutines[SwapMinimizingNVSubroutineTranspiler]
+
+    assert _count_gates(optimized) < _count_gates(plain)
+    assert are_matrices_equal(
+        _nv_subroutine_as_unitary(plain, [0, 1, 2]),
+        _nv_subroutine_as_unitary(optimized, [0, 1, 2]),
+    )
+
+
 if __name__ == "__main__":
     test_transpiling_nv()
     test_transpiling_nv_using_sdk()
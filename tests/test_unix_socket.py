@@ -0,0 +1,264 @@
+import socket
+import threading
+
+import pytest
+
+from netqasm.backend.executor import Executor
+from netqasm.backend.messages import (
+    InitNewAppMessage,
+    OpenEPRSocketMessage,
+    ReturnArrayMessage,
+    ReturnArraySliceMessage,
+    SetupAppMessage,
+    deserialize_host_msg,
+    deserialize_return_msg,
+)
+from netqasm.backend.qnodeos import QNodeController
+from netqasm.backend.unix_socket import FrameReader, QNodeControllerServer, encode_frame
+from netqasm.lang.parsing import parse_text_subroutine
+from netqasm.logging.glob import get_netqasm_logger
+from netqasm.sdk import unix_connection
+from netqasm.sdk.connection import DebugConnection
+from netqasm.sdk.epr_socket import EPRSocket
+from netqasm.sdk.qubit import Qubit
+from netqasm.sdk.shared_memory import SharedMemoryManager
+from netqasm.sdk.unix_connection import UnixSocketConnection
+
+
+class SimpleController(QNodeController):
+    """Controller that executes subroutines using an Executor without quantum backend."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.stopped = False
+        self.handled_messages = []
+
+    @classmethod
+    def _get_executor_class(cls, flavour=None):
+        return Executor
+
+    def stop(self):
+        self.stopped = True
+
+    def _mark_message_finished(self, msg_id, msg):
+        self.handled_messages.append(msg)
+
+
+@pytest.fixture
+def server(tmp_path):
+    SharedMemoryManager.reset_memories()
+    with QNodeControllerServer(
+        SimpleController("alice"), path=str(tmp_path / "alice.sock")
+    ) as server:
+        yield server
+
+
+def test_return_array_message():
+    msg = ReturnArrayMessage(address=3, values=[1, None, -2])
+    decoded = ReturnArrayMessage.deserialize_from(memoryview(bytes(msg)))
+    assert decoded.address == 3
+    assert decoded.values == [1, None, -2]
+
+
+def test_return_array_slice_message():
+    msg = ReturnArraySliceMessage(address=3, start=5, values=[1, None])
+    decoded = deserialize_return_msg(memoryview(bytes(msg)))
+    assert isinstance(decoded, ReturnArraySliceMessage)
+    assert (decoded.address, decoded.start, decoded.values) == (3, 5, [1, None])
+
+
+def test_setup_app_message():
+    msg = SetupAppMessage(
+        init_new_app=InitNewAppMessage(app_id=2, max_qubits=3),
+        open_epr_sockets=[
+            OpenEPRSocketMessage(app_id=2, epr_socket_id=i, remote_node_id=1)
+            for i in range(3)
+        ],
+    )
+    decoded = deserialize_host_msg(memoryview(bytes(msg)))
+    assert isinstance(decoded, SetupAppMessage)
+    assert decoded.init_new_app.max_qubits == 3
+    assert [m.epr_socket_id for m in decoded.open_epr_sockets] == [0, 1, 2]
+    assert len(SetupAppMessage(InitNewAppMessage()).open_epr_sockets) == 0
+
+
+def test_frame_reader():
+    msgs = [(0, b"hello"), (1, b""), (7, bytes(range(256)) * 1000), (2, b"bye")]
+    sender, receiver = socket.socketpair()
+    data = b"".join(encode_frame(msg_id, raw_msg) for msg_id, raw_msg in msgs)
+
+    def send():
+        # Send in chunks that do not align with frames
+        for i in range(0, len(data), 1000):
+            sender.sendall(data[i : i + 1000])
+        sender.close()
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    received = [(msg_id, bytes(raw_msg)) for msg_id, raw_msg in FrameReader(receiver)]
+    thread.join()
+    receiver.close()
+    assert received == msgs
+
+
+def test_frame_reader_partial_frame():
+    sender, receiver = socket.socketpair()
+    sender.sendall(encode_frame(0, b"hello")[:-1])
+    sender.close()
+    with pytest.raises(ConnectionError):
+        list(FrameReader(receiver))
+    receiver.close()
+
+
+def test_connection(server):
+    with UnixSocketConnection("alice", path=server.path, timeout=1) as alice:
+        array = alice.new_array(2)
+        q = Qubit(alice)
+        q.H()
+        m = q.measure()
+        q = Qubit(alice)
+        q.measure(future=array.get_future_index(1))
+        alice.flush()
+        assert m == 0
+        assert alice.shared_memory[array.address] == [None, 0]
+
+    # Another application can use the same app ID after the first has stopped
+    with UnixSocketConnection("alice", path=server.path, timeout=1) as alice:
+        m = Qubit(alice).measure()
+    assert m == 0
+    assert not server.stopped
+
+
+def test_setup_app(server, monkeypatch):
+    monkeypatch.setattr(DebugConnection, "node_ids", {"alice": 0, "bob": 1})
+    epr_sockets = [EPRSocket("bob", epr_socket_id=i) for i in range(3)]
+    with UnixSocketConnection(
+        "alice", path=server.path, timeout=1, epr_sockets=epr_sockets
+    ):
+        pass
+    # The application is registered and its EPR sockets are opened in one message
+    setup_app, stop_app = server.controller.handled_messages
+    assert isinstance(setup_app, SetupAppMessage)
+    assert len(setup_app.open_epr_sockets) == 3
+    assert all(epr_socket.conn is not None for epr_socket in epr_sockets)
+
+
+def test_pipelining(server):
+    done = []
+    with UnixSocketConnection("alice", path=server.path, timeout=1) as alice:
+        results = []
+        for i in range(10):
+            results.append(Qubit(alice).measure())
+            alice.flush(block=False, callback=lambda i=i: done.append(i))
+        alice.block()
+        assert done == list(range(10))
+        assert [int(m) for m in results] == [0] * 10
+
+
+def test_callback_error(server, caplog):
+    def fail():
+        raise ValueError("callback failed")
+
+    # The NetQASM logger does not propagate to the root logger captured by caplog
+    logger = get_netqasm_logger()
+    logger.addHandler(caplog.handler)
+    done = []
+    try:
+        with UnixSocketConnection("alice", path=server.path, timeout=1) as alice:
+            Qubit(alice).measure()
+            alice.flush(block=False, callback=fail)
+            Qubit(alice).measure()
+            alice.flush(block=False, callback=lambda: done.append(True))
+            alice.block()
+    finally:
+        logger.removeHandler(caplog.handler)
+    # Replies are handled after a callback failed
+    assert done == [True]
+    assert "callback failed" in caplog.text
+
+
+def test_unexpected_reply(server, monkeypatch):
+    alice = UnixSocketConnection("alice", path=server.path, timeout=1)
+    monkeypatch.setattr(unix_connection, "deserialize_return_msg", lambda _: None)
+    Qubit(alice).measure()
+    # Instead of waiting forever for the reply that could not be handled
+    with pytest.raises(ConnectionError, match="Failed to handle reply"):
+        alice.flush()
+    with pytest.raises(ConnectionError):
+        alice.close()
+
+
+def test_return_array_slice(server, monkeypatch):
+    replies = []
+
+    def deserialize(raw_msg):
+        replies.append(deserialize_return_msg(raw_msg))
+        return replies[-1]
+
+    monkeypatch.setattr(unix_connection, "deserialize_return_msg", deserialize)
+
+    def returned_arrays():
+        msgs = [
+            msg
+            for msg in replies
+            if isinstance(msg, (ReturnArrayMessage, ReturnArraySliceMessage))
+        ]
+        replies.clear()
+        return msgs
+
+    def subroutine(app_id, lines):
+        return parse_text_subroutine(f"# NETQASM 1.0\n# APPID {app_id}\n{lines}")
+
+    def store(app_id, entries):
+        lines = "\n".join(f"set R0 {value}\nstore R0 @0[{i}]" for i, value in entries)
+        return subroutine(app_id, f"{lines}\nret_arr @0")
+
+    with UnixSocketConnection("alice", path=server.path, timeout=1) as alice:
+        alice.commit_subroutine(subroutine(alice.app_id, "array 100 @0\nret_arr @0"))
+        (msg,) = returned_arrays()
+        assert isinstance(msg, ReturnArrayMessage) and len(msg.values) == 100
+
+        # Only the entries that were written since the array was returned are sent
+        alice.commit_subroutine(store(alice.app_id, [(3, 1), (5, 2)]))
+        (msg,) = returned_arrays()
+        assert isinstance(msg, ReturnArraySliceMessage)
+        assert (msg.start, msg.values) == (3, [1, None, 2])
+        alice.commit_subroutine(store(alice.app_id, [(3, 1)]))
+        (msg,) = returned_arrays()
+        assert (msg.start, msg.values) == (3, [1])
+        alice.commit_subroutine(store(alice.app_id, []))
+        assert returned_arrays() == []
+        assert alice.shared_memory[0] == [None] * 3 + [1, None, 2] + [None] * 94
+
+
+def test_error(server):
+    subroutine = parse_text_subroutine(
+        """
+        # NETQASM 1.0
+        # APPID 0
+        ret_reg R0
+        """
+    )
+    with UnixSocketConnection("alice", path=server.path, timeout=1) as alice:
+        with pytest.raises(RuntimeError, match="failed to handle"):
+            alice.commit_subroutine(subroutine)
+        # Errors of non-blocking messages are raised when blocking
+        alice.commit_subroutine(subroutine, block=False)
+        with pytest.raises(RuntimeError, match="failed to handle"):
+            alice.block()
+        # The controller keeps handling messages
+        m = Qubit(alice).measure()
+    assert m == 0
+
+
+def test_stop_backend(server):
+    alice = UnixSocketConnection("alice", path=server.path, timeout=1)
+    alice.close(stop_backend=True)
+    server.serve_forever()
+    assert server.stopped
+    assert server.controller.stopped
+
+
+def test_connect_timeout(tmp_path):
+    with pytest.raises(TimeoutError):
+        UnixSocketConnection("alice", path=str(tmp_path / "none.sock"), timeout=0.05)
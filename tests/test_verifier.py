@@ -0,0 +1,94 @@
+from netqasm.lang.instr import core
+from netqasm.lang.operand import Immediate
+from netqasm.lang.parsing import parse_text_subroutine
+from netqasm.lang.verifier import verify_subroutine
+
+
+def parse(subroutine_str):
+    return parse_text_subroutine("# NETQASM 0.0\n# APPID 0\n" + subroutine_str)
+
+
+def lines_of(subroutine, instr_class):
+    return {
+        line
+        for line, instr in enumerate(subroutine.instructions)
+        if isinstance(instr, instr_class)
+    }
+
+
+def test_verified():
+    subroutine = parse(
+        """
+        array 4 @0
+        set R0 0
+        LOOP:
+        beq R0 4 EXIT
+        store R0 @0[R0]
+        store R0 @0[3]
+        add R0 R0 1
+        jmp LOOP
+        EXIT:
+        load R1 @0[2]
+        undef @0[1]
+        ret_arr @0
+        """
+    )
+    verification = verify_subroutine(subroutine)
+    assert subroutine.verification is verification
+    assert verification.verified
+    assert verification.problems == []
+
+    # The store at the index in the loop register can not be proven to be safe
+    stores = sorted(lines_of(subroutine, core.StoreInstruction))
+    expected = {stores[1]}
+    expected |= lines_of(subroutine, core.LoadInstruction)
+    expected |= lines_of(subroutine, core.UndefInstruction)
+    assert verification.safe_array_accesses == expected
+
+    # New instructions are not verified
+    subroutine.instructions = list(subroutine.instructions)
+    assert subroutine.verification is None
+
+
+def test_invalid_register():
+    subroutine = parse("set R16 0\nset Q0 0")
+    verification = verify_subroutine(subroutine)
+    assert not verification.registers_in_range
+    assert verification.branch_targets_valid
+    assert not verification.verified
+    assert verification.problems == ["line 0: register R16 does not exist"]
+
+
+def test_invalid_branch_target():
+    subroutine = parse("set R0 0\njmp 0")
+    subroutine.instructions[1].line = Immediate(3)
+    verification = verify_subroutine(subroutine)
+    assert verification.registers_in_range
+    assert not verification.branch_targets_valid
+    assert verification.problems == ["line 1: invalid branch target 3"]
+
+
+def test_array_accesses_after_branches():
+    subroutine = parse(
+        """
+        array 2 @0
+        store R0 @1[0]
+        store R0 @0[2]
+        beq R0 0 ELSE
+        array 3 @2
+        jmp END
+        ELSE:
+        array 3 @0
+        array 3 @2
+        END:
+        store R0 @2[2]
+        store R0 @0[1]
+        load R0 @2[R0]
+        """
+    )
+    verification = verify_subroutine(subroutine)
+    assert verification.verified
+    # Array @1 is not declared, @0[2] is out of range, @0 has different sizes after
+    # the branches and R0 is not a constant. Only @2 always has the same size.
+    stores = sorted(lines_of(subroutine, core.StoreInstruction))
+    assert verification.safe_array_accesses == {stores[2]}